@@ -0,0 +1,44 @@
+"""add message maintenance indexes
+
+Revision ID: a3b4c5d6e7f8
+Revises: f7a8b9c0d1e2
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "a3b4c5d6e7f8"
+down_revision: str | Sequence[str] | None = "f7a8b9c0d1e2"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_msg_message_status_id",
+        "msg_message",
+        ["status", "id"],
+    )
+    op.create_index(
+        "ix_msg_message_status_updated_at",
+        "msg_message",
+        ["status", "updated_at"],
+    )
+    op.create_index(
+        "ix_msg_message_expires_at_not_null",
+        "msg_message",
+        ["expires_at"],
+        postgresql_where=sa.text("expires_at IS NOT NULL"),
+        sqlite_where=sa.text("expires_at IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_msg_message_expires_at_not_null", table_name="msg_message")
+    op.drop_index("ix_msg_message_status_updated_at", table_name="msg_message")
+    op.drop_index("ix_msg_message_status_id", table_name="msg_message")
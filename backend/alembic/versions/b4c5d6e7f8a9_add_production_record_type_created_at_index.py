@@ -0,0 +1,32 @@
+"""add production record type created_at index
+
+Revision ID: b4c5d6e7f8a9
+Revises: a3b4c5d6e7f8
+Create Date: 2026-10-17 00:10:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+
+revision: str = "b4c5d6e7f8a9"
+down_revision: str | Sequence[str] | None = "a3b4c5d6e7f8"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_mes_production_record_type_created_at",
+        "mes_production_record",
+        ["record_type", "created_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_mes_production_record_type_created_at",
+        table_name="mes_production_record",
+    )
@@ -0,0 +1,89 @@
+"""add production daily rollup table
+
+Revision ID: c6d7e8f9a0b1
+Revises: b4c5d6e7f8a9
+Create Date: 2026-10-17 01:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "c6d7e8f9a0b1"
+down_revision: str | Sequence[str] | None = "b4c5d6e7f8a9"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "mes_production_daily_rollup",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("stat_date", sa.Date(), nullable=False),
+        sa.Column("stat_mode", sa.String(length=16), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("stage_id", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("process_id", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column(
+            "operator_user_id",
+            sa.Integer(),
+            nullable=False,
+            server_default=sa.text("0"),
+        ),
+        sa.Column(
+            "production_quantity",
+            sa.Integer(),
+            nullable=False,
+            server_default=sa.text("0"),
+        ),
+        sa.Column(
+            "production_record_count",
+            sa.Integer(),
+            nullable=False,
+            server_default=sa.text("0"),
+        ),
+        sa.Column("last_production_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "stat_date",
+            "stat_mode",
+            "product_id",
+            "stage_id",
+            "process_id",
+            "operator_user_id",
+            name="uq_mes_production_daily_rollup_key",
+        ),
+    )
+    op.create_index(
+        op.f("ix_mes_production_daily_rollup_id"),
+        "mes_production_daily_rollup",
+        ["id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_mes_production_daily_rollup_stat_date"),
+        "mes_production_daily_rollup",
+        ["stat_date"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f("ix_mes_production_daily_rollup_stat_date"),
+        table_name="mes_production_daily_rollup",
+    )
+    op.drop_index(
+        op.f("ix_mes_production_daily_rollup_id"),
+        table_name="mes_production_daily_rollup",
+    )
+    op.drop_table("mes_production_daily_rollup")
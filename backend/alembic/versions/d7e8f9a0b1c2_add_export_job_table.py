@@ -0,0 +1,122 @@
+"""add export job table
+
+Revision ID: d7e8f9a0b1c2
+Revises: c6d7e8f9a0b1
+Create Date: 2026-10-17 03:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "d7e8f9a0b1c2"
+down_revision: str | Sequence[str] | None = "c6d7e8f9a0b1"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sys_export_job",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("job_code", sa.String(length=64), nullable=False),
+        sa.Column("job_type", sa.String(length=64), nullable=False),
+        sa.Column("created_by_user_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "status",
+            sa.String(length=32),
+            nullable=False,
+            server_default=sa.text("'pending'"),
+        ),
+        sa.Column("format", sa.String(length=16), nullable=False),
+        sa.Column("params", sa.JSON(), nullable=False),
+        sa.Column("record_count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("total_count", sa.Integer(), nullable=True),
+        sa.Column(
+            "progress_percent",
+            sa.Integer(),
+            nullable=False,
+            server_default=sa.text("0"),
+        ),
+        sa.Column(
+            "cancel_requested",
+            sa.Boolean(),
+            nullable=False,
+            server_default=sa.text("false"),
+        ),
+        sa.Column("file_name", sa.String(length=255), nullable=True),
+        sa.Column("mime_type", sa.String(length=128), nullable=True),
+        sa.Column("storage_path", sa.Text(), nullable=True),
+        sa.Column("failure_reason", sa.Text(), nullable=True),
+        sa.Column(
+            "requested_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["created_by_user_id"],
+            ["sys_user.id"],
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_sys_export_job_id"), "sys_export_job", ["id"], unique=False)
+    op.create_index(
+        op.f("ix_sys_export_job_job_code"),
+        "sys_export_job",
+        ["job_code"],
+        unique=True,
+    )
+    op.create_index(
+        "ix_sys_export_job_status_requested_at",
+        "sys_export_job",
+        ["status", "requested_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_sys_export_job_status_expires_at",
+        "sys_export_job",
+        ["status", "expires_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_sys_export_job_status_heartbeat_at",
+        "sys_export_job",
+        ["status", "heartbeat_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_sys_export_job_owner_requested_at",
+        "sys_export_job",
+        ["created_by_user_id", "requested_at"],
+        unique=False,
+    )
+    # 用户导出任务清理改为按状态 + 时间过滤，补齐 processing 超时判定用的联合索引
+    op.create_index(
+        "ix_sys_user_export_task_status_started_at",
+        "sys_user_export_task",
+        ["status", "started_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_sys_user_export_task_status_started_at",
+        table_name="sys_user_export_task",
+    )
+    op.drop_index("ix_sys_export_job_owner_requested_at", table_name="sys_export_job")
+    op.drop_index("ix_sys_export_job_status_heartbeat_at", table_name="sys_export_job")
+    op.drop_index("ix_sys_export_job_status_expires_at", table_name="sys_export_job")
+    op.drop_index("ix_sys_export_job_status_requested_at", table_name="sys_export_job")
+    op.drop_index(op.f("ix_sys_export_job_job_code"), table_name="sys_export_job")
+    op.drop_index(op.f("ix_sys_export_job_id"), table_name="sys_export_job")
+    op.drop_table("sys_export_job")
@@ -0,0 +1,73 @@
+"""add trigram search indexes
+
+Revision ID: e8f9a0b1c2d3
+Revises: d7e8f9a0b1c2
+Create Date: 2026-10-17 05:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+
+revision: str = "e8f9a0b1c2d3"
+down_revision: str | Sequence[str] | None = "d7e8f9a0b1c2"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+# (索引名, 表名, 列名)：列表关键字搜索 ILIKE '%kw%' 涉及的列
+_TRIGRAM_INDEXES: tuple[tuple[str, str, str], ...] = (
+    ("ix_mes_order_order_code_trgm", "mes_order", "order_code"),
+    ("ix_mes_order_supplier_name_trgm", "mes_order", "supplier_name"),
+    ("ix_mes_product_name_trgm", "mes_product", "name"),
+    ("ix_mes_order_process_process_code_trgm", "mes_order_process", "process_code"),
+    ("ix_mes_order_process_process_name_trgm", "mes_order_process", "process_name"),
+    ("ix_msg_message_title_trgm", "msg_message", "title"),
+    ("ix_msg_message_summary_trgm", "msg_message", "summary"),
+    ("ix_msg_message_source_code_trgm", "msg_message", "source_code"),
+    ("ix_sys_user_username_trgm", "sys_user", "username"),
+    ("ix_sys_audit_log_operator_username_trgm", "sys_audit_log", "operator_username"),
+)
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        for index_name, table_name, column_name in _TRIGRAM_INDEXES:
+            op.create_index(index_name, table_name, [column_name], unique=False)
+        return
+
+    # pg_trgm 自 PostgreSQL 13 起为 trusted 扩展，库属主即可创建
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # 大表上建 GIN 索引耗时较长，CONCURRENTLY 避免期间阻塞工单 / 消息写入；
+    # CONCURRENTLY 不能在事务内执行，放到 autocommit 块里
+    with op.get_context().autocommit_block():
+        for index_name, table_name, column_name in _TRIGRAM_INDEXES:
+            op.create_index(
+                index_name,
+                table_name,
+                [column_name],
+                unique=False,
+                postgresql_using="gin",
+                postgresql_ops={column_name: "gin_trgm_ops"},
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        for index_name, table_name, _ in reversed(_TRIGRAM_INDEXES):
+            op.drop_index(index_name, table_name=table_name)
+        return
+
+    with op.get_context().autocommit_block():
+        for index_name, table_name, _ in reversed(_TRIGRAM_INDEXES):
+            op.drop_index(
+                index_name,
+                table_name=table_name,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+    # pg_trgm 扩展保留：可能已被库内其他对象依赖
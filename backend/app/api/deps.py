@@ -1,12 +1,12 @@
 from collections.abc import Callable
-from threading import RLock
-import time
+from dataclasses import dataclass
 
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.core.local_cache import LocalTTLCache
 from app.core.security import decode_access_token
 from app.db.session import get_db
 from app.models.user import User
@@ -23,15 +23,28 @@ from app.services.user_service import get_user_for_auth
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.api_v1_prefix}/auth/login")
-_AUTH_USER_CACHE_LOCK = RLock()
-_AUTH_USER_CACHE: dict[str, tuple[float, User]] = {}
 _AUTH_USER_CACHE_TTL_SECONDS = 10
-_PERMISSION_DECISION_CACHE_LOCK = RLock()
-_PERMISSION_DECISION_CACHE: dict[str, tuple[float, bool]] = {}
+_AUTH_USER_CACHE_MAX_SIZE = 10000
 _PERMISSION_DECISION_CACHE_TTL_SECONDS = 10
-_SESSION_PERMISSION_DECISION_CACHE_LOCK = RLock()
-_SESSION_PERMISSION_DECISION_CACHE: dict[str, tuple[float, bool]] = {}
+_PERMISSION_DECISION_CACHE_MAX_SIZE = 4096
 _SESSION_PERMISSION_DECISION_CACHE_TTL_SECONDS = 20
+_SESSION_PERMISSION_DECISION_CACHE_MAX_SIZE = 50000
+_AUTH_USER_CACHE: LocalTTLCache[str, User] = LocalTTLCache(
+    "deps.auth_user",
+    max_size=_AUTH_USER_CACHE_MAX_SIZE,
+    ttl_seconds=_AUTH_USER_CACHE_TTL_SECONDS,
+)
+_PERMISSION_DECISION_CACHE: LocalTTLCache[str, bool] = LocalTTLCache(
+    "deps.permission_decision",
+    max_size=_PERMISSION_DECISION_CACHE_MAX_SIZE,
+    ttl_seconds=_PERMISSION_DECISION_CACHE_TTL_SECONDS,
+)
+# 以 session_token_id 为标签，会话下线时按标签失效，无需扫描全部 key
+_SESSION_PERMISSION_DECISION_CACHE: LocalTTLCache[str, bool] = LocalTTLCache(
+    "deps.session_permission_decision",
+    max_size=_SESSION_PERMISSION_DECISION_CACHE_MAX_SIZE,
+    ttl_seconds=_SESSION_PERMISSION_DECISION_CACHE_TTL_SECONDS,
+)
 _AUTHZ_CACHE_GENERATION = 0
 
 
@@ -55,33 +68,23 @@ def _get_cached_auth_user(
     session_token_id: str,
     expected_user_id: int,
 ) -> User | None:
-    with _AUTH_USER_CACHE_LOCK:
-        cached = _AUTH_USER_CACHE.get(session_token_id)
-        if cached is None:
-            return None
-        expire_at, user = cached
-        if expire_at <= time.monotonic():
-            _AUTH_USER_CACHE.pop(session_token_id, None)
-            return None
-        if user.id != expected_user_id or user.is_deleted or not user.is_active:
-            _AUTH_USER_CACHE.pop(session_token_id, None)
-            return None
-        return user
+    user = _AUTH_USER_CACHE.get(session_token_id)
+    if user is None:
+        return None
+    if user.id != expected_user_id or user.is_deleted or not user.is_active:
+        _AUTH_USER_CACHE.pop(session_token_id)
+        return None
+    return user
 
 
 def _set_cached_auth_user(*, session_token_id: str, user: User) -> None:
-    with _AUTH_USER_CACHE_LOCK:
-        _AUTH_USER_CACHE[session_token_id] = (
-            time.monotonic() + _AUTH_USER_CACHE_TTL_SECONDS,
-            user,
-        )
+    _AUTH_USER_CACHE.set(session_token_id, user)
 
 
 def _forget_cached_auth_user(session_token_id: str | None) -> None:
     if not session_token_id:
         return
-    with _AUTH_USER_CACHE_LOCK:
-        _AUTH_USER_CACHE.pop(session_token_id, None)
+    _AUTH_USER_CACHE.pop(session_token_id)
 
 
 def _session_permission_cache_key(*, session_token_id: str, permission_code: str) -> str:
@@ -89,37 +92,22 @@ def _session_permission_cache_key(*, session_token_id: str, permission_code: str
 
 
 def _get_cached_session_permission_decision(cache_key: str) -> bool | None:
-    with _SESSION_PERMISSION_DECISION_CACHE_LOCK:
-        cached = _SESSION_PERMISSION_DECISION_CACHE.get(cache_key)
-        if cached is None:
-            return None
-        expire_at, result = cached
-        if expire_at <= time.monotonic():
-            _SESSION_PERMISSION_DECISION_CACHE.pop(cache_key, None)
-            return None
-        return result
-
-
-def _set_cached_session_permission_decision(cache_key: str, result: bool) -> None:
-    with _SESSION_PERMISSION_DECISION_CACHE_LOCK:
-        _SESSION_PERMISSION_DECISION_CACHE[cache_key] = (
-            time.monotonic() + _SESSION_PERMISSION_DECISION_CACHE_TTL_SECONDS,
-            result,
-        )
+    return _SESSION_PERMISSION_DECISION_CACHE.get(cache_key)
+
+
+def _set_cached_session_permission_decision(
+    cache_key: str,
+    result: bool,
+    *,
+    session_token_id: str,
+) -> None:
+    _SESSION_PERMISSION_DECISION_CACHE.set(cache_key, result, tags=(session_token_id,))
 
 
 def _forget_cached_session_permission_decision(session_token_id: str | None) -> None:
     if not session_token_id:
         return
-    key_prefix = f"{session_token_id}|"
-    with _SESSION_PERMISSION_DECISION_CACHE_LOCK:
-        keys = [
-            key
-            for key in _SESSION_PERMISSION_DECISION_CACHE.keys()
-            if key.startswith(key_prefix)
-        ]
-        for key in keys:
-            _SESSION_PERMISSION_DECISION_CACHE.pop(key, None)
+    _SESSION_PERMISSION_DECISION_CACHE.invalidate_tag(session_token_id)
 
 
 def _sync_permission_decision_caches_with_generation() -> None:
@@ -128,10 +116,8 @@ def _sync_permission_decision_caches_with_generation() -> None:
     if generation <= _AUTHZ_CACHE_GENERATION:
         return
     _AUTHZ_CACHE_GENERATION = generation
-    with _PERMISSION_DECISION_CACHE_LOCK:
-        _PERMISSION_DECISION_CACHE.clear()
-    with _SESSION_PERMISSION_DECISION_CACHE_LOCK:
-        _SESSION_PERMISSION_DECISION_CACHE.clear()
+    _PERMISSION_DECISION_CACHE.clear()
+    _SESSION_PERMISSION_DECISION_CACHE.clear()
 
 
 def _role_code_key(user: User) -> str:
@@ -150,149 +136,209 @@ def _permission_decision_cache_key(*, role_key: str, permission_key: str) -> str
 
 
 def _get_cached_permission_decision(cache_key: str) -> bool | None:
-    with _PERMISSION_DECISION_CACHE_LOCK:
-        cached = _PERMISSION_DECISION_CACHE.get(cache_key)
-        if cached is None:
-            return None
-        expire_at, result = cached
-        if expire_at <= time.monotonic():
-            _PERMISSION_DECISION_CACHE.pop(cache_key, None)
-            return None
-        return result
+    return _PERMISSION_DECISION_CACHE.get(cache_key)
 
 
 def _set_cached_permission_decision(cache_key: str, result: bool) -> None:
-    with _PERMISSION_DECISION_CACHE_LOCK:
-        _PERMISSION_DECISION_CACHE[cache_key] = (
-            time.monotonic() + _PERMISSION_DECISION_CACHE_TTL_SECONDS,
-            result,
-        )
+    _PERMISSION_DECISION_CACHE.set(cache_key, result)
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    request: Request = None,
-    db: Session = Depends(get_db),
-) -> User:
-    credentials_error = HTTPException(
+@dataclass(slots=True)
+class AuthContext:
+    """单个请求内解析一次的鉴权上下文，挂在 request.state 上供各鉴权依赖复用"""
+
+    token: str
+    user_id: int
+    session_token_id: str | None
+    login_type: str
+    user: User | None = None
+    online_touched: bool = False
+
+
+def _credentials_error() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Invalid authentication credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _forget_session_auth_caches(session_token_id: str | None) -> None:
+    _forget_cached_auth_user(session_token_id)
+    _forget_cached_session_permission_decision(session_token_id)
+
+
+def _fingerprint_mismatch(a: str | None, b: str | None) -> bool:
+    if a is None and b is None:
+        return False
+    if a is None or b is None:
+        return True
+    return a.strip() != b.strip()
+
+
+def _validate_request_session(
+    db: Session,
+    request: Request | None,
+    *,
+    user_id: int,
+    session_token_id: str,
+    login_type: str,
+) -> None:
+    session_row, session_touched = touch_session_by_token_id(
+        db,
+        session_token_id,
+        require_user_id=user_id,
+    )
+    if session_touched:
+        db.commit()
+    session_user_id = getattr(session_row, "user_id", None) if session_row else None
+    if (
+        session_row is None
+        or session_row.status != "active"
+        or (session_user_id is not None and session_user_id != user_id)
+    ):
+        _forget_session_auth_caches(session_token_id)
+        raise _credentials_error()
+
+    # ── 隐患 F 修复：设备指纹绑定校验 ─────────────────────────────────────
+    # session_row 可能是缓存的 CachedSessionState 或完整的 UserSession（均有
+    # login_ip/UA），也可能是轻量级快照（无指纹字段，此时回源 DB）。
+    # force-offline 按 session_token_id 作用在 DB 记录上并失效缓存。
+    #
+    # 安全策略：
+    #   • web Token：严格校验 IP + User-Agent（跨设备使用必须拒绝）
+    #   • mobile_scan Token：仅校验 IP（移动端 UA 随请求变化，不适合作为指纹）
+    current_ip: str | None = (
+        request.client.host if request and request.client else None
+    )
+    current_ua: str | None = (
+        normalize_terminal_info(
+            request.headers.get("user-agent") if request else None
+        )
+        if request else None
+    )
+    if hasattr(session_row, "login_ip") and hasattr(session_row, "terminal_info"):
+        full_session = session_row
+    else:
+        full_session = get_session_by_token_id(db, session_token_id)
+    stored_ip = full_session.login_ip if full_session is not None else None
+    stored_ua = full_session.terminal_info if full_session is not None else None
+
+    # IP 检查：所有登录类型都必须校验（跨网段使用 Token 视为可疑）
+    ip_mismatch = _fingerprint_mismatch(current_ip, stored_ip)
+    # UA 检查：仅 web Token 需要，移动端 UA 随请求动态变化
+    ua_mismatch = (
+        (login_type == "web") and _fingerprint_mismatch(current_ua, stored_ua)
+    )
+
+    if ip_mismatch or ua_mismatch:
+        # Token 疑似被跨设备盗用 → 强制注销并要求重新登录
+        if full_session is not None:
+            from app.services.session_service import mark_session_logout
+
+            mark_session_logout(
+                db, session_token_id=session_token_id, forced_offline=True
+            )
+            db.commit()
+        _forget_session_auth_caches(session_token_id)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="会话设备指纹校验失败（IP或User-Agent与登录时不一致），"
+            "请重新登录。如需在新设备使用，请注销后重新登录。",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+def _request_state(request: Request | None) -> object | None:
+    # 单测直接调用依赖时可能传入 None 或简单替身，此时不做请求级复用
+    return getattr(request, "state", None) if request is not None else None
+
+
+def resolve_auth_context(
+    token: str,
+    request: Request | None,
+    db: Session,
+) -> AuthContext:
+    """解码 JWT 并校验会话；同一请求内多个鉴权依赖只执行一次"""
+    request_state = _request_state(request)
+    cached_context = getattr(request_state, "auth_context", None)
+    if isinstance(cached_context, AuthContext) and cached_context.token == token:
+        return cached_context
+
     try:
         payload = decode_access_token(token)
         token_data = TokenPayload(sub=payload.get("sub", ""))
         session_token_id = str(payload.get("sid") or "").strip() or None
         login_type = str(payload.get("login_type") or "web").strip() or "web"
     except Exception:
-        raise credentials_error
-
+        raise _credentials_error()
     if not token_data.sub:
-        raise credentials_error
-
+        raise _credentials_error()
     try:
         user_id = int(token_data.sub)
     except ValueError:
-        raise credentials_error
+        raise _credentials_error()
 
     if session_token_id:
-        session_row, session_touched = touch_session_by_token_id(
+        _validate_request_session(
             db,
-            session_token_id,
-            require_user_id=user_id,
-        )
-        if session_touched:
-            db.commit()
-        session_user_id = getattr(session_row, "user_id", None) if session_row else None
-        if (
-            session_row is None
-            or session_row.status != "active"
-            or (session_user_id is not None and session_user_id != user_id)
-        ):
-            _forget_cached_auth_user(session_token_id)
-            _forget_cached_session_permission_decision(session_token_id)
-            raise credentials_error
-
-        # ── 隐患 F 修复：设备指纹绑定校验 ─────────────────────────────────────
-        # session_row 可能是一个轻量级 SessionStatusSnapshot（无 login_ip/UA），
-        # 也可能是完整的 UserSession（有 login_ip/UA）。
-        # 为安全起见，强制从 DB 获取完整会话信息用于指纹比对；
-        # 同时确保 force-offline 操作作用在完整的 DB 记录上。
-        #
-        # 安全策略：
-        #   • web Token：严格校验 IP + User-Agent（跨设备使用必须拒绝）
-        #   • mobile_scan Token：仅校验 IP（移动端 UA 随请求变化，不适合作为指纹）
-        current_ip: str | None = (
-            request.client.host if request and request.client else None
-        )
-        current_ua: str | None = (
-            normalize_terminal_info(
-                request.headers.get("user-agent") if request else None
-            )
-            if request else None
+            request,
+            user_id=user_id,
+            session_token_id=session_token_id,
+            login_type=login_type,
         )
-        stored_ip = getattr(session_row, "login_ip", None)
-        stored_ua = getattr(session_row, "terminal_info", None)
-        if stored_ip is None or stored_ua is None:
-            full_session = get_session_by_token_id(db, session_token_id)
-        else:
-            full_session = session_row if hasattr(session_row, "login_ip") else None
-        if full_session is not None:
-            stored_ip = full_session.login_ip
-            stored_ua = full_session.terminal_info
-
-        def _fingerprint_mismatch(a: str | None, b: str | None) -> bool:
-            if a is None and b is None:
-                return False
-            if a is None or b is None:
-                return True
-            return a.strip() != b.strip()
-
-        # IP 检查：所有登录类型都必须校验（跨网段使用 Token 视为可疑）
-        ip_mismatch = _fingerprint_mismatch(current_ip, stored_ip)
-        # UA 检查：仅 web Token 需要，移动端 UA 随请求动态变化
-        ua_mismatch = (
-            (login_type == "web") and _fingerprint_mismatch(current_ua, stored_ua)
+    context = AuthContext(
+        token=token,
+        user_id=user_id,
+        session_token_id=session_token_id,
+        login_type=login_type,
+    )
+    if request_state is not None:
+        request_state.auth_context = context
+    return context
+
+
+def _load_auth_context_user(
+    context: AuthContext,
+    request: Request | None,
+    db: Session,
+) -> User:
+    if context.user is not None:
+        return context.user
+    session_token_id = context.session_token_id
+    allow_user_cache = bool(request) and _allow_auth_user_cache(request, session_token_id)
+    user: User | None = None
+    if allow_user_cache:
+        user = _get_cached_auth_user(
+            session_token_id=session_token_id,
+            expected_user_id=context.user_id,
         )
+    if user is None:
+        user = get_user_for_auth(db, context.user_id)
+        if not user or user.is_deleted or not user.is_active:
+            _forget_session_auth_caches(session_token_id)
+            raise _credentials_error()
+        if allow_user_cache:
+            _set_cached_auth_user(session_token_id=session_token_id, user=user)
+    context.user = user
+    return user
 
-        if ip_mismatch or ua_mismatch:
-            # Token 疑似被跨设备盗用 → 强制注销并要求重新登录
-            if full_session is not None:
-                from app.services.session_service import mark_session_logout
 
-                mark_session_logout(
-                    db, session_token_id=session_token_id, forced_offline=True
-                )
-                db.commit()
-            _forget_cached_auth_user(session_token_id)
-            _forget_cached_session_permission_decision(session_token_id)
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="会话设备指纹校验失败（IP或User-Agent与登录时不一致），"
-                "请重新登录。如需在新设备使用，请注销后重新登录。",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+def _touch_auth_context_online(context: AuthContext) -> None:
+    if context.online_touched:
+        return
+    context.online_touched = True
+    touch_user(context.user_id)
 
-        if request and _allow_auth_user_cache(request, session_token_id):
-            cached_user = _get_cached_auth_user(
-                session_token_id=session_token_id,
-                expected_user_id=user_id,
-            )
-            if cached_user is not None:
-                touch_user(cached_user.id)
-                return cached_user
-    user = get_user_for_auth(db, user_id)
-    if not user:
-        _forget_cached_auth_user(session_token_id)
-        _forget_cached_session_permission_decision(session_token_id)
-        raise credentials_error
-    if user.is_deleted or not user.is_active:
-        _forget_cached_auth_user(session_token_id)
-        _forget_cached_session_permission_decision(session_token_id)
-        raise credentials_error
-    if request and _allow_auth_user_cache(request, session_token_id):
-        _set_cached_auth_user(session_token_id=session_token_id, user=user)
-    touch_user(user.id)
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    request: Request = None,
+    db: Session = Depends(get_db),
+) -> User:
+    context = resolve_auth_context(token, request, db)
+    user = _load_auth_context_user(context, request, db)
+    _touch_auth_context_online(context)
     return user
 
 
@@ -375,94 +421,10 @@ def require_permission_fast(permission_code: str) -> Callable[[str, Request, Ses
         db: Session = Depends(get_db),
     ) -> None:
         _sync_permission_decision_caches_with_generation()
-        credentials_error = HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-        try:
-            payload = decode_access_token(token)
-            token_data = TokenPayload(sub=payload.get("sub", ""))
-            session_token_id = str(payload.get("sid") or "").strip() or None
-            login_type = str(payload.get("login_type") or "web").strip() or "web"
-        except Exception:
-            raise credentials_error
-        if not token_data.sub:
-            raise credentials_error
-        try:
-            user_id = int(token_data.sub)
-        except ValueError:
-            raise credentials_error
-
+        context = resolve_auth_context(token, request, db)
+        session_token_id = context.session_token_id
         if not session_token_id:
-            raise credentials_error
-        session_row, session_touched = touch_session_by_token_id(
-            db,
-            session_token_id,
-            require_user_id=user_id,
-        )
-        if session_touched:
-            db.commit()
-        session_user_id = getattr(session_row, "user_id", None) if session_row else None
-        if (
-            session_row is None
-            or session_row.status != "active"
-            or (session_user_id is not None and session_user_id != user_id)
-        ):
-            _forget_cached_auth_user(session_token_id)
-            _forget_cached_session_permission_decision(session_token_id)
-            raise credentials_error
-
-        # ── 隐患 F 修复：设备指纹绑定校验（require_permission_fast 路径）──────────
-        current_ip: str | None = (
-            request.client.host if request and request.client else None
-        )
-        current_ua: str | None = (
-            normalize_terminal_info(
-                request.headers.get("user-agent") if request else None
-            )
-            if request else None
-        )
-        stored_ip = getattr(session_row, "login_ip", None)
-        stored_ua = getattr(session_row, "terminal_info", None)
-        if stored_ip is None or stored_ua is None:
-            full_session = get_session_by_token_id(db, session_token_id)
-        else:
-            full_session = session_row if hasattr(session_row, "login_ip") else None
-        if full_session is not None:
-            stored_ip = full_session.login_ip
-            stored_ua = full_session.terminal_info
-
-        def _fp_mismatch(a: str | None, b: str | None) -> bool:
-            if a is None and b is None:
-                return False
-            if a is None or b is None:
-                return True
-            return a.strip() != b.strip()
-
-        # IP 检查：所有登录类型都必须校验
-        ip_mismatch = _fp_mismatch(current_ip, stored_ip)
-        # UA 检查：仅 web Token 需要，移动端 UA 随请求动态变化
-        ua_mismatch = (
-            (login_type == "web") and _fp_mismatch(current_ua, stored_ua)
-        )
-
-        if ip_mismatch or ua_mismatch:
-            if full_session is not None:
-                from app.services.session_service import mark_session_logout
-
-                mark_session_logout(
-                    db, session_token_id=session_token_id, forced_offline=True
-                )
-                db.commit()
-            _forget_cached_auth_user(session_token_id)
-            _forget_cached_session_permission_decision(session_token_id)
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="会话设备指纹校验失败（IP或User-Agent与登录时不一致），"
-                "请重新登录。如需在新设备使用，请注销后重新登录。",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+            raise _credentials_error()
 
         session_permission_cache_key = _session_permission_cache_key(
             session_token_id=session_token_id,
@@ -477,21 +439,10 @@ def require_permission_fast(permission_code: str) -> Callable[[str, Request, Ses
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Access denied",
                 )
-            touch_user(user_id)
+            _touch_auth_context_online(context)
             return
 
-        cached_user = None
-        if request and _allow_auth_user_cache(request, session_token_id):
-            cached_user = _get_cached_auth_user(
-                session_token_id=session_token_id,
-                expected_user_id=user_id,
-            )
-        user = cached_user or get_user_for_auth(db, user_id)
-        if not user or user.is_deleted or not user.is_active:
-            _forget_cached_auth_user(session_token_id)
-            _forget_cached_session_permission_decision(session_token_id)
-            raise credentials_error
-
+        user = _load_auth_context_user(context, request, db)
         role_key = _role_code_key(user)
         decision_cache_key = _permission_decision_cache_key(
             role_key=role_key,
@@ -502,12 +453,13 @@ def require_permission_fast(permission_code: str) -> Callable[[str, Request, Ses
             effective_codes = get_user_permission_codes(db, user=user)
             decision = permission_code in effective_codes
             _set_cached_permission_decision(decision_cache_key, decision)
-        _set_cached_session_permission_decision(session_permission_cache_key, decision)
+        _set_cached_session_permission_decision(
+            session_permission_cache_key,
+            decision,
+            session_token_id=session_token_id,
+        )
         if not decision:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
-
-        if request and _allow_auth_user_cache(request, session_token_id):
-            _set_cached_auth_user(session_token_id=session_token_id, user=user)
-        touch_user(user.id)
+        _touch_auth_context_online(context)
 
     return dependency
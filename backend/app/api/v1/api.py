@@ -6,6 +6,7 @@ from app.api.v1.endpoints import (
     authz,
     craft,
     equipment,
+    export_jobs,
     me,
     messages,
     processes,
@@ -36,4 +37,5 @@ api_router.include_router(quality.router, prefix="/quality", tags=["Quality"])
 api_router.include_router(equipment.router, prefix="/equipment", tags=["Equipment"])
 api_router.include_router(ui.router, prefix="/ui", tags=["UI"])
 api_router.include_router(messages.router, prefix="/messages", tags=["Messages"])
+api_router.include_router(export_jobs.router, prefix="/export-jobs", tags=["ExportJobs"])
 api_router.include_router(system.router, prefix="/system", tags=["System"])
@@ -1,15 +1,20 @@
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
 from app.api.deps import require_permission
-from app.db.session import get_db
+from app.db.session import get_read_db
 from app.models.audit_log import AuditLog
 from app.models.user import User
 from app.schemas.audit import AuditLogItem, AuditLogListResult
 from app.schemas.common import ApiResponse, success_response
-from app.services.audit_service import list_audit_logs
+from app.services.audit_service import AUDIT_LOG_KEYSET, list_audit_logs
+from app.services.list_pagination_service import (
+    COUNT_MODE_EXACT,
+    COUNT_MODE_PATTERN,
+    is_total_estimate,
+)
 
 
 router = APIRouter()
@@ -44,17 +49,31 @@ def get_audit_logs(
     target_type: str | None = Query(default=None),
     start_time: datetime | None = Query(default=None),
     end_time: datetime | None = Query(default=None),
-    db: Session = Depends(get_db),
+    cursor: str | None = Query(default=None),
+    count_mode: str = Query(default=COUNT_MODE_EXACT, pattern=COUNT_MODE_PATTERN),
+    db: Session = Depends(get_read_db),
     _: User = Depends(require_permission("user.audit_logs.list")),
 ) -> ApiResponse[AuditLogListResult]:
-    total, items = list_audit_logs(
-        db,
-        page=page,
-        page_size=page_size,
-        operator_username=operator_username,
-        action_code=action_code,
-        target_type=target_type,
-        start_time=start_time,
-        end_time=end_time,
+    try:
+        total, items = list_audit_logs(
+            db,
+            page=page,
+            page_size=page_size,
+            operator_username=operator_username,
+            action_code=action_code,
+            target_type=target_type,
+            start_time=start_time,
+            end_time=end_time,
+            cursor=cursor,
+            count_mode=count_mode,
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error)) from error
+    return success_response(
+        AuditLogListResult(
+            total=total,
+            items=[to_item(row) for row in items],
+            next_cursor=AUDIT_LOG_KEYSET.next_cursor(items, page_size),
+            total_is_estimate=is_total_estimate(total, count_mode=count_mode),
+        )
     )
-    return success_response(AuditLogListResult(total=total, items=[to_item(row) for row in items]))
@@ -272,7 +272,7 @@ def _login_with_expiry(
         expires_at=session_row.expires_at,
     )
 
-    touch_user(user.id)
+    touch_user(user.id, immediate=True)
     return _build_login_success_response(
         user=user,
         session_row=session_row,
@@ -5,12 +5,13 @@ import json
 import logging
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
 from app.api.deps import require_permission, require_permission_fast
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.models.craft_system_master_template import CraftSystemMasterTemplate
 from app.models.process import Process
 from app.models.process_stage import ProcessStage
@@ -18,6 +19,11 @@ from app.models.product import Product
 from app.models.product_process_template import ProductProcessTemplate
 from app.models.user import User
 from app.schemas.common import ApiResponse, success_response
+from app.services.export_stream_service import (
+    build_export_file_name,
+    build_streaming_export_response,
+    normalize_export_format,
+)
 from app.services.audit_service import write_audit_log
 from app.services.message_service import create_message_for_users
 from app.schemas.craft import (
@@ -125,6 +131,10 @@ from app.services.craft_service import (
     list_templates,
     export_stages_csv,
     export_processes_csv,
+    iter_process_export_rows,
+    iter_stage_export_rows,
+    PROCESS_EXPORT_HEADERS,
+    STAGE_EXPORT_HEADERS,
     update_process,
     update_system_master_template,
     update_stage,
@@ -699,6 +709,54 @@ def export_processes_api(
     return success_response(CraftExportResult(**result))
 
 
+def _export_format_or_400(value: str | None) -> str:
+    try:
+        return normalize_export_format(value)
+    except ValueError as error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(error)
+        ) from error
+
+
+@router.get("/stages/export/stream")
+def export_stages_stream_api(
+    keyword: str | None = Query(default=None),
+    enabled: bool | None = Query(default=None),
+    format: str = Query(default="csv"),
+    db: Session = Depends(get_db),
+    _: User = Depends(require_permission("craft.stages.list")),
+) -> StreamingResponse:
+    export_format = _export_format_or_400(format)
+    return build_streaming_export_response(
+        file_name=build_export_file_name("stages", format=export_format),
+        headers=STAGE_EXPORT_HEADERS,
+        rows=iter_stage_export_rows(db, keyword=keyword, enabled=enabled),
+        format=export_format,
+        sheet_title="工段",
+    )
+
+
+@router.get("/processes/export/stream")
+def export_processes_stream_api(
+    keyword: str | None = Query(default=None),
+    stage_id: int | None = Query(default=None, ge=1),
+    enabled: bool | None = Query(default=None),
+    format: str = Query(default="csv"),
+    db: Session = Depends(get_db),
+    _: User = Depends(require_permission("craft.processes.list")),
+) -> StreamingResponse:
+    export_format = _export_format_or_400(format)
+    return build_streaming_export_response(
+        file_name=build_export_file_name("processes", format=export_format),
+        headers=PROCESS_EXPORT_HEADERS,
+        rows=iter_process_export_rows(
+            db, keyword=keyword, stage_id=stage_id, enabled=enabled
+        ),
+        format=export_format,
+        sheet_title="工序",
+    )
+
+
 @router.get("/processes", response_model=ApiResponse[CraftProcessListResult])
 def get_processes_api(
     page: int = Query(default=1, ge=1),
@@ -949,7 +1007,7 @@ def get_craft_kanban_process_metrics_api(
     process_id: int | None = Query(default=None, ge=1),
     start_date: datetime | None = Query(default=None),
     end_date: datetime | None = Query(default=None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _: User = Depends(require_permission("craft.kanban.process_metrics.view")),
 ) -> ApiResponse[CraftKanbanProcessMetricsResult]:
     try:
@@ -980,7 +1038,7 @@ def export_craft_kanban_process_metrics_api(
     start_date: datetime | None = Query(default=None),
     end_date: datetime | None = Query(default=None),
     limit: int = Query(default=5, ge=1, le=100),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _: User = Depends(require_permission("craft.kanban.process_metrics.view")),
 ) -> ApiResponse[CraftExportResult]:
     try:
@@ -1,6 +1,7 @@
 from datetime import date as date_type
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
@@ -17,7 +18,17 @@ from app.models.user import User
 from app.schemas.common import ApiResponse, success_response
 from app.services.audit_service import write_audit_log
 from app.services.home_dashboard_service import invalidate_home_dashboard_cache
+from app.services.list_pagination_service import (
+    COUNT_MODE_EXACT,
+    COUNT_MODE_PATTERN,
+    is_total_estimate,
+)
 from app.services.message_service import close_source_todo_messages
+from app.services.export_stream_service import (
+    build_export_file_name,
+    build_streaming_export_response,
+    normalize_export_format,
+)
 from app.schemas.equipment import (
     EquipmentDetailResult,
     EquipmentExportResult,
@@ -66,9 +77,19 @@ from app.services.equipment_service import (
     export_maintenance_plans_csv,
     export_maintenance_records_csv,
     export_work_orders_csv,
+    EQUIPMENT_LEDGER_EXPORT_HEADERS,
+    MAINTENANCE_ITEM_EXPORT_HEADERS,
+    MAINTENANCE_PLAN_EXPORT_HEADERS,
+    MAINTENANCE_RECORD_EXPORT_HEADERS,
+    WORK_ORDER_EXPORT_HEADERS,
     ensure_maintenance_record_view_permission,
     ensure_work_order_view_permission,
     generate_work_order_for_plan,
+    iter_equipment_ledger_export_rows,
+    iter_maintenance_item_export_rows,
+    iter_maintenance_plan_export_rows,
+    iter_maintenance_record_export_rows,
+    iter_work_order_export_rows,
     get_equipment_by_id,
     get_equipment_detail,
     get_maintenance_item_by_id,
@@ -81,6 +102,7 @@ from app.services.equipment_service import (
     list_maintenance_items,
     list_maintenance_plans,
     list_maintenance_records,
+    WORK_ORDER_LIST_KEYSET,
     list_work_orders,
     start_work_order,
     toggle_equipment,
@@ -122,6 +144,15 @@ def _current_user_stage_codes(db: Session, current_user: User) -> list[str]:
     )
 
 
+def _export_format_or_400(value: str | None) -> str:
+    try:
+        return normalize_export_format(value)
+    except ValueError as error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(error)
+        ) from error
+
+
 def _raise_visibility_error(error: ValueError) -> None:
     detail = str(error)
     error_status = (
@@ -812,6 +843,8 @@ def get_maintenance_executions(
     due_date_start: date_type | None = Query(default=None),
     due_date_end: date_type | None = Query(default=None),
     stage_code: str | None = Query(default=None),
+    cursor: str | None = Query(default=None),
+    count_mode: str = Query(default=COUNT_MODE_EXACT, pattern=COUNT_MODE_PATTERN),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("equipment.executions.list")),
 ) -> ApiResponse[MaintenanceWorkOrderListResult]:
@@ -838,6 +871,8 @@ def get_maintenance_executions(
             due_date_start=due_date_start,
             due_date_end=due_date_end,
             stage_code_filter=stage_code,
+            cursor=cursor,
+            count_mode=count_mode,
         )
     except ValueError as error:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
@@ -845,6 +880,8 @@ def get_maintenance_executions(
         MaintenanceWorkOrderListResult(
             total=total,
             items=[to_work_order_item(row) for row in rows],
+            next_cursor=WORK_ORDER_LIST_KEYSET.next_cursor(rows, page_size),
+            total_is_estimate=is_total_estimate(total, count_mode=count_mode),
         )
     )
 
@@ -1185,6 +1222,32 @@ def export_equipment_ledger_api(
     return success_response(EquipmentExportResult(**result))
 
 
+@router.get("/ledger/export/stream")
+def export_equipment_ledger_stream_api(
+    keyword: str | None = Query(default=None),
+    enabled: bool | None = Query(default=None),
+    location_keyword: str | None = Query(default=None),
+    owner_name: str | None = Query(default=None),
+    format: str = Query(default="csv"),
+    db: Session = Depends(get_db),
+    _: User = Depends(require_permission("equipment.ledger.list")),
+) -> StreamingResponse:
+    export_format = _export_format_or_400(format)
+    return build_streaming_export_response(
+        file_name=build_export_file_name("equipment_ledger", format=export_format),
+        headers=EQUIPMENT_LEDGER_EXPORT_HEADERS,
+        rows=iter_equipment_ledger_export_rows(
+            db,
+            keyword=keyword,
+            enabled=enabled,
+            location_keyword=location_keyword,
+            owner_name=owner_name,
+        ),
+        format=export_format,
+        sheet_title="设备台账",
+    )
+
+
 @router.get("/items/export", response_model=ApiResponse[EquipmentExportResult])
 def export_maintenance_items_api(
     keyword: str | None = Query(default=None),
@@ -1199,6 +1262,27 @@ def export_maintenance_items_api(
     return success_response(EquipmentExportResult(**result))
 
 
+@router.get("/items/export/stream")
+def export_maintenance_items_stream_api(
+    keyword: str | None = Query(default=None),
+    enabled: bool | None = Query(default=None),
+    category: str | None = Query(default=None),
+    format: str = Query(default="csv"),
+    db: Session = Depends(get_db),
+    _: User = Depends(require_permission("equipment.items.list")),
+) -> StreamingResponse:
+    export_format = _export_format_or_400(format)
+    return build_streaming_export_response(
+        file_name=build_export_file_name("maintenance_items", format=export_format),
+        headers=MAINTENANCE_ITEM_EXPORT_HEADERS,
+        rows=iter_maintenance_item_export_rows(
+            db, keyword=keyword, enabled=enabled, category=category
+        ),
+        format=export_format,
+        sheet_title="保养项目",
+    )
+
+
 @router.get("/plans/export", response_model=ApiResponse[EquipmentExportResult])
 def export_maintenance_plans_api(
     equipment_id: int | None = Query(default=None, ge=1),
@@ -1220,6 +1304,34 @@ def export_maintenance_plans_api(
     return success_response(EquipmentExportResult(**result))
 
 
+@router.get("/plans/export/stream")
+def export_maintenance_plans_stream_api(
+    equipment_id: int | None = Query(default=None, ge=1),
+    item_id: int | None = Query(default=None, ge=1),
+    enabled: bool | None = Query(default=None),
+    execution_process_code: str | None = Query(default=None),
+    default_executor_user_id: int | None = Query(default=None, ge=1),
+    format: str = Query(default="csv"),
+    db: Session = Depends(get_db),
+    _: User = Depends(require_permission("equipment.plans.list")),
+) -> StreamingResponse:
+    export_format = _export_format_or_400(format)
+    return build_streaming_export_response(
+        file_name=build_export_file_name("maintenance_plans", format=export_format),
+        headers=MAINTENANCE_PLAN_EXPORT_HEADERS,
+        rows=iter_maintenance_plan_export_rows(
+            db,
+            equipment_id=equipment_id,
+            item_id=item_id,
+            enabled=enabled,
+            execution_process_code=execution_process_code,
+            default_executor_user_id=default_executor_user_id,
+        ),
+        format=export_format,
+        sheet_title="保养计划",
+    )
+
+
 @router.get("/records/export", response_model=ApiResponse[EquipmentExportResult])
 def export_maintenance_records_api(
     keyword: str | None = Query(default=None),
@@ -1245,6 +1357,38 @@ def export_maintenance_records_api(
     return success_response(EquipmentExportResult(**result))
 
 
+@router.get("/records/export/stream")
+def export_maintenance_records_stream_api(
+    keyword: str | None = Query(default=None),
+    executor_id: int | None = Query(default=None, ge=1),
+    result_summary: str | None = Query(default=None),
+    equipment_id: int | None = Query(default=None, ge=1),
+    start_date: date_type | None = Query(default=None),
+    end_date: date_type | None = Query(default=None),
+    format: str = Query(default="csv"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission("equipment.records.list")),
+) -> StreamingResponse:
+    export_format = _export_format_or_400(format)
+    return build_streaming_export_response(
+        file_name=build_export_file_name("maintenance_records", format=export_format),
+        headers=MAINTENANCE_RECORD_EXPORT_HEADERS,
+        rows=iter_maintenance_record_export_rows(
+            db,
+            keyword=keyword,
+            executor_user_id=executor_id,
+            result_summary=result_summary,
+            equipment_id=equipment_id,
+            current_user_role_codes=_current_user_role_codes(current_user),
+            current_user_stage_codes=_current_user_stage_codes(db, current_user),
+            start_date=start_date,
+            end_date=end_date,
+        ),
+        format=export_format,
+        sheet_title="保养记录",
+    )
+
+
 @router.get("/executions/export", response_model=ApiResponse[EquipmentExportResult])
 def export_work_orders_api(
     status_filter: str | None = Query(default=None, alias="status"),
@@ -1268,6 +1412,36 @@ def export_work_orders_api(
     return success_response(EquipmentExportResult(**result))
 
 
+@router.get("/executions/export/stream")
+def export_work_orders_stream_api(
+    status_filter: str | None = Query(default=None, alias="status"),
+    keyword: str | None = Query(default=None),
+    due_date_start: date_type | None = Query(default=None),
+    due_date_end: date_type | None = Query(default=None),
+    stage_code: str | None = Query(default=None),
+    format: str = Query(default="csv"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission("equipment.executions.list")),
+) -> StreamingResponse:
+    export_format = _export_format_or_400(format)
+    return build_streaming_export_response(
+        file_name=build_export_file_name("work_orders", format=export_format),
+        headers=WORK_ORDER_EXPORT_HEADERS,
+        rows=iter_work_order_export_rows(
+            db,
+            status=status_filter,
+            keyword=keyword,
+            due_date_start=due_date_start,
+            due_date_end=due_date_end,
+            stage_code=stage_code,
+            current_user_role_codes=_current_user_role_codes(current_user),
+            current_user_stage_codes=_current_user_stage_codes(db, current_user),
+        ),
+        format=export_format,
+        sheet_title="保养工单",
+    )
+
+
 # ── 设备规则 ──────────────────────────────────────────────────────────────────
 
 
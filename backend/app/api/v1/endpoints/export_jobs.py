@@ -0,0 +1,188 @@
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_current_active_user
+from app.db.session import get_db
+from app.models.export_job import ExportJob
+from app.models.user import User
+from app.schemas.common import ApiResponse, success_response
+from app.schemas.export_job import (
+    ExportJobCreateRequest,
+    ExportJobItem,
+    ExportJobListResult,
+    ExportJobTypeItem,
+)
+from app.services.audit_service import write_audit_log
+from app.services.authz_service import get_user_permission_codes
+from app.services.export_job_service import (
+    EXPORT_JOB_STATUS_SUCCEEDED,
+    cancel_export_job,
+    create_export_job,
+    get_export_job,
+    get_export_job_handler,
+    list_export_job_handlers,
+    list_export_jobs,
+)
+from app.services.export_stream_service import build_content_disposition, iter_file_bytes
+
+
+router = APIRouter()
+
+
+def to_export_job_item(job: ExportJob) -> ExportJobItem:
+    return ExportJobItem(
+        id=job.id,
+        job_code=job.job_code,
+        job_type=job.job_type,
+        status=job.status,
+        format=job.format,
+        params=job.params or {},
+        record_count=job.record_count,
+        total_count=job.total_count,
+        progress_percent=job.progress_percent,
+        cancel_requested=job.cancel_requested,
+        file_name=job.file_name,
+        mime_type=job.mime_type,
+        failure_reason=job.failure_reason,
+        requested_at=job.requested_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        expires_at=job.expires_at,
+    )
+
+
+def _get_owned_job_or_404(db: Session, *, job_id: int, current_user: User) -> ExportJob:
+    job = get_export_job(db, job_id=job_id, created_by_user_id=int(current_user.id))
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="导出任务不存在")
+    return job
+
+
+@router.get("/types", response_model=ApiResponse[list[ExportJobTypeItem]])
+def list_export_job_types_api(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> ApiResponse[list[ExportJobTypeItem]]:
+    permission_codes = get_user_permission_codes(db, user=current_user)
+    return success_response(
+        [
+            ExportJobTypeItem(
+                job_type=handler.job_type,
+                label=handler.label,
+                permission_code=handler.permission_code,
+            )
+            for handler in list_export_job_handlers()
+            if handler.permission_code in permission_codes
+        ]
+    )
+
+
+@router.post("", response_model=ApiResponse[ExportJobItem])
+def create_export_job_api(
+    payload: ExportJobCreateRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> ApiResponse[ExportJobItem]:
+    try:
+        handler = get_export_job_handler(payload.job_type)
+    except ValueError as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error)) from error
+    if handler.permission_code not in get_user_permission_codes(db, user=current_user):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+    try:
+        job = create_export_job(
+            db,
+            created_by_user_id=int(current_user.id),
+            job_type=handler.job_type,
+            format=payload.format,
+            params=payload.params,
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error)) from error
+    write_audit_log(
+        db,
+        action_code="export_job.create",
+        action_name="创建导出任务",
+        target_type="export_job",
+        target_id=str(job.id),
+        target_name=job.job_code,
+        operator=current_user,
+        after_data={
+            "job_type": job.job_type,
+            "format": job.format,
+            "params": job.params,
+        },
+        ip_address=request.client.host if request and request.client else None,
+        terminal_info=request.headers.get("user-agent") if request else None,
+    )
+    db.commit()
+    # 只入队：由 worker 进程领取执行，Web 进程不承担导出负载
+    return success_response(to_export_job_item(job), message="accepted")
+
+
+@router.get("", response_model=ApiResponse[ExportJobListResult])
+def list_export_jobs_api(
+    job_type: str | None = Query(default=None, max_length=64),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> ApiResponse[ExportJobListResult]:
+    jobs = list_export_jobs(
+        db,
+        created_by_user_id=int(current_user.id),
+        job_type=job_type,
+    )
+    return success_response(
+        ExportJobListResult(
+            total=len(jobs),
+            items=[to_export_job_item(job) for job in jobs],
+        )
+    )
+
+
+@router.get("/{job_id}", response_model=ApiResponse[ExportJobItem])
+def get_export_job_api(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> ApiResponse[ExportJobItem]:
+    job = _get_owned_job_or_404(db, job_id=job_id, current_user=current_user)
+    return success_response(to_export_job_item(job))
+
+
+@router.post("/{job_id}/cancel", response_model=ApiResponse[ExportJobItem])
+def cancel_export_job_api(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> ApiResponse[ExportJobItem]:
+    job = _get_owned_job_or_404(db, job_id=job_id, current_user=current_user)
+    try:
+        job = cancel_export_job(db, job=job)
+    except ValueError as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error)) from error
+    return success_response(to_export_job_item(job))
+
+
+@router.get("/{job_id}/download", response_class=StreamingResponse)
+def download_export_job_api(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> StreamingResponse:
+    job = _get_owned_job_or_404(db, job_id=job_id, current_user=current_user)
+    if job.status != EXPORT_JOB_STATUS_SUCCEEDED:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="导出任务尚未完成")
+    if not job.storage_path or not job.file_name or not job.mime_type:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="导出文件不存在，请重新导出")
+    file_path = Path(job.storage_path)
+    if not file_path.exists():
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="导出文件已过期，请重新导出")
+    return StreamingResponse(
+        iter_file_bytes(file_path),
+        media_type=job.mime_type,
+        headers={"Content-Disposition": build_content_disposition(job.file_name)},
+    )
@@ -5,6 +5,7 @@ from datetime import datetime
 
 from fastapi import (
     APIRouter,
+    BackgroundTasks,
     Depends,
     HTTPException,
     Query,
@@ -13,14 +14,16 @@ from fastapi import (
     status,
 )
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_active_user, require_permission
 from app.core.security import decode_access_token
-from app.db.session import get_db
+from app.db.session import get_async_db, get_db
 from app.models.user import User
 from app.schemas.common import ApiResponse, success_response
 from app.schemas.message import (
+    AnnouncementDeliveryProgress,
     AnnouncementManagementItem,
     AnnouncementOfflineResult,
     AnnouncementPublishRequest,
@@ -35,14 +38,23 @@ from app.schemas.message import (
 )
 from app.services.audit_service import write_audit_log
 from app.services.message_connection_manager import message_connection_manager
+from app.services.list_pagination_service import (
+    COUNT_MODE_EXACT,
+    COUNT_MODE_PATTERN,
+    is_total_estimate,
+)
 from app.services.message_service import (
+    MESSAGE_LIST_KEYSET,
+    fan_out_message_deliveries,
+    get_message_delivery_progress,
     get_message_detail,
     get_message_jump_target,
-    get_message_summary,
+    get_message_summary_async,
     get_unread_count,
+    get_unread_count_async,
     list_active_announcements,
     list_public_announcements,
-    list_messages,
+    list_messages_async,
     mark_all_read,
     mark_messages_read_batch,
     mark_message_read,
@@ -83,25 +95,25 @@ def api_list_public_announcements(
 
 
 @router.get("/unread-count", response_model=ApiResponse[UnreadCountResult])
-def api_unread_count(
-    db: Session = Depends(get_db),
+async def api_unread_count(
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_permission("message.messages.unread_count")),
 ) -> ApiResponse[UnreadCountResult]:
-    count = get_unread_count(db, user_id=current_user.id)
+    count = await get_unread_count_async(db, user_id=current_user.id)
     return success_response(UnreadCountResult(unread_count=count))
 
 
 @router.get("/summary", response_model=ApiResponse[MessageSummaryResult])
-def api_message_summary(
-    db: Session = Depends(get_db),
+async def api_message_summary(
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_permission("message.messages.unread_count")),
 ) -> ApiResponse[MessageSummaryResult]:
-    payload = get_message_summary(db, user_id=current_user.id)
+    payload = await get_message_summary_async(db, user_id=current_user.id)
     return success_response(MessageSummaryResult(**payload))
 
 
 @router.get("", response_model=ApiResponse[MessageListResult])
-def api_list_messages(
+async def api_list_messages(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     keyword: str | None = Query(None),
@@ -113,27 +125,42 @@ def api_list_messages(
     end_time: datetime | None = Query(None),
     todo_only: bool = Query(False),
     active_only: bool = Query(True),
-    db: Session = Depends(get_db),
+    cursor: str | None = Query(None),
+    count_mode: str = Query(COUNT_MODE_EXACT, pattern=COUNT_MODE_PATTERN),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_permission("message.messages.list")),
 ) -> ApiResponse[MessageListResult]:
-    items, total = list_messages(
-        db,
-        user_id=current_user.id,
-        current_user=current_user,
-        page=page,
-        page_size=page_size,
-        keyword=keyword,
-        status=status,
-        message_type=message_type,
-        priority=priority,
-        source_module=source_module,
-        start_time=start_time,
-        end_time=end_time,
-        todo_only=todo_only,
-        active_only=active_only,
-    )
+    try:
+        items, total = await list_messages_async(
+            db,
+            user_id=current_user.id,
+            current_user=current_user,
+            page=page,
+            page_size=page_size,
+            keyword=keyword,
+            status=status,
+            message_type=message_type,
+            priority=priority,
+            source_module=source_module,
+            start_time=start_time,
+            end_time=end_time,
+            todo_only=todo_only,
+            active_only=active_only,
+            cursor=cursor,
+            count_mode=count_mode,
+        )
+    except ValueError as exc:
+        # 参数 status 遮蔽了 fastapi.status，这里直接写 400
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     return success_response(
-        MessageListResult(items=items, total=total, page=page, page_size=page_size)
+        MessageListResult(
+            items=items,
+            total=total,
+            page=page,
+            page_size=page_size,
+            next_cursor=MESSAGE_LIST_KEYSET.next_cursor(items, page_size),
+            total_is_estimate=is_total_estimate(total, count_mode=count_mode),
+        )
     )
 
 
@@ -258,6 +285,7 @@ def api_mark_batch_read(
 )
 def api_publish_announcement(
     payload: AnnouncementPublishRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("message.announcements.publish")),
 ) -> ApiResponse[AnnouncementPublishResult]:
@@ -290,9 +318,24 @@ def api_publish_announcement(
         },
     )
     db.commit()
+    # 响应返回后再分批推送，发布耗时与收件人数量无关
+    background_tasks.add_task(fan_out_message_deliveries, result.message_id)
     return success_response(result)
 
 
+@router.get(
+    "/announcements/{message_id}/delivery-progress",
+    response_model=ApiResponse[AnnouncementDeliveryProgress],
+)
+def api_get_announcement_delivery_progress(
+    message_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission("message.announcements.view")),
+) -> ApiResponse[AnnouncementDeliveryProgress]:
+    _ = current_user
+    return success_response(get_message_delivery_progress(db, message_id=message_id))
+
+
 @router.get(
     "/announcements/active",
     response_model=ApiResponse[AnnouncementManagementListResult],
@@ -4,6 +4,7 @@ import json
 from datetime import date, datetime
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy import func, or_, select
 from sqlalchemy.orm import Session, load_only, selectinload
 
@@ -58,7 +59,7 @@ from app.core.rbac import (
     ROLE_QUALITY_ADMIN,
     ROLE_SYSTEM_ADMIN,
 )
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.models.first_article_template import FirstArticleTemplate
 from app.models.order_event_log import OrderEventLog
 from app.models.production_order import ProductionOrder
@@ -165,18 +166,28 @@ from app.services.production_order_service import (
     export_my_orders_csv,
     create_order,
     export_orders_csv,
+    iter_my_order_export_rows,
+    iter_order_export_rows,
+    MY_ORDER_EXPORT_HEADERS,
+    ORDER_EXPORT_HEADERS,
     get_my_order_context,
     get_order_pipeline_mode,
     delete_order,
     get_order_by_id,
     list_user_parallel_block_reasons_for_process,
     list_my_orders,
+    ORDER_LIST_KEYSET,
     list_orders,
     list_pipeline_instances,
     update_order_pipeline_mode,
     update_order,
 )
 from app.web import build_first_article_review_url
+from app.services.list_pagination_service import (
+    COUNT_MODE_EXACT,
+    COUNT_MODE_PATTERN,
+    is_total_estimate,
+)
 from app.services.production_event_log_service import search_order_event_logs_by_code
 from app.services.production_data_query_service import (
     build_manual_filters,
@@ -185,6 +196,8 @@ from app.services.production_data_query_service import (
     get_manual_production_data,
     get_today_realtime_data,
     get_unfinished_progress_data,
+    iter_manual_export_rows,
+    MANUAL_EXPORT_HEADERS,
     parse_id_list_param,
 )
 from app.services.production_repair_service import (
@@ -197,11 +210,19 @@ from app.services.production_repair_service import (
     get_repair_order_aggregate_by_anchor_id,
     export_scrap_statistics_csv,
     get_repair_order_by_id,
+    iter_scrap_statistics_export_rows,
+    SCRAP_STATISTICS_EXPORT_HEADERS,
     get_repair_order_phenomena_summary,
+    REPAIR_ORDER_LIST_KEYSET,
     list_repair_orders,
     list_scrap_statistics,
     return_repair_order_to_production,
 )
+from app.services.export_stream_service import (
+    build_export_file_name,
+    build_streaming_export_response,
+    normalize_export_format,
+)
 from app.services.production_statistics_service import (
     get_operator_stats,
     get_overview_stats,
@@ -500,6 +521,8 @@ def get_orders(
     start_date_to: date | None = Query(default=None),
     due_date_from: date | None = Query(default=None),
     due_date_to: date | None = Query(default=None),
+    cursor: str | None = Query(default=None),
+    count_mode: str = Query(default=COUNT_MODE_EXACT, pattern=COUNT_MODE_PATTERN),
     db: Session = Depends(get_db),
     _: User = Depends(require_permission(PERM_PROD_ORDERS_LIST)),
 ) -> ApiResponse[OrderListResult]:
@@ -508,21 +531,34 @@ def get_orders(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Invalid order status: {status_text}",
         )
-    total, rows = list_orders(
-        db,
-        page=page,
-        page_size=page_size,
-        keyword=keyword,
-        status=status_text,
-        product_name=product_name,
-        pipeline_enabled=pipeline_enabled,
-        start_date_from=start_date_from,
-        start_date_to=start_date_to,
-        due_date_from=due_date_from,
-        due_date_to=due_date_to,
-    )
+    try:
+        total, rows = list_orders(
+            db,
+            page=page,
+            page_size=page_size,
+            keyword=keyword,
+            status=status_text,
+            product_name=product_name,
+            pipeline_enabled=pipeline_enabled,
+            start_date_from=start_date_from,
+            start_date_to=start_date_to,
+            due_date_from=due_date_from,
+            due_date_to=due_date_to,
+            cursor=cursor,
+            count_mode=count_mode,
+        )
+    except ValueError as error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(error),
+        ) from error
     return success_response(
-        OrderListResult(total=total, items=[_to_order_item(row) for row in rows])
+        OrderListResult(
+            total=total,
+            items=[_to_order_item(row) for row in rows],
+            next_cursor=ORDER_LIST_KEYSET.next_cursor(rows, page_size),
+            total_is_estimate=is_total_estimate(total, count_mode=count_mode),
+        )
     )
 
 
@@ -873,15 +909,9 @@ def get_my_orders_api(
     )
 
 
-@router.post(
-    "/my-orders/export",
-    response_model=ApiResponse[ProductionExportResult],
-)
-def export_my_orders_api(
+def _normalize_my_orders_export_status(
     payload: MyOrdersExportRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission(PERM_PROD_MY_ORDERS_EXPORT)),
-) -> ApiResponse[ProductionExportResult]:
+) -> tuple[str | None, str | None]:
     normalized_status: str | None = None
     normalized_sub_order_status: str | None = None
     if payload.order_status is not None:
@@ -902,6 +932,21 @@ def export_my_orders_api(
                     detail=f"Invalid sub-order status: {payload.sub_order_status}",
                 )
             normalized_sub_order_status = token
+    return normalized_status, normalized_sub_order_status
+
+
+@router.post(
+    "/my-orders/export",
+    response_model=ApiResponse[ProductionExportResult],
+)
+def export_my_orders_api(
+    payload: MyOrdersExportRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission(PERM_PROD_MY_ORDERS_EXPORT)),
+) -> ApiResponse[ProductionExportResult]:
+    normalized_status, normalized_sub_order_status = _normalize_my_orders_export_status(
+        payload
+    )
     try:
         result = export_my_orders_csv(
             db,
@@ -918,6 +963,39 @@ def export_my_orders_api(
     return success_response(ProductionExportResult(**result))
 
 
+@router.post("/my-orders/export/stream")
+def export_my_orders_stream_api(
+    payload: MyOrdersExportRequest,
+    format: str = Query(default="csv"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission(PERM_PROD_MY_ORDERS_EXPORT)),
+) -> StreamingResponse:
+    normalized_status, normalized_sub_order_status = _normalize_my_orders_export_status(
+        payload
+    )
+    try:
+        export_format = normalize_export_format(format)
+    except Exception as error:
+        _raise_service_error(error)
+    rows = iter_my_order_export_rows(
+        db,
+        current_user=current_user,
+        keyword=payload.keyword,
+        view_mode=payload.view_mode,
+        proxy_operator_user_id=payload.proxy_operator_user_id,
+        order_status=normalized_status,
+        sub_order_status=normalized_sub_order_status,
+        current_process_id=payload.current_process_id,
+    )
+    return build_streaming_export_response(
+        file_name=build_export_file_name("my_orders", format=export_format),
+        headers=MY_ORDER_EXPORT_HEADERS,
+        rows=rows,
+        format=export_format,
+        sheet_title="我的工单",
+    )
+
+
 @router.get(
     "/my-orders/{order_id}/context",
     response_model=ApiResponse[MyOrderContextResult],
@@ -1388,10 +1466,12 @@ def end_production_api(
     response_model=ApiResponse[ProductionStatsOverview],
 )
 def get_overview_stats_api(
-    db: Session = Depends(get_db),
+    start_date: date | None = Query(default=None),
+    end_date: date | None = Query(default=None),
+    db: Session = Depends(get_read_db),
     _: User = Depends(require_permission(PERM_PROD_STATS_OVERVIEW)),
 ) -> ApiResponse[ProductionStatsOverview]:
-    payload = get_overview_stats(db)
+    payload = get_overview_stats(db, start_date=start_date, end_date=end_date)
     return success_response(ProductionStatsOverview(**payload))
 
 
@@ -1400,10 +1480,12 @@ def get_overview_stats_api(
     response_model=ApiResponse[ProductionProcessStatsResult],
 )
 def get_process_stats_api(
-    db: Session = Depends(get_db),
+    start_date: date | None = Query(default=None),
+    end_date: date | None = Query(default=None),
+    db: Session = Depends(get_read_db),
     _: User = Depends(require_permission(PERM_PROD_STATS_PROCESSES)),
 ) -> ApiResponse[ProductionProcessStatsResult]:
-    rows = get_process_stats(db)
+    rows = get_process_stats(db, start_date=start_date, end_date=end_date)
     return success_response(
         ProductionProcessStatsResult(
             items=[ProductionProcessStatItem(**row) for row in rows]
@@ -1416,10 +1498,12 @@ def get_process_stats_api(
     response_model=ApiResponse[ProductionOperatorStatsResult],
 )
 def get_operator_stats_api(
-    db: Session = Depends(get_db),
+    start_date: date | None = Query(default=None),
+    end_date: date | None = Query(default=None),
+    db: Session = Depends(get_read_db),
     _: User = Depends(require_permission(PERM_PROD_STATS_OPERATORS)),
 ) -> ApiResponse[ProductionOperatorStatsResult]:
-    rows = get_operator_stats(db)
+    rows = get_operator_stats(db, start_date=start_date, end_date=end_date)
     return success_response(
         ProductionOperatorStatsResult(
             items=[ProductionOperatorStatItem(**row) for row in rows]
@@ -1438,7 +1522,7 @@ def get_today_realtime_data_api(
     process_ids: str | None = Query(default=None),
     operator_user_ids: str | None = Query(default=None),
     order_status: str | None = Query(default="all"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _: User = Depends(require_permission(PERM_PROD_DATA_TODAY_REALTIME)),
 ) -> ApiResponse[ProductionDataTodayRealtimeResult]:
     try:
@@ -1466,7 +1550,7 @@ def get_unfinished_progress_data_api(
     process_ids: str | None = Query(default=None),
     operator_user_ids: str | None = Query(default=None),
     order_status: str | None = Query(default="all"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _: User = Depends(require_permission(PERM_PROD_DATA_UNFINISHED_PROGRESS)),
 ) -> ApiResponse[ProductionDataUnfinishedProgressResult]:
     try:
@@ -1496,7 +1580,7 @@ def get_manual_production_data_api(
     process_ids: str | None = Query(default=None),
     operator_user_ids: str | None = Query(default=None),
     order_status: str | None = Query(default="all"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _: User = Depends(require_permission(PERM_PROD_DATA_MANUAL)),
 ) -> ApiResponse[ProductionDataManualResult]:
     try:
@@ -1546,6 +1630,36 @@ def export_manual_production_data_api(
     return success_response(ProductionDataManualExportResult(**data))
 
 
+@router.post("/data/manual/export/stream")
+def export_manual_production_data_stream_api(
+    payload: ProductionDataManualExportRequest,
+    format: str = Query(default="csv"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission(PERM_PROD_DATA_MANUAL_EXPORT)),
+) -> StreamingResponse:
+    try:
+        export_format = normalize_export_format(format)
+        filters = build_manual_filters(
+            stat_mode=payload.stat_mode,
+            start_date=payload.start_date,
+            end_date=payload.end_date,
+            product_ids=payload.product_ids,
+            stage_ids=payload.stage_ids,
+            process_ids=payload.process_ids,
+            operator_user_ids=payload.operator_user_ids,
+            order_status=payload.order_status,
+        )
+    except Exception as error:
+        _raise_service_error(error)
+    return build_streaming_export_response(
+        file_name=build_export_file_name("production_manual", format=export_format),
+        headers=MANUAL_EXPORT_HEADERS,
+        rows=iter_manual_export_rows(db, filters=filters, operator=current_user),
+        format=export_format,
+        sheet_title="生产数据",
+    )
+
+
 @router.get(
     "/scrap-statistics",
     response_model=ApiResponse[ScrapStatisticsListResult],
@@ -1613,6 +1727,39 @@ def export_scrap_statistics_api(
     return success_response(ProductionExportResult(**result))
 
 
+@router.post("/scrap-statistics/export/stream")
+def export_scrap_statistics_stream_api(
+    payload: ScrapStatisticsExportRequest,
+    format: str = Query(default="csv"),
+    db: Session = Depends(get_db),
+    _: User = Depends(require_permission(PERM_PROD_SCRAP_STATISTICS_EXPORT)),
+) -> StreamingResponse:
+    try:
+        export_format = normalize_export_format(format)
+    except Exception as error:
+        _raise_service_error(error)
+    rows = iter_scrap_statistics_export_rows(
+        db,
+        filters=ScrapStatisticsFilters(
+            keyword=payload.keyword,
+            progress=payload.progress,
+            product_name=payload.product_name,
+            process_code=payload.process_code,
+            start_date=payload.start_date,
+            end_date=payload.end_date,
+        ),
+    )
+    return build_streaming_export_response(
+        file_name=build_export_file_name(
+            "production_scrap_statistics", format=export_format
+        ),
+        headers=SCRAP_STATISTICS_EXPORT_HEADERS,
+        rows=rows,
+        format=export_format,
+        sheet_title="报废统计",
+    )
+
+
 @router.get(
     "/repair-orders",
     response_model=ApiResponse[RepairOrderListResult],
@@ -1624,6 +1771,7 @@ def get_repair_orders_api(
     status_text: str | None = Query(default="all", alias="status"),
     start_date: date | None = Query(default=None),
     end_date: date | None = Query(default=None),
+    cursor: str | None = Query(default=None),
     db: Session = Depends(get_db),
     _: User = Depends(require_permission(PERM_PROD_REPAIR_ORDERS_LIST)),
 ) -> ApiResponse[RepairOrderListResult]:
@@ -1638,6 +1786,7 @@ def get_repair_orders_api(
                 start_date=start_date,
                 end_date=end_date,
             ),
+            cursor=cursor,
         )
     except Exception as error:
         _raise_service_error(error)
@@ -1645,6 +1794,7 @@ def get_repair_orders_api(
         RepairOrderListResult(
             total=total,
             items=[_to_repair_order_item(row) for row in rows],
+            next_cursor=REPAIR_ORDER_LIST_KEYSET.next_cursor(rows, page_size),
         )
     )
 
@@ -2166,6 +2316,37 @@ def export_orders_api(
     return success_response(ProductionExportResult(**result))
 
 
+@router.post("/orders/export/stream")
+def export_orders_stream_api(
+    payload: OrdersExportRequest,
+    format: str = Query(default="csv"),
+    db: Session = Depends(get_db),
+    _: User = Depends(require_permission(PERM_PROD_ORDERS_EXPORT)),
+) -> StreamingResponse:
+    try:
+        export_format = normalize_export_format(format)
+    except Exception as error:
+        _raise_service_error(error)
+    rows = iter_order_export_rows(
+        db,
+        keyword=payload.keyword,
+        status=payload.status,
+        product_name=payload.product_name,
+        pipeline_enabled=payload.pipeline_enabled,
+        start_date_from=payload.start_date_from,
+        start_date_to=payload.start_date_to,
+        due_date_from=payload.due_date_from,
+        due_date_to=payload.due_date_to,
+    )
+    return build_streaming_export_response(
+        file_name=build_export_file_name("orders", format=export_format),
+        headers=ORDER_EXPORT_HEADERS,
+        rows=rows,
+        format=export_format,
+        sheet_title="生产订单",
+    )
+
+
 @router.get(
     "/pipeline-instances",
     response_model=ApiResponse[PipelineInstanceListResult],
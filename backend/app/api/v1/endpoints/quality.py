@@ -4,6 +4,7 @@ import json
 from datetime import date
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
@@ -25,7 +26,7 @@ from app.core.authz_catalog import (
     PERM_QUALITY_SUPPLIERS_UPDATE,
 )
 from app.core.security import verify_password
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.models.user import User
 from app.schemas.common import ApiResponse, success_response
 from app.schemas.production import (
@@ -83,12 +84,19 @@ from app.schemas.quality import (
     QualityTrendItem,
     QualityTrendResult,
 )
+from app.services.export_stream_service import (
+    build_export_file_name,
+    build_streaming_export_response,
+    normalize_export_format,
+)
 from app.services.quality_service import (
     cancel_first_article,
     delete_first_article,
     export_defect_analysis_csv,
     export_first_articles_csv,
     export_quality_stats_csv,
+    FIRST_ARTICLE_EXPORT_HEADERS,
+    iter_first_article_export_rows,
     get_defect_analysis,
     get_first_article_by_id,
     get_quality_operator_stats,
@@ -109,6 +117,7 @@ from app.services.production_repair_service import (
     get_repair_order_aggregate_by_anchor_id,
     get_repair_order_by_id,
     get_repair_order_phenomena_summary,
+    REPAIR_ORDER_LIST_KEYSET,
     list_repair_orders,
     list_scrap_statistics,
     return_repair_order_to_production,
@@ -430,6 +439,43 @@ def export_first_articles_api(
     return success_response(FirstArticleExportResult(**result))
 
 
+@router.post("/first-articles/export/stream")
+def export_first_articles_stream_api(
+    payload: FirstArticleExportRequest,
+    format: str = Query(default="csv"),
+    db: Session = Depends(get_db),
+    _: User = Depends(require_permission("quality.first_articles.export")),
+) -> StreamingResponse:
+    resolved_start_date = (
+        payload.start_date or payload.query_date or payload.end_date or date.today()
+    )
+    resolved_end_date = payload.end_date or payload.query_date or resolved_start_date
+    _validate_date_range(resolved_start_date, resolved_end_date)
+    try:
+        export_format = normalize_export_format(format)
+    except ValueError as error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(error)
+        ) from error
+    return build_streaming_export_response(
+        file_name=build_export_file_name("first_articles", format=export_format),
+        headers=FIRST_ARTICLE_EXPORT_HEADERS,
+        rows=iter_first_article_export_rows(
+            db,
+            start_date=resolved_start_date,
+            end_date=resolved_end_date,
+            query_date=payload.query_date,
+            keyword=payload.keyword,
+            result_filter=payload.result,
+            product_name=payload.product_name,
+            process_code=payload.process_code,
+            operator_username=payload.operator_username,
+        ),
+        format=export_format,
+        sheet_title="首件记录",
+    )
+
+
 @router.post(
     "/first-articles/{record_id}/disposition",
     response_model=ApiResponse[FirstArticleDetail],
@@ -680,7 +726,7 @@ def get_quality_overview_api(
     process_code: str | None = Query(default=None),
     operator_username: str | None = Query(default=None),
     result: str | None = Query(default=None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _: User = Depends(require_permission("quality.stats.overview")),
 ) -> ApiResponse[QualityStatsOverview]:
     _validate_date_range(start_date, end_date)
@@ -706,7 +752,7 @@ def get_quality_process_stats_api(
     process_code: str | None = Query(default=None),
     operator_username: str | None = Query(default=None),
     result: str | None = Query(default=None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _: User = Depends(require_permission("quality.stats.processes")),
 ) -> ApiResponse[QualityProcessStatsResult]:
     _validate_date_range(start_date, end_date)
@@ -736,7 +782,7 @@ def get_quality_operator_stats_api(
     process_code: str | None = Query(default=None),
     operator_username: str | None = Query(default=None),
     result: str | None = Query(default=None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _: User = Depends(require_permission("quality.stats.operators")),
 ) -> ApiResponse[QualityOperatorStatsResult]:
     _validate_date_range(start_date, end_date)
@@ -766,7 +812,7 @@ def get_quality_product_stats_api(
     process_code: str | None = Query(default=None),
     operator_username: str | None = Query(default=None),
     result: str | None = Query(default=None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _: User = Depends(require_permission("quality.stats.products")),
 ) -> ApiResponse[QualityProductStatsResult]:
     _validate_date_range(start_date, end_date)
@@ -816,7 +862,7 @@ def get_quality_trend_api(
     process_code: str | None = Query(default=None),
     operator_username: str | None = Query(default=None),
     result: str | None = Query(default=None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _: User = Depends(require_permission("quality.trend")),
 ) -> ApiResponse[QualityTrendResult]:
     _validate_date_range(start_date, end_date)
@@ -1231,25 +1277,31 @@ def get_quality_repair_orders_api(
     end_date: date | None = Query(default=None),
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=20, ge=1, le=200),
+    cursor: str | None = Query(default=None),
     db: Session = Depends(get_db),
     _: User = Depends(require_permission(PERM_QUALITY_REPAIR_ORDERS_LIST)),
 ) -> ApiResponse[RepairOrderListResult]:
     _validate_date_range(start_date, end_date)
-    total, rows = list_repair_orders(
-        db,
-        page=page,
-        page_size=page_size,
-        filters=RepairListFilters(
-            keyword=keyword,
-            status=status_text,
-            start_date=start_date,
-            end_date=end_date,
-        ),
-    )
+    try:
+        total, rows = list_repair_orders(
+            db,
+            page=page,
+            page_size=page_size,
+            filters=RepairListFilters(
+                keyword=keyword,
+                status=status_text,
+                start_date=start_date,
+                end_date=end_date,
+            ),
+            cursor=cursor,
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error)) from error
     return success_response(
         RepairOrderListResult(
             total=total,
             items=[_to_quality_repair_order_item(row) for row in rows],
+            next_cursor=REPAIR_ORDER_LIST_KEYSET.next_cursor(rows, page_size),
         )
     )
 
@@ -1490,7 +1542,7 @@ def get_defect_analysis_api(
     operator_username: str | None = Query(default=None),
     phenomenon: str | None = Query(default=None),
     top_n: int = Query(default=10, ge=1, le=50),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _: User = Depends(require_permission("quality.defect_analysis.list")),
 ) -> ApiResponse[DefectAnalysisResult]:
     _validate_date_range(start_date, end_date)
@@ -21,7 +21,13 @@ from app.schemas.session import (
 )
 from app.services.audit_service import write_audit_log
 from app.services.message_service import create_message_for_users
+from app.services.list_pagination_service import (
+    COUNT_MODE_EXACT,
+    COUNT_MODE_PATTERN,
+    is_total_estimate,
+)
 from app.services.session_service import (
+    LOGIN_LOG_KEYSET,
     cleanup_expired_login_logs_if_due,
     force_offline_sessions,
     list_login_logs,
@@ -40,22 +46,31 @@ def get_login_logs(
     success: bool | None = Query(default=None),
     start_time: datetime | None = Query(default=None),
     end_time: datetime | None = Query(default=None),
+    cursor: str | None = Query(default=None),
+    count_mode: str = Query(default=COUNT_MODE_EXACT, pattern=COUNT_MODE_PATTERN),
     db: Session = Depends(get_db),
     _: User = Depends(require_permission("user.sessions.login_logs.list")),
 ) -> ApiResponse[LoginLogListResult]:
     cleanup_expired_login_logs_if_due(db)
-    total, items = list_login_logs(
-        db,
-        page=page,
-        page_size=page_size,
-        username=username,
-        success=success,
-        start_time=start_time,
-        end_time=end_time,
-    )
+    try:
+        total, items = list_login_logs(
+            db,
+            page=page,
+            page_size=page_size,
+            username=username,
+            success=success,
+            start_time=start_time,
+            end_time=end_time,
+            cursor=cursor,
+            count_mode=count_mode,
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error)) from error
     return success_response(
         LoginLogListResult(
             total=total,
+            next_cursor=LOGIN_LOG_KEYSET.next_cursor(items, page_size),
+            total_is_estimate=is_total_estimate(total, count_mode=count_mode),
             items=[
                 LoginLogItem(
                     id=row.id,
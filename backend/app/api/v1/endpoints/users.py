@@ -26,6 +26,7 @@ from app.schemas.user import (
     UserLifecycleRequest,
     UserLifecycleResult,
     UserListResult,
+    UserOnlineCountResult,
     UserOnlineStatusResult,
     UserPasswordResetResult,
     UserResetPasswordRequest,
@@ -33,7 +34,9 @@ from app.schemas.user import (
     UserUpdate,
 )
 from app.services.audit_service import write_audit_log
+from app.services.export_stream_service import iter_file_bytes
 from app.services.message_service import create_message_for_users
+from app.services.online_status_service import count_online_users
 from app.services.session_service import list_online_user_ids
 from app.services.user_service import (
     create_user,
@@ -377,7 +380,7 @@ def download_user_export_task_api(
         "Content-Type": task.mime_type,
     }
     return StreamingResponse(
-        iter([file_path.read_bytes()]),
+        iter_file_bytes(file_path),
         media_type=task.mime_type,
         headers=headers,
     )
@@ -428,6 +431,13 @@ def create_user_api(
     )
 
 
+@router.get("/online-count", response_model=ApiResponse[UserOnlineCountResult])
+def get_users_online_count(
+    _: User = Depends(require_permission("user.users.list")),
+) -> ApiResponse[UserOnlineCountResult]:
+    return success_response(UserOnlineCountResult(online_count=count_online_users()))
+
+
 @router.get("/online-status", response_model=ApiResponse[UserOnlineStatusResult])
 def get_users_online_status(
     user_id: list[int] = Query(default=[]),
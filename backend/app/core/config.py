@@ -27,6 +27,16 @@ class Settings(BaseSettings):
     db_max_overflow: int = 20
     db_pool_timeout_seconds: int = 10
     db_pool_recycle_seconds: int = 1800
+    db_async_enabled: bool = False  # 需安装 asyncpg；读多端点改走独立的异步连接池
+    db_async_pool_size: int = 10
+    db_async_max_overflow: int = 10
+    db_replica_host: str = ""  # 为空且未设置 DB_REPLICA_URL 时不启用只读副本，get_read_db 直接走主库
+    db_replica_port: int = 5432
+    db_replica_url: str = ""  # 完整连接串，优先于 DB_REPLICA_HOST（便于本地用第二个实例或 SQLite 替身）
+    db_replica_pool_size: int = 10
+    db_replica_max_overflow: int = 10
+    db_replica_max_lag_seconds: float = 5.0
+    db_replica_lag_check_interval_seconds: float = 2.0
 
     redis_host: str = "127.0.0.1"
     redis_port: int = 6379
@@ -38,6 +48,8 @@ class Settings(BaseSettings):
     authz_permission_cache_redis_enabled: bool = True
     authz_permission_cache_prefix: str = "authz:permission:v1"
     authz_permission_cache_ttl_seconds: int = 60
+    authz_cache_invalidation_channel: str = "authz:invalidation:v1"
+    authz_cache_invalidation_resync_seconds: int = 30
 
     bootstrap_on_startup: bool = True
     web_run_bootstrap: bool = True
@@ -53,7 +65,32 @@ class Settings(BaseSettings):
     bootstrap_admin_username: str = "admin"
     bootstrap_admin_password: str = "Admin@123456"
     online_status_ttl_seconds: int = 90
+    online_status_touch_min_interval_seconds: int = 15
+    online_status_flush_interval_seconds: float = 1.0
     session_touch_min_interval_seconds: int = 30
+    session_touch_flush_enabled: bool = True
+    session_touch_flush_interval_seconds: float = 5.0
+    session_state_cache_enabled: bool = True
+    session_state_cache_local_ttl_seconds: int = 10
+    session_state_cache_redis_ttl_seconds: int = 300
+    session_state_invalidation_channel: str = "mes:session:invalidate"
+    quality_stats_cache_ttl_seconds: float = 5.0
+    quality_stats_cache_redis_enabled: bool = True
+    quality_stats_cache_redis_ttl_seconds: int = 300
+    cache_metrics_enabled: bool = True
+    cache_metrics_key_prefix: str = "mes:cache_metrics"
+    cache_metrics_publish_interval_seconds: float = 15.0
+    cache_metrics_worker_ttl_seconds: int = 60
+    request_metrics_enabled: bool = True
+    request_metrics_sample_rate: float = 1.0
+    request_metrics_server_timing: bool = True
+    request_metrics_token: str = ""  # /metrics 需携带 Authorization: Bearer <token>；为空时 /metrics 返回 404
+    slow_query_log_enabled: bool = False
+    slow_query_threshold_ms: float = 200.0
+    slow_query_log_path: str = ""  # 为空时只写 logger；压测时建议指向 JSONL 文件供 scripts/slow_query_report.py 汇总
+    slow_query_explain_sample_rate: float = 0.0  # 仅 PostgreSQL 的 SELECT，后台线程另取连接执行
+    slow_query_explain_timeout_ms: int = 5000
+    list_count_cap: int = 10000  # 列表 count_mode=capped/estimated 退化时 total 最多数到该值
     session_max_seconds: int = 3600
     session_single_sign_on: bool = False  # 隐患 D：单点登录，新端登录强制踢掉旧端所有会话
     login_log_retention_days: int = 30
@@ -63,7 +100,18 @@ class Settings(BaseSettings):
     message_delivery_maintenance_enabled: bool = True
     message_delivery_maintenance_interval_seconds: int = 15
     message_delivery_pending_grace_seconds: int = 5
+    message_delivery_batch_size: int = 500
+    message_delivery_push_concurrency: int = 32
+    message_ws_fanout_redis_enabled: bool = True
+    message_ws_fanout_prefix: str = "mes:msg_ws"
+    message_ws_presence_ttl_seconds: int = 60
+    export_job_worker_enabled: bool = True
+    export_job_worker_concurrency: int = 1
+    export_job_poll_interval_seconds: int = 2
+    export_job_retention_days: int = 7
+    export_job_heartbeat_timeout_seconds: int = 300
     production_default_verification_code: str = "123456"
+    production_rollup_read_enabled: bool = False  # 日汇总表回填并校验一致后再开启，历史区间查询改读预聚合行
     craft_auto_bind_default_template_enabled: bool = True
 
     jwt_secret_key: str = "replace_with_a_strong_secret"
@@ -84,6 +132,17 @@ class Settings(BaseSettings):
             f"@{self.db_host}:{self.db_port}/{self.db_name}"
         )
 
+    @property
+    def replica_database_url(self) -> str:
+        if self.db_replica_url:
+            return self.db_replica_url
+        if not self.db_replica_host:
+            return ""
+        return (
+            f"postgresql+psycopg2://{self.db_user}:{self.db_password}"
+            f"@{self.db_replica_host}:{self.db_replica_port}/{self.db_name}"
+        )
+
 
 @lru_cache
 def get_settings() -> Settings:
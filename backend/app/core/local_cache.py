@@ -0,0 +1,374 @@
+from __future__ import annotations
+
+import asyncio
+import copy
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable
+from dataclasses import dataclass, field
+from threading import Event, RLock
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_MISSING = object()
+# 加载耗时直方图的桶上界（毫秒），最后一个桶为 +Inf；各桶计数不累加
+LOAD_LATENCY_BUCKETS_MS: tuple[float, ...] = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+_LOCAL_CACHE_REGISTRY_LOCK = RLock()
+_LOCAL_CACHE_REGISTRY: dict[str, LocalTTLCache] = {}
+
+
+def _on_event_loop_thread() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+@dataclass(slots=True)
+class _CacheEntry(Generic[V]):
+    expire_at: float
+    value: V
+    tags: tuple[Hashable, ...] = ()
+
+
+@dataclass(slots=True)
+class LocalCacheStats:
+    hits: int = 0
+    misses: int = 0
+    loads: int = 0
+    load_waits: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    load_seconds_total: float = 0.0
+    load_latency_buckets: list[int] = field(
+        default_factory=lambda: [0] * (len(LOAD_LATENCY_BUCKETS_MS) + 1)
+    )
+
+
+def load_latency_bucket_labels() -> list[str]:
+    return [f"{bound:g}" for bound in LOAD_LATENCY_BUCKETS_MS] + ["+Inf"]
+
+
+@dataclass(frozen=True, slots=True)
+class LocalCacheSnapshot:
+    name: str
+    size: int
+    max_size: int
+    default_ttl_seconds: float
+    hits: int
+    misses: int
+    hit_ratio: float
+    loads: int
+    load_waits: int
+    evictions: int
+    expirations: int
+    invalidations: int
+    tags: int = field(default=0)
+    load_seconds_total: float = 0.0
+    load_latency_histogram: dict[str, int] = field(default_factory=dict)
+
+
+class LocalTTLCache(Generic[K, V]):
+    """进程内有界缓存：LRU 淘汰 + TTL 过期 + 标签二级索引 + 单飞加载。
+
+    - 容量到达 max_size 时淘汰最久未使用的条目，内存不随 token / 会话数无限增长
+    - 过期条目在读到时删除，并按 sweep_interval_seconds 周期性整体清扫
+    - 写入时可附带 tags（如 session_token_id、user_id），invalidate_tag 按标签批量失效，
+      不再扫描全部 key 做前缀匹配
+    - get_or_load 保证同一 key 同一时刻只有一个线程执行 loader，其余线程等待结果
+    - 命中 / 未命中 / 淘汰等计数通过 snapshot() 暴露，所有实例登记在全局注册表
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        max_size: int,
+        ttl_seconds: float,
+        sweep_interval_seconds: float = 30.0,
+        copy_values: bool = False,
+        register: bool = True,
+    ) -> None:
+        if max_size <= 0:
+            raise ValueError("max_size must be > 0")
+        self.name = name
+        self.max_size = max_size
+        self.default_ttl_seconds = float(ttl_seconds)
+        self._sweep_interval_seconds = max(0.0, float(sweep_interval_seconds))
+        self._copy_values = copy_values
+        self._lock = RLock()
+        self._entries: OrderedDict[K, _CacheEntry[V]] = OrderedDict()
+        self._tag_index: dict[Hashable, set[K]] = {}
+        self._inflight: dict[K, Event] = {}
+        self._generation = 0
+        self._next_sweep_at = time.monotonic() + self._sweep_interval_seconds
+        self.stats = LocalCacheStats()
+        if register:
+            register_local_cache(self)
+
+    # ── internal helpers（调用方须持有 self._lock）──────────────────────────
+
+    def _copy(self, value: V) -> V:
+        return copy.deepcopy(value) if self._copy_values else value
+
+    def _unlink_locked(self, key: K) -> _CacheEntry[V] | None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        for tag in entry.tags:
+            keys = self._tag_index.get(tag)
+            if keys is None:
+                continue
+            keys.discard(key)
+            if not keys:
+                self._tag_index.pop(tag, None)
+        return entry
+
+    def _sweep_locked(self, now: float) -> int:
+        expired = [key for key, entry in self._entries.items() if entry.expire_at <= now]
+        for key in expired:
+            self._unlink_locked(key)
+        self.stats.expirations += len(expired)
+        self._next_sweep_at = now + self._sweep_interval_seconds
+        return len(expired)
+
+    def _maybe_sweep_locked(self, now: float) -> None:
+        if now >= self._next_sweep_at:
+            self._sweep_locked(now)
+
+    def _lookup_locked(self, key: K, now: float) -> object:
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        if entry.expire_at <= now:
+            self._unlink_locked(key)
+            self.stats.expirations += 1
+            return _MISSING
+        self._entries.move_to_end(key)
+        return entry.value
+
+    # ── public API ────────────────────────────────────────────────────────────
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        now = time.monotonic()
+        with self._lock:
+            self._maybe_sweep_locked(now)
+            value = self._lookup_locked(key, now)
+            if value is _MISSING:
+                self.stats.misses += 1
+                return default
+            self.stats.hits += 1
+            return self._copy(value)  # type: ignore[arg-type]
+
+    def set(
+        self,
+        key: K,
+        value: V,
+        *,
+        ttl_seconds: float | None = None,
+        tags: Iterable[Hashable] = (),
+    ) -> None:
+        ttl = self.default_ttl_seconds if ttl_seconds is None else float(ttl_seconds)
+        if ttl <= 0:
+            return
+        now = time.monotonic()
+        entry = _CacheEntry(expire_at=now + ttl, value=self._copy(value), tags=tuple(tags))
+        with self._lock:
+            self._maybe_sweep_locked(now)
+            self._unlink_locked(key)
+            self._entries[key] = entry
+            for tag in entry.tags:
+                self._tag_index.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_size:
+                oldest_key = next(iter(self._entries))
+                self._unlink_locked(oldest_key)
+                self.stats.evictions += 1
+
+    def pop(self, key: K) -> V | None:
+        with self._lock:
+            self._generation += 1
+            entry = self._unlink_locked(key)
+            if entry is None:
+                return None
+            self.stats.invalidations += 1
+            return entry.value
+
+    def replace(self, key: K, value: V) -> bool:
+        """替换未过期条目的值，保留原有过期时间与标签；条目不存在时返回 False"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expire_at <= now:
+                return False
+            entry.value = self._copy(value)
+            return True
+
+    def invalidate_tag(self, tag: Hashable) -> int:
+        with self._lock:
+            self._generation += 1
+            keys = list(self._tag_index.get(tag, ()))
+            for key in keys:
+                self._unlink_locked(key)
+            self.stats.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> int:
+        with self._lock:
+            self._generation += 1
+            removed = len(self._entries)
+            self._entries.clear()
+            self._tag_index.clear()
+            # 进行中的加载因代数变化不会回填；等待者收到信号后重新读取
+            self._inflight.clear()
+            self.stats.invalidations += removed
+            return removed
+
+    def sweep(self) -> int:
+        with self._lock:
+            return self._sweep_locked(time.monotonic())
+
+    def observe_load(self, seconds: float) -> None:
+        """记录一次回源耗时；不经 get_or_load 的调用方在自行回源后调用"""
+        elapsed_ms = max(0.0, seconds) * 1000
+        index = len(LOAD_LATENCY_BUCKETS_MS)
+        for position, bound in enumerate(LOAD_LATENCY_BUCKETS_MS):
+            if elapsed_ms <= bound:
+                index = position
+                break
+        with self._lock:
+            self.stats.load_seconds_total += max(0.0, seconds)
+            self.stats.load_latency_buckets[index] += 1
+
+    def get_or_load(
+        self,
+        key: K,
+        loader: Callable[[], V],
+        *,
+        ttl_seconds: float | None = None,
+        tags: Iterable[Hashable] = (),
+        wait_timeout_seconds: float | None = None,
+    ) -> V:
+        """单飞加载：并发未命中时只有一个线程执行 loader"""
+        wait_timeout = max(
+            0.05,
+            float(
+                wait_timeout_seconds
+                if wait_timeout_seconds is not None
+                else (ttl_seconds if ttl_seconds is not None else self.default_ttl_seconds)
+            ),
+        )
+        while True:
+            now = time.monotonic()
+            with self._lock:
+                value = self._lookup_locked(key, now)
+                if value is not _MISSING:
+                    self.stats.hits += 1
+                    return self._copy(value)  # type: ignore[arg-type]
+                event = self._inflight.get(key)
+                if event is None:
+                    self.stats.misses += 1
+                    self.stats.loads += 1
+                    event = Event()
+                    self._inflight[key] = event
+                    load_generation = self._generation
+                    break
+                if _on_event_loop_thread():
+                    # AsyncSession.run_sync 把同步服务放在事件循环线程执行，此时等待 Event
+                    # 会卡住整个循环（加载方可能正挂起在同一循环上），改为自行加载、不参与单飞
+                    self.stats.misses += 1
+                    self.stats.loads += 1
+                    event = None
+                    load_generation = self._generation
+                    break
+                self.stats.load_waits += 1
+            # 加载完成后回到循环顶部重读；加载方失败时由某个等待者接手加载
+            event.wait(timeout=wait_timeout)
+
+        started = time.perf_counter()
+        try:
+            value = loader()
+            self.observe_load(time.perf_counter() - started)
+            with self._lock:
+                # 加载期间发生过失效则不回填，避免把失效前读到的旧数据写回缓存
+                if load_generation == self._generation:
+                    self.set(key, value, ttl_seconds=ttl_seconds, tags=tags)
+            return value
+        finally:
+            if event is not None:
+                with self._lock:
+                    if self._inflight.get(key) is event:
+                        self._inflight.pop(key, None)
+                event.set()
+
+    def keys(self) -> list[K]:
+        now = time.monotonic()
+        with self._lock:
+            return [key for key, entry in self._entries.items() if entry.expire_at > now]
+
+    def __contains__(self, key: object) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)  # type: ignore[call-overload]
+            return entry is not None and entry.expire_at > now
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def snapshot(self) -> LocalCacheSnapshot:
+        with self._lock:
+            lookups = self.stats.hits + self.stats.misses
+            return LocalCacheSnapshot(
+                name=self.name,
+                size=len(self._entries),
+                max_size=self.max_size,
+                default_ttl_seconds=self.default_ttl_seconds,
+                hits=self.stats.hits,
+                misses=self.stats.misses,
+                hit_ratio=round(self.stats.hits / lookups, 4) if lookups else 0.0,
+                loads=self.stats.loads,
+                load_waits=self.stats.load_waits,
+                evictions=self.stats.evictions,
+                expirations=self.stats.expirations,
+                invalidations=self.stats.invalidations,
+                tags=len(self._tag_index),
+                load_seconds_total=round(self.stats.load_seconds_total, 6),
+                load_latency_histogram=dict(
+                    zip(load_latency_bucket_labels(), self.stats.load_latency_buckets)
+                ),
+            )
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.stats = LocalCacheStats()
+
+
+def register_local_cache(cache: LocalTTLCache) -> None:
+    with _LOCAL_CACHE_REGISTRY_LOCK:
+        _LOCAL_CACHE_REGISTRY[cache.name] = cache
+
+
+def list_local_caches() -> list[LocalTTLCache]:
+    with _LOCAL_CACHE_REGISTRY_LOCK:
+        return [_LOCAL_CACHE_REGISTRY[name] for name in sorted(_LOCAL_CACHE_REGISTRY)]
+
+
+def _reset_local_caches_after_fork() -> None:
+    global _LOCAL_CACHE_REGISTRY_LOCK
+    # fork 时其他线程可能正持有锁：子进程重建锁并丢弃父进程的缓存内容
+    _LOCAL_CACHE_REGISTRY_LOCK = RLock()
+    for cache in _LOCAL_CACHE_REGISTRY.values():
+        cache._lock = RLock()
+        cache._entries.clear()
+        cache._tag_index.clear()
+        cache._inflight.clear()
+        cache._generation += 1
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_local_caches_after_fork)
@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+import random
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from threading import Lock
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+# 请求耗时直方图桶上界（秒），最后一个桶为 +Inf；各桶计数不累加，导出时再累加
+REQUEST_LATENCY_BUCKETS_SECONDS: tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+_UNMATCHED_ROUTE = "__unmatched__"
+
+
+@dataclass(slots=True)
+class RequestSqlStats:
+    """单个请求内的 SQL 计数；经 ContextVar 传给线程池里执行的同步端点"""
+
+    statements: int = 0
+    seconds: float = 0.0
+
+
+@dataclass(slots=True)
+class RouteMetrics:
+    method: str
+    route: str
+    count: int = 0
+    seconds_total: float = 0.0
+    sql_statements_total: int = 0
+    sql_seconds_total: float = 0.0
+    errors_total: int = 0
+    buckets: list[int] = field(
+        default_factory=lambda: [0] * (len(REQUEST_LATENCY_BUCKETS_SECONDS) + 1)
+    )
+
+    def quantile(self, q: float) -> float | None:
+        """按桶线性插值估算分位数（与 Prometheus histogram_quantile 同一口径）"""
+        if self.count <= 0:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        lower = 0.0
+        for index, bucket_count in enumerate(self.buckets):
+            upper = (
+                REQUEST_LATENCY_BUCKETS_SECONDS[index]
+                if index < len(REQUEST_LATENCY_BUCKETS_SECONDS)
+                else REQUEST_LATENCY_BUCKETS_SECONDS[-1]
+            )
+            if bucket_count and cumulative + bucket_count >= rank:
+                if index >= len(REQUEST_LATENCY_BUCKETS_SECONDS):
+                    return upper
+                return lower + (upper - lower) * ((rank - cumulative) / bucket_count)
+            cumulative += bucket_count
+            lower = upper
+        return lower
+
+
+_REQUEST_SQL_STATS: ContextVar[RequestSqlStats | None] = ContextVar(
+    "request_sql_stats",
+    default=None,
+)
+_ROUTE_METRICS_LOCK = Lock()
+_ROUTE_METRICS: dict[tuple[str, str], RouteMetrics] = {}
+
+
+# ── SQLAlchemy 钩子 ───────────────────────────────────────────────────────────
+# 未采样的请求（以及后台任务）ContextVar 为 None，钩子只做一次 get 即返回。
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _REQUEST_SQL_STATS.get() is None:
+        return
+    conn.info.setdefault("request_metrics_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _REQUEST_SQL_STATS.get()
+    if stats is None:
+        return
+    started_stack = conn.info.get("request_metrics_started")
+    if not started_stack:
+        return
+    stats.statements += 1
+    stats.seconds += time.perf_counter() - started_stack.pop()
+
+
+def _handle_error(exception_context):
+    # 语句执行失败时不会触发 after_cursor_execute，这里出栈，避免计时栈错位、持续增长
+    conn = exception_context.connection
+    if conn is None or exception_context.execution_context is None:
+        return
+    stats = _REQUEST_SQL_STATS.get()
+    started_stack = conn.info.get("request_metrics_started")
+    if stats is None or not started_stack:
+        return
+    stats.statements += 1
+    stats.seconds += time.perf_counter() - started_stack.pop()
+
+
+def install_sql_query_counter(target: Engine | type[Engine] = Engine) -> None:
+    """默认挂在 Engine 类上，主库及后续新建的引擎都会计入；重复调用无副作用"""
+    if event.contains(target, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(target, "before_cursor_execute", _before_cursor_execute)
+    event.listen(target, "after_cursor_execute", _after_cursor_execute)
+    event.listen(target, "handle_error", _handle_error)
+
+
+def current_request_sql_stats() -> RequestSqlStats | None:
+    return _REQUEST_SQL_STATS.get()
+
+
+# ── 路由指标 ──────────────────────────────────────────────────────────────────
+
+def record_request(
+    *,
+    method: str,
+    route: str,
+    seconds: float,
+    sql_stats: RequestSqlStats,
+    status_code: int,
+) -> None:
+    bucket_index = bisect_left(REQUEST_LATENCY_BUCKETS_SECONDS, seconds)
+    key = (method, route)
+    with _ROUTE_METRICS_LOCK:
+        metrics = _ROUTE_METRICS.get(key)
+        if metrics is None:
+            metrics = RouteMetrics(method=method, route=route)
+            _ROUTE_METRICS[key] = metrics
+        metrics.count += 1
+        metrics.seconds_total += seconds
+        metrics.sql_statements_total += sql_stats.statements
+        metrics.sql_seconds_total += sql_stats.seconds
+        if status_code >= 500:
+            metrics.errors_total += 1
+        metrics.buckets[bucket_index] += 1
+
+
+def snapshot_route_metrics() -> list[RouteMetrics]:
+    with _ROUTE_METRICS_LOCK:
+        return [
+            RouteMetrics(
+                method=item.method,
+                route=item.route,
+                count=item.count,
+                seconds_total=item.seconds_total,
+                sql_statements_total=item.sql_statements_total,
+                sql_seconds_total=item.sql_seconds_total,
+                errors_total=item.errors_total,
+                buckets=list(item.buckets),
+            )
+            for _, item in sorted(_ROUTE_METRICS.items())
+        ]
+
+
+def reset_route_metrics() -> None:
+    with _ROUTE_METRICS_LOCK:
+        _ROUTE_METRICS.clear()
+
+
+def summarize_route_metrics() -> list[dict[str, object]]:
+    rows: list[dict[str, object]] = []
+    for item in snapshot_route_metrics():
+        rows.append(
+            {
+                "method": item.method,
+                "route": item.route,
+                "count": item.count,
+                "errors": item.errors_total,
+                "avg_ms": round(item.seconds_total / item.count * 1000, 3),
+                "p50_ms": round((item.quantile(0.50) or 0.0) * 1000, 3),
+                "p95_ms": round((item.quantile(0.95) or 0.0) * 1000, 3),
+                "p99_ms": round((item.quantile(0.99) or 0.0) * 1000, 3),
+                "avg_sql_statements": round(item.sql_statements_total / item.count, 2),
+                "avg_sql_ms": round(item.sql_seconds_total / item.count * 1000, 3),
+            }
+        )
+    rows.sort(key=lambda row: row["p95_ms"], reverse=True)
+    return rows
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_prometheus_text() -> str:
+    """Prometheus 文本格式（0.0.4）；指标为当前 worker 进程内累计值"""
+    lines = [
+        "# HELP mes_http_request_duration_seconds HTTP request latency by route.",
+        "# TYPE mes_http_request_duration_seconds histogram",
+    ]
+    snapshot = snapshot_route_metrics()
+    for item in snapshot:
+        labels = f'method="{_escape_label(item.method)}",route="{_escape_label(item.route)}"'
+        cumulative = 0
+        for bound, bucket_count in zip(REQUEST_LATENCY_BUCKETS_SECONDS, item.buckets):
+            cumulative += bucket_count
+            lines.append(
+                f'mes_http_request_duration_seconds_bucket{{{labels},le="{bound:g}"}} {cumulative}'
+            )
+        lines.append(
+            f'mes_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {item.count}'
+        )
+        lines.append(f"mes_http_request_duration_seconds_sum{{{labels}}} {item.seconds_total:.6f}")
+        lines.append(f"mes_http_request_duration_seconds_count{{{labels}}} {item.count}")
+    for name, help_text, attr, fmt in (
+        (
+            "mes_http_request_sql_statements_total",
+            "SQL statements issued while serving requests.",
+            "sql_statements_total",
+            "{}",
+        ),
+        (
+            "mes_http_request_sql_seconds_total",
+            "Time spent in SQL while serving requests.",
+            "sql_seconds_total",
+            "{:.6f}",
+        ),
+        (
+            "mes_http_request_errors_total",
+            "Requests that ended with a 5xx status.",
+            "errors_total",
+            "{}",
+        ),
+    ):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for item in snapshot:
+            labels = f'method="{_escape_label(item.method)}",route="{_escape_label(item.route)}"'
+            lines.append(f"{name}{{{labels}}} {fmt.format(getattr(item, attr))}")
+    return "\n".join(lines) + "\n"
+
+
+# ── ASGI 中间件 ───────────────────────────────────────────────────────────────
+
+def _route_template(scope) -> str:
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    return path if path else _UNMATCHED_ROUTE
+
+
+class RequestMetricsMiddleware:
+    """纯 ASGI 中间件：记录路由耗时与 SQL 计数，并在响应头附加 Server-Timing。
+
+    未采样时只比较一次配置与随机数后直接透传，不包装 send、不设置 ContextVar。
+    路由按模板（如 /api/v1/users/{user_id}）聚合，避免路径参数撑爆标签基数。
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not settings.request_metrics_enabled:
+            await self.app(scope, receive, send)
+            return
+        sample_rate = settings.request_metrics_sample_rate
+        if sample_rate < 1.0 and random.random() >= sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        sql_stats = RequestSqlStats()
+        token = _REQUEST_SQL_STATS.set(sql_stats)
+        started = time.perf_counter()
+        status_code = 500
+        server_timing = settings.request_metrics_server_timing
+
+        async def send_wrapper(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if server_timing:
+                    elapsed_ms = (time.perf_counter() - started) * 1000
+                    header = (
+                        f'app;dur={elapsed_ms:.1f}, '
+                        f'db;dur={sql_stats.seconds * 1000:.1f};desc="{sql_stats.statements} queries"'
+                    )
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (b"server-timing", header.encode("latin-1")),
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _REQUEST_SQL_STATS.reset(token)
+            record_request(
+                method=scope.get("method", "GET"),
+                route=_route_template(scope),
+                seconds=time.perf_counter() - started,
+                sql_stats=sql_stats,
+                status_code=status_code,
+            )
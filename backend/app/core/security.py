@@ -1,34 +1,31 @@
 import hashlib
-import time
 from datetime import datetime, timedelta, timezone
-from threading import RLock
 from typing import Any
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.core.config import ensure_runtime_settings_secure, settings
+from app.core.local_cache import LocalTTLCache
 
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=10)
-_PASSWORD_VERIFY_LOCAL_CACHE: dict[str, float] = {}
-_PASSWORD_VERIFY_LOCAL_CACHE_LOCK = RLock()
 _PASSWORD_VERIFY_CACHE_TTL_SECONDS = 60
-_PASSWORD_VERIFY_USER_KEYS: dict[int, set[str]] = {}  # user_id → set of cache_keys
+_PASSWORD_VERIFY_CACHE_MAX_SIZE = 10000
+# 只缓存校验成功的 key；按 cache_scope（如 user:7）打标签，改密时按用户整体失效
+_PASSWORD_VERIFY_LOCAL_CACHE: LocalTTLCache[str, bool] = LocalTTLCache(
+    "security.password_verify",
+    max_size=_PASSWORD_VERIFY_CACHE_MAX_SIZE,
+    ttl_seconds=_PASSWORD_VERIFY_CACHE_TTL_SECONDS,
+)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
-def _extract_user_id_from_scope(cache_scope: str) -> int | None:
-    """Extract user_id from cache_scope like 'user:123'."""
-    if cache_scope.startswith("user:"):
-        try:
-            return int(cache_scope[5:])
-        except ValueError:
-            return None
-    return None
+def _password_cache_user_tag(user_id: int) -> str:
+    return f"user:{user_id}"
 
 
 def verify_password_cached(
@@ -41,18 +38,16 @@ def verify_password_cached(
     cache_key = hashlib.sha256(
         f"{cache_scope}|{hashed_password}|{plain_password}".encode("utf-8")
     ).hexdigest()
-    now_monotonic = time.monotonic()
-    with _PASSWORD_VERIFY_LOCAL_CACHE_LOCK:
-        expire_at = _PASSWORD_VERIFY_LOCAL_CACHE.get(cache_key)
-        if expire_at is not None and expire_at > now_monotonic:
-            return True
+    if _PASSWORD_VERIFY_LOCAL_CACHE.get(cache_key):
+        return True
     verified = verify_password(plain_password, hashed_password)
     if verified:
-        with _PASSWORD_VERIFY_LOCAL_CACHE_LOCK:
-            _PASSWORD_VERIFY_LOCAL_CACHE[cache_key] = now_monotonic + max(1, ttl_seconds)
-            user_id = _extract_user_id_from_scope(cache_scope)
-            if user_id is not None:
-                _PASSWORD_VERIFY_USER_KEYS.setdefault(user_id, set()).add(cache_key)
+        _PASSWORD_VERIFY_LOCAL_CACHE.set(
+            cache_key,
+            True,
+            ttl_seconds=max(1, ttl_seconds),
+            tags=(cache_scope,),
+        )
     return verified
 
 
@@ -61,11 +56,7 @@ def invalidate_password_cache(user_id: int) -> int:
 
     Returns the number of cache entries removed.
     """
-    with _PASSWORD_VERIFY_LOCAL_CACHE_LOCK:
-        keys_to_remove = _PASSWORD_VERIFY_USER_KEYS.pop(user_id, set())
-        for key in keys_to_remove:
-            _PASSWORD_VERIFY_LOCAL_CACHE.pop(key, None)
-        return len(keys_to_remove)
+    return _PASSWORD_VERIFY_LOCAL_CACHE.invalidate_tag(_password_cache_user_tag(user_id))
 
 
 def rehash_password_if_needed(plain_password: str, hashed_password: str) -> str | None:
@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# ── 慢 SQL 记录 ───────────────────────────────────────────────────────────────
+# 默认关闭（SLOW_QUERY_LOG_ENABLED）。开启后在 Engine 类级 before/after_cursor_execute
+# 上计时，超过阈值的语句按指纹（字面量/绑定参数归一化后的 SQL）写一行 JSON：
+#   • 指纹 + 归一化 SQL + 原始 SQL（截断）
+#   • 调用栈中最内层的 app 业务帧（跳过 app/db 与本模块）
+#   • 绑定参数形状：只记类型与长度，不落参数值
+#   • 可选：按采样率对 SELECT 在后台线程里另取连接跑 EXPLAIN (ANALYZE, BUFFERS)，
+#     事务回滚，不阻塞原请求、不影响原事务状态
+# 汇总报告见 scripts/slow_query_report.py。
+_SQL_PREVIEW_MAX_CHARS = 2000
+_EXPLAIN_QUEUE_MAX_SIZE = 64
+_CALLER_FRAME_LIMIT = 4
+
+_APP_DIR = Path(__file__).resolve().parents[1]
+_SKIPPED_CALLER_DIRS = (
+    str(_APP_DIR / "db"),
+    str(Path(__file__).resolve()),
+    str(_APP_DIR / "core" / "request_metrics.py"),
+)
+
+_STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL_RE = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_NAMED_PARAM_RE = re.compile(r"%\(\w+\)s|(?<![:\w]):\w+\b|\$\d+|%s|\?")
+_IN_LIST_RE = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_VALUES_LIST_RE = re.compile(
+    r"\bVALUES\s*\(\s*\?(?:\s*,\s*\?)*\s*\)(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))*",
+    re.IGNORECASE,
+)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+_WRITE_LOCK = threading.Lock()
+_EXPLAIN_QUEUE: queue.Queue[dict[str, object]] | None = None
+_EXPLAIN_THREAD: threading.Thread | None = None
+_EXPLAIN_THREAD_LOCK = threading.Lock()
+# 后台 EXPLAIN 线程自身执行的语句不再计入慢 SQL
+_IN_EXPLAIN = threading.local()
+
+
+def normalize_sql(statement: str) -> str:
+    """把字面量、绑定参数、IN/VALUES 列表统一成 ?，得到可聚合的 SQL 形状"""
+    normalized = _STRING_LITERAL_RE.sub("?", statement)
+    normalized = _NAMED_PARAM_RE.sub("?", normalized)
+    normalized = _NUMBER_LITERAL_RE.sub("?", normalized)
+    normalized = _WHITESPACE_RE.sub(" ", normalized).strip()
+    normalized = _IN_LIST_RE.sub("IN (?...)", normalized)
+    normalized = _VALUES_LIST_RE.sub("VALUES (?...)", normalized)
+    return normalized
+
+
+def sql_fingerprint(statement: str) -> tuple[str, str]:
+    normalized = normalize_sql(statement)
+    digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+    return digest, normalized
+
+
+def describe_parameter_shape(parameters, executemany: bool) -> object:
+    """只描述参数的类型 / 长度，避免把口令、手机号等值写进日志"""
+    if executemany and isinstance(parameters, (list, tuple)):
+        first = parameters[0] if parameters else None
+        return {
+            "executemany": len(parameters),
+            "row": describe_parameter_shape(first, False),
+        }
+    if isinstance(parameters, dict):
+        return {str(key): _value_shape(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_value_shape(value) for value in parameters]
+    if parameters is None:
+        return None
+    return type(parameters).__name__
+
+
+def _value_shape(value) -> str:
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return f"{type(value).__name__}[{len(value)}]"
+    if isinstance(value, (str, bytes)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def capture_caller_frames(limit: int = _CALLER_FRAME_LIMIT) -> list[str]:
+    """从调用栈里挑出最内层的 app 业务帧，例如 services/quality_service.py:812 get_quality_trend"""
+    frames: list[str] = []
+    app_dir = str(_APP_DIR)
+    frame = sys._getframe(1)
+    while frame is not None and len(frames) < limit:
+        filename = frame.f_code.co_filename
+        if filename.startswith(app_dir) and not filename.startswith(_SKIPPED_CALLER_DIRS):
+            relative = os.path.relpath(filename, app_dir).replace(os.sep, "/")
+            frames.append(f"{relative}:{frame.f_lineno} {frame.f_code.co_name}")
+        frame = frame.f_back
+    return frames
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if not settings.slow_query_log_enabled or getattr(_IN_EXPLAIN, "active", False):
+        return
+    conn.info.setdefault("slow_query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started_stack = conn.info.get("slow_query_started")
+    if not started_stack:
+        return
+    elapsed_ms = (time.perf_counter() - started_stack.pop()) * 1000
+    if elapsed_ms < settings.slow_query_threshold_ms:
+        return
+    try:
+        _record_slow_query(
+            conn,
+            statement=statement,
+            parameters=parameters,
+            executemany=executemany,
+            elapsed_ms=elapsed_ms,
+        )
+    except Exception:
+        # 慢 SQL 记录失败不能影响业务语句
+        logger.exception("[SLOW_QUERY] 记录慢 SQL 失败")
+
+
+def _handle_error(exception_context):
+    # 语句执行失败时不会触发 after_cursor_execute，这里出栈，避免计时栈错位、持续增长
+    conn = exception_context.connection
+    if conn is None or exception_context.execution_context is None:
+        return
+    started_stack = conn.info.get("slow_query_started")
+    if started_stack:
+        started_stack.pop()
+
+
+def _record_slow_query(
+    conn,
+    *,
+    statement: str,
+    parameters,
+    executemany: bool,
+    elapsed_ms: float,
+) -> None:
+    fingerprint, normalized = sql_fingerprint(statement)
+    entry: dict[str, object] = {
+        "ts": datetime.now(UTC).isoformat(),
+        "pid": os.getpid(),
+        "fingerprint": fingerprint,
+        "elapsed_ms": round(elapsed_ms, 3),
+        "normalized_sql": normalized[:_SQL_PREVIEW_MAX_CHARS],
+        "sql": statement[:_SQL_PREVIEW_MAX_CHARS],
+        "callers": capture_caller_frames(),
+        "param_shape": describe_parameter_shape(parameters, executemany),
+        "executemany": bool(executemany),
+    }
+    write_slow_query_entry(entry)
+    if _should_explain(conn, statement, executemany):
+        _enqueue_explain(
+            conn.engine,
+            {
+                "fingerprint": fingerprint,
+                "statement": statement,
+                "parameters": parameters,
+                "elapsed_ms": entry["elapsed_ms"],
+            },
+        )
+
+
+def write_slow_query_entry(entry: dict[str, object]) -> None:
+    line = json.dumps(entry, ensure_ascii=False, default=str)
+    log_path = settings.slow_query_log_path.strip()
+    if not log_path:
+        logger.warning("[SLOW_QUERY] %s", line)
+        return
+    path = Path(log_path)
+    with _WRITE_LOCK:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a", encoding="utf-8") as handle:
+            handle.write(line + "\n")
+
+
+def _should_explain(conn, statement: str, executemany: bool) -> bool:
+    sample_rate = settings.slow_query_explain_sample_rate
+    if sample_rate <= 0 or executemany:
+        return False
+    if conn.dialect.name != "postgresql":
+        return False
+    # ANALYZE 会真实执行语句，只对纯查询采样
+    if not statement.lstrip().upper().startswith("SELECT"):
+        return False
+    return sample_rate >= 1.0 or random.random() < sample_rate
+
+
+def _enqueue_explain(engine: Engine, job: dict[str, object]) -> None:
+    global _EXPLAIN_QUEUE, _EXPLAIN_THREAD
+    with _EXPLAIN_THREAD_LOCK:
+        if _EXPLAIN_QUEUE is None:
+            _EXPLAIN_QUEUE = queue.Queue(maxsize=_EXPLAIN_QUEUE_MAX_SIZE)
+        if _EXPLAIN_THREAD is None or not _EXPLAIN_THREAD.is_alive():
+            _EXPLAIN_THREAD = threading.Thread(
+                target=_explain_worker,
+                args=(_EXPLAIN_QUEUE,),
+                name="slow-query-explain",
+                daemon=True,
+            )
+            _EXPLAIN_THREAD.start()
+    try:
+        _EXPLAIN_QUEUE.put_nowait({**job, "engine": engine})
+    except queue.Full:
+        # 队列满说明库已经很忙，丢弃本次采样
+        pass
+
+
+def _explain_worker(jobs: queue.Queue[dict[str, object]]) -> None:
+    while True:
+        job = jobs.get()
+        try:
+            run_explain(job)
+        except Exception:
+            logger.warning("[SLOW_QUERY] EXPLAIN 失败：%s", job.get("fingerprint"), exc_info=True)
+        finally:
+            jobs.task_done()
+
+
+def run_explain(job: dict[str, object]) -> None:
+    engine: Engine = job["engine"]  # type: ignore[assignment]
+    timeout_ms = max(100, int(settings.slow_query_explain_timeout_ms))
+    _IN_EXPLAIN.active = True
+    try:
+        with engine.connect() as conn:
+            transaction = conn.begin()
+            try:
+                conn.exec_driver_sql("SET TRANSACTION READ ONLY")
+                conn.exec_driver_sql(f"SET LOCAL statement_timeout = {timeout_ms}")
+                plan = conn.exec_driver_sql(
+                    f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {job['statement']}",
+                    job["parameters"] or (),
+                ).scalar()
+            finally:
+                transaction.rollback()
+    finally:
+        _IN_EXPLAIN.active = False
+    write_slow_query_entry(
+        {
+            "ts": datetime.now(UTC).isoformat(),
+            "pid": os.getpid(),
+            "fingerprint": job["fingerprint"],
+            "elapsed_ms": job["elapsed_ms"],
+            "explain": plan,
+        }
+    )
+
+
+def install_slow_query_log(target: Engine | type[Engine] = Engine) -> None:
+    """与 install_sql_query_counter 一样挂在 Engine 类上；是否记录由配置在运行时判断"""
+    if event.contains(target, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(target, "before_cursor_execute", _before_cursor_execute)
+    event.listen(target, "after_cursor_execute", _after_cursor_execute)
+    event.listen(target, "handle_error", _handle_error)
+
+
+def _reset_slow_query_log_after_fork() -> None:
+    global _EXPLAIN_QUEUE, _EXPLAIN_THREAD, _WRITE_LOCK, _EXPLAIN_THREAD_LOCK
+    _EXPLAIN_QUEUE = None
+    _EXPLAIN_THREAD = None
+    _WRITE_LOCK = threading.Lock()
+    _EXPLAIN_THREAD_LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_slow_query_log_after_fork)
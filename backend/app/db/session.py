@@ -1,14 +1,32 @@
-from collections.abc import Generator
+import logging
+import time
+from collections.abc import AsyncGenerator, Callable, Generator
+from functools import partial
+from threading import Lock
+from typing import Any, TypeVar
 
-from sqlalchemy import create_engine
+from anyio import to_thread
+from fastapi import Depends
+from sqlalchemy import create_engine, text
 from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
 
 from app.core.config import settings
+from app.core.request_metrics import install_sql_query_counter
+from app.core.slow_query_log import install_slow_query_log
 
 
-def _build_engine():
-    database_url = settings.database_url
+logger = logging.getLogger(__name__)
+
+
+def _build_engine(
+    database_url: str | None = None,
+    *,
+    pool_size: int | None = None,
+    max_overflow: int | None = None,
+):
+    database_url = database_url or settings.database_url
     engine_kwargs = {
         "pool_pre_ping": True,
         "future": True,
@@ -16,8 +34,8 @@ def _build_engine():
 
     if make_url(database_url).get_backend_name() != "sqlite":
         engine_kwargs.update(
-            pool_size=max(1, settings.db_pool_size),
-            max_overflow=max(0, settings.db_max_overflow),
+            pool_size=max(1, settings.db_pool_size if pool_size is None else pool_size),
+            max_overflow=max(0, settings.db_max_overflow if max_overflow is None else max_overflow),
             pool_timeout=max(1, settings.db_pool_timeout_seconds),
             pool_recycle=max(1, settings.db_pool_recycle_seconds),
         )
@@ -25,8 +43,148 @@ def _build_engine():
     return create_engine(database_url, **engine_kwargs)
 
 
+# 同步驱动 -> 异步驱动；未列出的后端不支持异步引擎
+_ASYNC_DRIVER_NAMES = {
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def _build_async_engine(
+    database_url: str | None = None,
+    *,
+    pool_size: int | None = None,
+    max_overflow: int | None = None,
+) -> AsyncEngine | None:
+    """DB_ASYNC_ENABLED=true 时为读多端点额外建一套 asyncpg 连接池，与同步池预算分开配置"""
+    if not settings.db_async_enabled:
+        return None
+    url = make_url(database_url or settings.database_url)
+    backend_name = url.get_backend_name()
+    if backend_name == "sqlite":
+        # SQLite（本地 / 单元测试）不引入 aiosqlite，get_async_db 回退到 ThreadpoolAsyncSession
+        return None
+    driver_name = _ASYNC_DRIVER_NAMES.get(backend_name)
+    if driver_name is None:
+        raise RuntimeError(f"数据库后端 {backend_name} 不支持异步引擎")
+    return create_async_engine(
+        url.set(drivername=driver_name),
+        pool_pre_ping=True,
+        pool_size=max(1, settings.db_async_pool_size if pool_size is None else pool_size),
+        max_overflow=max(
+            0,
+            settings.db_async_max_overflow if max_overflow is None else max_overflow,
+        ),
+        pool_timeout=max(1, settings.db_pool_timeout_seconds),
+        pool_recycle=max(1, settings.db_pool_recycle_seconds),
+    )
+
+
+install_sql_query_counter()
+install_slow_query_log()
 engine = _build_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, expire_on_commit=False)
+async_engine = _build_async_engine()
+AsyncSessionLocal = (
+    async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    if async_engine is not None
+    else None
+)
+
+# ── 只读副本 ──────────────────────────────────────────────────────────────────
+# 报表 / 查询类端点通过 get_read_db 显式选择副本；副本未配置、延迟超过上界或探测失败时
+# 退回主库（即请求内的 get_db 会话），因此未配置副本的部署行为不变。
+_REPLICA_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+_REPLICA_RETRY_BACKOFF_SECONDS = 30.0
+_REPLICA_STATE_LOCK = Lock()
+_REPLICA_LAG_SECONDS: float | None = None
+_REPLICA_NEXT_CHECK_AT = 0.0
+
+
+def _build_replica_engine():
+    replica_url = settings.replica_database_url
+    if not replica_url:
+        return None
+    return _build_engine(
+        replica_url,
+        pool_size=settings.db_replica_pool_size,
+        max_overflow=settings.db_replica_max_overflow,
+    )
+
+
+replica_engine = _build_replica_engine()
+ReplicaSessionLocal = (
+    sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        bind=replica_engine,
+        expire_on_commit=False,
+        info={"db_role": "replica"},
+    )
+    if replica_engine is not None
+    else None
+)
+
+
+def _measure_replica_lag_seconds() -> float | None:
+    if replica_engine is None:
+        return None
+    try:
+        with replica_engine.connect() as conn:
+            if conn.dialect.name != "postgresql":
+                # SQLite 替身没有复制概念，视为无延迟
+                return 0.0
+            return float(conn.execute(_REPLICA_LAG_SQL).scalar() or 0.0)
+    except Exception:
+        logger.warning("[DB_REPLICA] 副本延迟探测失败，暂时回退主库。", exc_info=True)
+        return None
+
+
+def get_replica_lag_seconds() -> float | None:
+    """副本复制延迟（秒），按 DB_REPLICA_LAG_CHECK_INTERVAL_SECONDS 缓存；不可用返回 None"""
+    global _REPLICA_LAG_SECONDS, _REPLICA_NEXT_CHECK_AT
+    if replica_engine is None:
+        return None
+    if time.monotonic() < _REPLICA_NEXT_CHECK_AT:
+        return _REPLICA_LAG_SECONDS
+    # 已有线程在探测时直接用上一次结果，不排队等待
+    if not _REPLICA_STATE_LOCK.acquire(blocking=False):
+        return _REPLICA_LAG_SECONDS
+    try:
+        if time.monotonic() < _REPLICA_NEXT_CHECK_AT:
+            return _REPLICA_LAG_SECONDS
+        lag_seconds = _measure_replica_lag_seconds()
+        _REPLICA_LAG_SECONDS = lag_seconds
+        _REPLICA_NEXT_CHECK_AT = time.monotonic() + (
+            max(0.1, settings.db_replica_lag_check_interval_seconds)
+            if lag_seconds is not None
+            else _REPLICA_RETRY_BACKOFF_SECONDS
+        )
+        return lag_seconds
+    finally:
+        _REPLICA_STATE_LOCK.release()
+
+
+def replica_is_usable(max_lag_seconds: float | None = None) -> bool:
+    lag_seconds = get_replica_lag_seconds()
+    if lag_seconds is None:
+        return False
+    bound = settings.db_replica_max_lag_seconds if max_lag_seconds is None else max_lag_seconds
+    return lag_seconds <= bound
+
+
+def open_read_session(max_lag_seconds: float | None = None) -> Session | None:
+    """副本可用且延迟不超过上界时返回副本 Session（调用方负责 close），否则返回 None"""
+    if ReplicaSessionLocal is None or not replica_is_usable(max_lag_seconds):
+        return None
+    return ReplicaSessionLocal()
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -35,3 +193,72 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+def get_read_db_with_max_lag(
+    max_lag_seconds: float | None = None,
+) -> Callable[..., Generator[Session, None, None]]:
+    """按端点指定可接受的副本延迟；不传时使用 DB_REPLICA_MAX_LAG_SECONDS"""
+
+    def _get_read_db(primary_db: Session = Depends(get_db)) -> Generator[Session, None, None]:
+        replica_db = open_read_session(max_lag_seconds)
+        if replica_db is None:
+            yield primary_db
+            return
+        try:
+            yield replica_db
+        finally:
+            replica_db.close()
+
+    return _get_read_db
+
+
+get_read_db = get_read_db_with_max_lag()
+
+
+_T = TypeVar("_T")
+
+
+class ThreadpoolAsyncSession:
+    """未启用异步引擎时 get_async_db 的退化实现。
+
+    只提供端点用到的 AsyncSession 子集（execute / scalar / run_sync），
+    在线程池里调用请求内的同步 Session，行为与改造前一致。
+    """
+
+    def __init__(self, sync_session: Session) -> None:
+        self.sync_session = sync_session
+
+    async def execute(self, statement, params=None, **kwargs):
+        return await to_thread.run_sync(
+            partial(self.sync_session.execute, statement, params, **kwargs)
+        )
+
+    async def scalar(self, statement, params=None, **kwargs):
+        return await to_thread.run_sync(
+            partial(self.sync_session.scalar, statement, params, **kwargs)
+        )
+
+    async def run_sync(self, fn: Callable[..., _T], *args, **kwargs) -> _T:
+        return await to_thread.run_sync(partial(fn, self.sync_session, *args, **kwargs))
+
+
+async def get_async_db(
+    sync_db: Session = Depends(get_db),
+) -> AsyncGenerator[AsyncSession | ThreadpoolAsyncSession, None]:
+    """读多端点使用的会话：启用异步引擎时为 AsyncSession，否则包装请求内的同步 Session。
+
+    两种实现都支持 await db.execute(stmt) 与 await db.run_sync(fn, ...)；
+    run_sync 里的同步函数在异步引擎下运行于事件循环线程，只能用于短小的 ORM 调用。
+    报表、看板等重聚合端点保持同步 def + get_db / get_read_db，由线程池执行。
+    """
+    if AsyncSessionLocal is None:
+        yield ThreadpoolAsyncSession(sync_db)
+        return
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def dispose_async_engine() -> None:
+    if async_engine is not None:
+        await async_engine.dispose()
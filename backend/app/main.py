@@ -1,19 +1,44 @@
 import asyncio
+import hmac
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
+from app.api.deps import require_role_codes
 from app.api.v1.api import api_router
 from app.bootstrap import run_startup_bootstrap
 from app.core.config import ensure_runtime_settings_secure, settings
+from app.core.rbac import ROLE_SYSTEM_ADMIN
+from app.core.request_metrics import (
+    RequestMetricsMiddleware,
+    render_prometheus_text,
+    summarize_route_metrics,
+)
 from app.core.user_facing_errors import localize_user_facing_detail
+from app.db.session import dispose_async_engine
+from app.models.user import User
+from app.schemas.common import ApiResponse, success_response
+from app.schemas.system import CacheMetricsOverview, RouteMetricsItem
+from app.services.authz_cache_service import stop_authz_cache_bus
+from app.services.cache_metrics_service import (
+    get_cache_metrics_overview,
+    run_cache_metrics_publish_loop,
+)
+from app.services.export_job_service import run_export_job_worker_loop
 from app.services.maintenance_scheduler_service import run_maintenance_auto_generate_loop
-from app.services.message_service import run_message_delivery_maintenance_loop
+from app.services.message_connection_manager import message_connection_manager
+from app.services.message_fanout_service import build_message_fanout_bus
+from app.services.message_service import (
+    record_forwarded_message_delivery,
+    run_message_delivery_maintenance_loop,
+)
+from app.services.session_service import run_session_touch_flush_loop
+from app.services.session_state_cache_service import stop_session_state_bus
 from app.web import first_article_review_router
 
 
@@ -21,14 +46,48 @@ from app.web import first_article_review_router
 async def lifespan(_: FastAPI) -> AsyncIterator[None]:
     scheduler_task: asyncio.Task[None] | None = None
     message_maintenance_task: asyncio.Task[None] | None = None
+    export_job_task: asyncio.Task[None] | None = None
+    session_touch_task: asyncio.Task[None] | None = None
+    cache_metrics_task: asyncio.Task[None] | None = None
     ensure_runtime_settings_secure()
     if settings.web_run_bootstrap:
         run_startup_bootstrap()
+    await message_connection_manager.start_fanout(
+        build_message_fanout_bus(),
+        on_forwarded_result=record_forwarded_message_delivery,
+    )
     if settings.web_run_background_loops and settings.maintenance_auto_generate_enabled:
         scheduler_task = asyncio.create_task(run_maintenance_auto_generate_loop())
     if settings.web_run_background_loops and settings.message_delivery_maintenance_enabled:
         message_maintenance_task = asyncio.create_task(run_message_delivery_maintenance_loop())
+    if settings.web_run_background_loops and settings.export_job_worker_enabled:
+        # 单进程部署兜底；拆分部署时导出任务由 worker_main 消费
+        export_job_task = asyncio.create_task(run_export_job_worker_loop())
+    if settings.web_run_background_loops and settings.session_touch_flush_enabled:
+        session_touch_task = asyncio.create_task(run_session_touch_flush_loop())
+    if settings.cache_metrics_enabled:
+        # 每个 web worker 各自持有进程内缓存，指标上报不受 web_run_background_loops 控制
+        cache_metrics_task = asyncio.create_task(run_cache_metrics_publish_loop())
     yield
+    await message_connection_manager.stop_fanout()
+    if cache_metrics_task:
+        cache_metrics_task.cancel()
+        try:
+            await cache_metrics_task
+        except asyncio.CancelledError:
+            pass
+    if session_touch_task:
+        session_touch_task.cancel()
+        try:
+            await session_touch_task
+        except asyncio.CancelledError:
+            pass
+    if export_job_task:
+        export_job_task.cancel()
+        try:
+            await export_job_task
+        except asyncio.CancelledError:
+            pass
     if message_maintenance_task:
         message_maintenance_task.cancel()
         try:
@@ -41,6 +100,9 @@ async def lifespan(_: FastAPI) -> AsyncIterator[None]:
             await scheduler_task
         except asyncio.CancelledError:
             pass
+    stop_authz_cache_bus()
+    stop_session_state_bus()
+    await dispose_async_engine()
 
 
 app = FastAPI(
@@ -49,6 +111,7 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+app.add_middleware(RequestMetricsMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -63,6 +126,40 @@ def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/health/caches", response_model=ApiResponse[CacheMetricsOverview])
+def health_caches(
+    _: User = Depends(require_role_codes([ROLE_SYSTEM_ADMIN])),
+) -> ApiResponse[CacheMetricsOverview]:
+    """进程内缓存命中率 / 淘汰 / 单飞等待 / 回源耗时直方图，多 worker 经 Redis 汇总"""
+    return success_response(CacheMetricsOverview.model_validate(get_cache_metrics_overview()))
+
+
+@app.get("/health/routes", response_model=ApiResponse[list[RouteMetricsItem]])
+def health_routes(
+    _: User = Depends(require_role_codes([ROLE_SYSTEM_ADMIN])),
+) -> ApiResponse[list[RouteMetricsItem]]:
+    """当前 worker 各路由 p50/p95/p99 与平均 SQL 条数，按 p95 倒序"""
+    return success_response(
+        [RouteMetricsItem.model_validate(row) for row in summarize_route_metrics()]
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics(request: Request) -> PlainTextResponse:
+    expected_token = settings.request_metrics_token
+    if not expected_token:
+        # 未配置令牌时不对外暴露路由与耗时分布
+        return PlainTextResponse("not found\n", status_code=404)
+    if not hmac.compare_digest(
+        request.headers.get("authorization", ""), f"Bearer {expected_token}"
+    ):
+        return PlainTextResponse("unauthorized\n", status_code=401)
+    return PlainTextResponse(
+        render_prometheus_text(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
 @app.exception_handler(StarletteHTTPException)
 async def handle_http_exception(
     _: Request, exc: StarletteHTTPException
@@ -24,6 +24,7 @@ from app.models.production_order import ProductionOrder
 from app.models.production_order_process import ProductionOrderProcess
 from app.models.production_record import ProductionRecord
 from app.models.production_sub_order import ProductionSubOrder
+from app.models.production_daily_rollup import ProductionDailyRollup
 from app.models.production_assist_authorization import ProductionAssistAuthorization
 from app.models.production_scrap_statistics import ProductionScrapStatistics
 from app.models.repair_cause import RepairCause
@@ -49,11 +50,13 @@ from app.models.role_permission_grant import RolePermissionGrant
 from app.models.supplier import Supplier
 from app.models.user import User
 from app.models.user_export_task import UserExportTask
+from app.models.export_job import ExportJob
 from app.models.user_session import UserSession
 
 __all__ = [
     "User",
     "UserExportTask",
+    "ExportJob",
     "Role",
     "AuthzChangeLog",
     "AuthzChangeLogItem",
@@ -89,6 +92,7 @@ __all__ = [
     "ProductionOrder",
     "ProductionOrderProcess",
     "ProductionSubOrder",
+    "ProductionDailyRollup",
     "ProductionAssistAuthorization",
     "ProductionScrapStatistics",
     "RepairOrder",
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, JSON, String, Text, func
+from sqlalchemy import DateTime, ForeignKey, Index, JSON, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base import Base
@@ -8,6 +8,15 @@ from app.models.base import Base
 
 class AuditLog(Base):
     __tablename__ = "sys_audit_log"
+    __table_args__ = (
+        # 关键字模糊搜索（ILIKE '%kw%'）用的 pg_trgm 索引，其他方言建成普通索引
+        Index(
+            "ix_sys_audit_log_operator_username_trgm",
+            "operator_username",
+            postgresql_using="gin",
+            postgresql_ops={"operator_username": "gin_trgm_ops"},
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     occurred_at: Mapped[datetime] = mapped_column(
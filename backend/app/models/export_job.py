@@ -0,0 +1,59 @@
+from datetime import datetime
+
+from sqlalchemy import JSON, Boolean, DateTime, ForeignKey, Index, Integer, String, Text, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class ExportJob(Base):
+    """通用异步导出任务：Web 只负责入队，由 worker 领取后流式写文件。"""
+
+    __tablename__ = "sys_export_job"
+    __table_args__ = (
+        # worker 领取 pending 任务、清理过期 / 超时任务均按 (status, 时间) 走索引
+        Index("ix_sys_export_job_status_requested_at", "status", "requested_at"),
+        Index("ix_sys_export_job_status_expires_at", "status", "expires_at"),
+        Index("ix_sys_export_job_status_heartbeat_at", "status", "heartbeat_at"),
+        Index("ix_sys_export_job_owner_requested_at", "created_by_user_id", "requested_at"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    job_code: Mapped[str] = mapped_column(String(64), nullable=False, unique=True, index=True)
+    job_type: Mapped[str] = mapped_column(String(64), nullable=False)
+    created_by_user_id: Mapped[int] = mapped_column(
+        ForeignKey("sys_user.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    status: Mapped[str] = mapped_column(
+        String(32),
+        nullable=False,
+        server_default=text("'pending'"),
+    )
+    format: Mapped[str] = mapped_column(String(16), nullable=False)
+    params: Mapped[dict[str, object]] = mapped_column(JSON, nullable=False, default=dict)
+    record_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    total_count: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    progress_percent: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        server_default=text("0"),
+    )
+    cancel_requested: Mapped[bool] = mapped_column(
+        Boolean,
+        nullable=False,
+        server_default=text("false"),
+    )
+    file_name: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    mime_type: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    storage_path: Mapped[str | None] = mapped_column(Text, nullable=True)
+    failure_reason: Mapped[str | None] = mapped_column(Text, nullable=True)
+    requested_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=text("now()"),
+    )
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -61,4 +61,32 @@ class Message(Base, TimestampMixin):
         ),
         Index("ix_msg_message_type_priority_published", "message_type", "priority", "published_at"),
         Index("ix_msg_message_source", "source_module", "source_type", "source_id"),
+        # 后台维护按状态 + ID 水位 / 最后更新时间分批扫描
+        Index("ix_msg_message_status_id", "status", "id"),
+        Index("ix_msg_message_status_updated_at", "status", "updated_at"),
+        Index(
+            "ix_msg_message_expires_at_not_null",
+            "expires_at",
+            postgresql_where=expires_at.isnot(None),
+            sqlite_where=expires_at.isnot(None),
+        ),
+        # 关键字模糊搜索（ILIKE '%kw%'）用的 pg_trgm 索引，其他方言建成普通索引
+        Index(
+            "ix_msg_message_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_msg_message_summary_trgm",
+            "summary",
+            postgresql_using="gin",
+            postgresql_ops={"summary": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_msg_message_source_code_trgm",
+            "source_code",
+            postgresql_using="gin",
+            postgresql_ops={"source_code": "gin_trgm_ops"},
+        ),
     )
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, Integer, String, Text, text
+from sqlalchemy import Boolean, DateTime, Index, Integer, String, Text, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base, TimestampMixin
@@ -8,6 +8,15 @@ from app.models.base import Base, TimestampMixin
 
 class Product(Base, TimestampMixin):
     __tablename__ = "mes_product"
+    __table_args__ = (
+        # 关键字模糊搜索（ILIKE '%kw%'）用的 pg_trgm 索引，其他方言建成普通索引
+        Index(
+            "ix_mes_product_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(128), unique=True, index=True, nullable=False)
@@ -0,0 +1,43 @@
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, Integer, String, UniqueConstraint, func, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class ProductionDailyRollup(Base):
+    """按 日期 × 统计口径 × 产品 × 工段 × 工序 × 操作员 预聚合的生产日汇总。
+
+    维度列均为非空整数（缺失记 0），不建外键：源数据删除后由重建命令修正。
+    """
+
+    __tablename__ = "mes_production_daily_rollup"
+    __table_args__ = (
+        UniqueConstraint(
+            "stat_date",
+            "stat_mode",
+            "product_id",
+            "stage_id",
+            "process_id",
+            "operator_user_id",
+            name="uq_mes_production_daily_rollup_key",
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    stat_date: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+    stat_mode: Mapped[str] = mapped_column(String(16), nullable=False)
+    product_id: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    stage_id: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    process_id: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    operator_user_id: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    production_quantity: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    production_record_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    last_production_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
@@ -1,6 +1,6 @@
 from datetime import date
 
-from sqlalchemy import Boolean, Date, ForeignKey, Integer, String, Text, text
+from sqlalchemy import Boolean, Date, ForeignKey, Index, Integer, String, Text, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base, TimestampMixin
@@ -8,6 +8,21 @@ from app.models.base import Base, TimestampMixin
 
 class ProductionOrder(Base, TimestampMixin):
     __tablename__ = "mes_order"
+    __table_args__ = (
+        # 关键字模糊搜索（ILIKE '%kw%'）用的 pg_trgm 索引，其他方言建成普通索引
+        Index(
+            "ix_mes_order_order_code_trgm",
+            "order_code",
+            postgresql_using="gin",
+            postgresql_ops={"order_code": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_mes_order_supplier_name_trgm",
+            "supplier_name",
+            postgresql_using="gin",
+            postgresql_ops={"supplier_name": "gin_trgm_ops"},
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     order_code: Mapped[str] = mapped_column(String(64), unique=True, index=True, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy import ForeignKey, Index, Integer, String, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base, TimestampMixin
@@ -8,6 +8,19 @@ class ProductionOrderProcess(Base, TimestampMixin):
     __tablename__ = "mes_order_process"
     __table_args__ = (
         UniqueConstraint("order_id", "process_order", name="uq_mes_order_process_order_id_process_order"),
+        # 关键字模糊搜索（ILIKE '%kw%'）用的 pg_trgm 索引，其他方言建成普通索引
+        Index(
+            "ix_mes_order_process_process_code_trgm",
+            "process_code",
+            postgresql_using="gin",
+            postgresql_ops={"process_code": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_mes_order_process_process_name_trgm",
+            "process_name",
+            postgresql_using="gin",
+            postgresql_ops={"process_name": "gin_trgm_ops"},
+        ),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey, Integer, String
+from sqlalchemy import ForeignKey, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base, TimestampMixin
@@ -35,3 +35,8 @@ class ProductionRecord(Base, TimestampMixin):
     order_process = relationship("ProductionOrderProcess", back_populates="production_records")
     sub_order = relationship("ProductionSubOrder", back_populates="production_records")
     operator = relationship("User")
+
+    __table_args__ = (
+        # 生产数据查询按记录类型 + 时间范围聚合
+        Index("ix_mes_production_record_type_created_at", "record_type", "created_at"),
+    )
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, text
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base import Base
@@ -8,6 +8,9 @@ from app.models.base import Base
 
 class UserExportTask(Base):
     __tablename__ = "sys_user_export_task"
+    __table_args__ = (
+        Index("ix_sys_user_export_task_status_started_at", "status", "started_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     task_code: Mapped[str] = mapped_column(String(64), nullable=False, unique=True, index=True)
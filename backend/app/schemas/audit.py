@@ -24,3 +24,6 @@ class AuditLogItem(BaseModel):
 class AuditLogListResult(BaseModel):
     total: int
     items: list[AuditLogItem]
+    # 游标翻页：下一页传 cursor=next_cursor；count_mode 非 exact 时 total 为估算/封顶值
+    next_cursor: str | None = None
+    total_is_estimate: bool = False
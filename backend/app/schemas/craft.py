@@ -594,6 +594,12 @@ class SystemMasterTemplateVersionListResult(BaseModel):
     items: list[SystemMasterTemplateVersionItem]
 
 
+class CraftProcessExportRequest(BaseModel):
+    keyword: str | None = Field(default=None, max_length=128)
+    stage_id: int | None = Field(default=None, ge=1)
+    enabled: bool | None = None
+
+
 class CraftExportResult(BaseModel):
     file_name: str
     mime_type: str
@@ -153,6 +153,9 @@ class MaintenanceWorkOrderItem(BaseModel):
 class MaintenanceWorkOrderListResult(BaseModel):
     total: int
     items: list[MaintenanceWorkOrderItem]
+    # 游标翻页：下一页传 cursor=next_cursor；count_mode 非 exact 时 total 为估算/封顶值
+    next_cursor: str | None = None
+    total_is_estimate: bool = False
 
 
 class MaintenanceRecordItem(BaseModel):
@@ -222,6 +225,13 @@ class MaintenanceRecordDetail(MaintenanceRecordItem):
     source_item_name: str | None = None
 
 
+class EquipmentLedgerExportRequest(BaseModel):
+    keyword: str | None = Field(default=None, max_length=128)
+    enabled: bool | None = None
+    location_keyword: str | None = Field(default=None, max_length=128)
+    owner_name: str | None = Field(default=None, max_length=128)
+
+
 class EquipmentExportResult(BaseModel):
     file_name: str
     mime_type: str
@@ -0,0 +1,43 @@
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class ExportJobCreateRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    job_type: str = Field(min_length=1, max_length=64)
+    format: str = Field(default="csv", pattern="^(csv|xlsx|excel)$")
+    params: dict[str, Any] = Field(default_factory=dict)
+
+
+class ExportJobItem(BaseModel):
+    id: int
+    job_code: str
+    job_type: str
+    status: str
+    format: str
+    params: dict[str, Any]
+    record_count: int
+    total_count: int | None = None
+    progress_percent: int
+    cancel_requested: bool
+    file_name: str | None = None
+    mime_type: str | None = None
+    failure_reason: str | None = None
+    requested_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    expires_at: datetime | None = None
+
+
+class ExportJobListResult(BaseModel):
+    total: int
+    items: list[ExportJobItem]
+
+
+class ExportJobTypeItem(BaseModel):
+    job_type: str
+    label: str
+    permission_code: str
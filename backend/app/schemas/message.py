@@ -24,6 +24,8 @@ class MessageItem(BaseModel):
     inactive_reason: str | None = None
     published_at: datetime | None
     expires_at: datetime | None = None
+    # 列表 keyset 游标取值（coalesce(published_at, created_at)），不随响应输出
+    sort_time: datetime | None = Field(default=None, exclude=True)
     # 收件记录字段
     is_read: bool
     read_at: datetime | None
@@ -58,6 +60,9 @@ class MessageListResult(BaseModel):
     total: int
     page: int
     page_size: int
+    # 游标翻页：下一页传 cursor=next_cursor；count_mode 非 exact 时 total 为估算/封顶值
+    next_cursor: str | None = None
+    total_is_estimate: bool = False
 
 
 class MessageDetailResult(BaseModel):
@@ -146,6 +151,15 @@ class AnnouncementPublishResult(BaseModel):
     recipient_count: int
 
 
+class AnnouncementDeliveryProgress(BaseModel):
+    message_id: int
+    recipient_count: int
+    pending_count: int
+    delivered_count: int
+    failed_count: int
+    completed: bool
+
+
 class AnnouncementOfflineResult(BaseModel):
     message_id: int
     status: str
@@ -173,6 +173,9 @@ class OrderItem(BaseModel):
 class OrderListResult(BaseModel):
     total: int
     items: list[OrderItem]
+    # 游标翻页：下一页传 cursor=next_cursor；count_mode 非 exact 时 total 为估算/封顶值
+    next_cursor: str | None = None
+    total_is_estimate: bool = False
 
 
 class OrderDetail(BaseModel):
@@ -738,6 +741,9 @@ class RepairOrderItem(BaseModel):
 class RepairOrderListResult(BaseModel):
     total: int
     items: list[RepairOrderItem]
+    # 游标翻页：下一页传 cursor=next_cursor；count_mode 非 exact 时 total 为估算/封顶值
+    next_cursor: str | None = None
+    total_is_estimate: bool = False
 
 
 class RepairOrderPhenomenonSummaryItem(BaseModel):
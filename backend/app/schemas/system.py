@@ -5,3 +5,54 @@ class SystemTimeSnapshot(BaseModel):
     server_utc_iso: str
     server_timezone_offset_minutes: int
     sampled_at_epoch_ms: int
+
+
+class CacheMetricsItem(BaseModel):
+    name: str
+    size: int
+    max_size: int
+    default_ttl_seconds: float
+    hits: int
+    misses: int
+    hit_ratio: float
+    loads: int
+    load_waits: int
+    evictions: int
+    expirations: int
+    invalidations: int
+    tags: int = 0
+    load_seconds_total: float = 0.0
+    load_latency_histogram: dict[str, int] = {}
+
+
+class RedisBackoffItem(BaseModel):
+    component: str
+    connected: bool
+    backoff_remaining_seconds: float
+
+
+class CacheMetricsWorker(BaseModel):
+    worker_id: str
+    collected_at: str
+    caches: list[CacheMetricsItem]
+    redis_backoff: list[RedisBackoffItem]
+
+
+class CacheMetricsOverview(BaseModel):
+    current_worker_id: str
+    aggregated: bool
+    workers: list[CacheMetricsWorker]
+    totals: list[CacheMetricsItem]
+
+
+class RouteMetricsItem(BaseModel):
+    method: str
+    route: str
+    count: int
+    errors: int
+    avg_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    avg_sql_statements: float
+    avg_sql_ms: float
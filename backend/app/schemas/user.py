@@ -123,6 +123,10 @@ class UserOnlineStatusResult(BaseModel):
     user_ids: list[int]
 
 
+class UserOnlineCountResult(BaseModel):
+    online_count: int
+
+
 class UserLifecycleResult(BaseModel):
     user: UserItem
     forced_offline_session_count: int
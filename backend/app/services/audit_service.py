@@ -2,11 +2,23 @@ from __future__ import annotations
 
 from datetime import UTC, datetime
 
-from sqlalchemy import Select, and_, func, select
+from sqlalchemy import Select, and_, func, insert, select
 from sqlalchemy.orm import Session
 
 from app.models.audit_log import AuditLog
 from app.models.user import User
+from app.services.keyword_search_service import keyword_filter
+from app.services.list_pagination_service import (
+    COUNT_MODE_EXACT,
+    KeysetOrder,
+    count_list_total,
+)
+
+
+AUDIT_LOG_KEYSET = KeysetOrder(
+    columns=((AuditLog.occurred_at, True), (AuditLog.id, True)),
+    row_values=lambda row: (row.occurred_at, row.id),
+)
 
 
 def _build_audit_log_filters(
@@ -18,8 +30,9 @@ def _build_audit_log_filters(
     end_time: datetime | None = None,
 ) -> list[object]:
     filters: list[object] = []
-    if operator_username:
-        filters.append(AuditLog.operator_username.ilike(f"%{operator_username.strip()}%"))
+    operator_clause = keyword_filter(operator_username, AuditLog.operator_username)
+    if operator_clause is not None:
+        filters.append(operator_clause)
     if action_code:
         filters.append(AuditLog.action_code == action_code.strip())
     if target_type:
@@ -68,6 +81,42 @@ def write_audit_log(
     return row
 
 
+def write_audit_logs_bulk(
+    db: Session,
+    *,
+    entries: list[dict[str, object]],
+    operator: User | None = None,
+) -> int:
+    """批量写入审计日志（单条 INSERT ... VALUES 多行），用于后台批处理。
+
+    entries 中每项的键与 write_audit_log 的关键字参数一致。
+    """
+    if not entries:
+        return 0
+    occurred_at = datetime.now(UTC)
+    rows = [
+        {
+            "occurred_at": occurred_at,
+            "operator_user_id": operator.id if operator else None,
+            "operator_username": operator.username if operator else None,
+            "action_code": entry["action_code"],
+            "action_name": entry["action_name"],
+            "target_type": entry["target_type"],
+            "target_id": entry.get("target_id"),
+            "target_name": entry.get("target_name"),
+            "result": entry.get("result") or "success",
+            "before_data": entry.get("before_data"),
+            "after_data": entry.get("after_data"),
+            "ip_address": entry.get("ip_address"),
+            "terminal_info": entry.get("terminal_info"),
+            "remark": entry.get("remark"),
+        }
+        for entry in entries
+    ]
+    db.execute(insert(AuditLog), rows)
+    return len(rows)
+
+
 def query_audit_logs(
     *,
     operator_username: str | None = None,
@@ -76,7 +125,7 @@ def query_audit_logs(
     start_time: datetime | None = None,
     end_time: datetime | None = None,
 ) -> Select[tuple[AuditLog]]:
-    stmt = select(AuditLog).order_by(AuditLog.occurred_at.desc(), AuditLog.id.desc())
+    stmt = AUDIT_LOG_KEYSET.order_by(select(AuditLog))
     filters = _build_audit_log_filters(
         operator_username=operator_username,
         action_code=action_code,
@@ -99,7 +148,10 @@ def list_audit_logs(
     target_type: str | None = None,
     start_time: datetime | None = None,
     end_time: datetime | None = None,
+    cursor: str | None = None,
+    count_mode: str = COUNT_MODE_EXACT,
 ) -> tuple[int, list[AuditLog]]:
+    """cursor 非空时按 (occurred_at, id) 游标取下一页，忽略 page"""
     filters = _build_audit_log_filters(
         operator_username=operator_username,
         action_code=action_code,
@@ -117,6 +169,16 @@ def list_audit_logs(
     total_stmt = select(func.count(AuditLog.id))
     if filters:
         total_stmt = total_stmt.where(and_(*filters))
-    total = int(db.execute(total_stmt).scalar_one())
-    rows = db.execute(stmt.offset((page - 1) * page_size).limit(page_size)).scalars().all()
+    total = count_list_total(
+        db,
+        stmt,
+        count_mode=count_mode,
+        exact_count_stmt=total_stmt,
+        table_name=AuditLog.__tablename__,
+    )
+    if cursor:
+        paged_stmt = AUDIT_LOG_KEYSET.after(stmt, cursor)
+    else:
+        paged_stmt = stmt.offset((page - 1) * page_size)
+    rows = db.execute(paged_stmt.limit(page_size)).scalars().all()
     return total, rows
@@ -1,12 +1,47 @@
 from __future__ import annotations
 
 import hashlib
-from pathlib import Path
+import logging
+import os
+from threading import Event, Lock, Thread
 import time
+from uuid import uuid4
 
+try:
+    from redis import Redis
+    from redis.exceptions import RedisError
+except Exception:  # pragma: no cover - 依赖缺失时仅启用进程内代数
+    Redis = None  # type: ignore[assignment]
+
+    class RedisError(Exception):
+        pass
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
 
 AUTHZ_PERMISSION_CACHE_ALL_MODULES = "__all__"
 
+# ── 跨进程失效总线 ────────────────────────────────────────────────────────────
+# 每个进程持有一个单调递增的本地代数，权限热路径只读取内存整数。
+# 失效时：本地代数 +1，同时 INCR Redis 计数器并 PUBLISH 到失效频道；
+# 后台监听线程收到其他进程的消息后推进本地代数，并定期对比计数器补偿漏收消息。
+# Redis 不可用时退化为纯进程内代数。
+_AUTHZ_CACHE_GENERATION_LOCK = Lock()
+_AUTHZ_CACHE_LOCAL_GENERATION = 0
+_AUTHZ_CACHE_REMOTE_GENERATION: int | None = None
+_AUTHZ_CACHE_BUS_ORIGIN = uuid4().hex
+_AUTHZ_CACHE_BUS_LOCK = Lock()
+_AUTHZ_CACHE_BUS_STARTED = False
+_AUTHZ_CACHE_BUS_THREAD: Thread | None = None
+_AUTHZ_CACHE_BUS_STOP = Event()
+_AUTHZ_CACHE_BUS_REDIS_CLIENT = None
+_AUTHZ_CACHE_BUS_REDIS_INIT = False
+_AUTHZ_CACHE_BUS_REDIS_DISABLED_UNTIL = 0.0
+_AUTHZ_CACHE_BUS_REDIS_BACKOFF_SECONDS = 30.0
+_AUTHZ_CACHE_BUS_POLL_SECONDS = 1.0
+
 
 def _authz_permission_cache_ttl_seconds(*, ttl_seconds: int) -> int:
     return max(1, ttl_seconds)
@@ -35,22 +70,247 @@ def _authz_permission_cache_key(
     return f"{cache_prefix}:{digest}"
 
 
-def _authz_cache_generation_marker_path() -> Path:
-    repo_root = Path(__file__).resolve().parents[3]
-    return repo_root / ".tmp_runtime" / "authz_cache_generation.marker"
+def _authz_cache_bus_channel() -> str:
+    return settings.authz_cache_invalidation_channel
 
 
-def _authz_cache_generation_value() -> int:
-    marker_path = _authz_cache_generation_marker_path()
+def _authz_cache_bus_generation_key() -> str:
+    return f"{settings.authz_cache_invalidation_channel}:generation"
+
+
+def _authz_cache_bus_enabled() -> bool:
+    return bool(settings.authz_permission_cache_redis_enabled) and Redis is not None
+
+
+def _build_authz_cache_bus_redis_client(*, socket_timeout: float | None):
+    return Redis(
+        host=settings.redis_host,
+        port=settings.redis_port,
+        db=settings.redis_db,
+        password=settings.redis_password or None,
+        ssl=settings.redis_ssl,
+        decode_responses=True,
+        socket_timeout=socket_timeout,
+        socket_connect_timeout=max(0.05, settings.redis_connect_timeout_seconds),
+    )
+
+
+def _get_authz_cache_bus_redis_client():
+    global _AUTHZ_CACHE_BUS_REDIS_CLIENT
+    global _AUTHZ_CACHE_BUS_REDIS_INIT
+    if _AUTHZ_CACHE_BUS_REDIS_DISABLED_UNTIL > time.monotonic():
+        return None
+    if _AUTHZ_CACHE_BUS_REDIS_INIT:
+        return _AUTHZ_CACHE_BUS_REDIS_CLIENT
+    _AUTHZ_CACHE_BUS_REDIS_INIT = True
+    if not _authz_cache_bus_enabled():
+        return None
+    try:
+        _AUTHZ_CACHE_BUS_REDIS_CLIENT = _build_authz_cache_bus_redis_client(
+            socket_timeout=max(0.05, settings.redis_socket_timeout_seconds)
+        )
+        _AUTHZ_CACHE_BUS_REDIS_CLIENT.ping()
+    except Exception:
+        _mark_authz_cache_bus_redis_unavailable(
+            "[AUTHZ_CACHE] 失效总线 Redis 连接失败，退化为进程内代数。"
+        )
+    return _AUTHZ_CACHE_BUS_REDIS_CLIENT
+
+
+def _mark_authz_cache_bus_redis_unavailable(message: str) -> None:
+    global _AUTHZ_CACHE_BUS_REDIS_CLIENT
+    global _AUTHZ_CACHE_BUS_REDIS_INIT
+    global _AUTHZ_CACHE_BUS_REDIS_DISABLED_UNTIL
+    logger.warning(message, exc_info=True)
+    _AUTHZ_CACHE_BUS_REDIS_CLIENT = None
+    _AUTHZ_CACHE_BUS_REDIS_INIT = False
+    _AUTHZ_CACHE_BUS_REDIS_DISABLED_UNTIL = (
+        time.monotonic() + _AUTHZ_CACHE_BUS_REDIS_BACKOFF_SECONDS
+    )
+
+
+def _advance_local_authz_cache_generation() -> int:
+    global _AUTHZ_CACHE_LOCAL_GENERATION
+    with _AUTHZ_CACHE_GENERATION_LOCK:
+        _AUTHZ_CACHE_LOCAL_GENERATION += 1
+        return _AUTHZ_CACHE_LOCAL_GENERATION
+
+
+def _observe_remote_authz_cache_generation(
+    remote_generation: int,
+    *,
+    origin: str | None = None,
+) -> bool:
+    """记录 Redis 侧代数；若来自其他进程且发生变化，则推进本地代数。
+
+    比较使用“不相等”而非“更大”，Redis 计数器被重置后仍能触发失效。
+    """
+    global _AUTHZ_CACHE_REMOTE_GENERATION
+    global _AUTHZ_CACHE_LOCAL_GENERATION
+    with _AUTHZ_CACHE_GENERATION_LOCK:
+        previous = _AUTHZ_CACHE_REMOTE_GENERATION
+        _AUTHZ_CACHE_REMOTE_GENERATION = remote_generation
+        if origin == _AUTHZ_CACHE_BUS_ORIGIN:
+            return False
+        if previous is None and origin is None:
+            # 首次同步仅建立基线，进程刚启动时本地缓存必然为空。
+            return False
+        if previous == remote_generation and origin is None:
+            return False
+        _AUTHZ_CACHE_LOCAL_GENERATION += 1
+        return True
+
+
+def _parse_authz_cache_bus_message(payload: object) -> tuple[str | None, int] | None:
+    text = str(payload or "").strip()
+    if not text:
+        return None
+    origin, _, raw_generation = text.rpartition(":")
+    try:
+        return (origin or None), int(raw_generation)
+    except ValueError:
+        return None
+
+
+def _resync_authz_cache_generation_from_redis(redis_client) -> None:
+    raw_value = redis_client.get(_authz_cache_bus_generation_key())
     try:
-        return int(marker_path.stat().st_mtime_ns)
-    except FileNotFoundError:
-        return 0
+        remote_generation = int(raw_value or 0)
+    except (TypeError, ValueError):
+        return
+    _observe_remote_authz_cache_generation(remote_generation)
+
+
+def _run_authz_cache_bus_listener() -> None:
+    resync_interval = max(1, settings.authz_cache_invalidation_resync_seconds)
+    # 每次断线只失效一次；Redis 持续不可用时，退避重连不再反复清空本地缓存。
+    # 断线期间本进程仍在用本地缓存加载权限，而 Redis 整体不可用时其他进程的 INCR 同样失败，
+    # 计数器不会前进、重连后的对齐发现不了差异，因此重连成功后再无条件推进一次本地代数。
+    invalidated_for_outage = False
+    while not _AUTHZ_CACHE_BUS_STOP.is_set():
+        pubsub = None
+        try:
+            redis_client = _build_authz_cache_bus_redis_client(socket_timeout=None)
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(_authz_cache_bus_channel())
+            # 订阅建立后对齐计数器基线：只能补偿 Redis 可写、仅本进程断开期间发生的失效。
+            _resync_authz_cache_generation_from_redis(redis_client)
+            if invalidated_for_outage:
+                _advance_local_authz_cache_generation()
+                invalidated_for_outage = False
+            next_resync_at = time.monotonic() + resync_interval
+            while not _AUTHZ_CACHE_BUS_STOP.is_set():
+                message = pubsub.get_message(timeout=_AUTHZ_CACHE_BUS_POLL_SECONDS)
+                if message and message.get("type") == "message":
+                    parsed = _parse_authz_cache_bus_message(message.get("data"))
+                    if parsed is not None:
+                        origin, remote_generation = parsed
+                        _observe_remote_authz_cache_generation(
+                            remote_generation,
+                            origin=origin or "",
+                        )
+                if time.monotonic() >= next_resync_at:
+                    _resync_authz_cache_generation_from_redis(redis_client)
+                    next_resync_at = time.monotonic() + resync_interval
+        except Exception:
+            logger.warning(
+                "[AUTHZ_CACHE] 失效总线监听中断，%ds 后重连。",
+                _AUTHZ_CACHE_BUS_REDIS_BACKOFF_SECONDS,
+                exc_info=True,
+            )
+            # 断线期间无法确认是否漏收失效，保守地推进一次本地代数；
+            # 断线期间加载的条目同样可能过期，重连成功后再推进一次。
+            if not invalidated_for_outage:
+                _advance_local_authz_cache_generation()
+                invalidated_for_outage = True
+            _AUTHZ_CACHE_BUS_STOP.wait(_AUTHZ_CACHE_BUS_REDIS_BACKOFF_SECONDS)
+        finally:
+            if pubsub is not None:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+
+
+def _ensure_authz_cache_bus_started() -> None:
+    global _AUTHZ_CACHE_BUS_STARTED
+    global _AUTHZ_CACHE_BUS_THREAD
+    if _AUTHZ_CACHE_BUS_STARTED:
+        return
+    with _AUTHZ_CACHE_BUS_LOCK:
+        if _AUTHZ_CACHE_BUS_STARTED:
+            return
+        _AUTHZ_CACHE_BUS_STARTED = True
+        if not _authz_cache_bus_enabled():
+            return
+        _AUTHZ_CACHE_BUS_STOP.clear()
+        _AUTHZ_CACHE_BUS_THREAD = Thread(
+            target=_run_authz_cache_bus_listener,
+            name="authz-cache-bus",
+            daemon=True,
+        )
+        _AUTHZ_CACHE_BUS_THREAD.start()
+
+
+def stop_authz_cache_bus() -> None:
+    global _AUTHZ_CACHE_BUS_STARTED
+    global _AUTHZ_CACHE_BUS_THREAD
+    with _AUTHZ_CACHE_BUS_LOCK:
+        _AUTHZ_CACHE_BUS_STOP.set()
+        thread = _AUTHZ_CACHE_BUS_THREAD
+        _AUTHZ_CACHE_BUS_THREAD = None
+        _AUTHZ_CACHE_BUS_STARTED = False
+    if thread is not None and thread.is_alive():
+        thread.join(timeout=_AUTHZ_CACHE_BUS_POLL_SECONDS * 2)
+
+
+def _reset_authz_cache_bus_after_fork() -> None:
+    global _AUTHZ_CACHE_BUS_STARTED
+    global _AUTHZ_CACHE_BUS_THREAD
+    global _AUTHZ_CACHE_BUS_ORIGIN
+    global _AUTHZ_CACHE_BUS_REDIS_CLIENT
+    global _AUTHZ_CACHE_BUS_REDIS_INIT
+    global _AUTHZ_CACHE_BUS_STOP
+    global _AUTHZ_CACHE_BUS_LOCK
+    global _AUTHZ_CACHE_GENERATION_LOCK
+    # gunicorn 预加载后 fork 的 worker 不会继承监听线程，需要各自重新订阅。
+    _AUTHZ_CACHE_BUS_LOCK = Lock()
+    _AUTHZ_CACHE_GENERATION_LOCK = Lock()
+    _AUTHZ_CACHE_BUS_STOP = Event()
+    _AUTHZ_CACHE_BUS_STARTED = False
+    _AUTHZ_CACHE_BUS_THREAD = None
+    _AUTHZ_CACHE_BUS_ORIGIN = uuid4().hex
+    _AUTHZ_CACHE_BUS_REDIS_CLIENT = None
+    _AUTHZ_CACHE_BUS_REDIS_INIT = False
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_authz_cache_bus_after_fork)
+
+
+def _authz_cache_generation_value() -> int:
+    _ensure_authz_cache_bus_started()
+    return _AUTHZ_CACHE_LOCAL_GENERATION
 
 
 def _bump_authz_cache_generation() -> int:
-    marker_path = _authz_cache_generation_marker_path()
-    marker_path.parent.mkdir(parents=True, exist_ok=True)
-    now_ns = time.time_ns()
-    marker_path.write_text(str(now_ns), encoding="utf-8")
-    return now_ns
+    generation = _advance_local_authz_cache_generation()
+    _ensure_authz_cache_bus_started()
+    redis_client = _get_authz_cache_bus_redis_client()
+    if redis_client is None:
+        return generation
+    try:
+        remote_generation = int(redis_client.incr(_authz_cache_bus_generation_key()))
+        _observe_remote_authz_cache_generation(
+            remote_generation,
+            origin=_AUTHZ_CACHE_BUS_ORIGIN,
+        )
+        redis_client.publish(
+            _authz_cache_bus_channel(),
+            f"{_AUTHZ_CACHE_BUS_ORIGIN}:{remote_generation}",
+        )
+    except RedisError:
+        _mark_authz_cache_bus_redis_unavailable(
+            "[AUTHZ_CACHE] 失效广播失败，其他进程将在重连后补偿同步。"
+        )
+    return generation
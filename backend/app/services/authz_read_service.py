@@ -2,110 +2,50 @@ from __future__ import annotations
 
 import copy
 import json
-from threading import Event
-import time
+
+from app.core.local_cache import LocalTTLCache
 
 
 def get_authz_read_cache(
     *,
-    local_cache: dict[str, tuple[float, object]],
-    local_cache_lock,
+    local_cache: LocalTTLCache[str, object],
     cache_key: str,
     copy_payload: bool = False,
 ):
-    with local_cache_lock:
-        cached = local_cache.get(cache_key)
-        if cached is None:
-            return None
-        expire_at, payload = cached
-        if expire_at <= time.monotonic():
-            local_cache.pop(cache_key, None)
-            return None
-        if copy_payload:
-            return copy.deepcopy(payload)
-        return payload
+    payload = local_cache.get(cache_key)
+    if payload is None:
+        return None
+    if copy_payload:
+        return copy.deepcopy(payload)
+    return payload
 
 
 def set_authz_read_cache(
     *,
-    local_cache: dict[str, tuple[float, object]],
-    local_cache_lock,
+    local_cache: LocalTTLCache[str, object],
     cache_key: str,
     payload: object,
     ttl_seconds: int,
     copy_payload: bool = False,
 ) -> None:
-    expire_at = time.monotonic() + ttl_seconds
-    with local_cache_lock:
-        if copy_payload:
-            local_cache[cache_key] = (expire_at, copy.deepcopy(payload))
-            return
-        local_cache[cache_key] = (expire_at, payload)
+    if copy_payload:
+        payload = copy.deepcopy(payload)
+    local_cache.set(cache_key, payload, ttl_seconds=ttl_seconds)
 
 
 def get_or_build_authz_read_cache(
     *,
-    local_cache: dict[str, tuple[float, object]],
-    local_cache_lock,
-    inflight: dict[str, Event],
-    inflight_lock,
+    local_cache: LocalTTLCache[str, object],
     cache_key: str,
     builder,
     ttl_seconds: int,
     copy_payload: bool = False,
 ):
-    cached = get_authz_read_cache(
-        local_cache=local_cache,
-        local_cache_lock=local_cache_lock,
-        cache_key=cache_key,
-        copy_payload=copy_payload,
-    )
-    if cached is not None:
-        return cached
-
-    event: Event | None = None
-    while True:
-        with inflight_lock:
-            cached = get_authz_read_cache(
-                local_cache=local_cache,
-                local_cache_lock=local_cache_lock,
-                cache_key=cache_key,
-                copy_payload=copy_payload,
-            )
-            if cached is not None:
-                return cached
-            event = inflight.get(cache_key)
-            if event is None:
-                event = Event()
-                inflight[cache_key] = event
-                break
-        event.wait(timeout=max(0.05, float(ttl_seconds)))
-        cached = get_authz_read_cache(
-            local_cache=local_cache,
-            local_cache_lock=local_cache_lock,
-            cache_key=cache_key,
-            copy_payload=copy_payload,
-        )
-        if cached is not None:
-            return cached
-
-    try:
-        payload = builder()
-        set_authz_read_cache(
-            local_cache=local_cache,
-            local_cache_lock=local_cache_lock,
-            cache_key=cache_key,
-            payload=payload,
-            ttl_seconds=ttl_seconds,
-            copy_payload=copy_payload,
-        )
-        return payload
-    finally:
-        with inflight_lock:
-            current = inflight.get(cache_key)
-            if current is event:
-                inflight.pop(cache_key, None)
-                event.set()
+    # 并发未命中由 LocalTTLCache 单飞合并，只有一个线程执行 builder
+    payload = local_cache.get_or_load(cache_key, builder, ttl_seconds=ttl_seconds)
+    if copy_payload:
+        return copy.deepcopy(payload)
+    return payload
 
 
 def build_authz_read_revision_state(
@@ -6,7 +6,7 @@ from dataclasses import dataclass
 import hashlib
 import json
 import logging
-from threading import Event, RLock
+from threading import RLock
 import time
 
 from sqlalchemy import select
@@ -47,6 +47,7 @@ from app.core.authz_hierarchy_catalog import (
     module_permission_code,
 )
 from app.core.config import settings
+from app.core.local_cache import LocalTTLCache
 from app.core.rbac import (
     ROLE_MAINTENANCE_STAFF,
     ROLE_DEFINITIONS,
@@ -99,14 +100,20 @@ _CAPABILITY_PACK_VISIBLE_MODULE_CODES = (
 logger = logging.getLogger(__name__)
 
 _AUTHZ_PERMISSION_CACHE_ALL_MODULES = "__all__"
-_AUTHZ_PERMISSION_LOCAL_CACHE: dict[str, tuple[float, set[str]]] = {}
-_AUTHZ_PERMISSION_LOCAL_CACHE_LOCK = RLock()
-_AUTHZ_PERMISSION_INFLIGHT: dict[str, Event] = {}
-_AUTHZ_PERMISSION_INFLIGHT_LOCK = RLock()
-_AUTHZ_READ_LOCAL_CACHE: dict[str, tuple[float, object]] = {}
-_AUTHZ_READ_LOCAL_CACHE_LOCK = RLock()
-_AUTHZ_READ_INFLIGHT: dict[str, Event] = {}
-_AUTHZ_READ_INFLIGHT_LOCK = RLock()
+_AUTHZ_PERMISSION_LOCAL_CACHE_MAX_SIZE = 2048
+_AUTHZ_READ_LOCAL_CACHE_MAX_SIZE = 1024
+# 权限码集合按角色组合缓存；读取时复制，调用方修改返回值不会污染缓存
+_AUTHZ_PERMISSION_LOCAL_CACHE: LocalTTLCache[str, set[str]] = LocalTTLCache(
+    "authz.permission_codes",
+    max_size=_AUTHZ_PERMISSION_LOCAL_CACHE_MAX_SIZE,
+    ttl_seconds=settings.authz_permission_cache_ttl_seconds,
+    copy_values=True,
+)
+_AUTHZ_READ_LOCAL_CACHE: LocalTTLCache[str, object] = LocalTTLCache(
+    "authz.read",
+    max_size=_AUTHZ_READ_LOCAL_CACHE_MAX_SIZE,
+    ttl_seconds=settings.authz_permission_cache_ttl_seconds,
+)
 _AUTHZ_DEFAULTS_READY = False
 _AUTHZ_DEFAULTS_READY_LOCK = RLock()
 _AUTHZ_PERMISSION_REDIS_CLIENT = None
@@ -150,7 +157,6 @@ def _get_authz_read_cache(cache_key: str, *, copy_payload: bool = False):
     _sync_local_authz_caches_with_generation()
     return authz_read_service.get_authz_read_cache(
         local_cache=_AUTHZ_READ_LOCAL_CACHE,
-        local_cache_lock=_AUTHZ_READ_LOCAL_CACHE_LOCK,
         cache_key=cache_key,
         copy_payload=copy_payload,
     )
@@ -162,7 +168,6 @@ def _set_authz_read_cache(
     _sync_local_authz_caches_with_generation()
     authz_read_service.set_authz_read_cache(
         local_cache=_AUTHZ_READ_LOCAL_CACHE,
-        local_cache_lock=_AUTHZ_READ_LOCAL_CACHE_LOCK,
         cache_key=cache_key,
         payload=payload,
         ttl_seconds=_authz_read_cache_ttl_seconds(),
@@ -179,9 +184,6 @@ def _get_or_build_authz_read_cache(
     _sync_local_authz_caches_with_generation()
     return authz_read_service.get_or_build_authz_read_cache(
         local_cache=_AUTHZ_READ_LOCAL_CACHE,
-        local_cache_lock=_AUTHZ_READ_LOCAL_CACHE_LOCK,
-        inflight=_AUTHZ_READ_INFLIGHT,
-        inflight_lock=_AUTHZ_READ_INFLIGHT_LOCK,
         cache_key=cache_key,
         builder=builder,
         ttl_seconds=_authz_read_cache_ttl_seconds(),
@@ -251,34 +253,8 @@ def _sync_local_authz_caches_with_generation() -> None:
     if generation <= _AUTHZ_CACHE_GENERATION:
         return
     _AUTHZ_CACHE_GENERATION = generation
-    with _AUTHZ_PERMISSION_LOCAL_CACHE_LOCK:
-        _AUTHZ_PERMISSION_LOCAL_CACHE.clear()
-    with _AUTHZ_PERMISSION_INFLIGHT_LOCK:
-        _AUTHZ_PERMISSION_INFLIGHT.clear()
-    with _AUTHZ_READ_LOCAL_CACHE_LOCK:
-        _AUTHZ_READ_LOCAL_CACHE.clear()
-    with _AUTHZ_READ_INFLIGHT_LOCK:
-        _AUTHZ_READ_INFLIGHT.clear()
-
-
-def _get_permission_codes_from_local_cache(cache_key: str) -> set[str] | None:
-    with _AUTHZ_PERMISSION_LOCAL_CACHE_LOCK:
-        cached = _AUTHZ_PERMISSION_LOCAL_CACHE.get(cache_key)
-        if cached is None:
-            return None
-        expire_at, value = cached
-        if expire_at <= time.monotonic():
-            _AUTHZ_PERMISSION_LOCAL_CACHE.pop(cache_key, None)
-            return None
-        return set(value)
-
-
-def _set_permission_codes_to_local_cache(
-    cache_key: str, permission_codes: set[str], ttl_seconds: int
-) -> None:
-    expire_at = time.monotonic() + max(1, ttl_seconds)
-    with _AUTHZ_PERMISSION_LOCAL_CACHE_LOCK:
-        _AUTHZ_PERMISSION_LOCAL_CACHE[cache_key] = (expire_at, set(permission_codes))
+    _AUTHZ_PERMISSION_LOCAL_CACHE.clear()
+    _AUTHZ_READ_LOCAL_CACHE.clear()
 
 
 def _get_or_build_permission_codes_cache(
@@ -288,49 +264,23 @@ def _get_or_build_permission_codes_cache(
     builder,
 ) -> set[str]:
     _sync_local_authz_caches_with_generation()
-    local_cached = _get_permission_codes_from_local_cache(cache_key)
-    if local_cached is not None:
-        return local_cached
-    redis_cached = _get_permission_codes_from_redis_cache(cache_key)
-    if redis_cached is not None:
-        _set_permission_codes_to_local_cache(cache_key, redis_cached, ttl_seconds)
-        return redis_cached
-
-    event: Event | None = None
-    while True:
-        with _AUTHZ_PERMISSION_INFLIGHT_LOCK:
-            local_cached = _get_permission_codes_from_local_cache(cache_key)
-            if local_cached is not None:
-                return local_cached
-            redis_cached = _get_permission_codes_from_redis_cache(cache_key)
-            if redis_cached is not None:
-                _set_permission_codes_to_local_cache(cache_key, redis_cached, ttl_seconds)
-                return redis_cached
-            event = _AUTHZ_PERMISSION_INFLIGHT.get(cache_key)
-            if event is None:
-                event = Event()
-                _AUTHZ_PERMISSION_INFLIGHT[cache_key] = event
-                break
-        event.wait(timeout=max(0.05, float(ttl_seconds)))
-        local_cached = _get_permission_codes_from_local_cache(cache_key)
-        if local_cached is not None:
-            return local_cached
+
+    def load() -> set[str]:
         redis_cached = _get_permission_codes_from_redis_cache(cache_key)
         if redis_cached is not None:
-            _set_permission_codes_to_local_cache(cache_key, redis_cached, ttl_seconds)
             return redis_cached
-
-    try:
         resolved_codes = builder()
-        _set_permission_codes_to_local_cache(cache_key, resolved_codes, ttl_seconds)
         _set_permission_codes_to_redis_cache(cache_key, resolved_codes, ttl_seconds)
         return resolved_codes
-    finally:
-        with _AUTHZ_PERMISSION_INFLIGHT_LOCK:
-            current = _AUTHZ_PERMISSION_INFLIGHT.get(cache_key)
-            if current is event:
-                _AUTHZ_PERMISSION_INFLIGHT.pop(cache_key, None)
-                event.set()
+
+    # 本地未命中时单飞：同一角色组合并发只有一个线程读 Redis / 查库
+    return set(
+        _AUTHZ_PERMISSION_LOCAL_CACHE.get_or_load(
+            cache_key,
+            load,
+            ttl_seconds=max(1, ttl_seconds),
+        )
+    )
 
 
 def _get_permission_codes_from_redis_cache(cache_key: str) -> set[str] | None:
@@ -375,14 +325,8 @@ def _set_permission_codes_to_redis_cache(
 
 def invalidate_permission_cache() -> None:
     global _AUTHZ_CACHE_GENERATION
-    with _AUTHZ_PERMISSION_LOCAL_CACHE_LOCK:
-        _AUTHZ_PERMISSION_LOCAL_CACHE.clear()
-    with _AUTHZ_PERMISSION_INFLIGHT_LOCK:
-        _AUTHZ_PERMISSION_INFLIGHT.clear()
-    with _AUTHZ_READ_LOCAL_CACHE_LOCK:
-        _AUTHZ_READ_LOCAL_CACHE.clear()
-    with _AUTHZ_READ_INFLIGHT_LOCK:
-        _AUTHZ_READ_INFLIGHT.clear()
+    _AUTHZ_PERMISSION_LOCAL_CACHE.clear()
+    _AUTHZ_READ_LOCAL_CACHE.clear()
     _AUTHZ_CACHE_GENERATION = authz_cache_service._bump_authz_cache_generation()
     redis_client = _get_authz_permission_cache_redis_client()
     if redis_client is None:
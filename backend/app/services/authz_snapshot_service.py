@@ -3,8 +3,6 @@ from __future__ import annotations
 from collections import defaultdict
 import hashlib
 import json
-from threading import Event, RLock
-import time
 
 from sqlalchemy.orm import Session
 
@@ -16,6 +14,7 @@ from app.core.authz_catalog import (
     PAGE_PERMISSION_BY_PAGE_CODE,
 )
 from app.core.authz_hierarchy_catalog import MODULE_NAME_BY_CODE, module_permission_code
+from app.core.local_cache import LocalTTLCache
 from app.core.page_catalog import PAGE_CATALOG, PAGE_TYPE_SIDEBAR, PAGE_TYPE_TAB
 from app.models.user import User
 from app.services.authz_service import (
@@ -25,17 +24,21 @@ from app.services.authz_service import (
     list_permission_catalog_rows,
 )
 
-_AUTHZ_SNAPSHOT_LOCAL_CACHE: dict[str, tuple[float, object]] = {}
-_AUTHZ_SNAPSHOT_LOCAL_CACHE_LOCK = RLock()
-_AUTHZ_SNAPSHOT_INFLIGHT: dict[str, Event] = {}
-_AUTHZ_SNAPSHOT_INFLIGHT_LOCK = RLock()
 _AUTHZ_SNAPSHOT_CACHE_TTL_SECONDS = 30
+_AUTHZ_SNAPSHOT_CACHE_MAX_SIZE = 1024
 
 
 def _authz_snapshot_cache_ttl_seconds() -> int:
     return max(5, min(60, _AUTHZ_SNAPSHOT_CACHE_TTL_SECONDS))
 
 
+_AUTHZ_SNAPSHOT_LOCAL_CACHE: LocalTTLCache[str, object] = LocalTTLCache(
+    "authz.snapshot",
+    max_size=_AUTHZ_SNAPSHOT_CACHE_MAX_SIZE,
+    ttl_seconds=_authz_snapshot_cache_ttl_seconds(),
+)
+
+
 def _authz_snapshot_revision_token(revision_by_module: dict[str, int]) -> str:
     return json.dumps(
         sorted((str(module), int(revision)) for module, revision in revision_by_module.items()),
@@ -60,56 +63,15 @@ def _authz_snapshot_catalog_cache_key(revision_token: str) -> str:
 
 
 def _get_authz_snapshot_from_cache(cache_key: str):
-    with _AUTHZ_SNAPSHOT_LOCAL_CACHE_LOCK:
-        cached = _AUTHZ_SNAPSHOT_LOCAL_CACHE.get(cache_key)
-        if cached is None:
-            return None
-        expire_at, payload = cached
-        if expire_at <= time.monotonic():
-            _AUTHZ_SNAPSHOT_LOCAL_CACHE.pop(cache_key, None)
-            return None
-        return payload
+    return _AUTHZ_SNAPSHOT_LOCAL_CACHE.get(cache_key)
 
 
 def _set_authz_snapshot_cache(cache_key: str, payload: object) -> None:
-    with _AUTHZ_SNAPSHOT_LOCAL_CACHE_LOCK:
-        _AUTHZ_SNAPSHOT_LOCAL_CACHE[cache_key] = (
-            time.monotonic() + _authz_snapshot_cache_ttl_seconds(),
-            payload,
-        )
+    _AUTHZ_SNAPSHOT_LOCAL_CACHE.set(cache_key, payload)
 
 
 def _get_or_build_authz_snapshot_cache(cache_key: str, builder) -> object:
-    cached = _get_authz_snapshot_from_cache(cache_key)
-    if cached is not None:
-        return cached
-
-    event: Event | None = None
-    while True:
-        with _AUTHZ_SNAPSHOT_INFLIGHT_LOCK:
-            cached = _get_authz_snapshot_from_cache(cache_key)
-            if cached is not None:
-                return cached
-            event = _AUTHZ_SNAPSHOT_INFLIGHT.get(cache_key)
-            if event is None:
-                event = Event()
-                _AUTHZ_SNAPSHOT_INFLIGHT[cache_key] = event
-                break
-        event.wait(timeout=max(0.05, float(_authz_snapshot_cache_ttl_seconds())))
-        cached = _get_authz_snapshot_from_cache(cache_key)
-        if cached is not None:
-            return cached
-
-    try:
-        payload = builder()
-        _set_authz_snapshot_cache(cache_key, payload)
-        return payload
-    finally:
-        with _AUTHZ_SNAPSHOT_INFLIGHT_LOCK:
-            current = _AUTHZ_SNAPSHOT_INFLIGHT.get(cache_key)
-            if current is event:
-                _AUTHZ_SNAPSHOT_INFLIGHT.pop(cache_key, None)
-                event.set()
+    return _AUTHZ_SNAPSHOT_LOCAL_CACHE.get_or_load(cache_key, builder)
 
 
 def _load_catalog_meta(
@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import sys
+import time
+from dataclasses import asdict
+from datetime import UTC, datetime
+
+try:
+    from redis import Redis
+    from redis.exceptions import RedisError
+except Exception:  # pragma: no cover - 依赖缺失时只返回本进程指标
+    Redis = None  # type: ignore[assignment]
+    RedisError = Exception  # type: ignore[misc, assignment]
+
+from app.core.config import settings
+from app.core.local_cache import list_local_caches, load_latency_bucket_labels
+from app.services import (
+    authz_cache_service,
+    authz_service,
+    login_ratelimit_service,
+    online_status_service,
+    session_service,
+    session_state_cache_service,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# ── 进程内缓存指标 ─────────────────────────────────────────────────────────────
+# 每个 worker 进程各自持有一份 LocalTTLCache 计数，定期把快照写入 Redis：
+#   • {prefix}:worker:{worker_id}  SETEX JSON 快照，worker 退出后按 TTL 自然消失
+#   • {prefix}:workers             ZSET 索引，score 为写入时间，读取时剔除过期成员
+# 管理端读取时先刷新本进程快照，再汇总所有仍存活的 worker。
+_CACHE_METRICS_REDIS_CLIENT: Redis | None = None
+_CACHE_METRICS_REDIS_INIT = False
+_CACHE_METRICS_REDIS_DISABLED_UNTIL = 0.0
+_CACHE_METRICS_REDIS_BACKOFF_SECONDS = 30.0
+
+# (组件名, 模块, 全局变量前缀)：读取各模块 _mark_*_redis_unavailable 维护的退避状态
+_REDIS_BACKOFF_COMPONENTS = (
+    ("authz_permission_cache", authz_service, "_AUTHZ_PERMISSION_REDIS"),
+    ("authz_cache_bus", authz_cache_service, "_AUTHZ_CACHE_BUS_REDIS"),
+    ("session", session_service, "_SESSION_REDIS"),
+    ("session_state_cache", session_state_cache_service, "_SESSION_STATE_REDIS"),
+    ("online_status", online_status_service, "_ONLINE_REDIS"),
+    ("login_ratelimit", login_ratelimit_service, "_LOGIN_RATELIMIT_REDIS"),
+)
+
+_SUMMED_FIELDS = (
+    "size",
+    "max_size",
+    "hits",
+    "misses",
+    "loads",
+    "load_waits",
+    "evictions",
+    "expirations",
+    "invalidations",
+    "tags",
+)
+
+
+def current_worker_id() -> str:
+    # fork 后 pid 变化，每次现取
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _workers_index_key() -> str:
+    return f"{settings.cache_metrics_key_prefix}:workers"
+
+
+def _worker_key(worker_id: str) -> str:
+    return f"{settings.cache_metrics_key_prefix}:worker:{worker_id}"
+
+
+def _get_cache_metrics_redis_client() -> Redis | None:
+    global _CACHE_METRICS_REDIS_CLIENT, _CACHE_METRICS_REDIS_INIT
+    if _CACHE_METRICS_REDIS_DISABLED_UNTIL > time.monotonic():
+        return None
+    if _CACHE_METRICS_REDIS_INIT:
+        return _CACHE_METRICS_REDIS_CLIENT
+    _CACHE_METRICS_REDIS_INIT = True
+    if Redis is None:
+        return None
+    try:
+        _CACHE_METRICS_REDIS_CLIENT = Redis(
+            host=settings.redis_host,
+            port=settings.redis_port,
+            db=settings.redis_db,
+            password=settings.redis_password or None,
+            ssl=settings.redis_ssl,
+            decode_responses=True,
+            socket_timeout=max(0.05, settings.redis_socket_timeout_seconds),
+            socket_connect_timeout=max(0.05, settings.redis_connect_timeout_seconds),
+        )
+        _CACHE_METRICS_REDIS_CLIENT.ping()
+    except Exception:
+        _mark_cache_metrics_redis_unavailable()
+    return _CACHE_METRICS_REDIS_CLIENT
+
+
+def _mark_cache_metrics_redis_unavailable() -> None:
+    global _CACHE_METRICS_REDIS_CLIENT, _CACHE_METRICS_REDIS_INIT
+    global _CACHE_METRICS_REDIS_DISABLED_UNTIL
+    logger.warning("[CACHE_METRICS] Redis 不可用，仅返回本进程缓存指标。", exc_info=True)
+    _CACHE_METRICS_REDIS_CLIENT = None
+    _CACHE_METRICS_REDIS_INIT = False
+    _CACHE_METRICS_REDIS_DISABLED_UNTIL = (
+        time.monotonic() + _CACHE_METRICS_REDIS_BACKOFF_SECONDS
+    )
+
+
+def collect_redis_backoff_state() -> list[dict[str, object]]:
+    now = time.monotonic()
+    components = [
+        *_REDIS_BACKOFF_COMPONENTS,
+        ("cache_metrics", sys.modules[__name__], "_CACHE_METRICS_REDIS"),
+    ]
+    result: list[dict[str, object]] = []
+    for component, module, prefix in components:
+        disabled_until = float(getattr(module, f"{prefix}_DISABLED_UNTIL", 0.0) or 0.0)
+        result.append(
+            {
+                "component": component,
+                "connected": getattr(module, f"{prefix}_CLIENT", None) is not None,
+                "backoff_remaining_seconds": round(max(0.0, disabled_until - now), 3),
+            }
+        )
+    return result
+
+
+def collect_worker_cache_metrics() -> dict[str, object]:
+    return {
+        "worker_id": current_worker_id(),
+        "collected_at": datetime.now(UTC).isoformat(),
+        "caches": [asdict(cache.snapshot()) for cache in list_local_caches()],
+        "redis_backoff": collect_redis_backoff_state(),
+    }
+
+
+def publish_worker_cache_metrics(payload: dict[str, object] | None = None) -> bool:
+    redis_client = _get_cache_metrics_redis_client()
+    if redis_client is None:
+        return False
+    payload = payload or collect_worker_cache_metrics()
+    worker_id = str(payload["worker_id"])
+    ttl_seconds = max(1, settings.cache_metrics_worker_ttl_seconds)
+    try:
+        pipeline = redis_client.pipeline(transaction=False)
+        pipeline.setex(_worker_key(worker_id), ttl_seconds, json.dumps(payload))
+        pipeline.zadd(_workers_index_key(), {worker_id: time.time()})
+        pipeline.execute()
+    except RedisError:
+        _mark_cache_metrics_redis_unavailable()
+        return False
+    return True
+
+
+def list_worker_cache_metrics() -> list[dict[str, object]] | None:
+    """读取所有存活 worker 的快照；Redis 不可用时返回 None"""
+    redis_client = _get_cache_metrics_redis_client()
+    if redis_client is None:
+        return None
+    stale_before = time.time() - max(1, settings.cache_metrics_worker_ttl_seconds)
+    try:
+        redis_client.zremrangebyscore(_workers_index_key(), "-inf", stale_before)
+        worker_ids = list(redis_client.zrange(_workers_index_key(), 0, -1))
+        payloads = (
+            redis_client.mget([_worker_key(worker_id) for worker_id in worker_ids])
+            if worker_ids
+            else []
+        )
+    except RedisError:
+        _mark_cache_metrics_redis_unavailable()
+        return None
+    workers: list[dict[str, object]] = []
+    for raw in payloads:
+        if not raw:
+            continue
+        try:
+            workers.append(json.loads(raw))
+        except (TypeError, ValueError):
+            continue
+    return sorted(workers, key=lambda item: str(item.get("worker_id", "")))
+
+
+def aggregate_cache_metrics(workers: list[dict[str, object]]) -> list[dict[str, object]]:
+    """按缓存名累加各 worker 的计数与直方图，命中率按累加后的计数重新计算"""
+    bucket_labels = load_latency_bucket_labels()
+    totals: dict[str, dict[str, object]] = {}
+    for worker in workers:
+        for cache in worker.get("caches", []):
+            name = str(cache["name"])
+            total = totals.setdefault(
+                name,
+                {
+                    "name": name,
+                    "default_ttl_seconds": cache.get("default_ttl_seconds", 0.0),
+                    "load_seconds_total": 0.0,
+                    "load_latency_histogram": {label: 0 for label in bucket_labels},
+                    **{field_name: 0 for field_name in _SUMMED_FIELDS},
+                },
+            )
+            for field_name in _SUMMED_FIELDS:
+                total[field_name] += int(cache.get(field_name, 0) or 0)
+            total["load_seconds_total"] += float(cache.get("load_seconds_total", 0.0) or 0.0)
+            histogram = total["load_latency_histogram"]
+            for label, count in (cache.get("load_latency_histogram") or {}).items():
+                histogram[label] = histogram.get(label, 0) + int(count)
+    for total in totals.values():
+        lookups = total["hits"] + total["misses"]
+        total["hit_ratio"] = round(total["hits"] / lookups, 4) if lookups else 0.0
+        total["load_seconds_total"] = round(total["load_seconds_total"], 6)
+    return [totals[name] for name in sorted(totals)]
+
+
+def get_cache_metrics_overview() -> dict[str, object]:
+    local_payload = collect_worker_cache_metrics()
+    workers: list[dict[str, object]] | None = None
+    if settings.cache_metrics_enabled and publish_worker_cache_metrics(local_payload):
+        workers = list_worker_cache_metrics()
+    aggregated = workers is not None
+    if not workers:
+        workers = [local_payload]
+    return {
+        "current_worker_id": local_payload["worker_id"],
+        "aggregated": aggregated,
+        "workers": workers,
+        "totals": aggregate_cache_metrics(workers),
+    }
+
+
+async def run_cache_metrics_publish_loop() -> None:
+    interval_seconds = max(settings.cache_metrics_publish_interval_seconds, 1.0)
+    logger.info("[CACHE_METRICS] 缓存指标上报循环已启动，间隔 %s 秒。", interval_seconds)
+    while True:
+        try:
+            await asyncio.to_thread(publish_worker_cache_metrics)
+        except Exception:
+            logger.exception("[CACHE_METRICS] 缓存指标上报失败")
+        await asyncio.sleep(interval_seconds)
+
+
+def _reset_cache_metrics_after_fork() -> None:
+    global _CACHE_METRICS_REDIS_CLIENT, _CACHE_METRICS_REDIS_INIT
+    _CACHE_METRICS_REDIS_CLIENT = None
+    _CACHE_METRICS_REDIS_INIT = False
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_cache_metrics_after_fork)
@@ -1,10 +1,10 @@
 from __future__ import annotations
 
 import base64
-import csv
 import io
 import json
 from datetime import UTC, datetime
+from collections.abc import Iterator
 from dataclasses import dataclass
 from math import ceil
 from sqlalchemy import and_, func, or_, select
@@ -46,6 +46,7 @@ from app.models.repair_cause import RepairCause
 from app.models.repair_defect_phenomenon import RepairDefectPhenomenon
 from app.models.repair_return_route import RepairReturnRoute
 from app.models.user import User
+from app.services.export_stream_service import encode_csv_base64, iter_paged
 from app.services.process_code_rule import (
     ensure_process_code_unique,
     get_stage_for_process_write,
@@ -3773,12 +3774,7 @@ def get_product_template_references(
 
 
 def _craft_csv_base64(headers: list[str], rows: list[list[object]]) -> str:
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(headers)
-    for row in rows:
-        writer.writerow(row)
-    return base64.b64encode(output.getvalue().encode("utf-8-sig")).decode("ascii")
+    return encode_csv_base64(headers, rows)
 
 
 def _craft_json_base64(payload: dict[str, object]) -> str:
@@ -3880,6 +3876,32 @@ def export_template_version_json(
     }
 
 
+STAGE_EXPORT_HEADERS = ["工段编码", "工段名称", "排序", "状态", "工序数量", "创建时间"]
+
+
+def _stage_export_row(row: ProcessStage) -> list[object]:
+    return [
+        row.code,
+        row.name,
+        row.sort_order,
+        "启用" if row.is_enabled else "停用",
+        len(row.processes) if row.processes else 0,
+        row.created_at.astimezone().strftime("%Y-%m-%d %H:%M:%S")
+        if row.created_at
+        else "",
+    ]
+
+
+def iter_stage_export_rows(db: Session, **filters: object) -> Iterator[list[object]]:
+    pages = iter_paged(
+        lambda page, page_size: list_stages(
+            db, page=page, page_size=page_size, **filters
+        )[1],
+    )
+    for row in pages:
+        yield _stage_export_row(row)
+
+
 def export_stages_csv(
     db: Session,
     *,
@@ -3889,24 +3911,8 @@ def export_stages_csv(
     _, rows = list_stages(
         db, page=1, page_size=200000, keyword=keyword, enabled=enabled
     )
-    csv_rows: list[list[object]] = []
-    for row in rows:
-        csv_rows.append(
-            [
-                row.code,
-                row.name,
-                row.sort_order,
-                "启用" if row.is_enabled else "停用",
-                len(row.processes) if row.processes else 0,
-                row.created_at.astimezone().strftime("%Y-%m-%d %H:%M:%S")
-                if row.created_at
-                else "",
-            ]
-        )
-    content_base64 = _craft_csv_base64(
-        ["工段编码", "工段名称", "排序", "状态", "工序数量", "创建时间"],
-        csv_rows,
-    )
+    csv_rows = [_stage_export_row(row) for row in rows]
+    content_base64 = _craft_csv_base64(STAGE_EXPORT_HEADERS, csv_rows)
     return {
         "file_name": "stages_export.csv",
         "mime_type": "text/csv",
@@ -3915,6 +3921,44 @@ def export_stages_csv(
     }
 
 
+PROCESS_EXPORT_HEADERS = [
+    "所属工段编码",
+    "所属工段名称",
+    "工序编码",
+    "工序名称",
+    "状态",
+    "创建时间",
+]
+
+
+def _process_export_row(row: Process) -> list[object]:
+    return [
+        row.stage.code if row.stage else "",
+        row.stage.name if row.stage else "",
+        row.code,
+        row.name,
+        "启用" if row.is_enabled else "停用",
+        row.created_at.astimezone().strftime("%Y-%m-%d %H:%M:%S")
+        if row.created_at
+        else "",
+    ]
+
+
+def count_process_export_rows(db: Session, **filters: object) -> int:
+    total, _ = list_craft_processes(db, page=1, page_size=1, **filters)
+    return total
+
+
+def iter_process_export_rows(db: Session, **filters: object) -> Iterator[list[object]]:
+    pages = iter_paged(
+        lambda page, page_size: list_craft_processes(
+            db, page=page, page_size=page_size, **filters
+        )[1],
+    )
+    for row in pages:
+        yield _process_export_row(row)
+
+
 def export_processes_csv(
     db: Session,
     *,
@@ -3930,24 +3974,8 @@ def export_processes_csv(
         stage_id=stage_id,
         enabled=enabled,
     )
-    csv_rows: list[list[object]] = []
-    for row in rows:
-        csv_rows.append(
-            [
-                row.stage.code if row.stage else "",
-                row.stage.name if row.stage else "",
-                row.code,
-                row.name,
-                "启用" if row.is_enabled else "停用",
-                row.created_at.astimezone().strftime("%Y-%m-%d %H:%M:%S")
-                if row.created_at
-                else "",
-            ]
-        )
-    content_base64 = _craft_csv_base64(
-        ["所属工段编码", "所属工段名称", "工序编码", "工序名称", "状态", "创建时间"],
-        csv_rows,
-    )
+    csv_rows = [_process_export_row(row) for row in rows]
+    content_base64 = _craft_csv_base64(PROCESS_EXPORT_HEADERS, csv_rows)
     return {
         "file_name": "processes_export.csv",
         "mime_type": "text/csv",
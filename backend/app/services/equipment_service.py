@@ -1,8 +1,6 @@
 from __future__ import annotations
 
-import base64
-import csv
-import io
+from collections.abc import Iterator
 from dataclasses import dataclass
 from datetime import UTC, date, datetime, time, timedelta
 from pathlib import PurePosixPath, PureWindowsPath
@@ -25,6 +23,12 @@ from app.models.role import Role
 from app.models.user import User
 from app.services.audit_service import write_audit_log
 from app.services.craft_service import is_valid_stage_code, list_enabled_stage_options
+from app.services.export_stream_service import encode_csv_base64, iter_paged
+from app.services.list_pagination_service import (
+    COUNT_MODE_EXACT,
+    KeysetOrder,
+    count_list_total,
+)
 
 WORK_ORDER_STATUS_PENDING = "pending"
 WORK_ORDER_STATUS_IN_PROGRESS = "in_progress"
@@ -1224,6 +1228,12 @@ def generate_due_work_orders_for_today(
     return len(plans), created_count, existing_count, failed_count, [], traces
 
 
+WORK_ORDER_LIST_KEYSET = KeysetOrder(
+    columns=((MaintenanceWorkOrder.due_date, True), (MaintenanceWorkOrder.id, True)),
+    row_values=lambda row: (row.due_date, row.id),
+)
+
+
 def list_work_orders(
     db: Session,
     *,
@@ -1242,7 +1252,10 @@ def list_work_orders(
     due_date_start: date | None = None,
     due_date_end: date | None = None,
     stage_code_filter: str | None = None,
+    cursor: str | None = None,
+    count_mode: str = COUNT_MODE_EXACT,
 ) -> tuple[int, list[MaintenanceWorkOrder]]:
+    """cursor 非空时按 (due_date, id) 游标取下一页，忽略 page"""
     refresh_overdue_work_orders(db)
 
     filters = []
@@ -1316,23 +1329,20 @@ def list_work_orders(
         )
     stmt = stmt.where(*filters)
 
-    total_stmt = select(func.count()).select_from(stmt.subquery())
-    total = db.execute(total_stmt).scalar_one()
+    total = count_list_total(db, stmt, count_mode=count_mode)
 
-    offset = (page - 1) * page_size
+    paged_stmt = WORK_ORDER_LIST_KEYSET.order_by(stmt)
+    if cursor:
+        paged_stmt = WORK_ORDER_LIST_KEYSET.after(paged_stmt, cursor)
+    else:
+        paged_stmt = paged_stmt.offset((page - 1) * page_size)
     rows = (
         db.execute(
-            stmt.options(
+            paged_stmt.options(
                 selectinload(MaintenanceWorkOrder.equipment),
                 selectinload(MaintenanceWorkOrder.item),
                 selectinload(MaintenanceWorkOrder.executor),
-            )
-            .order_by(
-                MaintenanceWorkOrder.due_date.desc(),
-                MaintenanceWorkOrder.id.desc(),
-            )
-            .offset(offset)
-            .limit(page_size)
+            ).limit(page_size)
         )
         .scalars()
         .all()
@@ -1561,18 +1571,53 @@ def cancel_work_order(
 
 
 def _build_csv_base64(headers: list[str], rows: list[list[Any]]) -> str:
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(headers)
-    for row in rows:
-        writer.writerow(row)
-    return base64.b64encode(output.getvalue().encode("utf-8-sig")).decode("ascii")
+    return encode_csv_base64(headers, rows)
 
 
 def _now_utc() -> datetime:
     return datetime.now(UTC)
 
 
+EQUIPMENT_LEDGER_EXPORT_HEADERS = [
+    "设备编号",
+    "设备名称",
+    "型号",
+    "位置",
+    "负责人",
+    "备注",
+    "状态",
+    "创建时间",
+]
+
+
+def _equipment_ledger_export_row(row: Equipment) -> list[Any]:
+    return [
+        row.code,
+        row.name,
+        row.model or "",
+        row.location or "",
+        row.owner_name or "",
+        row.remark or "",
+        "启用" if row.is_enabled else "停用",
+        row.created_at.astimezone().strftime("%Y-%m-%d %H:%M:%S"),
+    ]
+
+
+def count_equipment_ledger_export_rows(db: Session, **filters: Any) -> int:
+    total, _ = list_equipment(db, page=1, page_size=1, **filters)
+    return total
+
+
+def iter_equipment_ledger_export_rows(db: Session, **filters: Any) -> Iterator[list[Any]]:
+    pages = iter_paged(
+        lambda page, page_size: list_equipment(
+            db, page=page, page_size=page_size, **filters
+        )[1],
+    )
+    for row in pages:
+        yield _equipment_ledger_export_row(row)
+
+
 def export_equipment_ledger_csv(
     db: Session,
     *,
@@ -1590,23 +1635,9 @@ def export_equipment_ledger_csv(
         location_keyword=location_keyword,
         owner_name=owner_name,
     )
-    csv_rows: list[list[Any]] = []
-    for row in rows:
-        csv_rows.append(
-            [
-                row.code,
-                row.name,
-                row.model or "",
-                row.location or "",
-                row.owner_name or "",
-                row.remark or "",
-                "启用" if row.is_enabled else "停用",
-                row.created_at.astimezone().strftime("%Y-%m-%d %H:%M:%S"),
-            ]
-        )
     content_base64 = _build_csv_base64(
-        ["设备编号", "设备名称", "型号", "位置", "负责人", "备注", "状态", "创建时间"],
-        csv_rows,
+        EQUIPMENT_LEDGER_EXPORT_HEADERS,
+        [_equipment_ledger_export_row(row) for row in rows],
     )
     now = _now_utc()
     return {
@@ -1617,6 +1648,39 @@ def export_equipment_ledger_csv(
     }
 
 
+MAINTENANCE_ITEM_EXPORT_HEADERS = [
+    "项目名称",
+    "类别",
+    "默认周期(天)",
+    "默认时长(分钟)",
+    "标准描述",
+    "状态",
+]
+
+
+def _maintenance_item_export_row(row: MaintenanceItem) -> list[Any]:
+    return [
+        row.name,
+        row.category or "",
+        row.default_cycle_days,
+        row.default_duration_minutes or "",
+        row.standard_description or "",
+        "启用" if row.is_enabled else "停用",
+    ]
+
+
+def iter_maintenance_item_export_rows(
+    db: Session, **filters: Any
+) -> Iterator[list[Any]]:
+    pages = iter_paged(
+        lambda page, page_size: list_maintenance_items(
+            db, page=page, page_size=page_size, **filters
+        )[1],
+    )
+    for row in pages:
+        yield _maintenance_item_export_row(row)
+
+
 def export_maintenance_items_csv(
     db: Session,
     *,
@@ -1632,21 +1696,9 @@ def export_maintenance_items_csv(
         enabled=enabled,
         category=category,
     )
-    csv_rows: list[list[Any]] = []
-    for row in rows:
-        csv_rows.append(
-            [
-                row.name,
-                row.category or "",
-                row.default_cycle_days,
-                row.default_duration_minutes or "",
-                row.standard_description or "",
-                "启用" if row.is_enabled else "停用",
-            ]
-        )
     content_base64 = _build_csv_base64(
-        ["项目名称", "类别", "默认周期(天)", "默认时长(分钟)", "标准描述", "状态"],
-        csv_rows,
+        MAINTENANCE_ITEM_EXPORT_HEADERS,
+        [_maintenance_item_export_row(row) for row in rows],
     )
     now = _now_utc()
     return {
@@ -1657,6 +1709,49 @@ def export_maintenance_items_csv(
     }
 
 
+MAINTENANCE_PLAN_EXPORT_HEADERS = [
+    "设备",
+    "保养项目",
+    "执行工段",
+    "周期(天)",
+    "起始日期",
+    "下次到期",
+    "默认执行人",
+    "预计时长(分钟)",
+    "创建时间",
+    "更新时间",
+    "状态",
+]
+
+
+def _maintenance_plan_export_row(row: MaintenancePlan) -> list[Any]:
+    return [
+        row.equipment.name if row.equipment else "",
+        row.item.name if row.item else "",
+        row.execution_process_code or "",
+        row.cycle_days,
+        row.start_date.strftime("%Y-%m-%d"),
+        row.next_due_date.strftime("%Y-%m-%d"),
+        row.default_executor.username if row.default_executor else "",
+        row.estimated_duration_minutes or "",
+        row.created_at.astimezone().strftime("%Y-%m-%d %H:%M:%S"),
+        row.updated_at.astimezone().strftime("%Y-%m-%d %H:%M:%S"),
+        "启用" if row.is_enabled else "停用",
+    ]
+
+
+def iter_maintenance_plan_export_rows(
+    db: Session, **filters: Any
+) -> Iterator[list[Any]]:
+    pages = iter_paged(
+        lambda page, page_size: list_maintenance_plans(
+            db, page=page, page_size=page_size, **filters
+        )[1],
+    )
+    for row in pages:
+        yield _maintenance_plan_export_row(row)
+
+
 def export_maintenance_plans_csv(
     db: Session,
     *,
@@ -1676,38 +1771,9 @@ def export_maintenance_plans_csv(
         execution_process_code=execution_process_code,
         default_executor_user_id=default_executor_user_id,
     )
-    csv_rows: list[list[Any]] = []
-    for row in rows:
-        csv_rows.append(
-            [
-                row.equipment.name if row.equipment else "",
-                row.item.name if row.item else "",
-                row.execution_process_code or "",
-                row.cycle_days,
-                row.start_date.strftime("%Y-%m-%d"),
-                row.next_due_date.strftime("%Y-%m-%d"),
-                row.default_executor.username if row.default_executor else "",
-                row.estimated_duration_minutes or "",
-                row.created_at.astimezone().strftime("%Y-%m-%d %H:%M:%S"),
-                row.updated_at.astimezone().strftime("%Y-%m-%d %H:%M:%S"),
-                "启用" if row.is_enabled else "停用",
-            ]
-        )
     content_base64 = _build_csv_base64(
-        [
-            "设备",
-            "保养项目",
-            "执行工段",
-            "周期(天)",
-            "起始日期",
-            "下次到期",
-            "默认执行人",
-            "预计时长(分钟)",
-            "创建时间",
-            "更新时间",
-            "状态",
-        ],
-        csv_rows,
+        MAINTENANCE_PLAN_EXPORT_HEADERS,
+        [_maintenance_plan_export_row(row) for row in rows],
     )
     now = _now_utc()
     return {
@@ -1718,6 +1784,41 @@ def export_maintenance_plans_csv(
     }
 
 
+MAINTENANCE_RECORD_EXPORT_HEADERS = [
+    "设备",
+    "保养项目",
+    "到期日期",
+    "完成时间",
+    "执行人",
+    "结果摘要",
+    "备注",
+]
+
+
+def _maintenance_record_export_row(row: MaintenanceRecord) -> list[Any]:
+    return [
+        row.source_equipment_name or "",
+        row.source_item_name or "",
+        row.due_date.strftime("%Y-%m-%d"),
+        row.completed_at.astimezone().strftime("%Y-%m-%d %H:%M:%S"),
+        row.executor_username or "",
+        row.result_summary or "",
+        row.result_remark or "",
+    ]
+
+
+def iter_maintenance_record_export_rows(
+    db: Session, **filters: Any
+) -> Iterator[list[Any]]:
+    pages = iter_paged(
+        lambda page, page_size: list_maintenance_records(
+            db, page=page, page_size=page_size, **filters
+        )[1],
+    )
+    for row in pages:
+        yield _maintenance_record_export_row(row)
+
+
 def export_maintenance_records_csv(
     db: Session,
     *,
@@ -1743,22 +1844,9 @@ def export_maintenance_records_csv(
         start_date=start_date,
         end_date=end_date,
     )
-    csv_rows: list[list[Any]] = []
-    for row in rows:
-        csv_rows.append(
-            [
-                row.source_equipment_name or "",
-                row.source_item_name or "",
-                row.due_date.strftime("%Y-%m-%d"),
-                row.completed_at.astimezone().strftime("%Y-%m-%d %H:%M:%S"),
-                row.executor_username or "",
-                row.result_summary or "",
-                row.result_remark or "",
-            ]
-        )
     content_base64 = _build_csv_base64(
-        ["设备", "保养项目", "到期日期", "完成时间", "执行人", "结果摘要", "备注"],
-        csv_rows,
+        MAINTENANCE_RECORD_EXPORT_HEADERS,
+        [_maintenance_record_export_row(row) for row in rows],
     )
     now = _now_utc()
     return {
@@ -1777,6 +1865,94 @@ _WORK_ORDER_STATUS_LABELS = {
     "cancelled": "已取消",
 }
 
+WORK_ORDER_EXPORT_HEADERS = [
+    "工单编号",
+    "设备",
+    "保养项目",
+    "到期日期",
+    "状态",
+    "执行人",
+    "开始时间",
+    "完成时间",
+    "结果摘要",
+    "备注",
+]
+
+
+def _work_order_export_row(row: MaintenanceWorkOrder) -> list[Any]:
+    return [
+        row.id,
+        row.source_equipment_name or "",
+        row.source_item_name or "",
+        row.due_date.strftime("%Y-%m-%d"),
+        _WORK_ORDER_STATUS_LABELS.get(row.status, row.status),
+        row.executor.username if row.executor else "",
+        row.started_at.astimezone().strftime("%Y-%m-%d %H:%M")
+        if row.started_at
+        else "",
+        row.completed_at.astimezone().strftime("%Y-%m-%d %H:%M")
+        if row.completed_at
+        else "",
+        row.result_summary or "",
+        row.result_remark or "",
+    ]
+
+
+def _work_order_export_filters(
+    *,
+    status: str | None,
+    keyword: str | None,
+    due_date_start: date | None,
+    due_date_end: date | None,
+    stage_code: str | None,
+    current_user_role_codes: list[str],
+    current_user_stage_codes: list[str],
+) -> dict[str, Any]:
+    return {
+        "status": status,
+        "keyword": keyword,
+        "mine": False,
+        "current_user_id": None,
+        "current_user_role_codes": current_user_role_codes,
+        "current_user_stage_codes": current_user_stage_codes,
+        "done_only": False,
+        "executor_user_id": None,
+        "start_date": None,
+        "end_date": None,
+        "due_date_start": due_date_start,
+        "due_date_end": due_date_end,
+        "stage_code_filter": stage_code,
+    }
+
+
+def iter_work_order_export_rows(
+    db: Session,
+    *,
+    status: str | None = None,
+    keyword: str | None = None,
+    due_date_start: date | None = None,
+    due_date_end: date | None = None,
+    stage_code: str | None = None,
+    current_user_role_codes: list[str],
+    current_user_stage_codes: list[str],
+) -> Iterator[list[Any]]:
+    filters = _work_order_export_filters(
+        status=status,
+        keyword=keyword,
+        due_date_start=due_date_start,
+        due_date_end=due_date_end,
+        stage_code=stage_code,
+        current_user_role_codes=current_user_role_codes,
+        current_user_stage_codes=current_user_stage_codes,
+    )
+    pages = iter_paged(
+        lambda page, page_size: list_work_orders(
+            db, page=page, page_size=page_size, **filters
+        )[1],
+    )
+    for row in pages:
+        yield _work_order_export_row(row)
+
 
 def export_work_orders_csv(
     db: Session,
@@ -1793,54 +1969,19 @@ def export_work_orders_csv(
         db,
         page=1,
         page_size=200000,
-        status=status,
-        keyword=keyword,
-        mine=False,
-        current_user_id=None,
-        current_user_role_codes=current_user_role_codes,
-        current_user_stage_codes=current_user_stage_codes,
-        done_only=False,
-        executor_user_id=None,
-        start_date=None,
-        end_date=None,
-        due_date_start=due_date_start,
-        due_date_end=due_date_end,
-        stage_code_filter=stage_code,
+        **_work_order_export_filters(
+            status=status,
+            keyword=keyword,
+            due_date_start=due_date_start,
+            due_date_end=due_date_end,
+            stage_code=stage_code,
+            current_user_role_codes=current_user_role_codes,
+            current_user_stage_codes=current_user_stage_codes,
+        ),
     )
-    csv_rows: list[list[Any]] = []
-    for row in rows:
-        csv_rows.append(
-            [
-                row.id,
-                row.source_equipment_name or "",
-                row.source_item_name or "",
-                row.due_date.strftime("%Y-%m-%d"),
-                _WORK_ORDER_STATUS_LABELS.get(row.status, row.status),
-                row.executor.username if row.executor else "",
-                row.started_at.astimezone().strftime("%Y-%m-%d %H:%M")
-                if row.started_at
-                else "",
-                row.completed_at.astimezone().strftime("%Y-%m-%d %H:%M")
-                if row.completed_at
-                else "",
-                row.result_summary or "",
-                row.result_remark or "",
-            ]
-        )
     content_base64 = _build_csv_base64(
-        [
-            "工单编号",
-            "设备",
-            "保养项目",
-            "到期日期",
-            "状态",
-            "执行人",
-            "开始时间",
-            "完成时间",
-            "结果摘要",
-            "备注",
-        ],
-        csv_rows,
+        WORK_ORDER_EXPORT_HEADERS,
+        [_work_order_export_row(row) for row in rows],
     )
     now = _now_utc()
     return {
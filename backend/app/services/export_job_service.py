@@ -0,0 +1,630 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+from time import monotonic
+from typing import Any
+from uuid import uuid4
+
+from pydantic import BaseModel
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.core.authz_catalog import (
+    PERM_PROD_DATA_MANUAL_EXPORT,
+    PERM_PROD_ORDERS_EXPORT,
+    PERM_PROD_REPAIR_ORDERS_EXPORT,
+    PERM_PROD_SCRAP_STATISTICS_EXPORT,
+)
+from app.core.config import settings
+from app.db.session import SessionLocal, open_read_session
+from app.models.export_job import ExportJob
+from app.models.user import User
+from app.schemas.craft import CraftProcessExportRequest
+from app.schemas.equipment import EquipmentLedgerExportRequest
+from app.schemas.production import (
+    OrdersExportRequest,
+    ProductionDataManualExportRequest,
+    RepairOrdersExportRequest,
+    ScrapStatisticsExportRequest,
+)
+from app.schemas.quality import FirstArticleExportRequest
+from app.services.audit_service import write_audit_log
+from app.services.craft_service import (
+    PROCESS_EXPORT_HEADERS,
+    count_process_export_rows,
+    iter_process_export_rows,
+)
+from app.services.equipment_service import (
+    EQUIPMENT_LEDGER_EXPORT_HEADERS,
+    count_equipment_ledger_export_rows,
+    iter_equipment_ledger_export_rows,
+)
+from app.services.export_stream_service import (
+    EXPORT_MIME_TYPES,
+    ExportRow,
+    build_export_file_name,
+    normalize_export_format,
+    write_export_file,
+)
+from app.services.production_data_query_service import (
+    MANUAL_EXPORT_HEADERS,
+    ManualExportRows,
+    build_manual_filters,
+    count_manual_export_rows,
+    record_manual_export,
+)
+from app.services.production_order_service import (
+    ORDER_EXPORT_HEADERS,
+    count_order_export_rows,
+    iter_order_export_rows,
+)
+from app.services.production_repair_service import (
+    REPAIR_ORDER_EXPORT_HEADERS,
+    SCRAP_STATISTICS_EXPORT_HEADERS,
+    RepairListFilters,
+    RepairOrderExportRows,
+    ScrapStatisticsFilters,
+    count_scrap_statistics_export_rows,
+    iter_scrap_statistics_export_rows,
+    record_repair_orders_export,
+)
+from app.services.quality_service import (
+    FIRST_ARTICLE_EXPORT_HEADERS,
+    count_first_article_export_rows,
+    iter_first_article_export_rows,
+)
+
+
+logger = logging.getLogger(__name__)
+
+EXPORT_JOB_STATUS_PENDING = "pending"
+EXPORT_JOB_STATUS_PROCESSING = "processing"
+EXPORT_JOB_STATUS_SUCCEEDED = "succeeded"
+EXPORT_JOB_STATUS_FAILED = "failed"
+EXPORT_JOB_STATUS_CANCELLED = "cancelled"
+EXPORT_JOB_STATUS_EXPIRED = "expired"
+EXPORT_JOB_LIST_LIMIT = 20
+EXPORT_JOB_PROGRESS_REPORT_ROWS = 1000
+EXPORT_JOB_CLEANUP_INTERVAL_SECONDS = 300
+EXPORT_JOB_CLEANUP_BATCH_SIZE = 200
+RUNTIME_EXPORT_DIR = (
+    Path(__file__).resolve().parents[2] / "runtime_exports" / "jobs"
+)
+
+
+class ExportJobCancelled(Exception):
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class ExportJobHandler:
+    job_type: str
+    label: str
+    permission_code: str
+    params_model: type[BaseModel]
+    headers: Sequence[str]
+    file_prefix: str
+    sheet_title: str
+    iter_rows: Callable[[Session, Any, User], Iterable[ExportRow]]
+    count_rows: Callable[[Session, Any, User], int] | None = None
+    # 文件写完后在主库会话上执行（如记导出日志），收到 iter_rows 返回的同一对象；
+    # iter_rows 可能挂在只读副本上，只读不写
+    after_write: Callable[[Session, Any, User, Iterable[ExportRow]], None] | None = None
+
+
+def _now_utc() -> datetime:
+    return datetime.now(UTC)
+
+
+def ensure_export_job_runtime_dir() -> Path:
+    RUNTIME_EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    return RUNTIME_EXPORT_DIR
+
+
+def _manual_filters(params: ProductionDataManualExportRequest):
+    return build_manual_filters(**params.model_dump())
+
+
+def _scrap_filters(params: ScrapStatisticsExportRequest) -> ScrapStatisticsFilters:
+    return ScrapStatisticsFilters(**params.model_dump())
+
+
+def _first_article_filters(params: FirstArticleExportRequest) -> dict[str, Any]:
+    resolved_start_date = (
+        params.start_date or params.query_date or params.end_date or date.today()
+    )
+    return {
+        "start_date": resolved_start_date,
+        "end_date": params.end_date or params.query_date or resolved_start_date,
+        "query_date": params.query_date,
+        "keyword": params.keyword,
+        "result_filter": params.result,
+        "product_name": params.product_name,
+        "process_code": params.process_code,
+        "operator_username": params.operator_username,
+    }
+
+
+_EXPORT_JOB_HANDLERS: dict[str, ExportJobHandler] = {
+    handler.job_type: handler
+    for handler in (
+        ExportJobHandler(
+            job_type="production_orders",
+            label="生产订单",
+            permission_code=PERM_PROD_ORDERS_EXPORT,
+            params_model=OrdersExportRequest,
+            headers=ORDER_EXPORT_HEADERS,
+            file_prefix="orders",
+            sheet_title="生产订单",
+            iter_rows=lambda db, params, _: iter_order_export_rows(
+                db, **params.model_dump()
+            ),
+            count_rows=lambda db, params, _: count_order_export_rows(
+                db, **params.model_dump()
+            ),
+        ),
+        ExportJobHandler(
+            job_type="production_manual",
+            label="生产数据（手动筛选）",
+            permission_code=PERM_PROD_DATA_MANUAL_EXPORT,
+            params_model=ProductionDataManualExportRequest,
+            headers=MANUAL_EXPORT_HEADERS,
+            file_prefix="production_manual",
+            sheet_title="生产数据",
+            iter_rows=lambda db, params, _: ManualExportRows(
+                db, filters=_manual_filters(params)
+            ),
+            count_rows=lambda db, params, _: count_manual_export_rows(
+                db, filters=_manual_filters(params)
+            ),
+            after_write=lambda db, _, operator, rows: record_manual_export(
+                db, operator=operator, rows=rows
+            ),
+        ),
+        ExportJobHandler(
+            job_type="production_scrap_statistics",
+            label="报废统计",
+            permission_code=PERM_PROD_SCRAP_STATISTICS_EXPORT,
+            params_model=ScrapStatisticsExportRequest,
+            headers=SCRAP_STATISTICS_EXPORT_HEADERS,
+            file_prefix="production_scrap_statistics",
+            sheet_title="报废统计",
+            iter_rows=lambda db, params, _: iter_scrap_statistics_export_rows(
+                db, filters=_scrap_filters(params)
+            ),
+            count_rows=lambda db, params, _: count_scrap_statistics_export_rows(
+                db, filters=_scrap_filters(params)
+            ),
+        ),
+        ExportJobHandler(
+            job_type="production_repair_orders",
+            label="维修订单",
+            permission_code=PERM_PROD_REPAIR_ORDERS_EXPORT,
+            params_model=RepairOrdersExportRequest,
+            headers=REPAIR_ORDER_EXPORT_HEADERS,
+            file_prefix="repair_orders",
+            sheet_title="维修订单",
+            iter_rows=lambda db, params, _: RepairOrderExportRows(
+                db, filters=RepairListFilters(**params.model_dump())
+            ),
+            after_write=lambda db, _, operator, rows: record_repair_orders_export(
+                db, operator=operator, rows=rows
+            ),
+        ),
+        ExportJobHandler(
+            job_type="quality_first_articles",
+            label="首件记录",
+            permission_code="quality.first_articles.export",
+            params_model=FirstArticleExportRequest,
+            headers=FIRST_ARTICLE_EXPORT_HEADERS,
+            file_prefix="first_articles",
+            sheet_title="首件记录",
+            iter_rows=lambda db, params, _: iter_first_article_export_rows(
+                db, **_first_article_filters(params)
+            ),
+            count_rows=lambda db, params, _: count_first_article_export_rows(
+                db, **_first_article_filters(params)
+            ),
+        ),
+        ExportJobHandler(
+            job_type="equipment_ledger",
+            label="设备台账",
+            permission_code="equipment.ledger.list",
+            params_model=EquipmentLedgerExportRequest,
+            headers=EQUIPMENT_LEDGER_EXPORT_HEADERS,
+            file_prefix="equipment_ledger",
+            sheet_title="设备台账",
+            iter_rows=lambda db, params, _: iter_equipment_ledger_export_rows(
+                db, **params.model_dump()
+            ),
+            count_rows=lambda db, params, _: count_equipment_ledger_export_rows(
+                db, **params.model_dump()
+            ),
+        ),
+        ExportJobHandler(
+            job_type="craft_processes",
+            label="工序",
+            permission_code="craft.processes.list",
+            params_model=CraftProcessExportRequest,
+            headers=PROCESS_EXPORT_HEADERS,
+            file_prefix="processes",
+            sheet_title="工序",
+            iter_rows=lambda db, params, _: iter_process_export_rows(
+                db, **params.model_dump()
+            ),
+            count_rows=lambda db, params, _: count_process_export_rows(
+                db, **params.model_dump()
+            ),
+        ),
+    )
+}
+
+
+def list_export_job_handlers() -> list[ExportJobHandler]:
+    return list(_EXPORT_JOB_HANDLERS.values())
+
+
+def get_export_job_handler(job_type: str) -> ExportJobHandler:
+    handler = _EXPORT_JOB_HANDLERS.get((job_type or "").strip())
+    if handler is None:
+        raise ValueError(f"Unsupported export job type: {job_type}")
+    return handler
+
+
+def create_export_job(
+    db: Session,
+    *,
+    created_by_user_id: int,
+    job_type: str,
+    format: str,
+    params: dict[str, Any],
+) -> ExportJob:
+    handler = get_export_job_handler(job_type)
+    normalized_params = handler.params_model.model_validate(params or {})
+    job = ExportJob(
+        job_code=uuid4().hex,
+        job_type=handler.job_type,
+        created_by_user_id=created_by_user_id,
+        status=EXPORT_JOB_STATUS_PENDING,
+        format=normalize_export_format(format),
+        params=normalized_params.model_dump(mode="json"),
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def list_export_jobs(
+    db: Session,
+    *,
+    created_by_user_id: int,
+    job_type: str | None = None,
+    limit: int = EXPORT_JOB_LIST_LIMIT,
+) -> list[ExportJob]:
+    stmt = select(ExportJob).where(ExportJob.created_by_user_id == created_by_user_id)
+    if job_type:
+        stmt = stmt.where(ExportJob.job_type == job_type)
+    stmt = stmt.order_by(ExportJob.requested_at.desc(), ExportJob.id.desc()).limit(limit)
+    return db.execute(stmt).scalars().all()
+
+
+def get_export_job(
+    db: Session,
+    *,
+    job_id: int,
+    created_by_user_id: int,
+) -> ExportJob | None:
+    stmt = select(ExportJob).where(
+        ExportJob.id == job_id,
+        ExportJob.created_by_user_id == created_by_user_id,
+    )
+    return db.execute(stmt).scalars().first()
+
+
+def cancel_export_job(db: Session, *, job: ExportJob) -> ExportJob:
+    """排队中的任务直接取消；执行中的任务只打标记，由 worker 在下一个进度点停下"""
+    if job.status == EXPORT_JOB_STATUS_PENDING:
+        job.status = EXPORT_JOB_STATUS_CANCELLED
+        job.cancel_requested = True
+        job.finished_at = _now_utc()
+    elif job.status == EXPORT_JOB_STATUS_PROCESSING:
+        job.cancel_requested = True
+    else:
+        raise ValueError("导出任务已结束，无法取消")
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def claim_next_export_job(db: Session) -> int | None:
+    """SKIP LOCKED 领取最早的 pending 任务，多个 worker 并发领取互不阻塞"""
+    now = _now_utc()
+    next_job_id = (
+        select(ExportJob.id)
+        .where(ExportJob.status == EXPORT_JOB_STATUS_PENDING)
+        .order_by(ExportJob.requested_at.asc(), ExportJob.id.asc())
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(ExportJob)
+        .where(ExportJob.id == next_job_id)
+        .values(
+            status=EXPORT_JOB_STATUS_PROCESSING,
+            started_at=now,
+            heartbeat_at=now,
+            progress_percent=0,
+            record_count=0,
+        )
+        .returning(ExportJob.id)
+    )
+    job_id = db.execute(stmt).scalar_one_or_none()
+    db.commit()
+    return int(job_id) if job_id is not None else None
+
+
+def _progress_percent(record_count: int, total_count: int | None) -> int:
+    if not total_count:
+        return 0
+    # 写文件收尾前最多报到 99%，100% 只在任务成功后给出
+    return min(99, record_count * 100 // total_count)
+
+
+def _update_export_job(job_id: int, **values: Any) -> bool:
+    """进度与状态用独立会话短事务写入，不打断导出会话上的服务端游标；返回是否已请求取消"""
+    db = SessionLocal()
+    try:
+        cancel_requested = db.execute(
+            update(ExportJob)
+            .where(ExportJob.id == job_id)
+            .values(**values)
+            .returning(ExportJob.cancel_requested)
+        ).scalar_one_or_none()
+        db.commit()
+        return bool(cancel_requested)
+    finally:
+        db.close()
+
+
+class _ExportJobProgress:
+    """包装行生成器：累计行数，每 report_every 行上报一次进度并检查取消标记"""
+
+    def __init__(
+        self,
+        *,
+        job_id: int,
+        total_count: int | None,
+        report_every: int | None = None,
+    ) -> None:
+        self.job_id = job_id
+        self.total_count = total_count
+        self.report_every = report_every or EXPORT_JOB_PROGRESS_REPORT_ROWS
+        self.record_count = 0
+
+    def wrap(self, rows: Iterable[ExportRow]) -> Iterator[ExportRow]:
+        for row in rows:
+            yield row
+            self.record_count += 1
+            if self.record_count % self.report_every == 0:
+                cancel_requested = _update_export_job(
+                    self.job_id,
+                    record_count=self.record_count,
+                    progress_percent=_progress_percent(
+                        self.record_count, self.total_count
+                    ),
+                    heartbeat_at=_now_utc(),
+                )
+                if cancel_requested:
+                    raise ExportJobCancelled()
+
+
+def _write_export_job_audit(
+    db: Session,
+    *,
+    job: ExportJob,
+    action_code: str,
+    action_name: str,
+    after_data: dict[str, object],
+) -> None:
+    operator = db.get(User, job.created_by_user_id)
+    if operator is None:
+        return
+    write_audit_log(
+        db,
+        action_code=action_code,
+        action_name=action_name,
+        target_type="export_job",
+        target_id=str(job.id),
+        target_name=job.file_name or job.job_code,
+        operator=operator,
+        after_data=after_data,
+    )
+    db.commit()
+
+
+def run_export_job(job_id: int) -> None:
+    db = SessionLocal()
+    # 导出数据读取走只读副本（未配置或延迟超限时为 None，回退主库）；任务状态仍写主库
+    read_db = open_read_session()
+    try:
+        job = db.get(ExportJob, job_id)
+        if job is None:
+            return
+        handler = get_export_job_handler(job.job_type)
+        operator = db.get(User, job.created_by_user_id)
+        if operator is None:
+            raise RuntimeError("导出任务创建人不存在")
+        params = handler.params_model.model_validate(job.params or {})
+        source_db = read_db or db
+        total_count = (
+            handler.count_rows(source_db, params, operator)
+            if handler.count_rows is not None
+            else None
+        )
+        if _update_export_job(job_id, total_count=total_count, heartbeat_at=_now_utc()):
+            raise ExportJobCancelled()
+
+        file_name = build_export_file_name(handler.file_prefix, format=job.format)
+        file_path = ensure_export_job_runtime_dir() / f"{job.job_code}_{file_name}"
+        progress = _ExportJobProgress(job_id=job_id, total_count=total_count)
+        rows = handler.iter_rows(source_db, params, operator)
+        write_export_file(
+            file_path,
+            handler.headers,
+            progress.wrap(rows),
+            format=job.format,
+            sheet_title=handler.sheet_title,
+        )
+        if handler.after_write is not None:
+            handler.after_write(db, params, operator, rows)
+        db.commit()
+
+        finished_at = _now_utc()
+        _update_export_job(
+            job_id,
+            status=EXPORT_JOB_STATUS_SUCCEEDED,
+            record_count=progress.record_count,
+            progress_percent=100,
+            file_name=file_name,
+            mime_type=EXPORT_MIME_TYPES[job.format],
+            storage_path=str(file_path.resolve()),
+            finished_at=finished_at,
+            heartbeat_at=finished_at,
+            expires_at=finished_at + timedelta(days=settings.export_job_retention_days),
+        )
+        db.refresh(job)
+        _write_export_job_audit(
+            db,
+            job=job,
+            action_code="export_job.complete",
+            action_name="导出任务完成",
+            after_data={
+                "job_type": job.job_type,
+                "status": job.status,
+                "record_count": job.record_count,
+                "file_name": job.file_name,
+            },
+        )
+    except ExportJobCancelled:
+        db.rollback()
+        _update_export_job(
+            job_id,
+            status=EXPORT_JOB_STATUS_CANCELLED,
+            finished_at=_now_utc(),
+        )
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("[EXPORT_JOB] 导出任务 %s 执行失败", job_id)
+        db.rollback()
+        _update_export_job(
+            job_id,
+            status=EXPORT_JOB_STATUS_FAILED,
+            failure_reason=str(exc),
+            finished_at=_now_utc(),
+        )
+        job = db.get(ExportJob, job_id)
+        if job is not None:
+            _write_export_job_audit(
+                db,
+                job=job,
+                action_code="export_job.fail",
+                action_name="导出任务失败",
+                after_data={
+                    "job_type": job.job_type,
+                    "status": job.status,
+                    "failure_reason": job.failure_reason,
+                },
+            )
+    finally:
+        if read_db is not None:
+            read_db.close()
+        db.close()
+
+
+def run_next_export_job() -> bool:
+    db = SessionLocal()
+    try:
+        job_id = claim_next_export_job(db)
+    finally:
+        db.close()
+    if job_id is None:
+        return False
+    run_export_job(job_id)
+    return True
+
+
+def cleanup_export_jobs(db: Session, *, now: datetime | None = None) -> dict[str, int]:
+    """按 (status, 时间) 索引只扫描需要处理的行：心跳超时的任务判失败，过期文件删除"""
+    current = now or _now_utc()
+    heartbeat_deadline = current - timedelta(
+        seconds=max(settings.export_job_heartbeat_timeout_seconds, 60)
+    )
+    interrupted = db.execute(
+        update(ExportJob)
+        .where(
+            ExportJob.status == EXPORT_JOB_STATUS_PROCESSING,
+            ExportJob.heartbeat_at < heartbeat_deadline,
+        )
+        .values(
+            status=EXPORT_JOB_STATUS_FAILED,
+            failure_reason="任务执行中断，请重新导出",
+            finished_at=current,
+        )
+    ).rowcount
+
+    expired_rows = db.execute(
+        select(ExportJob.id, ExportJob.storage_path)
+        .where(
+            ExportJob.status == EXPORT_JOB_STATUS_SUCCEEDED,
+            ExportJob.expires_at <= current,
+        )
+        .limit(EXPORT_JOB_CLEANUP_BATCH_SIZE)
+    ).all()
+    for _, storage_path in expired_rows:
+        if storage_path:
+            Path(storage_path).unlink(missing_ok=True)
+    if expired_rows:
+        db.execute(
+            update(ExportJob)
+            .where(ExportJob.id.in_([int(row_id) for row_id, _ in expired_rows]))
+            .values(status=EXPORT_JOB_STATUS_EXPIRED)
+        )
+    db.commit()
+    return {"interrupted": int(interrupted or 0), "expired": len(expired_rows)}
+
+
+def _run_export_job_cleanup_once() -> dict[str, int]:
+    db = SessionLocal()
+    try:
+        return cleanup_export_jobs(db)
+    finally:
+        db.close()
+
+
+async def run_export_job_worker_loop(*, worker_index: int = 0) -> None:
+    poll_seconds = max(settings.export_job_poll_interval_seconds, 1)
+    logger.info(
+        "[EXPORT_JOB] 导出任务 worker #%s 已启动，空闲轮询间隔 %s 秒。",
+        worker_index,
+        poll_seconds,
+    )
+    next_cleanup_at = 0.0
+    while True:
+        processed = False
+        try:
+            if worker_index == 0 and monotonic() >= next_cleanup_at:
+                stats = await asyncio.to_thread(_run_export_job_cleanup_once)
+                next_cleanup_at = monotonic() + EXPORT_JOB_CLEANUP_INTERVAL_SECONDS
+                if any(value > 0 for value in stats.values()):
+                    logger.info("[EXPORT_JOB] 清理完成：%s", stats)
+            processed = await asyncio.to_thread(run_next_export_job)
+        except Exception:
+            logger.exception("[EXPORT_JOB] 导出任务 worker 循环执行失败")
+        if not processed:
+            await asyncio.sleep(poll_seconds)
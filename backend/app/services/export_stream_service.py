@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import base64
+import csv
+import io
+import os
+import tempfile
+import urllib.parse
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from datetime import datetime
+from pathlib import Path
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, func, select
+from sqlalchemy.orm import Session
+
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMAT_XLSX = "xlsx"
+EXPORT_FORMATS = {EXPORT_FORMAT_CSV, EXPORT_FORMAT_XLSX}
+EXPORT_MIME_TYPES = {
+    EXPORT_FORMAT_CSV: "text/csv",
+    EXPORT_FORMAT_XLSX: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+EXPORT_CHUNK_BYTES = 64 * 1024
+EXPORT_YIELD_PER = 1000
+# xlsx 为 zip 结构无法边写边发：先写入临时文件（小文件留在内存），再分块读出
+_XLSX_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+ExportRow = Sequence[object]
+
+
+def normalize_export_format(value: str | None) -> str:
+    normalized = (value or EXPORT_FORMAT_CSV).strip().lower()
+    if normalized == "excel":
+        normalized = EXPORT_FORMAT_XLSX
+    if normalized not in EXPORT_FORMATS:
+        raise ValueError(f"Invalid export format: {value}")
+    return normalized
+
+
+def build_export_file_name(prefix: str, *, format: str, now: datetime | None = None) -> str:
+    timestamp = (now or datetime.now()).strftime("%Y%m%d_%H%M%S")
+    return f"{prefix}_{timestamp}.{format}"
+
+
+def iter_scalars(
+    db: Session,
+    stmt: Select,
+    *,
+    batch_size: int = EXPORT_YIELD_PER,
+) -> Iterator[object]:
+    """服务端游标分批读取 ORM 对象，内存只保留一批（selectinload 按批加载关联）"""
+    result = db.execute(stmt.execution_options(yield_per=batch_size))
+    for row in result.scalars():
+        yield row
+
+
+def iter_rows(
+    db: Session,
+    stmt: Select,
+    *,
+    batch_size: int = EXPORT_YIELD_PER,
+) -> Iterator[object]:
+    """服务端游标分批读取 Core 行（聚合查询等非 ORM 实体结果）"""
+    result = db.execute(stmt.execution_options(yield_per=batch_size))
+    for row in result:
+        yield row
+
+
+def count_statement_rows(db: Session, stmt: Select) -> int:
+    """导出前预估总行数（用于进度百分比），去掉排序后包一层 count"""
+    count_stmt = select(func.count()).select_from(stmt.order_by(None).subquery())
+    return int(db.execute(count_stmt).scalar_one() or 0)
+
+
+def iter_paged(
+    fetch_page: Callable[[int, int], Sequence[object]],
+    *,
+    page_size: int = EXPORT_YIELD_PER,
+) -> Iterator[object]:
+    """按页拉取只提供分页列表接口的数据源，直到某页不满为止"""
+    page = 1
+    while True:
+        items = fetch_page(page, page_size)
+        yield from items
+        if len(items) < page_size:
+            return
+        page += 1
+
+
+def iter_csv_bytes(
+    headers: Sequence[str],
+    rows: Iterable[ExportRow],
+    *,
+    chunk_bytes: int = EXPORT_CHUNK_BYTES,
+) -> Iterator[bytes]:
+    """带 UTF-8 BOM 的 CSV 分块编码，缓冲区到达 chunk_bytes 即交出"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")
+    writer.writerow(headers)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= chunk_bytes:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate(0)
+    tail = buffer.getvalue()
+    if tail:
+        yield tail.encode("utf-8")
+
+
+def iter_xlsx_bytes(
+    headers: Sequence[str],
+    rows: Iterable[ExportRow],
+    *,
+    sheet_title: str = "导出数据",
+    chunk_bytes: int = EXPORT_CHUNK_BYTES,
+) -> Iterator[bytes]:
+    """openpyxl 只写模式逐行落盘，内存占用与行数无关"""
+    try:
+        import openpyxl
+    except ImportError as exc:
+        raise RuntimeError("Excel 导出不可用：缺少 openpyxl") from exc
+
+    workbook = openpyxl.Workbook(write_only=True)
+    worksheet = workbook.create_sheet(title=sheet_title[:31] or "Sheet1")
+    worksheet.append(list(headers))
+    for row in rows:
+        worksheet.append(list(row))
+    with tempfile.SpooledTemporaryFile(max_size=_XLSX_SPOOL_MAX_BYTES) as spool:
+        workbook.save(spool)
+        spool.seek(0)
+        while True:
+            chunk = spool.read(chunk_bytes)
+            if not chunk:
+                break
+            yield chunk
+
+
+def iter_export_bytes(
+    headers: Sequence[str],
+    rows: Iterable[ExportRow],
+    *,
+    format: str,
+    sheet_title: str = "导出数据",
+) -> Iterator[bytes]:
+    if format == EXPORT_FORMAT_XLSX:
+        return iter_xlsx_bytes(headers, rows, sheet_title=sheet_title)
+    return iter_csv_bytes(headers, rows)
+
+
+def write_export_file(
+    file_path: Path,
+    headers: Sequence[str],
+    rows: Iterable[ExportRow],
+    *,
+    format: str,
+    sheet_title: str = "导出数据",
+) -> None:
+    """边生成边写入 .part 临时文件，成功后原子替换，中途失败不留半截文件"""
+    part_path = file_path.with_name(f"{file_path.name}.part")
+    try:
+        with part_path.open("wb") as handle:
+            for chunk in iter_export_bytes(
+                headers, rows, format=format, sheet_title=sheet_title
+            ):
+                handle.write(chunk)
+        os.replace(part_path, file_path)
+    except BaseException:
+        part_path.unlink(missing_ok=True)
+        raise
+
+
+def iter_file_bytes(
+    file_path: Path,
+    *,
+    chunk_bytes: int = EXPORT_CHUNK_BYTES,
+) -> Iterator[bytes]:
+    with file_path.open("rb") as handle:
+        while True:
+            chunk = handle.read(chunk_bytes)
+            if not chunk:
+                return
+            yield chunk
+
+
+def encode_csv_base64(headers: Sequence[str], rows: Iterable[ExportRow]) -> str:
+    """兼容旧的 JSON 包装导出：与流式下载共用同一套 CSV 编码"""
+    return base64.b64encode(b"".join(iter_csv_bytes(headers, rows))).decode("ascii")
+
+
+def build_content_disposition(file_name: str) -> str:
+    ascii_name = file_name.encode("ascii", "ignore").decode().strip() or "export"
+    quoted_name = urllib.parse.quote(file_name)
+    return f"attachment; filename=\"{ascii_name}\"; filename*=UTF-8''{quoted_name}"
+
+
+def build_streaming_export_response(
+    *,
+    file_name: str,
+    headers: Sequence[str],
+    rows: Iterable[ExportRow],
+    format: str,
+    sheet_title: str = "导出数据",
+) -> StreamingResponse:
+    """把行生成器包装成分块下载响应；同步生成器由 Starlette 在线程池中迭代"""
+    media_type = EXPORT_MIME_TYPES[format]
+    return StreamingResponse(
+        iter_export_bytes(headers, rows, format=format, sheet_title=sheet_title),
+        media_type=media_type,
+        headers={"Content-Disposition": build_content_disposition(file_name)},
+    )
@@ -2,11 +2,10 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import UTC, datetime
-from threading import Event, RLock
-import time
 
 from sqlalchemy.orm import Session
 
+from app.core.local_cache import LocalTTLCache
 from app.models.user import User
 from app.schemas.home_dashboard import (
     HomeDashboardDegradedBlock,
@@ -50,10 +49,13 @@ _CATEGORY_LABELS = {
 }
 
 _HOME_DASHBOARD_CACHE_TTL_SECONDS = 5
-_HOME_DASHBOARD_LOCAL_CACHE: dict[str, tuple[float, HomeDashboardResult]] = {}
-_HOME_DASHBOARD_LOCAL_CACHE_LOCK = RLock()
-_HOME_DASHBOARD_INFLIGHT: dict[str, Event] = {}
-_HOME_DASHBOARD_INFLIGHT_LOCK = RLock()
+_HOME_DASHBOARD_CACHE_MAX_SIZE = 2048
+# 以 user_id 为标签，按用户失效时不再扫描全部 key 做前缀匹配
+_HOME_DASHBOARD_LOCAL_CACHE: LocalTTLCache[str, HomeDashboardResult] = LocalTTLCache(
+    "home_dashboard",
+    max_size=_HOME_DASHBOARD_CACHE_MAX_SIZE,
+    ttl_seconds=_HOME_DASHBOARD_CACHE_TTL_SECONDS,
+)
 
 
 def build_dashboard_todo_summary(
@@ -123,81 +125,25 @@ def _home_dashboard_cache_key(
     return f"home_dashboard:{user_id}:{visible_codes}"
 
 
-def _get_cached_home_dashboard(cache_key: str) -> HomeDashboardResult | None:
-    with _HOME_DASHBOARD_LOCAL_CACHE_LOCK:
-        cached = _HOME_DASHBOARD_LOCAL_CACHE.get(cache_key)
-        if cached is None:
-            return None
-        expire_at, payload = cached
-        if expire_at <= time.monotonic():
-            _HOME_DASHBOARD_LOCAL_CACHE.pop(cache_key, None)
-            return None
-        return payload
-
-
-def _set_cached_home_dashboard(
-    cache_key: str,
-    payload: HomeDashboardResult,
-) -> None:
-    with _HOME_DASHBOARD_LOCAL_CACHE_LOCK:
-        _HOME_DASHBOARD_LOCAL_CACHE[cache_key] = (
-            time.monotonic() + _HOME_DASHBOARD_CACHE_TTL_SECONDS,
-            payload,
-        )
-
-
 def invalidate_home_dashboard_cache(*, user_ids: set[int] | None = None) -> int:
-    with _HOME_DASHBOARD_LOCAL_CACHE_LOCK:
-        if not user_ids:
-            removed = len(_HOME_DASHBOARD_LOCAL_CACHE)
-            _HOME_DASHBOARD_LOCAL_CACHE.clear()
-            return removed
-
-        prefixes = tuple(f"home_dashboard:{int(user_id)}:" for user_id in user_ids)
-        cache_keys = [
-            cache_key
-            for cache_key in _HOME_DASHBOARD_LOCAL_CACHE
-            if cache_key.startswith(prefixes)
-        ]
-        for cache_key in cache_keys:
-            _HOME_DASHBOARD_LOCAL_CACHE.pop(cache_key, None)
-        return len(cache_keys)
+    if not user_ids:
+        return _HOME_DASHBOARD_LOCAL_CACHE.clear()
+    return sum(
+        _HOME_DASHBOARD_LOCAL_CACHE.invalidate_tag(int(user_id)) for user_id in user_ids
+    )
 
 
 def _get_or_build_home_dashboard(
     cache_key: str,
     builder,
+    *,
+    user_id: int,
 ) -> HomeDashboardResult:
-    cached = _get_cached_home_dashboard(cache_key)
-    if cached is not None:
-        return cached
-
-    event: Event | None = None
-    while True:
-        with _HOME_DASHBOARD_INFLIGHT_LOCK:
-            cached = _get_cached_home_dashboard(cache_key)
-            if cached is not None:
-                return cached
-            event = _HOME_DASHBOARD_INFLIGHT.get(cache_key)
-            if event is None:
-                event = Event()
-                _HOME_DASHBOARD_INFLIGHT[cache_key] = event
-                break
-        event.wait(timeout=max(0.05, float(_HOME_DASHBOARD_CACHE_TTL_SECONDS)))
-        cached = _get_cached_home_dashboard(cache_key)
-        if cached is not None:
-            return cached
-
-    try:
-        payload = builder()
-        _set_cached_home_dashboard(cache_key, payload)
-        return payload
-    finally:
-        with _HOME_DASHBOARD_INFLIGHT_LOCK:
-            current = _HOME_DASHBOARD_INFLIGHT.get(cache_key)
-            if current is event:
-                _HOME_DASHBOARD_INFLIGHT.pop(cache_key, None)
-                event.set()
+    return _HOME_DASHBOARD_LOCAL_CACHE.get_or_load(
+        cache_key,
+        builder,
+        tags=(int(user_id),),
+    )
 
 
 def build_home_dashboard(db: Session, *, current_user: User) -> HomeDashboardResult:
@@ -347,4 +293,4 @@ def build_home_dashboard(db: Session, *, current_user: User) -> HomeDashboardRes
             degraded_blocks=degraded_blocks,
         )
 
-    return _get_or_build_home_dashboard(cache_key, _build)
+    return _get_or_build_home_dashboard(cache_key, _build, user_id=current_user.id)
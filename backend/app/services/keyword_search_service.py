@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from sqlalchemy import or_
+from sqlalchemy.sql.elements import ColumnElement
+
+
+# ── 列表关键字搜索 ────────────────────────────────────────────────────────────
+# 各列表的模糊搜索统一走 `列 ILIKE '%关键字%'`：
+#   • PostgreSQL 上 order_code / 产品名 / 供应商 / 工序编码名称 / 消息标题摘要来源编号 /
+#     用户名 / 审计操作人 建有 pg_trgm GIN 索引（见迁移 e8f9a0b1c2d3），
+#     关键字 ≥ 3 个字符时可走位图索引扫描，不再整表顺序扫描；
+#   • 不足 3 个字符时 pg_trgm 提取不出三元组，规划器仍会退回顺序扫描，结果不变；
+#   • SQLite（单元测试）没有 pg_trgm，SQLAlchemy 把 ILIKE 编译为 lower() LIKE lower()，语义一致。
+# 用户输入中的 % / _ / \ 按字面量匹配，不再被当成通配符。
+LIKE_ESCAPE_CHAR = "\\"
+
+
+def normalize_keyword(keyword: str | None) -> str | None:
+    normalized = (keyword or "").strip()
+    return normalized or None
+
+
+def build_contains_pattern(keyword: str) -> str:
+    escaped = (
+        keyword.replace(LIKE_ESCAPE_CHAR, LIKE_ESCAPE_CHAR * 2)
+        .replace("%", f"{LIKE_ESCAPE_CHAR}%")
+        .replace("_", f"{LIKE_ESCAPE_CHAR}_")
+    )
+    return f"%{escaped}%"
+
+
+def keyword_contains(column: ColumnElement, keyword: str) -> ColumnElement[bool]:
+    """单列包含匹配；直接对原列 ILIKE，保证 PostgreSQL 能命中该列的 trigram 索引"""
+    return column.ilike(build_contains_pattern(keyword), escape=LIKE_ESCAPE_CHAR)
+
+
+def keyword_filter(keyword: str | None, *columns: ColumnElement) -> ColumnElement[bool] | None:
+    """任一列包含关键字即命中；关键字为空时返回 None，调用方不追加条件"""
+    normalized = normalize_keyword(keyword)
+    if normalized is None or not columns:
+        return None
+    pattern = build_contains_pattern(normalized)
+    conditions = [column.ilike(pattern, escape=LIKE_ESCAPE_CHAR) for column in columns]
+    if len(conditions) == 1:
+        return conditions[0]
+    return or_(*conditions)
+
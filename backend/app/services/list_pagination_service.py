@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import base64
+import json
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import date, datetime
+
+from sqlalchemy import Select, and_, func, or_, select, text
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.config import settings
+
+
+# ── 列表分页：keyset 游标与总数模式 ─────────────────────────────────────────────
+# 深分页时 OFFSET 需要先扫过前面所有行，历史表越大越慢；游标模式按排序键
+# (例如 updated_at DESC, id DESC) 记住上一页最后一行，下一页直接 WHERE 键 < 游标。
+# 游标对前端是不透明字符串，仅在同一列表、同一排序下有效。
+#
+# 总数模式（仅影响 total 徽标）：
+#   • exact     原有 count(*)，与翻页模式无关
+#   • capped    最多数到 LIST_COUNT_CAP 行，超过即返回上限
+#   • estimated PostgreSQL 且列表无过滤条件、reltuples 不低于上限时取 pg_class.reltuples，
+#               否则退回 capped
+# 两种非精确模式下 total 未达上限即为精确值，只有达到上限才是估算（见 is_total_estimate）。
+COUNT_MODE_EXACT = "exact"
+COUNT_MODE_CAPPED = "capped"
+COUNT_MODE_ESTIMATED = "estimated"
+COUNT_MODES = {COUNT_MODE_EXACT, COUNT_MODE_CAPPED, COUNT_MODE_ESTIMATED}
+COUNT_MODE_PATTERN = "^(exact|capped|estimated)$"
+
+_CURSOR_VERSION = 1
+
+
+def normalize_count_mode(value: str | None) -> str:
+    normalized = (value or COUNT_MODE_EXACT).strip().lower()
+    if normalized not in COUNT_MODES:
+        raise ValueError(f"Invalid count mode: {value}")
+    return normalized
+
+
+def _encode_value(value: object) -> object:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value: object) -> object:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(str(value["dt"]))
+        if "d" in value:
+            return date.fromisoformat(str(value["d"]))
+        raise ValueError("Invalid cursor")
+    return value
+
+
+def encode_cursor(values: Sequence[object]) -> str:
+    payload = json.dumps(
+        [_CURSOR_VERSION, [_encode_value(value) for value in values]],
+        ensure_ascii=True,
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, *, size: int) -> list[object]:
+    try:
+        padded = token.strip() + "=" * (-len(token.strip()) % 4)
+        version, raw_values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if version != _CURSOR_VERSION or not isinstance(raw_values, list):
+            raise ValueError("Invalid cursor")
+        values = [_decode_value(value) for value in raw_values]
+    except (TypeError, ValueError, UnicodeError) as error:
+        raise ValueError("Invalid cursor") from error
+    if len(values) != size or any(value is None for value in values):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+@dataclass(frozen=True, slots=True)
+class KeysetOrder:
+    """列表的 keyset 排序定义：columns 与 SQL ORDER BY 一致，row_values 从行对象取同样的键
+
+    键列需非空且整体唯一（末列一般为主键 id）。
+    """
+
+    columns: tuple[tuple[ColumnElement, bool], ...]
+    row_values: Callable[[object], tuple[object, ...]]
+
+    def order_by(self, stmt: Select) -> Select:
+        return stmt.order_by(
+            *(column.desc() if descending else column.asc() for column, descending in self.columns)
+        )
+
+    def after(self, stmt: Select, cursor: str) -> Select:
+        """追加“排在游标之后”的条件：(a, b, c) 之后 = a 超过 或 a 相等且 b 超过 ……"""
+        values = decode_cursor(cursor, size=len(self.columns))
+        branches = []
+        for index, (column, descending) in enumerate(self.columns):
+            equal_prefix = [
+                prefix_column == values[prefix_index]
+                for prefix_index, (prefix_column, _) in enumerate(self.columns[:index])
+            ]
+            beyond = column < values[index] if descending else column > values[index]
+            branches.append(and_(*equal_prefix, beyond))
+        return stmt.where(or_(*branches))
+
+    def next_cursor(self, rows: Sequence[object], page_size: int) -> str | None:
+        """本页取满才给下一页游标；最后一页恰好取满时下一页为空列表"""
+        if not rows or len(rows) < page_size:
+            return None
+        return encode_cursor(self.row_values(rows[-1]))
+
+
+def build_count_statement(
+    stmt: Select,
+    *,
+    count_mode: str,
+    exact_count_stmt: Select | None = None,
+) -> Select:
+    """不访问数据库的 count 语句（异步会话也可执行）；estimated 在这里按 capped 处理"""
+    if normalize_count_mode(count_mode) == COUNT_MODE_EXACT:
+        if exact_count_stmt is not None:
+            return exact_count_stmt
+        return select(func.count()).select_from(stmt.order_by(None).subquery())
+    cap = _list_count_cap()
+    return select(func.count()).select_from(stmt.order_by(None).limit(cap).subquery())
+
+
+def _list_count_cap() -> int:
+    return max(int(settings.list_count_cap), 1)
+
+
+def is_total_estimate(total: int, *, count_mode: str) -> bool:
+    """非精确模式下仅当 total 达到上限（封顶或取自统计信息）时才是估算值"""
+    if normalize_count_mode(count_mode) == COUNT_MODE_EXACT:
+        return False
+    return total >= _list_count_cap()
+
+
+def count_list_total(
+    db: Session,
+    stmt: Select,
+    *,
+    count_mode: str,
+    exact_count_stmt: Select | None = None,
+    table_name: str | None = None,
+) -> int:
+    """按总数模式统计列表总数；exact 时优先使用调用方已有的 count 语句"""
+    normalized = normalize_count_mode(count_mode)
+    if normalized == COUNT_MODE_ESTIMATED and table_name and stmt.whereclause is None:
+        estimated = _estimate_table_rows(db, table_name=table_name)
+        # 低于上限时封顶计数本身就是精确值，不必用统计信息
+        if estimated is not None and estimated >= _list_count_cap():
+            return estimated
+    count_stmt = build_count_statement(
+        stmt,
+        count_mode=normalized,
+        exact_count_stmt=exact_count_stmt,
+    )
+    return int(db.execute(count_stmt).scalar_one() or 0)
+
+
+def _estimate_table_rows(db: Session, *, table_name: str) -> int | None:
+    if db.get_bind().dialect.name != "postgresql":
+        return None
+    reltuples = db.execute(
+        text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:table_name)"),
+        {"table_name": table_name},
+    ).scalar()
+    # 从未 ANALYZE 的表 reltuples 为 -1
+    if reltuples is None or float(reltuples) < 0:
+        return None
+    return int(reltuples)
@@ -2,51 +2,165 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import os
+import socket
 from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from uuid import uuid4
 
 from fastapi import WebSocket
 
 logger = logging.getLogger(__name__)
 
+# 已转发给持有连接的进程，投递结果由对方回写；发起方不得据此记为送达或失败。
+PUSH_HANDED_OFF = "handed_off"
+
+# 持有连接的进程完成转发推送后的回调：(user_id, payload, delivered, failure_reason)
+ForwardedResultHandler = Callable[[int, dict, bool, str | None], Awaitable[None]]
+
+
+def _build_owner_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+
 
 class MessageConnectionManager:
-    """管理 WebSocket 连接池，按 user_id 维护在线连接"""
+    """管理 WebSocket 连接池，按 user_id 维护在线连接
 
-    def __init__(self) -> None:
+    连接只存在于持有它的 worker 进程内；挂载转发总线后，本进程找不到连接的
+    推送会转发给登记了该用户连接的其他 worker（或容器）完成投递。
+    """
+
+    def __init__(self, *, fanout_bus=None, owner_id: str | None = None) -> None:
         # user_id -> set of WebSocket
         self._connections: dict[int, set[WebSocket]] = defaultdict(set)
         self._lock = asyncio.Lock()
+        # 在线用户快照供转发总线监听线程读取：只在事件循环内持锁整体替换，
+        # 其他线程读到的总是某一时刻完整的元组，不会遍历到正在变化的字典
+        self._online_user_ids: tuple[int, ...] = ()
+        self._fanout_bus = fanout_bus
+        self._owner_id = owner_id or _build_owner_id()
+        self._on_forwarded_result: ForwardedResultHandler | None = None
+
+    @property
+    def owner_id(self) -> str:
+        return self._owner_id
+
+    async def start_fanout(
+        self,
+        fanout_bus,
+        *,
+        subscribe: bool = True,
+        on_forwarded_result: ForwardedResultHandler | None = None,
+    ) -> None:
+        """挂载转发总线；subscribe=False 时仅发布（如 worker_main 进程）。
+
+        on_forwarded_result 在本进程代其他进程完成推送后回调，用于回写真实投递结果。
+        """
+        if fanout_bus is None:
+            return
+        # gunicorn 预加载场景下 fork 出的 worker 共享模块单例，需重新生成归属标识。
+        self._owner_id = _build_owner_id()
+        self._fanout_bus = fanout_bus
+        self._on_forwarded_result = on_forwarded_result
+        if not subscribe:
+            return
+        await fanout_bus.subscribe(
+            self._owner_id,
+            self.push_forwarded,
+            local_user_ids=self.online_user_ids,
+        )
+        for user_id in self.online_user_ids():
+            await fanout_bus.register(self._owner_id, user_id)
+
+    async def stop_fanout(self) -> None:
+        fanout_bus = self._fanout_bus
+        self._fanout_bus = None
+        if fanout_bus is None:
+            return
+        try:
+            await fanout_bus.unsubscribe(self._owner_id)
+        except Exception:
+            logger.warning("[MSG_WS] 转发总线注销失败", exc_info=True)
 
     async def connect(self, websocket: WebSocket, user_id: int) -> None:
         await websocket.accept()
-        async with self._lock:
-            self._connections[user_id].add(websocket)
-        logger.debug(
-            "[MSG_WS] 用户 %s 建立连接，当前连接数 %s",
-            user_id,
-            len(self._connections[user_id]),
-        )
+        await self.connect_already_accepted(websocket, user_id)
 
     async def connect_already_accepted(self, websocket: WebSocket, user_id: int) -> None:
         async with self._lock:
+            first_connection = not self._connections.get(user_id)
             self._connections[user_id].add(websocket)
+            if first_connection:
+                self._refresh_online_snapshot_locked()
         logger.debug(
             "[MSG_WS] 用户 %s 建立连接，当前连接数 %s",
             user_id,
             len(self._connections[user_id]),
         )
+        if first_connection and self._fanout_bus is not None:
+            await self._fanout_bus.register(self._owner_id, user_id)
 
     async def disconnect(self, websocket: WebSocket, user_id: int) -> None:
         async with self._lock:
             self._connections[user_id].discard(websocket)
-            if not self._connections[user_id]:
+            last_connection = not self._connections[user_id]
+            if last_connection:
                 del self._connections[user_id]
+                self._refresh_online_snapshot_locked()
         logger.debug("[MSG_WS] 用户 %s 断开连接", user_id)
+        if last_connection and self._fanout_bus is not None:
+            await self._fanout_bus.unregister(self._owner_id, user_id)
 
     async def push_to_user(
         self, user_id: int, payload: dict
     ) -> tuple[bool, str | None]:
-        """向指定用户的所有在线连接推送轻量事件"""
+        """向指定用户的所有在线连接推送轻量事件（本地优先，其次跨进程转发）
+
+        转发成功只代表已移交给持有连接的进程，返回 (False, PUSH_HANDED_OFF)，
+        真实投递结果由对方经 on_forwarded_result 回写。
+        """
+        delivered, failure_reason = await self.push_to_local_connections(
+            user_id,
+            payload,
+        )
+        if delivered or self._fanout_bus is None:
+            return delivered, failure_reason
+        try:
+            forwarded = await self._fanout_bus.publish_to_owners(
+                user_id,
+                payload,
+                exclude_owner_id=self._owner_id,
+            )
+        except Exception:
+            logger.warning("[MSG_WS] 用户 %s 跨进程转发失败", user_id, exc_info=True)
+            forwarded = False
+        if forwarded:
+            return False, PUSH_HANDED_OFF
+        return False, failure_reason
+
+    async def push_forwarded(
+        self, user_id: int, payload: dict
+    ) -> tuple[bool, str | None]:
+        """处理其他进程转发来的推送：本地发送后回调真实结果"""
+        delivered, failure_reason = await self.push_to_local_connections(
+            user_id,
+            payload,
+        )
+        if self._on_forwarded_result is not None:
+            try:
+                await self._on_forwarded_result(
+                    user_id, payload, delivered, failure_reason
+                )
+            except Exception:
+                logger.warning(
+                    "[MSG_WS] 用户 %s 转发推送结果回写失败", user_id, exc_info=True
+                )
+        return delivered, failure_reason
+
+    async def push_to_local_connections(
+        self, user_id: int, payload: dict
+    ) -> tuple[bool, str | None]:
+        """仅向本进程持有的连接推送"""
         async with self._lock:
             sockets = set(self._connections.get(user_id, set()))
         if not sockets:
@@ -65,12 +179,22 @@ class MessageConnectionManager:
             async with self._lock:
                 for ws in dead:
                     self._connections[user_id].discard(ws)
+                last_connection = not self._connections[user_id]
+                if last_connection:
+                    del self._connections[user_id]
+                    self._refresh_online_snapshot_locked()
+            if last_connection and self._fanout_bus is not None:
+                await self._fanout_bus.unregister(self._owner_id, user_id)
         if delivered:
             return True, None
         return False, failure_reason or "push_failed"
 
+    def _refresh_online_snapshot_locked(self) -> None:
+        self._online_user_ids = tuple(self._connections.keys())
+
     def online_user_ids(self) -> list[int]:
-        return list(self._connections.keys())
+        """本进程在线用户；可在转发总线监听线程中调用"""
+        return list(self._online_user_ids)
 
 
 # 全局单例
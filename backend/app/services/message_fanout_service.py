@@ -0,0 +1,333 @@
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+import json
+import logging
+from threading import Event, Thread
+import time
+
+try:
+    from redis import Redis
+    from redis.exceptions import RedisError
+except Exception:  # pragma: no cover - graceful fallback
+    Redis = None  # type: ignore[assignment]
+    RedisError = Exception  # type: ignore[misc, assignment]
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 收到其他进程转发的事件后，由持有连接的进程执行本地推送。
+FanoutHandler = Callable[[int, dict], Awaitable[tuple[bool, str | None]]]
+LocalUserIdsProvider = Callable[[], list[int]]
+
+_FANOUT_POLL_SECONDS = 1.0
+_FANOUT_REDIS_BACKOFF_SECONDS = 30.0
+
+
+class LocalMessageFanoutBus:
+    """进程内的跨连接池转发替身。
+
+    多个 MessageConnectionManager 共用同一实例即可模拟多 worker，
+    供单测以及未启用 Redis 的单进程部署使用。
+    """
+
+    def __init__(self) -> None:
+        self._owners: dict[int, set[str]] = defaultdict(set)
+        self._handlers: dict[str, FanoutHandler] = {}
+
+    async def register(self, owner_id: str, user_id: int) -> None:
+        self._owners[user_id].add(owner_id)
+
+    async def unregister(self, owner_id: str, user_id: int) -> None:
+        owners = self._owners.get(user_id)
+        if owners is None:
+            return
+        owners.discard(owner_id)
+        if not owners:
+            self._owners.pop(user_id, None)
+
+    async def publish_to_owners(
+        self,
+        user_id: int,
+        payload: dict,
+        *,
+        exclude_owner_id: str | None = None,
+    ) -> bool:
+        handed_off = False
+        for owner_id in sorted(self._owners.get(user_id, set())):
+            if owner_id == exclude_owner_id:
+                continue
+            handler = self._handlers.get(owner_id)
+            if handler is None:
+                continue
+            await handler(user_id, payload)
+            handed_off = True
+        return handed_off
+
+    async def subscribe(
+        self,
+        owner_id: str,
+        handler: FanoutHandler,
+        *,
+        local_user_ids: LocalUserIdsProvider,
+    ) -> None:
+        self._handlers[owner_id] = handler
+
+    async def unsubscribe(self, owner_id: str) -> None:
+        self._handlers.pop(owner_id, None)
+        for user_id in list(self._owners.keys()):
+            await self.unregister(owner_id, user_id)
+
+
+class RedisMessageFanoutBus:
+    """基于 Redis 的跨 worker / 跨容器 WebSocket 转发。
+
+    - 在线归属：``{prefix}:presence:{user_id}`` 有序集合，成员为持有连接的
+      owner_id，score 为过期时间戳；监听线程按 TTL 的三分之一周期续期。
+    - 转发：向 ``{prefix}:owner:{owner_id}`` 频道 PUBLISH，订阅者数 > 0 仅视为已移交；
+      是否送达由持有连接的进程按实际发送结果回写，发布方不据此记账。
+    """
+
+    def __init__(
+        self,
+        *,
+        key_prefix: str,
+        presence_ttl_seconds: int,
+        redis_client=None,
+    ) -> None:
+        self._key_prefix = key_prefix
+        self._presence_ttl_seconds = max(10, presence_ttl_seconds)
+        self._redis_client = redis_client
+        self._disabled_until = 0.0
+        self._listener_thread: Thread | None = None
+        self._listener_stop = Event()
+        self._owned_user_ids: list[int] = []
+
+    def _presence_key(self, user_id: int) -> str:
+        return f"{self._key_prefix}:presence:{user_id}"
+
+    def _owner_channel(self, owner_id: str) -> str:
+        return f"{self._key_prefix}:owner:{owner_id}"
+
+    def _client(self):
+        if self._disabled_until > time.monotonic():
+            return None
+        if self._redis_client is None:
+            self._redis_client = _build_fanout_redis_client(
+                socket_timeout=max(0.05, settings.redis_socket_timeout_seconds)
+            )
+        return self._redis_client
+
+    def _mark_unavailable(self, message: str) -> None:
+        logger.warning(message, exc_info=True)
+        self._disabled_until = time.monotonic() + _FANOUT_REDIS_BACKOFF_SECONDS
+
+    def _register_sync(self, owner_id: str, user_ids: list[int]) -> None:
+        redis_client = self._client()
+        if redis_client is None or not user_ids:
+            return
+        expire_at = time.time() + self._presence_ttl_seconds
+        try:
+            pipe = redis_client.pipeline()
+            for user_id in user_ids:
+                key = self._presence_key(user_id)
+                pipe.zadd(key, {owner_id: expire_at})
+                pipe.expire(key, self._presence_ttl_seconds * 2)
+            pipe.execute()
+        except RedisError:
+            self._mark_unavailable("[MSG_FANOUT] 在线归属登记失败，暂时仅本地推送。")
+
+    def _unregister_sync(self, owner_id: str, user_id: int) -> None:
+        redis_client = self._client()
+        if redis_client is None:
+            return
+        try:
+            redis_client.zrem(self._presence_key(user_id), owner_id)
+        except RedisError:
+            self._mark_unavailable("[MSG_FANOUT] 在线归属注销失败，依赖 TTL 自然过期。")
+
+    def _publish_sync(
+        self,
+        user_id: int,
+        payload: dict,
+        exclude_owner_id: str | None,
+    ) -> bool:
+        redis_client = self._client()
+        if redis_client is None:
+            return False
+        key = self._presence_key(user_id)
+        now = time.time()
+        try:
+            owner_ids = redis_client.zrangebyscore(key, now, "+inf")
+            redis_client.zremrangebyscore(key, "-inf", now)
+            message = json.dumps(
+                {"user_id": user_id, "payload": payload},
+                ensure_ascii=False,
+                default=str,
+            )
+            handed_off = False
+            for owner_id in owner_ids:
+                if owner_id == exclude_owner_id:
+                    continue
+                receivers = redis_client.publish(self._owner_channel(owner_id), message)
+                handed_off = handed_off or int(receivers or 0) > 0
+            return handed_off
+        except RedisError:
+            self._mark_unavailable("[MSG_FANOUT] 跨进程转发失败，暂时仅本地推送。")
+            return False
+
+    async def register(self, owner_id: str, user_id: int) -> None:
+        await asyncio.to_thread(self._register_sync, owner_id, [user_id])
+
+    async def unregister(self, owner_id: str, user_id: int) -> None:
+        await asyncio.to_thread(self._unregister_sync, owner_id, user_id)
+
+    async def publish_to_owners(
+        self,
+        user_id: int,
+        payload: dict,
+        *,
+        exclude_owner_id: str | None = None,
+    ) -> bool:
+        return await asyncio.to_thread(
+            self._publish_sync,
+            user_id,
+            payload,
+            exclude_owner_id,
+        )
+
+    async def subscribe(
+        self,
+        owner_id: str,
+        handler: FanoutHandler,
+        *,
+        local_user_ids: LocalUserIdsProvider,
+    ) -> None:
+        if self._listener_thread is not None:
+            return
+        loop = asyncio.get_running_loop()
+        self._listener_stop.clear()
+        self._listener_thread = Thread(
+            target=self._run_listener,
+            args=(owner_id, handler, local_user_ids, loop),
+            name="message-fanout",
+            daemon=True,
+        )
+        self._listener_thread.start()
+
+    async def unsubscribe(self, owner_id: str) -> None:
+        self._listener_stop.set()
+        thread = self._listener_thread
+        self._listener_thread = None
+        if thread is not None and thread.is_alive():
+            await asyncio.to_thread(thread.join, _FANOUT_POLL_SECONDS * 2)
+        for user_id in list(self._owned_user_ids):
+            await self.unregister(owner_id, user_id)
+        self._owned_user_ids = []
+
+    def _run_listener(
+        self,
+        owner_id: str,
+        handler: FanoutHandler,
+        local_user_ids: LocalUserIdsProvider,
+        loop: asyncio.AbstractEventLoop,
+    ) -> None:
+        heartbeat_interval = max(1.0, self._presence_ttl_seconds / 3)
+        while not self._listener_stop.is_set():
+            pubsub = None
+            try:
+                listener_client = _build_fanout_redis_client(socket_timeout=None)
+                pubsub = listener_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self._owner_channel(owner_id))
+                self._owned_user_ids = list(local_user_ids())
+                self._register_sync(owner_id, self._owned_user_ids)
+                next_heartbeat_at = time.monotonic() + heartbeat_interval
+                while not self._listener_stop.is_set():
+                    message = pubsub.get_message(timeout=_FANOUT_POLL_SECONDS)
+                    if message and message.get("type") == "message":
+                        self._dispatch(message.get("data"), handler, loop)
+                    if time.monotonic() >= next_heartbeat_at:
+                        self._owned_user_ids = list(local_user_ids())
+                        self._register_sync(owner_id, self._owned_user_ids)
+                        next_heartbeat_at = time.monotonic() + heartbeat_interval
+            except Exception:
+                logger.warning(
+                    "[MSG_FANOUT] 转发监听中断，%ds 后重连。",
+                    _FANOUT_REDIS_BACKOFF_SECONDS,
+                    exc_info=True,
+                )
+                self._listener_stop.wait(_FANOUT_REDIS_BACKOFF_SECONDS)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    @staticmethod
+    def _dispatch(
+        raw_message: object,
+        handler: FanoutHandler,
+        loop: asyncio.AbstractEventLoop,
+    ) -> None:
+        try:
+            decoded = json.loads(str(raw_message or ""))
+            user_id = int(decoded["user_id"])
+            payload = decoded["payload"]
+        except (ValueError, KeyError, TypeError):
+            return
+        if not isinstance(payload, dict) or loop.is_closed():
+            return
+        future = asyncio.run_coroutine_threadsafe(handler(user_id, payload), loop)
+        future.add_done_callback(_log_dispatch_failure)
+
+
+def _log_dispatch_failure(future) -> None:
+    if future.cancelled():
+        return
+    exc = future.exception()
+    if exc is not None:
+        logger.warning(
+            "[MSG_FANOUT] 转发推送处理失败", exc_info=(type(exc), exc, exc.__traceback__)
+        )
+
+
+def _build_fanout_redis_client(*, socket_timeout: float | None):
+    return Redis(
+        host=settings.redis_host,
+        port=settings.redis_port,
+        db=settings.redis_db,
+        password=settings.redis_password or None,
+        ssl=settings.redis_ssl,
+        decode_responses=True,
+        socket_timeout=socket_timeout,
+        socket_connect_timeout=max(0.05, settings.redis_connect_timeout_seconds),
+    )
+
+
+def build_message_fanout_bus() -> RedisMessageFanoutBus | None:
+    """按配置构建 Redis 转发总线；Redis 不可用时返回 None（退化为仅本地推送）。"""
+    if not settings.message_ws_fanout_redis_enabled:
+        return None
+    if Redis is None:
+        logger.warning("[MSG_FANOUT] redis 依赖不可用，WebSocket 推送仅限本进程。")
+        return None
+    try:
+        redis_client = _build_fanout_redis_client(
+            socket_timeout=max(0.05, settings.redis_socket_timeout_seconds)
+        )
+        redis_client.ping()
+    except Exception:
+        logger.warning(
+            "[MSG_FANOUT] Redis 连接失败，WebSocket 推送仅限本进程。",
+            exc_info=True,
+        )
+        return None
+    return RedisMessageFanoutBus(
+        key_prefix=settings.message_ws_fanout_prefix,
+        presence_ttl_seconds=settings.message_ws_presence_ttl_seconds,
+        redis_client=redis_client,
+    )
@@ -6,7 +6,19 @@ from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
 
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import and_, case, func, or_, select
+from sqlalchemy import (
+    DateTime,
+    and_,
+    case,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.rbac import ROLE_PRODUCTION_ADMIN, ROLE_QUALITY_ADMIN, ROLE_SYSTEM_ADMIN
@@ -29,6 +41,7 @@ from app.models.role import Role
 from app.models.user import User
 from app.models.user_session import UserSession
 from app.schemas.message import (
+    AnnouncementDeliveryProgress,
     AnnouncementManagementItem,
     AnnouncementOfflineResult,
     AnnouncementPublishRequest,
@@ -39,13 +52,25 @@ from app.schemas.message import (
     MessageJumpResult,
 )
 from app.services.authz_service import get_user_permission_codes
-from app.services.audit_service import write_audit_log
+from app.services.audit_service import write_audit_log, write_audit_logs_bulk
+from app.services.keyword_search_service import keyword_filter
+from app.services.list_pagination_service import (
+    COUNT_MODE_EXACT,
+    KeysetOrder,
+    build_count_statement,
+)
+from app.services.message_connection_manager import PUSH_HANDED_OFF
 
 logger = logging.getLogger(__name__)
 
 _MESSAGE_DELIVERY_MAX_RETRY = 3
 _MESSAGE_DELIVERY_RETRY_DELAYS = (5, 30, 120)
+# 待投递记录被认领后的租约时长，超时未回写结果则允许补偿链路重新认领
+_MESSAGE_DELIVERY_CLAIM_LEASE_SECONDS = 60
 _MESSAGE_RETENTION_DAYS = 30
+_MESSAGE_MAINTENANCE_BATCH_SIZE = 2000
+# 来源失效检查的 ID 水位，跨轮次轮转扫描活跃消息
+_MESSAGE_MAINTENANCE_SOURCE_WATERMARK = 0
 _MESSAGE_STATUS_SOURCE_UNAVAILABLE = "src_unavailable"
 _PUBLIC_MESSAGE_STATUS_SOURCE_UNAVAILABLE = "source_unavailable"
 
@@ -135,8 +160,12 @@ def _source_record_exists(db: Session, msg: Message) -> bool:
     return not bool(is_deleted)
 
 
-def _message_source_is_actionable(db: Session, msg: Message) -> bool:
-    row = _get_message_source_record(db, msg)
+def _source_row_is_actionable(
+    msg: Message,
+    row: object | None,
+    *,
+    has_disposition: bool = False,
+) -> bool:
     if row is None:
         return False
     if bool(getattr(row, "is_deleted", False)):
@@ -156,16 +185,7 @@ def _message_source_is_actionable(db: Session, msg: Message) -> bool:
             return False
         if getattr(row, "result", None) != "failed":
             return False
-        disposition = (
-            db.execute(
-                select(FirstArticleDisposition).where(
-                    FirstArticleDisposition.first_article_record_id == row.id
-                )
-            )
-            .scalars()
-            .first()
-        )
-        return disposition is None
+        return not has_disposition
     if (
         msg.message_type == "todo"
         and msg.source_module == "equipment"
@@ -175,6 +195,38 @@ def _message_source_is_actionable(db: Session, msg: Message) -> bool:
     return True
 
 
+def _first_article_disposition_record_ids(
+    db: Session, record_ids: list[int]
+) -> set[int]:
+    if not record_ids:
+        return set()
+    return {
+        int(record_id)
+        for record_id in db.execute(
+            select(FirstArticleDisposition.first_article_record_id)
+            .where(FirstArticleDisposition.first_article_record_id.in_(record_ids))
+            .distinct()
+        )
+        .scalars()
+        .all()
+    }
+
+
+def _message_source_is_actionable(db: Session, msg: Message) -> bool:
+    row = _get_message_source_record(db, msg)
+    has_disposition = False
+    if (
+        row is not None
+        and msg.message_type == "todo"
+        and msg.source_module == "quality"
+        and msg.source_type == "first_article_record"
+    ):
+        has_disposition = bool(
+            _first_article_disposition_record_ids(db, [int(row.id)])
+        )
+    return _source_row_is_actionable(msg, row, has_disposition=has_disposition)
+
+
 def _failure_reason_hint(failure_reason: str | None) -> str | None:
     normalized = (failure_reason or "").strip().lower()
     if not normalized:
@@ -369,96 +421,163 @@ def _sync_overdue_production_order_messages(
         )
 
 
-def _write_delivery_audit_log(
-    db: Session,
-    *,
-    recipient: MessageRecipient,
-    previous_status: str,
-    previous_attempt_count: int,
-    previous_failure_reason: str | None,
-    previous_next_retry_at: datetime | None,
-    failure_reason: str | None,
-) -> None:
-    write_audit_log(
-        db,
-        action_code="message.delivery_state_changed",
-        action_name="消息投递状态变更",
-        target_type="message_delivery",
-        target_id=str(recipient.id),
-        target_name=f"message:{recipient.message_id}/user:{recipient.recipient_user_id}",
-        before_data={
-            "delivery_status": previous_status,
-            "delivery_attempt_count": previous_attempt_count,
-            "last_failure_reason": previous_failure_reason,
-            "next_retry_at": previous_next_retry_at.isoformat()
-            if previous_next_retry_at is not None
-            else None,
-        },
-        after_data={
-            "delivery_status": recipient.delivery_status,
-            "delivery_attempt_count": recipient.delivery_attempt_count,
-            "last_failure_reason": recipient.last_failure_reason,
-            "next_retry_at": recipient.next_retry_at.isoformat()
-            if recipient.next_retry_at is not None
-            else None,
-            "delivered_at": recipient.delivered_at.isoformat()
-            if recipient.delivered_at is not None
-            else None,
-            "last_push_at": recipient.last_push_at.isoformat()
-            if recipient.last_push_at is not None
-            else None,
-        },
-        remark=failure_reason,
-    )
+@dataclass(frozen=True)
+class _MessageDeliveryResult:
+    message_id: int
+    user_id: int
+    delivered: bool
+    failure_reason: str | None
+    pushed_at: datetime
 
 
-def _mark_recipient_delivery_result(
+def _delivery_audit_entry(
     *,
+    recipient_id: int,
     message_id: int,
     user_id: int,
-    delivered: bool,
+    before_data: dict[str, object],
+    after_data: dict[str, object],
     failure_reason: str | None,
-    pushed_at: datetime,
-) -> None:
+) -> dict[str, object]:
+    return {
+        "action_code": "message.delivery_state_changed",
+        "action_name": "消息投递状态变更",
+        "target_type": "message_delivery",
+        "target_id": str(recipient_id),
+        "target_name": f"message:{message_id}/user:{user_id}",
+        "before_data": before_data,
+        "after_data": after_data,
+        "remark": failure_reason,
+    }
+
+
+def _isoformat_or_none(value: datetime | None) -> str | None:
+    return value.isoformat() if value is not None else None
+
+
+def _record_delivery_results(
+    results: list[_MessageDeliveryResult],
+) -> dict[tuple[int, int], datetime | None]:
+    """批量回写一批推送结果：一次查询 + 一次批量 UPDATE + 一次批量审计写入。
+
+    返回失败项 (message_id, user_id) -> 下次重试时间。
+    """
+    if not results:
+        return {}
+    results_by_key = {(item.message_id, item.user_id): item for item in results}
+    next_retry_by_key: dict[tuple[int, int], datetime | None] = {}
+    with SessionLocal() as db:
+        rows = db.execute(
+            select(
+                MessageRecipient.id,
+                MessageRecipient.message_id,
+                MessageRecipient.recipient_user_id,
+                MessageRecipient.delivery_status,
+                MessageRecipient.delivery_attempt_count,
+                MessageRecipient.last_failure_reason,
+                MessageRecipient.next_retry_at,
+            ).where(
+                # 按 (message_id, user_id) 成对匹配，避免两个 IN 的笛卡尔积多读无关行
+                tuple_(
+                    MessageRecipient.message_id, MessageRecipient.recipient_user_id
+                ).in_(list(results_by_key)),
+                MessageRecipient.is_deleted.is_(False),
+            )
+        ).all()
+        update_rows: list[dict[str, object]] = []
+        audit_entries: list[dict[str, object]] = []
+        for row in rows:
+            result = results_by_key.get((row.message_id, row.recipient_user_id))
+            if result is None:
+                continue
+            if row.delivery_status == "delivered" and not result.delivered:
+                # 多个持有连接的进程各自回写时，已有一方送达即不再降级为失败重推
+                continue
+            attempt_count = int(row.delivery_attempt_count or 0) + 1
+            if result.delivered:
+                values = {
+                    "delivery_status": "delivered",
+                    "delivered_at": result.pushed_at,
+                    "last_failure_reason": None,
+                    "next_retry_at": None,
+                }
+            else:
+                values = {
+                    "delivery_status": "failed",
+                    "delivered_at": None,
+                    "last_failure_reason": (
+                        result.failure_reason or "push_failed"
+                    ).strip()[:255],
+                    "next_retry_at": _next_retry_time(
+                        attempt_count, now=result.pushed_at
+                    ),
+                }
+                next_retry_by_key[(row.message_id, row.recipient_user_id)] = values[
+                    "next_retry_at"
+                ]
+            update_rows.append(
+                {
+                    "id": row.id,
+                    "last_push_at": result.pushed_at,
+                    "delivery_attempt_count": attempt_count,
+                    **values,
+                }
+            )
+            audit_entries.append(
+                _delivery_audit_entry(
+                    recipient_id=row.id,
+                    message_id=row.message_id,
+                    user_id=row.recipient_user_id,
+                    before_data={
+                        "delivery_status": row.delivery_status,
+                        "delivery_attempt_count": row.delivery_attempt_count,
+                        "last_failure_reason": row.last_failure_reason,
+                        "next_retry_at": _isoformat_or_none(row.next_retry_at),
+                    },
+                    after_data={
+                        "delivery_status": values["delivery_status"],
+                        "delivery_attempt_count": attempt_count,
+                        "last_failure_reason": values["last_failure_reason"],
+                        "next_retry_at": _isoformat_or_none(values["next_retry_at"]),
+                        "delivered_at": _isoformat_or_none(values["delivered_at"]),
+                        "last_push_at": _isoformat_or_none(result.pushed_at),
+                    },
+                    failure_reason=values["last_failure_reason"],
+                )
+            )
+        if not update_rows:
+            return next_retry_by_key
+        # ORM 按主键批量 UPDATE，驱动层合并为一次 executemany
+        db.execute(update(MessageRecipient), update_rows)
+        write_audit_logs_bulk(db, entries=audit_entries)
+        db.commit()
+    return next_retry_by_key
+
+
+def _load_unread_counts(user_ids: list[int]) -> dict[int, int]:
+    with SessionLocal() as db:
+        return get_unread_counts_by_user(db, user_ids=user_ids)
+
+
+def _recipient_retry_still_due(
+    message_id: int,
+    user_id: int,
+    next_retry_at: datetime,
+) -> bool:
     with SessionLocal() as db:
-        recipient = db.execute(
-            select(MessageRecipient).where(
+        row = db.execute(
+            select(
+                MessageRecipient.delivery_status,
+                MessageRecipient.next_retry_at,
+            ).where(
                 MessageRecipient.message_id == message_id,
                 MessageRecipient.recipient_user_id == user_id,
                 MessageRecipient.is_deleted.is_(False),
             )
-        ).scalar_one_or_none()
-        if recipient is None:
-            return
-        previous_status = recipient.delivery_status
-        previous_attempt_count = recipient.delivery_attempt_count
-        previous_failure_reason = recipient.last_failure_reason
-        previous_next_retry_at = recipient.next_retry_at
-        attempt_count = recipient.delivery_attempt_count + 1
-        recipient.last_push_at = pushed_at
-        recipient.delivery_attempt_count = attempt_count
-        if delivered:
-            recipient.delivery_status = "delivered"
-            recipient.delivered_at = pushed_at
-            recipient.last_failure_reason = None
-            recipient.next_retry_at = None
-        else:
-            recipient.delivery_status = "failed"
-            recipient.delivered_at = None
-            recipient.last_failure_reason = (failure_reason or "push_failed").strip()[
-                :255
-            ]
-            recipient.next_retry_at = _next_retry_time(attempt_count, now=pushed_at)
-        _write_delivery_audit_log(
-            db,
-            recipient=recipient,
-            previous_status=previous_status,
-            previous_attempt_count=previous_attempt_count,
-            previous_failure_reason=previous_failure_reason,
-            previous_next_retry_at=previous_next_retry_at,
-            failure_reason=recipient.last_failure_reason,
-        )
-        db.commit()
+        ).first()
+    if row is None or row.delivery_status != "failed":
+        return False
+    return row.next_retry_at is not None and row.next_retry_at == next_retry_at
 
 
 async def _retry_message_delivery_after_delay(
@@ -469,20 +588,14 @@ async def _retry_message_delivery_after_delay(
     delay_seconds = max((next_retry_at - datetime.now(UTC)).total_seconds(), 0)
     if delay_seconds > 0:
         await asyncio.sleep(delay_seconds)
-    with SessionLocal() as db:
-        recipient = db.execute(
-            select(MessageRecipient).where(
-                MessageRecipient.message_id == message_id,
-                MessageRecipient.recipient_user_id == user_id,
-                MessageRecipient.is_deleted.is_(False),
-            )
-        ).scalar_one_or_none()
-        if recipient is None:
-            return
-        if recipient.delivery_status != "failed":
-            return
-        if recipient.next_retry_at is None or recipient.next_retry_at != next_retry_at:
-            return
+    still_due = await asyncio.to_thread(
+        _recipient_retry_still_due,
+        message_id,
+        user_id,
+        next_retry_at,
+    )
+    if not still_due:
+        return
     await _push_message_created_for_recipient(message_id, user_id)
 
 
@@ -503,12 +616,134 @@ def _schedule_message_retry_if_possible(
     )
 
 
+async def _deliver_message_created_chunk(
+    pairs: list[tuple[int, int]],
+    *,
+    schedule_retry: bool,
+) -> list[_MessageDeliveryResult]:
+    from app.services.message_push_service import push_message_created
+
+    # 数据库访问放到线程池，避免阻塞同时承载 WebSocket 的事件循环
+    unread_by_user = await asyncio.to_thread(
+        _load_unread_counts,
+        [user_id for _, user_id in pairs],
+    )
+    semaphore = asyncio.Semaphore(max(1, settings.message_delivery_push_concurrency))
+
+    async def _push_one(message_id: int, user_id: int) -> _MessageDeliveryResult:
+        async with semaphore:
+            try:
+                delivered, failure_reason, pushed_at = await push_message_created(
+                    user_id,
+                    message_id,
+                    unread_by_user.get(user_id, 0),
+                )
+            except Exception:
+                logger.warning(
+                    "[MSG_PUSH] 消息 %s 推送给用户 %s 失败",
+                    message_id,
+                    user_id,
+                    exc_info=True,
+                )
+                delivered, failure_reason, pushed_at = (
+                    False,
+                    "push_failed",
+                    datetime.now(UTC),
+                )
+        return _MessageDeliveryResult(
+            message_id=message_id,
+            user_id=user_id,
+            delivered=delivered,
+            failure_reason=failure_reason,
+            pushed_at=pushed_at,
+        )
+
+    results = list(
+        await asyncio.gather(
+            *(_push_one(message_id, user_id) for message_id, user_id in pairs)
+        )
+    )
+    # 已移交给其他进程的推送由对方按实际发送结果回写；未回写的记录保留原状态，
+    # 由补偿（pending 租约过期）或失败重试链路再次捞取
+    next_retry_by_key = await asyncio.to_thread(
+        _record_delivery_results,
+        [item for item in results if item.failure_reason != PUSH_HANDED_OFF],
+    )
+    if schedule_retry:
+        for (message_id, user_id), next_retry_at in next_retry_by_key.items():
+            _schedule_message_retry_if_possible(
+                message_id=message_id,
+                user_id=user_id,
+                next_retry_at=next_retry_at,
+            )
+    return results
+
+
+async def record_forwarded_message_delivery(
+    user_id: int,
+    payload: dict,
+    delivered: bool,
+    failure_reason: str | None,
+) -> None:
+    """持有连接的进程回写转发推送的真实结果，失败项按退避重新排期。"""
+    if payload.get("event") != "message_created":
+        return
+    try:
+        message_id = int(payload["message_id"])
+    except (KeyError, TypeError, ValueError):
+        return
+    next_retry_by_key = await asyncio.to_thread(
+        _record_delivery_results,
+        [
+            _MessageDeliveryResult(
+                message_id=message_id,
+                user_id=user_id,
+                delivered=delivered,
+                failure_reason=failure_reason,
+                pushed_at=datetime.now(UTC),
+            )
+        ],
+    )
+    for (retry_message_id, retry_user_id), next_retry_at in next_retry_by_key.items():
+        _schedule_message_retry_if_possible(
+            message_id=retry_message_id,
+            user_id=retry_user_id,
+            next_retry_at=next_retry_at,
+        )
+
+
+async def _deliver_message_created(
+    pairs: list[tuple[int, int]],
+    *,
+    schedule_retry: bool = True,
+) -> list[_MessageDeliveryResult]:
+    """投递一批 (message_id, user_id) 的新消息事件。
+
+    按批次：一次分组查询未读数 → 有界并发推送 → 一次批量回写投递结果。
+    """
+    batch_size = max(1, settings.message_delivery_batch_size)
+    results: list[_MessageDeliveryResult] = []
+    for start in range(0, len(pairs), batch_size):
+        results.extend(
+            await _deliver_message_created_chunk(
+                pairs[start : start + batch_size],
+                schedule_retry=schedule_retry,
+            )
+        )
+    return results
+
+
+async def _push_message_created_for_recipient(message_id: int, user_id: int) -> None:
+    await _deliver_message_created([(message_id, user_id)])
+
+
 async def _push_message_created_for_recipients(
     message_id: int,
     recipient_user_ids: list[int],
 ) -> None:
-    for user_id in recipient_user_ids:
-        await _push_message_created_for_recipient(message_id, user_id)
+    await _deliver_message_created(
+        [(message_id, user_id) for user_id in recipient_user_ids]
+    )
 
 
 def _resolve_message_status(
@@ -569,6 +804,7 @@ def _to_item(
         inactive_reason=inactive_reason,
         published_at=msg.published_at,
         expires_at=msg.expires_at,
+        sort_time=msg.published_at or msg.created_at,
         is_read=recipient.is_read,
         read_at=recipient.read_at,
         delivered_at=recipient.delivered_at,
@@ -718,28 +954,49 @@ def _write_message_state_audit_log(
     )
 
 
-def list_messages(
-    db: Session,
+_MESSAGE_PRIORITY_RANKS = {"urgent": 0, "important": 1}
+# 高优先级置顶，同优先级按发布时间倒序
+_MESSAGE_PRIORITY_ORDER = case(
+    (Message.priority == "urgent", 0),
+    (Message.priority == "important", 1),
+    else_=2,
+)
+# published_at 可为空，keyset 键列须非空：排序与游标统一用 coalesce(published_at, created_at)
+_MESSAGE_SORT_TIME = func.coalesce(Message.published_at, Message.created_at)
+MESSAGE_LIST_KEYSET = KeysetOrder(
+    columns=(
+        (_MESSAGE_PRIORITY_ORDER, False),
+        (_MESSAGE_SORT_TIME, True),
+        (Message.id, True),
+    ),
+    # 取自 list_messages 返回的 MessageItem
+    row_values=lambda item: (
+        _MESSAGE_PRIORITY_RANKS.get(item.priority, 2),
+        item.sort_time,
+        item.id,
+    ),
+)
+
+
+def _build_message_list_statements(
     *,
     user_id: int,
-    current_user: User | None = None,
-    page: int = 1,
-    page_size: int = 20,
-    keyword: str | None = None,
-    status: str | None = None,
-    message_type: str | None = None,
-    priority: str | None = None,
-    source_module: str | None = None,
-    start_time: datetime | None = None,
-    end_time: datetime | None = None,
-    todo_only: bool = False,
-    active_only: bool = True,
-    run_maintenance: bool = False,
-) -> tuple[list[MessageItem], int]:
-    """查询当前用户的消息列表，返回 (items, total)"""
-    now = datetime.now(UTC)
-    if run_maintenance:
-        run_message_maintenance(db, now=now)
+    now: datetime,
+    page: int,
+    page_size: int,
+    cursor: str | None,
+    count_mode: str,
+    keyword: str | None,
+    status: str | None,
+    message_type: str | None,
+    priority: str | None,
+    source_module: str | None,
+    start_time: datetime | None,
+    end_time: datetime | None,
+    todo_only: bool,
+    active_only: bool,
+):
+    """消息列表的 (count_stmt, data_stmt)，同步 / 异步两条查询路径共用"""
     base_stmt = (
         select(Message, MessageRecipient)
         .join(MessageRecipient, MessageRecipient.message_id == Message.id)
@@ -749,13 +1006,11 @@ def list_messages(
         )
     )
 
-    if keyword:
-        like = f"%{keyword}%"
-        base_stmt = base_stmt.where(
-            Message.title.ilike(like)
-            | Message.summary.ilike(like)
-            | Message.source_code.ilike(like)
-        )
+    keyword_clause = keyword_filter(
+        keyword, Message.title, Message.summary, Message.source_code
+    )
+    if keyword_clause is not None:
+        base_stmt = base_stmt.where(keyword_clause)
     if status == "unread":
         base_stmt = base_stmt.where(MessageRecipient.is_read.is_(False))
     elif status == "read":
@@ -778,27 +1033,22 @@ def list_messages(
             or_(Message.expires_at.is_(None), Message.expires_at > now),
         )
 
-    count_stmt = select(func.count()).select_from(base_stmt.subquery())
-    total: int = db.execute(count_stmt).scalar_one()
+    count_stmt = build_count_statement(base_stmt, count_mode=count_mode)
 
-    # 高优先级置顶，同优先级按发布时间倒序
-    priority_order = case(
-        (Message.priority == "urgent", 0),
-        (Message.priority == "important", 1),
-        else_=2,
-    )
-    data_stmt = (
-        base_stmt.order_by(priority_order, Message.published_at.desc())
-        .offset((page - 1) * page_size)
-        .limit(page_size)
-    )
+    data_stmt = MESSAGE_LIST_KEYSET.order_by(base_stmt)
+    if cursor:
+        data_stmt = MESSAGE_LIST_KEYSET.after(data_stmt, cursor)
+    else:
+        data_stmt = data_stmt.offset((page - 1) * page_size)
+    return count_stmt, data_stmt.limit(page_size)
 
-    rows = db.execute(data_stmt).all()
-    user_permission_codes = (
-        get_user_permission_codes(db, user=current_user)
-        if current_user is not None
-        else None
-    )
+
+def _to_message_items(
+    rows,
+    *,
+    now: datetime,
+    user_permission_codes: set[str] | None,
+) -> list[MessageItem]:
     items = []
     for msg, recipient in rows:
         effective_status, inactive_reason = _resolve_message_status(
@@ -814,6 +1064,107 @@ def list_messages(
                 inactive_reason=inactive_reason,
             )
         )
+    return items
+
+
+def list_messages(
+    db: Session,
+    *,
+    user_id: int,
+    current_user: User | None = None,
+    page: int = 1,
+    page_size: int = 20,
+    keyword: str | None = None,
+    status: str | None = None,
+    message_type: str | None = None,
+    priority: str | None = None,
+    source_module: str | None = None,
+    start_time: datetime | None = None,
+    end_time: datetime | None = None,
+    todo_only: bool = False,
+    active_only: bool = True,
+    run_maintenance: bool = False,
+    cursor: str | None = None,
+    count_mode: str = COUNT_MODE_EXACT,
+) -> tuple[list[MessageItem], int]:
+    """查询当前用户的消息列表，返回 (items, total)；cursor 非空时忽略 page"""
+    now = datetime.now(UTC)
+    if run_maintenance:
+        run_message_maintenance(db, now=now)
+    count_stmt, data_stmt = _build_message_list_statements(
+        user_id=user_id,
+        now=now,
+        page=page,
+        page_size=page_size,
+        cursor=cursor,
+        count_mode=count_mode,
+        keyword=keyword,
+        status=status,
+        message_type=message_type,
+        priority=priority,
+        source_module=source_module,
+        start_time=start_time,
+        end_time=end_time,
+        todo_only=todo_only,
+        active_only=active_only,
+    )
+    total: int = db.execute(count_stmt).scalar_one()
+    rows = db.execute(data_stmt).all()
+    user_permission_codes = (
+        get_user_permission_codes(db, user=current_user)
+        if current_user is not None
+        else None
+    )
+    items = _to_message_items(rows, now=now, user_permission_codes=user_permission_codes)
+    return items, total
+
+
+async def list_messages_async(
+    db: AsyncSession,
+    *,
+    user_id: int,
+    current_user: User | None = None,
+    page: int = 1,
+    page_size: int = 20,
+    keyword: str | None = None,
+    status: str | None = None,
+    message_type: str | None = None,
+    priority: str | None = None,
+    source_module: str | None = None,
+    start_time: datetime | None = None,
+    end_time: datetime | None = None,
+    todo_only: bool = False,
+    active_only: bool = True,
+    cursor: str | None = None,
+    count_mode: str = COUNT_MODE_EXACT,
+) -> tuple[list[MessageItem], int]:
+    """list_messages 的异步版本，db 为 get_async_db 提供的会话"""
+    now = datetime.now(UTC)
+    count_stmt, data_stmt = _build_message_list_statements(
+        user_id=user_id,
+        now=now,
+        page=page,
+        page_size=page_size,
+        cursor=cursor,
+        count_mode=count_mode,
+        keyword=keyword,
+        status=status,
+        message_type=message_type,
+        priority=priority,
+        source_module=source_module,
+        start_time=start_time,
+        end_time=end_time,
+        todo_only=todo_only,
+        active_only=active_only,
+    )
+    total: int = (await db.execute(count_stmt)).scalar_one()
+    rows = (await db.execute(data_stmt)).all()
+    user_permission_codes = (
+        await db.run_sync(get_user_permission_codes, user=current_user)
+        if current_user is not None
+        else None
+    )
+    items = _to_message_items(rows, now=now, user_permission_codes=user_permission_codes)
     return items, total
 
 
@@ -893,18 +1244,10 @@ def list_active_announcements(
     return items, total
 
 
-def get_message_summary(
-    db: Session,
-    *,
-    user_id: int,
-    run_maintenance: bool = False,
-) -> dict[str, int]:
-    now = datetime.now(UTC)
-    if run_maintenance:
-        run_message_maintenance(db, now=now)
+def _build_message_summary_stmt(*, user_id: int, now: datetime):
     active_condition = _active_message_visibility_condition(now=now)
     normalized_priority = func.lower(func.coalesce(Message.priority, ""))
-    total_count, unread_count, todo_unread_count, urgent_unread_count = db.execute(
+    return (
         select(
             func.count().label("total_count"),
             func.coalesce(
@@ -959,7 +1302,11 @@ def get_message_summary(
             MessageRecipient.recipient_user_id == user_id,
             MessageRecipient.is_deleted.is_(False),
         )
-    ).one()
+    )
+
+
+def _message_summary_from_row(row) -> dict[str, int]:
+    total_count, unread_count, todo_unread_count, urgent_unread_count = row
     return {
         "total_count": int(total_count),
         "unread_count": int(unread_count),
@@ -968,18 +1315,27 @@ def get_message_summary(
     }
 
 
-def get_unread_count(
+def get_message_summary(
     db: Session,
     *,
     user_id: int,
     run_maintenance: bool = False,
-) -> int:
-    """获取当前用户未读消息数"""
+) -> dict[str, int]:
     now = datetime.now(UTC)
     if run_maintenance:
         run_message_maintenance(db, now=now)
+    row = db.execute(_build_message_summary_stmt(user_id=user_id, now=now)).one()
+    return _message_summary_from_row(row)
+
+
+async def get_message_summary_async(db: AsyncSession, *, user_id: int) -> dict[str, int]:
+    stmt = _build_message_summary_stmt(user_id=user_id, now=datetime.now(UTC))
+    return _message_summary_from_row((await db.execute(stmt)).one())
+
+
+def _build_unread_count_stmt(*, user_id: int, now: datetime):
     active_condition = _active_message_visibility_condition(now=now)
-    stmt = (
+    return (
         select(func.count())
         .select_from(MessageRecipient)
         .join(Message, Message.id == MessageRecipient.message_id)
@@ -990,7 +1346,51 @@ def get_unread_count(
             active_condition,
         )
     )
-    return db.execute(stmt).scalar_one()
+
+
+def get_unread_count(
+    db: Session,
+    *,
+    user_id: int,
+    run_maintenance: bool = False,
+) -> int:
+    """获取当前用户未读消息数"""
+    now = datetime.now(UTC)
+    if run_maintenance:
+        run_message_maintenance(db, now=now)
+    return db.execute(_build_unread_count_stmt(user_id=user_id, now=now)).scalar_one()
+
+
+async def get_unread_count_async(db: AsyncSession, *, user_id: int) -> int:
+    stmt = _build_unread_count_stmt(user_id=user_id, now=datetime.now(UTC))
+    return (await db.execute(stmt)).scalar_one()
+
+
+def get_unread_counts_by_user(
+    db: Session,
+    *,
+    user_ids: list[int],
+) -> dict[int, int]:
+    """批量获取多位用户的未读消息数（单条 GROUP BY 查询），无未读的用户返回 0"""
+    unique_user_ids = sorted({int(user_id) for user_id in user_ids})
+    if not unique_user_ids:
+        return {}
+    active_condition = _active_message_visibility_condition(now=datetime.now(UTC))
+    rows = db.execute(
+        select(MessageRecipient.recipient_user_id, func.count())
+        .select_from(MessageRecipient)
+        .join(Message, Message.id == MessageRecipient.message_id)
+        .where(
+            MessageRecipient.recipient_user_id.in_(unique_user_ids),
+            MessageRecipient.is_read.is_(False),
+            MessageRecipient.is_deleted.is_(False),
+            active_condition,
+        )
+        .group_by(MessageRecipient.recipient_user_id)
+    ).all()
+    counts = {user_id: 0 for user_id in unique_user_ids}
+    counts.update({int(user_id): int(count) for user_id, count in rows})
+    return counts
 
 
 def mark_message_read(db: Session, *, user_id: int, message_id: int) -> bool:
@@ -1263,44 +1663,146 @@ def create_message(db: Session, *, req: MessageCreateRequest) -> Message:
     return msg
 
 
-async def _push_message_created_for_recipient(message_id: int, user_id: int) -> None:
-    from app.services.message_push_service import push_message_created
+def _message_source_registry_condition():
+    return or_(
+        *(
+            and_(Message.source_module == module, Message.source_type == source_type)
+            for module, source_type in _MESSAGE_SOURCE_MODEL_REGISTRY
+        )
+    )
 
-    with SessionLocal() as db:
-        unread = get_unread_count(db, user_id=user_id)
-    delivered, failure_reason, pushed_at = await push_message_created(
-        user_id,
-        message_id,
-        unread,
+
+def _message_maintenance_columns() -> tuple:
+    return (
+        Message.id,
+        Message.title,
+        Message.message_type,
+        Message.status,
+        Message.source_module,
+        Message.source_type,
+        Message.source_id,
+        Message.expires_at,
+        Message.updated_at,
+        Message.created_at,
     )
-    _mark_recipient_delivery_result(
-        message_id=message_id,
-        user_id=user_id,
-        delivered=delivered,
-        failure_reason=failure_reason,
-        pushed_at=pushed_at,
-    )
-    if not delivered:
-        with SessionLocal() as db:
-            recipient = db.execute(
-                select(MessageRecipient).where(
-                    MessageRecipient.message_id == message_id,
-                    MessageRecipient.recipient_user_id == user_id,
-                    MessageRecipient.is_deleted.is_(False),
-                )
-            ).scalar_one_or_none()
-            next_retry_at = recipient.next_retry_at if recipient is not None else None
-        _schedule_message_retry_if_possible(
-            message_id=message_id,
-            user_id=user_id,
-            next_retry_at=next_retry_at,
+
+
+def _load_active_source_bound_messages(db: Session, *, batch_size: int) -> list:
+    """按 ID 水位分批扫描“有效且绑定来源”的消息，单轮至多 batch_size 条。
+
+    每轮从上次水位之后继续，扫到末尾后回绕；活跃消息总数不超过批量上限时
+    单轮即可覆盖全部，超过时多轮轮转覆盖，单轮成本与历史消息总量无关。
+    """
+    global _MESSAGE_MAINTENANCE_SOURCE_WATERMARK
+    base_stmt = (
+        select(*_message_maintenance_columns())
+        .where(Message.status == "active", _message_source_registry_condition())
+        .order_by(Message.id.asc())
+    )
+    watermark = _MESSAGE_MAINTENANCE_SOURCE_WATERMARK
+    rows = list(
+        db.execute(base_stmt.where(Message.id > watermark).limit(batch_size)).all()
+    )
+    if len(rows) < batch_size and watermark > 0:
+        rows.extend(
+            db.execute(
+                base_stmt.where(Message.id <= watermark).limit(batch_size - len(rows))
+            ).all()
+        )
+    if len(rows) < batch_size:
+        _MESSAGE_MAINTENANCE_SOURCE_WATERMARK = 0
+    elif rows:
+        _MESSAGE_MAINTENANCE_SOURCE_WATERMARK = int(rows[-1].id)
+    return rows
+
+
+def _load_message_source_rows(
+    db: Session,
+    messages: list,
+) -> tuple[dict[tuple[str, str, str], object], set[int]]:
+    """按 source_type 分组，每组一条 IN 查询取回来源记录。
+
+    返回 ((module, type, source_id) -> row, 已处置的首件记录 ID 集合)。
+    """
+    source_ids_by_key: dict[tuple[str, str], set[str]] = {}
+    for msg in messages:
+        registry_key = (
+            (msg.source_module or "").strip(),
+            (msg.source_type or "").strip(),
         )
+        source_id = (msg.source_id or "").strip()
+        if registry_key not in _MESSAGE_SOURCE_MODEL_REGISTRY or not source_id:
+            continue
+        source_ids_by_key.setdefault(registry_key, set()).add(source_id)
+
+    rows_by_source: dict[tuple[str, str, str], object] = {}
+    first_article_record_ids: list[int] = []
+    for registry_key, source_ids in source_ids_by_key.items():
+        entry = _MESSAGE_SOURCE_MODEL_REGISTRY[registry_key]
+        id_attr = getattr(entry.model, entry.id_attr, None)
+        if id_attr is None:
+            continue
+        if entry.id_attr == "id":
+            lookup_values: list[object] = sorted(
+                {int(value) for value in source_ids if value.isdigit()}
+            )
+        else:
+            lookup_values = sorted(source_ids)
+        if not lookup_values:
+            continue
+        for row in db.execute(select(entry.model).where(id_attr.in_(lookup_values))).scalars():
+            source_id = str(getattr(row, entry.id_attr))
+            rows_by_source[(registry_key[0], registry_key[1], source_id)] = row
+            if registry_key == ("quality", "first_article_record"):
+                first_article_record_ids.append(int(row.id))
+    disposed_record_ids = _first_article_disposition_record_ids(
+        db, first_article_record_ids
+    )
+    return rows_by_source, disposed_record_ids
+
+
+def _message_state_audit_entry(
+    msg,
+    *,
+    action_code: str,
+    action_name: str,
+    previous_status: str,
+    current_status: str,
+    reason: str,
+) -> dict[str, object]:
+    source_fields = {
+        "source_module": msg.source_module,
+        "source_type": msg.source_type,
+        "source_id": msg.source_id,
+    }
+    return {
+        "action_code": action_code,
+        "action_name": action_name,
+        "target_type": "message",
+        "target_id": str(msg.id),
+        "target_name": msg.title,
+        "before_data": {"status": previous_status, **source_fields},
+        "after_data": {"status": current_status, **source_fields},
+        "remark": reason,
+    }
+
+
+def _bulk_update_message_status(db: Session, message_ids: list[int], status: str) -> None:
+    if not message_ids:
+        return
+    db.execute(
+        update(Message)
+        .where(Message.id.in_(message_ids))
+        .values(status=status)
+        .execution_options(synchronize_session="fetch")
+    )
 
 
 def run_message_maintenance(
     db: Session,
     *,
     now: datetime | None = None,
+    batch_size: int = _MESSAGE_MAINTENANCE_BATCH_SIZE,
 ) -> dict[str, int]:
     current_time = now or datetime.now(UTC)
     _sync_pending_registration_request_messages(db)
@@ -1310,112 +1812,233 @@ def run_message_maintenance(
         "source_unavailable_updated": 0,
         "archived_messages": 0,
     }
-    messages = db.execute(select(Message)).scalars().all()
     archive_before = current_time - timedelta(days=_MESSAGE_RETENTION_DAYS)
-    changed = False
-    for msg in messages:
-        if msg.status == "active" and not _message_source_is_actionable(db, msg):
-            previous_status = msg.status
-            msg.status = _MESSAGE_STATUS_SOURCE_UNAVAILABLE
-            stats["source_unavailable_updated"] += 1
-            _write_message_state_audit_log(
-                db,
-                message=msg,
+    audit_entries: list[dict[str, object]] = []
+    unavailable_ids: list[int] = []
+    archived_ids: list[int] = []
+
+    # 1) 来源失效：只检查当前批次内“有效且绑定来源”的消息，来源按类型批量查询。
+    candidates = _load_active_source_bound_messages(db, batch_size=batch_size)
+    rows_by_source, disposed_record_ids = _load_message_source_rows(db, candidates)
+    for msg in candidates:
+        source_key = (
+            (msg.source_module or "").strip(),
+            (msg.source_type or "").strip(),
+            (msg.source_id or "").strip(),
+        )
+        row = rows_by_source.get(source_key)
+        has_disposition = (
+            row is not None
+            and source_key[:2] == ("quality", "first_article_record")
+            and int(row.id) in disposed_record_ids
+        )
+        if _source_row_is_actionable(msg, row, has_disposition=has_disposition):
+            continue
+        stats["source_unavailable_updated"] += 1
+        audit_entries.append(
+            _message_state_audit_entry(
+                msg,
                 action_code="message.source_unavailable",
                 action_name="消息来源失效",
-                previous_status=previous_status,
-                current_status=msg.status,
+                previous_status=msg.status,
+                current_status=_MESSAGE_STATUS_SOURCE_UNAVAILABLE,
                 reason="source_record_missing_deleted_or_processed",
             )
-            changed = True
-        if msg.status in {
-            _MESSAGE_STATUS_SOURCE_UNAVAILABLE,
-            _PUBLIC_MESSAGE_STATUS_SOURCE_UNAVAILABLE,
-        }:
-            reference_time = msg.updated_at or msg.created_at or current_time
-            if reference_time <= archive_before:
-                previous_status = msg.status
-                msg.status = "archived"
-                stats["archived_messages"] += 1
-                _write_message_state_audit_log(
-                    db,
-                    message=msg,
+        )
+        # 沿用旧语义：以失效前的最后更新时间判断是否已超过保留期。
+        reference_time = msg.updated_at or msg.created_at or current_time
+        if reference_time <= archive_before:
+            stats["archived_messages"] += 1
+            archived_ids.append(int(msg.id))
+            audit_entries.append(
+                _message_state_audit_entry(
+                    msg,
                     action_code="message.archived",
                     action_name="消息归档",
-                    previous_status=previous_status,
-                    current_status=msg.status,
+                    previous_status=_MESSAGE_STATUS_SOURCE_UNAVAILABLE,
+                    current_status="archived",
                     reason="source_unavailable_retention_expired",
                 )
-                changed = True
-        if msg.expires_at is not None and msg.expires_at <= current_time:
-            reference_time = msg.expires_at
-            if reference_time <= archive_before and msg.status != "archived":
-                previous_status = msg.status
-                msg.status = "archived"
-                stats["archived_messages"] += 1
-                _write_message_state_audit_log(
-                    db,
-                    message=msg,
-                    action_code="message.archived",
-                    action_name="消息归档",
-                    previous_status=previous_status,
-                    current_status=msg.status,
-                    reason="message_retention_expired",
-                )
-                changed = True
-    if changed:
+            )
+        else:
+            unavailable_ids.append(int(msg.id))
+
+    # 2) 来源失效且超过保留期的消息归档（走 status + updated_at 索引）。
+    stale_rows = db.execute(
+        select(*_message_maintenance_columns())
+        .where(
+            Message.status.in_(
+                [
+                    _MESSAGE_STATUS_SOURCE_UNAVAILABLE,
+                    _PUBLIC_MESSAGE_STATUS_SOURCE_UNAVAILABLE,
+                ]
+            ),
+            Message.updated_at <= archive_before,
+        )
+        .order_by(Message.id.asc())
+        .limit(batch_size)
+    ).all()
+    handled_ids = set(archived_ids) | set(unavailable_ids)
+    for msg in stale_rows:
+        if int(msg.id) in handled_ids:
+            continue
+        handled_ids.add(int(msg.id))
+        stats["archived_messages"] += 1
+        archived_ids.append(int(msg.id))
+        audit_entries.append(
+            _message_state_audit_entry(
+                msg,
+                action_code="message.archived",
+                action_name="消息归档",
+                previous_status=msg.status,
+                current_status="archived",
+                reason="source_unavailable_retention_expired",
+            )
+        )
+
+    # 3) 过期超过保留期的消息归档（走 expires_at 部分索引）。
+    expired_rows = db.execute(
+        select(*_message_maintenance_columns())
+        .where(
+            Message.expires_at.is_not(None),
+            Message.expires_at <= archive_before,
+            Message.status != "archived",
+        )
+        .order_by(Message.expires_at.asc(), Message.id.asc())
+        .limit(batch_size)
+    ).all()
+    for msg in expired_rows:
+        message_id = int(msg.id)
+        if message_id in archived_ids:
+            continue
+        previous_status = msg.status
+        if message_id in unavailable_ids:
+            unavailable_ids.remove(message_id)
+            previous_status = _MESSAGE_STATUS_SOURCE_UNAVAILABLE
+        stats["archived_messages"] += 1
+        archived_ids.append(message_id)
+        audit_entries.append(
+            _message_state_audit_entry(
+                msg,
+                action_code="message.archived",
+                action_name="消息归档",
+                previous_status=previous_status,
+                current_status="archived",
+                reason="message_retention_expired",
+            )
+        )
+
+    _bulk_update_message_status(db, unavailable_ids, _MESSAGE_STATUS_SOURCE_UNAVAILABLE)
+    _bulk_update_message_status(db, archived_ids, "archived")
+    write_audit_logs_bulk(db, entries=audit_entries)
+    if audit_entries:
         db.flush()
     return stats
 
 
-async def retry_failed_message_deliveries(
-    db: Session,
-    *,
-    now: datetime | None = None,
-    limit: int = 100,
-) -> list[int]:
-    from app.services.message_push_service import push_message_created
+def _claimable_pending_recipient_filters(*, lease_before: datetime) -> tuple:
+    """待投递且租约已过期的收件记录；认领子查询与外层 UPDATE 共用，外层重新校验，
+    避免并发认领方在子查询之后抢先续约的记录被再次认领"""
+    return (
+        MessageRecipient.delivery_status == "pending",
+        MessageRecipient.delivery_attempt_count == 0,
+        MessageRecipient.is_deleted.is_(False),
+        or_(
+            MessageRecipient.last_push_at.is_(None),
+            MessageRecipient.last_push_at <= lease_before,
+        ),
+    )
 
-    current_time = now or datetime.now(UTC)
-    recipients = (
-        db.execute(
-            select(MessageRecipient)
+
+def _load_due_failed_recipients(
+    *,
+    now: datetime,
+    limit: int,
+) -> list[tuple[int, int, int]]:
+    # 在线程池内自建会话，不跨线程复用事件循环侧的 Session
+    with SessionLocal() as db:
+        rows = db.execute(
+            select(
+                MessageRecipient.id,
+                MessageRecipient.message_id,
+                MessageRecipient.recipient_user_id,
+            )
             .where(
                 MessageRecipient.delivery_status == "failed",
                 MessageRecipient.next_retry_at.is_not(None),
-                MessageRecipient.next_retry_at <= current_time,
+                MessageRecipient.next_retry_at <= now,
                 MessageRecipient.is_deleted.is_(False),
             )
             .order_by(MessageRecipient.next_retry_at.asc(), MessageRecipient.id.asc())
             .limit(limit)
+        ).all()
+    return [
+        (int(row.id), int(row.message_id), int(row.recipient_user_id)) for row in rows
+    ]
+
+
+def _claim_stale_pending_recipients(
+    *,
+    pending_before: datetime,
+    lease_before: datetime,
+    limit: int,
+) -> list[tuple[int, int, int]]:
+    # SKIP LOCKED：与后台分批推送并发时跳过对方正在认领的行，而不是排队后重复认领
+    candidate_ids = (
+        select(MessageRecipient.id)
+        .where(
+            *_claimable_pending_recipient_filters(lease_before=lease_before),
+            MessageRecipient.created_at <= pending_before,
         )
-        .scalars()
-        .all()
+        .order_by(MessageRecipient.created_at.asc(), MessageRecipient.id.asc())
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
     )
-    retried_ids: list[int] = []
-    for recipient in recipients:
-        message_id = recipient.message_id
-        user_id = recipient.recipient_user_id
-        with SessionLocal() as retry_db:
-            unread = get_unread_count(retry_db, user_id=user_id)
-        delivered, failure_reason, pushed_at = await push_message_created(
-            user_id,
-            message_id,
-            unread,
-        )
-        _mark_recipient_delivery_result(
-            message_id=message_id,
-            user_id=user_id,
-            delivered=delivered,
-            failure_reason=failure_reason,
-            pushed_at=pushed_at,
-        )
-        retried_ids.append(recipient.id)
-    return retried_ids
+    with SessionLocal() as db:
+        rows = db.execute(
+            update(MessageRecipient)
+            .where(
+                MessageRecipient.id.in_(candidate_ids),
+                *_claimable_pending_recipient_filters(lease_before=lease_before),
+            )
+            .values(last_push_at=datetime.now(UTC))
+            .returning(
+                MessageRecipient.id,
+                MessageRecipient.message_id,
+                MessageRecipient.recipient_user_id,
+            )
+            .execution_options(synchronize_session=False)
+        ).all()
+        db.commit()
+    return sorted(
+        (int(row.id), int(row.message_id), int(row.recipient_user_id))
+        for row in rows
+    )
+
+
+async def retry_failed_message_deliveries(
+    *,
+    now: datetime | None = None,
+    limit: int = 100,
+) -> list[int]:
+    current_time = now or datetime.now(UTC)
+    recipients = await asyncio.to_thread(
+        _load_due_failed_recipients,
+        now=current_time,
+        limit=limit,
+    )
+    if not recipients:
+        return []
+    # 维护循环自身会按 next_retry_at 再次捞取，这里不再额外挂进程内重试任务
+    await _deliver_message_created(
+        [(message_id, user_id) for _, message_id, user_id in recipients],
+        schedule_retry=False,
+    )
+    return [recipient_id for recipient_id, _, _ in recipients]
 
 
 async def compensate_pending_message_deliveries(
-    db: Session,
     *,
     now: datetime | None = None,
     limit: int = 100,
@@ -1428,30 +2051,26 @@ async def compensate_pending_message_deliveries(
         else settings.message_delivery_pending_grace_seconds
     )
     pending_before = current_time - timedelta(seconds=max(pending_grace_seconds, 0))
-    recipients = (
-        db.execute(
-            select(MessageRecipient)
-            .where(
-                MessageRecipient.delivery_status == "pending",
-                MessageRecipient.delivery_attempt_count == 0,
-                MessageRecipient.last_push_at.is_(None),
-                MessageRecipient.is_deleted.is_(False),
-                MessageRecipient.created_at <= pending_before,
-            )
-            .order_by(MessageRecipient.created_at.asc(), MessageRecipient.id.asc())
-            .limit(limit)
-        )
-        .scalars()
-        .all()
+    recipients = await asyncio.to_thread(
+        _claim_stale_pending_recipients,
+        pending_before=pending_before,
+        lease_before=current_time
+        - timedelta(seconds=_MESSAGE_DELIVERY_CLAIM_LEASE_SECONDS),
+        limit=limit,
     )
-    compensated_ids: list[int] = []
-    for recipient in recipients:
-        await _push_message_created_for_recipient(
-            recipient.message_id,
-            recipient.recipient_user_id,
-        )
-        compensated_ids.append(recipient.id)
-    return compensated_ids
+    if not recipients:
+        return []
+    await _deliver_message_created(
+        [(message_id, user_id) for _, message_id, user_id in recipients]
+    )
+    return [recipient_id for recipient_id, _, _ in recipients]
+
+
+def _run_message_maintenance_in_session(now: datetime) -> dict[str, int]:
+    with SessionLocal() as db:
+        stats = run_message_maintenance(db, now=now)
+        db.commit()
+    return stats
 
 
 async def run_message_delivery_maintenance_once(
@@ -1460,23 +2079,19 @@ async def run_message_delivery_maintenance_once(
     limit: int = 100,
 ) -> dict[str, int]:
     current_time = now or datetime.now(UTC)
-    with SessionLocal() as db:
-        maintenance_stats = run_message_maintenance(db, now=current_time)
-        db.commit()
-
-    with SessionLocal() as db:
-        pending_ids = await compensate_pending_message_deliveries(
-            db,
-            now=current_time,
-            limit=limit,
-        )
+    maintenance_stats = await asyncio.to_thread(
+        _run_message_maintenance_in_session,
+        current_time,
+    )
 
-    with SessionLocal() as db:
-        retried_ids = await retry_failed_message_deliveries(
-            db,
-            now=current_time,
-            limit=limit,
-        )
+    pending_ids = await compensate_pending_message_deliveries(
+        now=current_time,
+        limit=limit,
+    )
+    retried_ids = await retry_failed_message_deliveries(
+        now=current_time,
+        limit=limit,
+    )
 
     return {
         "pending_compensated": len(pending_ids),
@@ -1518,8 +2133,7 @@ def _push_message_created_async(db: Session, msg: Message) -> None:
         # 同步业务入口不阻塞主请求链路；首次投递留给后续维护链路补偿。
         return
 
-    for uid in recipient_ids:
-        loop.create_task(_push_message_created_for_recipient(msg.id, uid))
+    loop.create_task(_push_message_created_for_recipients(msg.id, recipient_ids))
 
 
 def create_message_for_users(
@@ -1596,26 +2210,25 @@ def _announcement_summary(content: str) -> str:
     return f"{summary[:117]}..."
 
 
-def _resolve_announcement_recipient_user_ids(
-    db: Session,
+def _announcement_recipient_user_stmt(
     *,
     range_type: str,
     role_codes: list[str],
     user_ids: list[int],
-) -> list[int]:
+):
     base_stmt = select(User.id).where(
         User.is_deleted.is_(False),
         User.is_active.is_(True),
     )
     if range_type == "all":
-        stmt = base_stmt.order_by(User.id.asc())
-    elif range_type == "roles":
+        return base_stmt
+    if range_type == "roles":
         normalized_role_codes = sorted(
             {code.strip() for code in role_codes if code and code.strip()}
         )
         if not normalized_role_codes:
             raise ValueError("range_type=roles 时必须选择至少一个角色")
-        stmt = (
+        return (
             base_stmt.join(User.roles)
             .where(
                 Role.code.in_(normalized_role_codes),
@@ -1623,20 +2236,49 @@ def _resolve_announcement_recipient_user_ids(
                 Role.is_deleted.is_(False),
             )
             .distinct()
-            .order_by(User.id.asc())
         )
-    else:
-        normalized_user_ids = sorted(
-            {int(user_id) for user_id in user_ids if int(user_id) > 0}
-        )
-        if not normalized_user_ids:
-            raise ValueError("range_type=users 时必须选择至少一个用户")
-        stmt = base_stmt.where(User.id.in_(normalized_user_ids)).order_by(User.id.asc())
+    normalized_user_ids = sorted(
+        {int(user_id) for user_id in user_ids if int(user_id) > 0}
+    )
+    if not normalized_user_ids:
+        raise ValueError("range_type=users 时必须选择至少一个用户")
+    return base_stmt.where(User.id.in_(normalized_user_ids))
 
-    recipient_user_ids = list(db.execute(stmt).scalars().all())
-    if not recipient_user_ids:
-        raise ValueError("未匹配到可投递的有效用户")
-    return recipient_user_ids
+
+def _insert_message_recipients_from_select(
+    db: Session,
+    *,
+    message_id: int,
+    user_id_stmt,
+    now: datetime,
+) -> int:
+    """INSERT ... SELECT 一次性生成收件记录，不在应用侧逐条构造 ORM 对象"""
+    user_ids = user_id_stmt.subquery()
+    result = db.execute(
+        insert(MessageRecipient).from_select(
+            [
+                "message_id",
+                "recipient_user_id",
+                "delivery_status",
+                "is_read",
+                "is_deleted",
+                "delivery_attempt_count",
+                "created_at",
+                "updated_at",
+            ],
+            select(
+                literal(message_id),
+                user_ids.c.id,
+                literal("pending"),
+                literal(False),
+                literal(False),
+                literal(0),
+                literal(now, DateTime(timezone=True)),
+                literal(now, DateTime(timezone=True)),
+            ).select_from(user_ids),
+        )
+    )
+    return max(int(result.rowcount or 0), 0)
 
 
 def publish_announcement(
@@ -1645,21 +2287,25 @@ def publish_announcement(
     req: AnnouncementPublishRequest,
     operator: User,
 ) -> AnnouncementPublishResult:
+    """发布公告：消息与收件记录在同一事务内写入（不提交），推送由调用方在提交后
+    通过 fan_out_message_deliveries 分批异步完成。"""
     title = _normalize_announcement_text(req.title, field_name="title")
     content = _normalize_announcement_text(req.content, field_name="content")
     priority = _normalize_announcement_priority(req.priority)
     range_type = _normalize_announcement_range_type(req.range_type)
-    if req.expires_at is not None and req.expires_at <= datetime.now(UTC):
+    now = datetime.now(UTC)
+    if req.expires_at is not None and req.expires_at <= now:
         raise ValueError("expires_at 必须晚于当前时间")
 
-    recipient_user_ids = _resolve_announcement_recipient_user_ids(
-        db,
+    user_id_stmt = _announcement_recipient_user_stmt(
         range_type=range_type,
         role_codes=req.role_codes,
         user_ids=req.user_ids,
     )
-    message = create_message_for_users(
-        db,
+    # 先确认有可投递用户再写消息；失败时不触碰调用方事务，由调用方决定回滚
+    if not db.execute(select(user_id_stmt.exists())).scalar():
+        raise ValueError("未匹配到可投递的有效用户")
+    message = Message(
         message_type="announcement",
         priority=priority,
         title=title,
@@ -1669,13 +2315,114 @@ def publish_announcement(
         source_type="announcement",
         source_id=str(operator.id),
         source_code=range_type,
-        recipient_user_ids=recipient_user_ids,
+        status="active",
+        published_at=now,
         expires_at=req.expires_at,
         created_by_user_id=operator.id,
     )
+    db.add(message)
+    db.flush()
+    recipient_count = _insert_message_recipients_from_select(
+        db,
+        message_id=message.id,
+        user_id_stmt=user_id_stmt,
+        now=now,
+    )
+    if recipient_count <= 0:
+        # 校验与插入之间用户恰好被停用：消息行已写入当前事务，调用方不提交即随之丢弃
+        raise ValueError("未匹配到可投递的有效用户")
     return AnnouncementPublishResult(
         message_id=message.id,
-        recipient_count=len(recipient_user_ids),
+        recipient_count=recipient_count,
+    )
+
+
+def _claim_pending_message_recipients(
+    message_id: int,
+    *,
+    batch_size: int,
+    lease_before: datetime,
+) -> list[tuple[int, int]]:
+    """认领一批待投递收件记录：写入 last_push_at 作为租约，避免与补偿链路重复推送"""
+    claimed_at = datetime.now(UTC)
+    with SessionLocal() as db:
+        candidate_ids = (
+            select(MessageRecipient.id)
+            .where(
+                MessageRecipient.message_id == message_id,
+                *_claimable_pending_recipient_filters(lease_before=lease_before),
+            )
+            .order_by(MessageRecipient.id.asc())
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        rows = db.execute(
+            update(MessageRecipient)
+            .where(
+                MessageRecipient.id.in_(candidate_ids),
+                *_claimable_pending_recipient_filters(lease_before=lease_before),
+            )
+            .values(last_push_at=claimed_at)
+            .returning(MessageRecipient.message_id, MessageRecipient.recipient_user_id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        db.commit()
+    return [(int(row.message_id), int(row.recipient_user_id)) for row in rows]
+
+
+async def fan_out_message_deliveries(message_id: int) -> int:
+    """分批认领并推送某条消息的全部待投递收件人，返回本次推送人数。
+
+    每批大小由 message_delivery_batch_size 控制，批内并发受
+    message_delivery_push_concurrency 约束；进度可通过
+    get_message_delivery_progress 查询。
+    """
+    batch_size = max(1, settings.message_delivery_batch_size)
+    lease_before = datetime.now(UTC) - timedelta(
+        seconds=_MESSAGE_DELIVERY_CLAIM_LEASE_SECONDS
+    )
+    pushed_count = 0
+    while True:
+        pairs = await asyncio.to_thread(
+            _claim_pending_message_recipients,
+            message_id,
+            batch_size=batch_size,
+            lease_before=lease_before,
+        )
+        if not pairs:
+            break
+        await _deliver_message_created(pairs)
+        pushed_count += len(pairs)
+    if pushed_count:
+        logger.info("[MSG_PUSH] 消息 %s 分批推送完成，共 %s 人。", message_id, pushed_count)
+    return pushed_count
+
+
+def get_message_delivery_progress(
+    db: Session,
+    *,
+    message_id: int,
+) -> AnnouncementDeliveryProgress:
+    """按投递状态分组统计某条消息的推送进度（单条 GROUP BY 查询）"""
+    rows = db.execute(
+        select(MessageRecipient.delivery_status, func.count())
+        .where(
+            MessageRecipient.message_id == message_id,
+            MessageRecipient.is_deleted.is_(False),
+        )
+        .group_by(MessageRecipient.delivery_status)
+    ).all()
+    counts = {str(status): int(count) for status, count in rows}
+    recipient_count = sum(counts.values())
+    pending_count = counts.get("pending", 0)
+    return AnnouncementDeliveryProgress(
+        message_id=message_id,
+        recipient_count=recipient_count,
+        pending_count=pending_count,
+        delivered_count=counts.get("delivered", 0),
+        failed_count=counts.get("failed", 0),
+        completed=recipient_count > 0 and pending_count == 0,
     )
 
 
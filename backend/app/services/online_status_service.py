@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import logging
+import threading
 import time
 from datetime import UTC, datetime, timedelta
 
@@ -22,8 +23,20 @@ _ONLINE_REDIS_INIT = False
 _ONLINE_REDIS_DISABLED_UNTIL = 0.0
 _ONLINE_REDIS_BACKOFF_SECONDS = 30.0
 
-# Redis key prefix: "mes:online:{user_id}" → value = last_seen timestamp (int)
-_ONLINE_KEY_PREFIX = "mes:online"
+# Sorted set: member = user_id, score = last_seen epoch seconds.
+# 窗口内查询走 ZRANGEBYSCORE / ZCOUNT（O(log N)），不再 KEYS 扫描整个 keyspace。
+_ONLINE_PRESENCE_KEY = "mes:online_presence"
+# 旧版逐用户 SETEX 的 key 前缀，仅 clear_user 兼容清理；旧 key 会按 TTL 自然过期
+_LEGACY_ONLINE_KEY_PREFIX = "mes:online"
+
+# 每个 worker 进程内合并 touch：同一用户在最小间隔内只写一次，批量 ZADD 落到 Redis
+_ONLINE_TOUCH_LOCK = threading.Lock()
+_ONLINE_PENDING_TOUCHES: dict[int, float] = {}
+_ONLINE_LAST_WRITTEN: dict[int, float] = {}
+_ONLINE_FLUSH_TIMER: threading.Timer | None = None
+_ONLINE_LAST_TRIM_AT = 0.0
+_ONLINE_TRIM_INTERVAL_SECONDS = 60.0
+_ONLINE_LAST_WRITTEN_MAX_SIZE = 50_000
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -80,44 +93,114 @@ def _mark_online_redis_unavailable() -> None:
 
 
 # ─────────────────────────────────────────────────────────────────────────────
-# Redis key helpers
+# Presence helpers
 # ─────────────────────────────────────────────────────────────────────────────
 
-def _online_key(user_id: int) -> str:
-    return f"{_ONLINE_KEY_PREFIX}:{user_id}"
+def _legacy_online_key(user_id: int) -> str:
+    return f"{_LEGACY_ONLINE_KEY_PREFIX}:{user_id}"
 
 
-# ─────────────────────────────────────────────────────────────────────────────
-# Online status API
-# ─────────────────────────────────────────────────────────────────────────────
+def _online_window_start(now: float | None = None) -> float:
+    return (now if now is not None else time.time()) - settings.online_status_ttl_seconds
 
-def touch_user(user_id: int) -> None:
-    """Refresh the user's online TTL in Redis (TTL = online_status_ttl_seconds).
 
-    Redis automatically expires the key after TTL with no heartbeat needed.
-    """
-    if user_id <= 0:
+def _touch_min_interval_seconds() -> float:
+    # 合并间隔必须明显小于在线窗口，否则活跃用户会在两次写入之间被判离线
+    return min(
+        float(max(settings.online_status_touch_min_interval_seconds, 0)),
+        settings.online_status_ttl_seconds / 3,
+    )
+
+
+def _schedule_flush_locked() -> None:
+    global _ONLINE_FLUSH_TIMER
+    if _ONLINE_FLUSH_TIMER is not None:
         return
+    timer = threading.Timer(
+        max(settings.online_status_flush_interval_seconds, 0.05),
+        flush_pending_touches,
+    )
+    timer.daemon = True
+    _ONLINE_FLUSH_TIMER = timer
+    timer.start()
+
+
+def _maybe_trim_presence(redis_client: Redis, now: float) -> None:
+    """定期删除窗口外的成员，控制有序集合规模"""
+    global _ONLINE_LAST_TRIM_AT
+    if now - _ONLINE_LAST_TRIM_AT < _ONLINE_TRIM_INTERVAL_SECONDS:
+        return
+    _ONLINE_LAST_TRIM_AT = now
+    redis_client.zremrangebyscore(_ONLINE_PRESENCE_KEY, "-inf", f"({_online_window_start(now)}")
+
+
+def flush_pending_touches() -> int:
+    """把本进程累积的 touch 以一次 ZADD 写入；返回写入的用户数"""
+    global _ONLINE_FLUSH_TIMER
+    with _ONLINE_TOUCH_LOCK:
+        _ONLINE_FLUSH_TIMER = None
+        pending = dict(_ONLINE_PENDING_TOUCHES)
+        _ONLINE_PENDING_TOUCHES.clear()
+    if not pending:
+        return 0
     redis_client = _get_online_redis_client()
     if redis_client is None:
-        return
-    key = _online_key(user_id)
+        return 0
     try:
-        redis_client.setex(key, settings.online_status_ttl_seconds, str(int(time.time())))
+        redis_client.zadd(
+            _ONLINE_PRESENCE_KEY,
+            {str(user_id): last_seen for user_id, last_seen in pending.items()},
+        )
+        _maybe_trim_presence(redis_client, time.time())
     except RedisError:
         _mark_online_redis_unavailable()
+        with _ONLINE_TOUCH_LOCK:
+            for user_id in pending:
+                _ONLINE_LAST_WRITTEN.pop(user_id, None)
+        return 0
+    return len(pending)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Online status API
+# ─────────────────────────────────────────────────────────────────────────────
+
+def touch_user(user_id: int, *, immediate: bool = False) -> None:
+    """Record the user's last-seen time in the presence sorted set.
+
+    普通请求只进入进程内缓冲：同一用户在最小间隔内不重复写，缓冲在
+    online_status_flush_interval_seconds 后批量 ZADD。登录等需要立即可见的场景传 immediate=True。
+    """
+    if user_id <= 0:
+        return
+    now = time.time()
+    with _ONLINE_TOUCH_LOCK:
+        last_written = _ONLINE_LAST_WRITTEN.get(user_id, 0.0)
+        if not immediate and now - last_written < _touch_min_interval_seconds():
+            return
+        if len(_ONLINE_LAST_WRITTEN) >= _ONLINE_LAST_WRITTEN_MAX_SIZE:
+            _ONLINE_LAST_WRITTEN.clear()
+        _ONLINE_LAST_WRITTEN[user_id] = now
+        _ONLINE_PENDING_TOUCHES[user_id] = now
+        if not immediate:
+            _schedule_flush_locked()
+    if immediate:
+        flush_pending_touches()
 
 
 def clear_user(user_id: int) -> None:
     """Force-remove the user from the online set (e.g., on logout)."""
     if user_id <= 0:
         return
+    with _ONLINE_TOUCH_LOCK:
+        _ONLINE_PENDING_TOUCHES.pop(user_id, None)
+        _ONLINE_LAST_WRITTEN.pop(user_id, None)
     redis_client = _get_online_redis_client()
     if redis_client is None:
         return
-    key = _online_key(user_id)
     try:
-        redis_client.delete(key)
+        redis_client.zrem(_ONLINE_PRESENCE_KEY, str(user_id))
+        redis_client.delete(_legacy_online_key(user_id))
     except RedisError:
         pass  # best-effort; DB state is authoritative
 
@@ -126,66 +209,74 @@ def get_user_online_snapshot(user_id: int) -> tuple[bool, datetime | None]:
     """
     Check if a user is currently online.
 
-    Returns (is_online, last_seen_datetime).  Redis TTL auto-expiry is the
-    source of truth — no in-process prune loop is needed.
+    Returns (is_online, last_seen_datetime).  在线 = 最近一次 touch 落在
+    online_status_ttl_seconds 窗口内。
     """
     redis_client = _get_online_redis_client()
     if redis_client is None:
         return False, None
-    key = _online_key(user_id)
     try:
-        value = redis_client.get(key)
-        if value is None:
-            return False, None
-        ts = int(value)
-        return True, datetime.fromtimestamp(ts, tz=UTC)
-    except (RedisError, ValueError):
+        score = redis_client.zscore(_ONLINE_PRESENCE_KEY, str(user_id))
+    except RedisError:
         _mark_online_redis_unavailable()
         return False, None
+    if score is None:
+        return False, None
+    last_seen = float(score)
+    if last_seen < _online_window_start():
+        return False, datetime.fromtimestamp(last_seen, tz=UTC)
+    return True, datetime.fromtimestamp(last_seen, tz=UTC)
 
 
 def list_online_user_ids(candidate_user_ids: list[int] | None = None) -> set[int]:
     """
     Return the set of online user IDs.
 
-    With Redis TTL, a key's absence means the user is offline — no manual
-    timestamp comparison needed.  This function queries Redis directly.
+    不带候选时 ZRANGEBYSCORE 取窗口内成员；带候选时 ZMSCORE 一次取回分数。
     """
     redis_client = _get_online_redis_client()
     if redis_client is None:
         return set()
 
+    window_start = _online_window_start()
     if candidate_user_ids is None:
-        # Scan all mes:online:* keys
-        pattern = f"{_ONLINE_KEY_PREFIX}:*"
         try:
-            keys = redis_client.keys(pattern)
-            result: set[int] = set()
-            prefix_len = len(f"{_ONLINE_KEY_PREFIX}:")
-            for key in keys:
-                try:
-                    uid = int(key[prefix_len:])
-                    if uid > 0:
-                        result.add(uid)
-                except (ValueError, IndexError):
-                    pass
-            return result
+            members = redis_client.zrangebyscore(_ONLINE_PRESENCE_KEY, window_start, "+inf")
         except RedisError:
             _mark_online_redis_unavailable()
             return set()
-    else:
-        # Batch-check only requested user IDs
-        pipe = redis_client.pipeline()
-        for uid in candidate_user_ids:
+        result: set[int] = set()
+        for member in members:
+            try:
+                uid = int(member)
+            except (TypeError, ValueError):
+                continue
             if uid > 0:
-                pipe.exists(_online_key(uid))
-        try:
-            exists_list = pipe.execute()
-            return {
-                uid
-                for uid, exists in zip(candidate_user_ids, exists_list, strict=False)
-                if exists and uid > 0
-            }
-        except RedisError:
-            _mark_online_redis_unavailable()
-            return set()
+                result.add(uid)
+        return result
+
+    user_ids = [uid for uid in dict.fromkeys(candidate_user_ids) if uid > 0]
+    if not user_ids:
+        return set()
+    try:
+        scores = redis_client.zmscore(_ONLINE_PRESENCE_KEY, [str(uid) for uid in user_ids])
+    except RedisError:
+        _mark_online_redis_unavailable()
+        return set()
+    return {
+        uid
+        for uid, score in zip(user_ids, scores, strict=False)
+        if score is not None and float(score) >= window_start
+    }
+
+
+def count_online_users() -> int:
+    """在线人数：ZCOUNT 窗口计数，O(log N)"""
+    redis_client = _get_online_redis_client()
+    if redis_client is None:
+        return 0
+    try:
+        return int(redis_client.zcount(_ONLINE_PRESENCE_KEY, _online_window_start(), "+inf"))
+    except RedisError:
+        _mark_online_redis_unavailable()
+        return 0
@@ -4,7 +4,7 @@ import json
 from dataclasses import dataclass, field
 from datetime import UTC, date, datetime
 
-from sqlalchemy import select
+from sqlalchemy import select, text
 from sqlalchemy.orm import Session, selectinload
 
 from app.core.config import settings
@@ -43,6 +43,7 @@ STABLE_FIRST_ARTICLE_TEMPLATE_NAME = "PERF-FA-TPL-STD-01"
 STABLE_ORDER_CODE = "PERF-ORDER-OPEN-01"
 STABLE_VERIFICATION_CODE = "VC-654321"
 RUNTIME_ORDER_PREFIX = "PERF-RUN-"
+STATISTICS_ORDER_PREFIX = "PERF-STATS-"
 
 
 @dataclass(slots=True)
@@ -54,6 +55,14 @@ class ProductionCraftSampleSeedResult:
     run_scoped_refs: list[str] = field(default_factory=list)
 
 
+@dataclass(slots=True)
+class ProductionStatisticsSampleSeedResult:
+    order_code_prefix: str
+    order_count: int
+    order_process_count: int
+    record_count: int
+
+
 def _now_utc() -> datetime:
     return datetime.now(UTC)
 
@@ -789,3 +798,162 @@ def reset_runtime_samples(
     db.commit()
     if restore_strategy == "rebuild":
         db.expire_all()
+
+
+# 订单状态按 n % 4 轮转：pending / in_progress / completed / in_progress，
+# 创建时间在 days 天内均匀回溯，便于日期窗口筛选命中一部分样本。
+_STATISTICS_ORDER_SEED_SQL = text(
+    """
+    INSERT INTO mes_order (
+        order_code, product_id, supplier_id, quantity, status, current_process_code,
+        pipeline_enabled, pipeline_process_codes, created_by_user_id,
+        created_at, updated_at
+    )
+    SELECT
+        :prefix || lpad(n::text, 8, '0'),
+        :product_id,
+        :supplier_id,
+        :order_quantity,
+        CASE n % 4
+            WHEN 0 THEN 'pending'
+            WHEN 2 THEN 'completed'
+            ELSE 'in_progress'
+        END,
+        :process_code,
+        false,
+        '',
+        :operator_user_id,
+        :now - (n % :days) * interval '1 day',
+        :now - (n % :days) * interval '1 day'
+    FROM generate_series(1, :order_count) AS n
+    """
+)
+
+_STATISTICS_PROCESS_SEED_SQL = text(
+    """
+    INSERT INTO mes_order_process (
+        order_id, process_id, stage_id, stage_code, stage_name, process_code,
+        process_name, process_order, status, visible_quantity, completed_quantity,
+        created_at, updated_at
+    )
+    SELECT
+        o.id,
+        p.process_id,
+        :stage_id,
+        :stage_code,
+        :stage_code,
+        p.process_code,
+        p.process_code,
+        p.process_order,
+        CASE
+            WHEN o.status = 'completed' THEN 'completed'
+            WHEN o.status = 'pending' THEN 'pending'
+            WHEN p.process_order = 1 THEN 'partial'
+            ELSE 'pending'
+        END,
+        CASE WHEN p.process_order = 1 OR o.status = 'completed' THEN o.quantity ELSE 0 END,
+        CASE
+            WHEN o.status = 'completed' THEN o.quantity
+            WHEN o.status = 'in_progress' AND p.process_order = 1 THEN o.quantity / 2
+            ELSE 0
+        END,
+        o.created_at,
+        o.created_at
+    FROM mes_order AS o
+    CROSS JOIN (
+        VALUES
+            (1, CAST(:process_id AS integer), CAST(:process_code AS varchar)),
+            (2, CAST(:secondary_process_id AS integer), CAST(:secondary_process_code AS varchar))
+    ) AS p (process_order, process_id, process_code)
+    WHERE o.order_code LIKE :prefix || '%'
+    """
+)
+
+_STATISTICS_RECORD_SEED_SQL = text(
+    """
+    INSERT INTO mes_production_record (
+        order_id, order_process_id, operator_user_id, production_quantity,
+        record_type, created_at, updated_at
+    )
+    SELECT
+        op.order_id,
+        op.id,
+        :operator_user_id,
+        1 + n % 5,
+        'production',
+        op.created_at + n * interval '1 minute',
+        op.created_at + n * interval '1 minute'
+    FROM mes_order_process AS op
+    JOIN mes_order AS o ON o.id = op.order_id
+    CROSS JOIN generate_series(1, :records_per_process) AS n
+    WHERE o.order_code LIKE :prefix || '%'
+    """
+)
+
+
+def build_statistics_order_prefix(run_id: str) -> str:
+    return f"{STATISTICS_ORDER_PREFIX}{run_id}-"
+
+
+def seed_production_statistics_samples(
+    db: Session,
+    *,
+    run_id: str,
+    record_count: int,
+    records_per_order: int = 100,
+    days: int = 90,
+) -> ProductionStatisticsSampleSeedResult:
+    """按规模灌入生产统计压测样本（仅 PostgreSQL）。
+
+    以稳定样本的产品 / 工序 / 管理员为锚点，用 INSERT ... SELECT generate_series
+    批量生成订单、两道工序与生产记录，避免逐行 ORM 写入；record_count 按
+    records_per_order 向上取整到整单。
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        raise ValueError("生产统计压测样本依赖 generate_series，仅支持 PostgreSQL")
+    context = seed_production_craft_samples(db, run_id=run_id).context
+    records_per_process = max(1, records_per_order // 2)
+    order_count = max(1, -(-max(1, record_count) // (records_per_process * 2)))
+    prefix = build_statistics_order_prefix(run_id)
+    reset_production_statistics_samples(db, run_id=run_id)
+
+    params = {
+        "prefix": prefix,
+        "now": _now_utc(),
+        "days": max(1, days),
+        "order_count": order_count,
+        "order_quantity": records_per_process * 5,
+        "records_per_process": records_per_process,
+        "product_id": context["product_id"],
+        "supplier_id": context["supplier_id"],
+        "operator_user_id": context["admin_user_id"],
+        "stage_id": context["stage_id"],
+        "stage_code": context["stage_code"],
+        "process_id": context["process_id"],
+        "process_code": context["process_code"],
+        "secondary_process_id": context["secondary_process_id"],
+        "secondary_process_code": context["secondary_process_code"],
+    }
+    inserted_orders = db.execute(_STATISTICS_ORDER_SEED_SQL, params).rowcount
+    inserted_processes = db.execute(_STATISTICS_PROCESS_SEED_SQL, params).rowcount
+    inserted_records = db.execute(_STATISTICS_RECORD_SEED_SQL, params).rowcount
+    for table_name in ("mes_order", "mes_order_process", "mes_production_record"):
+        db.execute(text(f"ANALYZE {table_name}"))
+    db.commit()
+
+    return ProductionStatisticsSampleSeedResult(
+        order_code_prefix=prefix,
+        order_count=int(inserted_orders or 0),
+        order_process_count=int(inserted_processes or 0),
+        record_count=int(inserted_records or 0),
+    )
+
+
+def reset_production_statistics_samples(db: Session, *, run_id: str) -> int:
+    """删除指定 run_id 的统计压测订单，工序与生产记录随外键级联删除。"""
+    result = db.execute(
+        text("DELETE FROM mes_order WHERE order_code LIKE :prefix || '%'"),
+        {"prefix": build_statistics_order_prefix(run_id)},
+    )
+    db.commit()
+    return int(result.rowcount or 0)
@@ -1,16 +1,15 @@
 from __future__ import annotations
 
-import base64
-import csv
-import io
 import json
+from collections.abc import Iterator
 from dataclasses import dataclass
 from datetime import date, datetime, time, timedelta
 from typing import Any
 
-from sqlalchemy import select
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import DateTime, Select, and_, func, select
+from sqlalchemy.orm import Session, aliased, selectinload
 
+from app.core.config import settings
 from app.core.production_constants import (
     ORDER_STATUS_COMPLETED,
     ORDER_STATUS_IN_PROGRESS,
@@ -24,10 +23,18 @@ from app.core.production_constants import (
 )
 from app.models.order_event_log import OrderEventLog
 from app.models.process_stage import ProcessStage
+from app.models.product import Product
+from app.models.production_daily_rollup import ProductionDailyRollup
 from app.models.production_order import ProductionOrder
 from app.models.production_order_process import ProductionOrderProcess
 from app.models.production_record import ProductionRecord
+from app.models.production_sub_order import ProductionSubOrder
 from app.models.user import User
+from app.services.export_stream_service import (
+    count_statement_rows,
+    encode_csv_base64,
+    iter_rows,
+)
 from app.services.production_event_log_service import add_order_event_log
 
 
@@ -173,81 +180,69 @@ def _date_range_to_datetime(
     )
 
 
-def _load_relevant_records(
-    db: Session,
-    *,
-    start_date: date,
-    end_date: date,
-) -> list[ProductionRecord]:
-    start_at, end_at = _date_range_to_datetime(start_date, end_date)
-    stmt = (
-        select(ProductionRecord)
-        .where(
-            ProductionRecord.record_type == RECORD_TYPE_PRODUCTION,
-            ProductionRecord.created_at >= start_at,
-            ProductionRecord.created_at <= end_at,
+def _record_base_conditions(filters: ProductionDataFilters) -> list[Any]:
+    """时间范围、订单状态与统计口径（主订单只计末道工序）等不随维度筛选变化的条件"""
+    start_at, end_at = _date_range_to_datetime(filters.start_date, filters.end_date)
+    conditions: list[Any] = [
+        ProductionRecord.record_type == RECORD_TYPE_PRODUCTION,
+        ProductionRecord.created_at >= start_at,
+        ProductionRecord.created_at <= end_at,
+    ]
+    if filters.order_status:
+        conditions.append(ProductionOrder.status == filters.order_status)
+    if filters.stat_mode == STAT_MODE_MAIN_ORDER:
+        last_process = aliased(ProductionOrderProcess)
+        last_process_order = (
+            select(func.max(last_process.process_order))
+            .where(last_process.order_id == ProductionRecord.order_id)
+            .correlate(ProductionRecord)
+            .scalar_subquery()
         )
-        .options(
-            selectinload(ProductionRecord.order).selectinload(ProductionOrder.product),
-            selectinload(ProductionRecord.order_process),
-            selectinload(ProductionRecord.operator),
-            selectinload(ProductionRecord.sub_order),
+        conditions.append(ProductionOrderProcess.process_order == last_process_order)
+    return conditions
+
+
+def _record_dimension_conditions(filters: ProductionDataFilters) -> list[Any]:
+    conditions: list[Any] = []
+    if filters.product_ids:
+        conditions.append(ProductionOrder.product_id.in_(sorted(filters.product_ids)))
+    if filters.stage_ids:
+        conditions.append(
+            func.coalesce(ProductionOrderProcess.stage_id, 0).in_(
+                sorted(filters.stage_ids)
+            )
         )
-        .order_by(ProductionRecord.created_at.asc(), ProductionRecord.id.asc())
-        .limit(1000)
-    )
-    return db.execute(stmt).scalars().all()
+    if filters.process_ids:
+        conditions.append(
+            ProductionOrderProcess.process_id.in_(sorted(filters.process_ids))
+        )
+    if filters.operator_user_ids:
+        conditions.append(
+            ProductionRecord.operator_user_id.in_(sorted(filters.operator_user_ids))
+        )
+    return conditions
 
 
-def _build_last_process_order_map(
-    db: Session,
-    *,
-    order_ids: set[int],
-) -> dict[int, int]:
-    if not order_ids:
-        return {}
-    rows = db.execute(
-        select(
-            ProductionOrderProcess.order_id, ProductionOrderProcess.process_order
-        ).where(ProductionOrderProcess.order_id.in_(order_ids))
-    ).all()
-    result: dict[int, int] = {}
-    for order_id, process_order in rows:
-        current = result.get(int(order_id))
-        if current is None or int(process_order) > current:
-            result[int(order_id)] = int(process_order)
-    return result
+def _record_select(*columns: Any) -> Select:
+    return (
+        select(*columns)
+        .select_from(ProductionRecord)
+        .join(ProductionOrder, ProductionOrder.id == ProductionRecord.order_id)
+        .join(
+            ProductionOrderProcess,
+            ProductionOrderProcess.id == ProductionRecord.order_process_id,
+        )
+    )
 
 
-def _record_matches_common_filters(
-    record: ProductionRecord,
-    *,
+def _filtered_record_select(
     filters: ProductionDataFilters,
-    last_process_order_map: dict[int, int],
-) -> bool:
-    order = record.order
-    process = record.order_process
-    if order is None or process is None:
-        return False
-    if filters.order_status and order.status != filters.order_status:
-        return False
-    if filters.product_ids and order.product_id not in filters.product_ids:
-        return False
-    if filters.stage_ids and (process.stage_id or 0) not in filters.stage_ids:
-        return False
-    if filters.process_ids and process.process_id not in filters.process_ids:
-        return False
-    if (
-        filters.operator_user_ids
-        and record.operator_user_id not in filters.operator_user_ids
-    ):
-        return False
-    if filters.stat_mode == STAT_MODE_MAIN_ORDER:
-        max_order = last_process_order_map.get(order.id)
-        if max_order is None:
-            return False
-        return process.process_order == max_order
-    return True
+    *columns: Any,
+) -> Select:
+    return _record_select(*columns).where(
+        *_record_base_conditions(filters),
+        *_record_dimension_conditions(filters),
+    )
 
 
 def _format_datetime_text(value: datetime | None) -> str:
@@ -257,105 +252,119 @@ def _format_datetime_text(value: datetime | None) -> str:
     return local.strftime("%Y-%m-%d %H:%M:%S")
 
 
-def _build_today_realtime_overview(
-    rows: list[ProductionRecord],
+def _load_today_status_overview(
+    db: Session,
     *,
-    stat_mode: str,
+    filters: ProductionDataFilters,
 ) -> dict[str, int]:
     overview = {
         "pending_count": 0,
         "in_progress_count": 0,
         "completed_count": 0,
-        "finished_quantity": 0,
     }
-    overview["finished_quantity"] = int(
-        sum(int(row.production_quantity or 0) for row in rows)
-    )
-
-    if stat_mode == STAT_MODE_MAIN_ORDER:
-        order_status_by_id: dict[int, str] = {}
-        for row in rows:
-            order = row.order
-            if order is None:
-                continue
-            order_status_by_id[order.id] = order.status
-        for status in order_status_by_id.values():
-            if status == ORDER_STATUS_PENDING:
-                overview["pending_count"] += 1
-            elif status == ORDER_STATUS_IN_PROGRESS:
-                overview["in_progress_count"] += 1
-            elif status == ORDER_STATUS_COMPLETED:
-                overview["completed_count"] += 1
-        return overview
-
-    sub_order_status_by_id: dict[int, str] = {}
-    for row in rows:
-        sub_order = row.sub_order
-        if sub_order is None:
-            continue
-        sub_order_status_by_id[sub_order.id] = sub_order.status
-    for status in sub_order_status_by_id.values():
-        if status == SUB_ORDER_STATUS_PENDING:
-            overview["pending_count"] += 1
-        elif status == SUB_ORDER_STATUS_IN_PROGRESS:
-            overview["in_progress_count"] += 1
-        elif status == SUB_ORDER_STATUS_DONE:
-            overview["completed_count"] += 1
+    if filters.stat_mode == STAT_MODE_MAIN_ORDER:
+        stmt = _filtered_record_select(
+            filters,
+            ProductionOrder.status,
+            func.count(func.distinct(ProductionOrder.id)),
+        ).group_by(ProductionOrder.status)
+        status_keys = {
+            ORDER_STATUS_PENDING: "pending_count",
+            ORDER_STATUS_IN_PROGRESS: "in_progress_count",
+            ORDER_STATUS_COMPLETED: "completed_count",
+        }
+    else:
+        stmt = (
+            _filtered_record_select(
+                filters,
+                ProductionSubOrder.status,
+                func.count(func.distinct(ProductionSubOrder.id)),
+            )
+            .join(
+                ProductionSubOrder,
+                ProductionSubOrder.id == ProductionRecord.sub_order_id,
+            )
+            .group_by(ProductionSubOrder.status)
+        )
+        status_keys = {
+            SUB_ORDER_STATUS_PENDING: "pending_count",
+            SUB_ORDER_STATUS_IN_PROGRESS: "in_progress_count",
+            SUB_ORDER_STATUS_DONE: "completed_count",
+        }
+    for status, count in db.execute(stmt).all():
+        key = status_keys.get(str(status))
+        if key is not None:
+            overview[key] += int(count or 0)
     return overview
 
 
+def _load_today_product_rows(
+    db: Session,
+    *,
+    filters: ProductionDataFilters,
+) -> list[Any]:
+    """当日按产品汇总产量与最近报工时间；日汇总在报工事务内维护，可直接读当天的汇总行"""
+    product_name = func.coalesce(Product.name, "")
+    if _rollup_readable(filters):
+        quantity_sum = func.coalesce(
+            func.sum(ProductionDailyRollup.production_quantity), 0
+        )
+        return db.execute(
+            select(
+                ProductionDailyRollup.product_id,
+                product_name.label("product_name"),
+                quantity_sum.label("quantity"),
+                func.max(ProductionDailyRollup.last_production_at).label("latest_time"),
+            )
+            .outerjoin(Product, Product.id == ProductionDailyRollup.product_id)
+            .where(
+                *_rollup_conditions(filters),
+                *_rollup_dimension_conditions(filters),
+            )
+            .group_by(ProductionDailyRollup.product_id, Product.name)
+            .order_by(
+                quantity_sum.desc(),
+                product_name.asc(),
+                ProductionDailyRollup.product_id.asc(),
+            )
+        ).all()
+
+    quantity_sum = func.coalesce(func.sum(ProductionRecord.production_quantity), 0)
+    return db.execute(
+        _filtered_record_select(
+            filters,
+            ProductionOrder.product_id,
+            product_name.label("product_name"),
+            quantity_sum.label("quantity"),
+            func.max(ProductionRecord.created_at).label("latest_time"),
+        )
+        .outerjoin(Product, Product.id == ProductionOrder.product_id)
+        .group_by(ProductionOrder.product_id, Product.name)
+        .order_by(
+            quantity_sum.desc(),
+            product_name.asc(),
+            ProductionOrder.product_id.asc(),
+        )
+    ).all()
+
+
 def get_today_realtime_data(
     db: Session,
     *,
     filters: ProductionDataFilters,
 ) -> dict[str, Any]:
-    rows = _load_relevant_records(
-        db,
-        start_date=filters.start_date,
-        end_date=filters.end_date,
-    )
-    order_ids = {row.order_id for row in rows}
-    last_process_order_map = _build_last_process_order_map(db, order_ids=order_ids)
-
-    matched_rows: list[ProductionRecord] = []
-    product_bucket: dict[int, dict[str, Any]] = {}
-    for row in rows:
-        if not _record_matches_common_filters(
-            row,
-            filters=filters,
-            last_process_order_map=last_process_order_map,
-        ):
-            continue
-        order = row.order
-        if order is None:
-            continue
-        matched_rows.append(row)
-        product = order.product
-        product_name = product.name if product else ""
-        bucket = product_bucket.get(order.product_id)
-        if bucket is None:
-            bucket = {
-                "product_id": order.product_id,
-                "product_name": product_name,
-                "quantity": 0,
-                "latest_time": None,
-            }
-            product_bucket[order.product_id] = bucket
-        bucket["quantity"] = int(bucket["quantity"]) + int(row.production_quantity or 0)
-        previous_latest = bucket.get("latest_time")
-        if previous_latest is None or (
-            row.created_at and row.created_at > previous_latest
-        ):
-            bucket["latest_time"] = row.created_at
+    product_rows = _load_today_product_rows(db, filters=filters)
 
-    table_rows = sorted(
-        product_bucket.values(),
-        key=lambda item: (
-            -int(item["quantity"]),
-            str(item["product_name"]),
-            int(item["product_id"]),
-        ),
-    )
+    table_rows = [
+        {
+            "product_id": int(row.product_id),
+            "product_name": str(row.product_name or ""),
+            "quantity": int(row.quantity or 0),
+            "latest_time": row.latest_time,
+            "latest_time_text": _format_datetime_text(row.latest_time),
+        }
+        for row in product_rows
+    ]
     chart_data = [
         {
             "label": str(item["product_name"]),
@@ -364,15 +373,12 @@ def get_today_realtime_data(
         for item in table_rows
     ]
     total_quantity = int(sum(int(item["quantity"]) for item in table_rows))
-    for item in table_rows:
-        item["latest_time_text"] = _format_datetime_text(item.get("latest_time"))
+    overview = _load_today_status_overview(db, filters=filters)
+    overview["finished_quantity"] = total_quantity
 
     return {
         "stat_mode": filters.stat_mode,
-        "overview": _build_today_realtime_overview(
-            matched_rows,
-            stat_mode=filters.stat_mode,
-        ),
+        "overview": overview,
         "summary": {
             "total_products": len(table_rows),
             "total_quantity": total_quantity,
@@ -532,100 +538,213 @@ def get_unfinished_progress_data(
     }
 
 
-def _build_manual_rows(
-    rows: list[ProductionRecord],
+def _manual_rows_statement(filters: ProductionDataFilters) -> Select:
+    # 主订单口径按订单聚合（只计末道工序）；子订单口径按 订单 × 工序 × 操作员 聚合
+    group_columns: list[Any] = [
+        ProductionOrder.id,
+        ProductionOrder.order_code,
+        ProductionOrder.product_id,
+        Product.name,
+        ProductionOrder.status,
+        ProductionOrderProcess.id,
+        ProductionOrderProcess.stage_id,
+        ProductionOrderProcess.stage_code,
+        ProductionOrderProcess.stage_name,
+        ProductionOrderProcess.process_id,
+        ProductionOrderProcess.process_code,
+        ProductionOrderProcess.process_name,
+    ]
+    sub_order_mode = filters.stat_mode != STAT_MODE_MAIN_ORDER
+    if sub_order_mode:
+        group_columns.extend([ProductionRecord.operator_user_id, User.username])
+    production_time = func.max(ProductionRecord.created_at)
+    stmt = (
+        _filtered_record_select(
+            filters,
+            *group_columns,
+            func.coalesce(func.sum(ProductionRecord.production_quantity), 0).label(
+                "quantity"
+            ),
+            production_time.label("production_time"),
+        )
+        .outerjoin(Product, Product.id == ProductionOrder.product_id)
+        .group_by(*group_columns)
+        .order_by(
+            production_time.desc(),
+            ProductionOrder.order_code.desc(),
+            ProductionOrderProcess.process_code.desc(),
+            ProductionOrder.id.desc(),
+        )
+    )
+    if sub_order_mode:
+        stmt = stmt.outerjoin(User, User.id == ProductionRecord.operator_user_id)
+    return stmt
+
+
+def _manual_row_payload(row: Any, *, sub_order_mode: bool) -> dict[str, Any]:
+    mapping = row._mapping
+    return {
+        "order_id": int(mapping[ProductionOrder.id]),
+        "order_code": mapping[ProductionOrder.order_code],
+        "product_id": mapping[ProductionOrder.product_id],
+        "product_name": mapping[Product.name] or "",
+        "stage_id": mapping[ProductionOrderProcess.stage_id],
+        "stage_code": mapping[ProductionOrderProcess.stage_code],
+        "stage_name": mapping[ProductionOrderProcess.stage_name],
+        "process_id": mapping[ProductionOrderProcess.process_id],
+        "process_code": mapping[ProductionOrderProcess.process_code],
+        "process_name": mapping[ProductionOrderProcess.process_name],
+        "operator_user_id": (
+            mapping[ProductionRecord.operator_user_id] if sub_order_mode else None
+        ),
+        "operator_username": (
+            (mapping[User.username] or "") if sub_order_mode else ""
+        ),
+        "quantity": int(mapping["quantity"] or 0),
+        "production_time": mapping["production_time"],
+        "order_status": mapping[ProductionOrder.status],
+    }
+
+
+def _load_manual_rows(
+    db: Session,
     *,
     filters: ProductionDataFilters,
-    last_process_order_map: dict[int, int],
 ) -> list[dict[str, Any]]:
-    if filters.stat_mode == STAT_MODE_MAIN_ORDER:
-        grouped: dict[int, dict[str, Any]] = {}
-        for row in rows:
-            if not _record_matches_common_filters(
-                row,
-                filters=filters,
-                last_process_order_map=last_process_order_map,
-            ):
-                continue
-            order = row.order
-            process = row.order_process
-            if order is None or process is None:
-                continue
+    sub_order_mode = filters.stat_mode != STAT_MODE_MAIN_ORDER
+    return [
+        _manual_row_payload(row, sub_order_mode=sub_order_mode)
+        for row in db.execute(_manual_rows_statement(filters)).all()
+    ]
+
+
+def _rollup_readable(filters: ProductionDataFilters) -> bool:
+    # 日汇总表不含订单状态维度，带订单状态筛选时仍扫明细
+    return settings.production_rollup_read_enabled and not filters.order_status
+
+
+def _rollup_conditions(filters: ProductionDataFilters) -> list[Any]:
+    return [
+        ProductionDailyRollup.stat_mode == filters.stat_mode,
+        ProductionDailyRollup.stat_date >= filters.start_date,
+        ProductionDailyRollup.stat_date <= filters.end_date,
+    ]
+
+
+def _rollup_dimension_conditions(filters: ProductionDataFilters) -> list[Any]:
+    conditions: list[Any] = []
+    if filters.product_ids:
+        conditions.append(
+            ProductionDailyRollup.product_id.in_(sorted(filters.product_ids))
+        )
+    if filters.stage_ids:
+        conditions.append(ProductionDailyRollup.stage_id.in_(sorted(filters.stage_ids)))
+    if filters.process_ids:
+        conditions.append(
+            ProductionDailyRollup.process_id.in_(sorted(filters.process_ids))
+        )
+    if filters.operator_user_ids:
+        conditions.append(
+            ProductionDailyRollup.operator_user_id.in_(
+                sorted(filters.operator_user_ids)
+            )
+        )
+    return conditions
+
+
+def _load_manual_totals(
+    db: Session,
+    *,
+    filters: ProductionDataFilters,
+) -> tuple[int, int]:
+    """一次查询同时得到 筛选结果产量 与 同时间范围（不含维度筛选）的总产量"""
+    if _rollup_readable(filters):
+        quantity = ProductionDailyRollup.production_quantity
+        dimension_conditions = _rollup_dimension_conditions(filters)
+        filtered_sum = (
+            func.sum(quantity).filter(and_(*dimension_conditions))
+            if dimension_conditions
+            else func.sum(quantity)
+        )
+        row = db.execute(
+            select(
+                func.coalesce(filtered_sum, 0),
+                func.coalesce(func.sum(quantity), 0),
+            ).where(*_rollup_conditions(filters))
+        ).one()
+        return int(row[0] or 0), int(row[1] or 0)
+
+    quantity = ProductionRecord.production_quantity
+    dimension_conditions = _record_dimension_conditions(filters)
+    filtered_sum = (
+        func.sum(quantity).filter(and_(*dimension_conditions))
+        if dimension_conditions
+        else func.sum(quantity)
+    )
+    row = db.execute(
+        _record_select(
+            func.coalesce(filtered_sum, 0),
+            func.coalesce(func.sum(quantity), 0),
+        ).where(*_record_base_conditions(filters))
+    ).one()
+    return int(row[0] or 0), int(row[1] or 0)
+
 
-            bucket = grouped.get(order.id)
-            if bucket is None:
-                bucket = {
-                    "order_id": order.id,
-                    "order_code": order.order_code,
-                    "product_id": order.product_id,
-                    "product_name": order.product.name if order.product else "",
-                    "stage_id": process.stage_id,
-                    "stage_code": process.stage_code,
-                    "stage_name": process.stage_name,
-                    "process_id": process.process_id,
-                    "process_code": process.process_code,
-                    "process_name": process.process_name,
-                    "operator_user_id": None,
-                    "operator_username": "",
-                    "quantity": 0,
-                    "production_time": None,
-                    "order_status": order.status,
-                }
-                grouped[order.id] = bucket
-            bucket["quantity"] = int(bucket["quantity"]) + int(
-                row.production_quantity or 0
+def _load_manual_trend_buckets(
+    db: Session,
+    *,
+    filters: ProductionDataFilters,
+) -> list[tuple[datetime, int]]:
+    if _rollup_readable(filters) and filters.start_date != filters.end_date:
+        # 多日区间按日出图，直接读日汇总；桶时间取本地零点，图表归并时落在同一天
+        rows = db.execute(
+            select(
+                ProductionDailyRollup.stat_date,
+                func.coalesce(func.sum(ProductionDailyRollup.production_quantity), 0),
             )
-            previous_time = bucket.get("production_time")
-            if previous_time is None or (
-                row.created_at and row.created_at > previous_time
-            ):
-                bucket["production_time"] = row.created_at
-        return list(grouped.values())
-
-    grouped_sub: dict[tuple[int, int, int], dict[str, Any]] = {}
-    for row in rows:
-        if not _record_matches_common_filters(
-            row,
-            filters=filters,
-            last_process_order_map=last_process_order_map,
-        ):
-            continue
-        order = row.order
-        process = row.order_process
-        if order is None or process is None:
-            continue
-        key = (order.id, process.id, row.operator_user_id)
-        bucket = grouped_sub.get(key)
-        if bucket is None:
-            bucket = {
-                "order_id": order.id,
-                "order_code": order.order_code,
-                "product_id": order.product_id,
-                "product_name": order.product.name if order.product else "",
-                "stage_id": process.stage_id,
-                "stage_code": process.stage_code,
-                "stage_name": process.stage_name,
-                "process_id": process.process_id,
-                "process_code": process.process_code,
-                "process_name": process.process_name,
-                "operator_user_id": row.operator_user_id,
-                "operator_username": row.operator.username if row.operator else "",
-                "quantity": 0,
-                "production_time": None,
-                "order_status": order.status,
-            }
-            grouped_sub[key] = bucket
-        bucket["quantity"] = int(bucket["quantity"]) + int(row.production_quantity or 0)
-        previous_time = bucket.get("production_time")
-        if previous_time is None or (row.created_at and row.created_at > previous_time):
-            bucket["production_time"] = row.created_at
-    return list(grouped_sub.values())
+            .where(
+                *_rollup_conditions(filters),
+                *_rollup_dimension_conditions(filters),
+            )
+            .group_by(ProductionDailyRollup.stat_date)
+        ).all()
+        return [
+            (datetime.combine(stat_date, time.min).astimezone(), int(quantity or 0))
+            for stat_date, quantity in rows
+        ]
+
+    hour_bucket = _hour_bucket_expression(db)
+    rows = db.execute(
+        _filtered_record_select(
+            filters,
+            hour_bucket.label("bucket"),
+            func.coalesce(func.sum(ProductionRecord.production_quantity), 0),
+        ).group_by(hour_bucket)
+    ).all()
+    return [(_parse_hour_bucket(bucket), int(quantity or 0)) for bucket, quantity in rows]
+
+
+def _hour_bucket_expression(db: Session):
+    if db.get_bind().dialect.name == "postgresql":
+        return func.date_trunc(
+            "hour",
+            ProductionRecord.created_at,
+            type_=DateTime(timezone=True),
+        )
+    # 非 PostgreSQL（单元测试的 SQLite）没有 date_trunc：截到整点的文本，取回后再解析
+    return func.strftime("%Y-%m-%d %H:00:00", ProductionRecord.created_at)
+
+
+def _parse_hour_bucket(bucket: object) -> object:
+    if isinstance(bucket, str):
+        return datetime.fromisoformat(bucket)
+    return bucket
 
 
 def _build_manual_chart_data(
     table_rows: list[dict[str, Any]],
     *,
-    filtered_records: list[ProductionRecord],
+    trend_buckets: list[tuple[datetime, int]],
     start_date: date,
     end_date: date,
 ) -> dict[str, Any]:
@@ -642,20 +761,15 @@ def _build_manual_chart_data(
         )
     ]
 
+    # 数据库按小时聚合，这里只把（至多 24 × 天数 个）小时桶换算到本地时区再归并
     single_day = start_date == end_date
     if single_day:
         hour_counter = {index: 0 for index in range(24)}
-        for record in filtered_records:
-            if not isinstance(record.created_at, datetime):
+        for bucket, quantity in trend_buckets:
+            if not isinstance(bucket, datetime):
                 continue
-            local_time = (
-                record.created_at.astimezone()
-                if record.created_at.tzinfo is not None
-                else record.created_at
-            )
-            hour_counter[int(local_time.hour)] = int(
-                hour_counter[int(local_time.hour)]
-            ) + int(record.production_quantity or 0)
+            local_time = bucket.astimezone() if bucket.tzinfo is not None else bucket
+            hour_counter[int(local_time.hour)] += quantity
         trend_output = [
             {"bucket": f"{hour:02d}:00", "quantity": int(hour_counter[hour])}
             for hour in range(24)
@@ -667,19 +781,13 @@ def _build_manual_chart_data(
             key = cursor.strftime("%Y-%m-%d")
             day_counter[key] = 0
             cursor += timedelta(days=1)
-        for record in filtered_records:
-            if not isinstance(record.created_at, datetime):
+        for bucket, quantity in trend_buckets:
+            if not isinstance(bucket, datetime):
                 continue
-            local_time = (
-                record.created_at.astimezone()
-                if record.created_at.tzinfo is not None
-                else record.created_at
-            )
+            local_time = bucket.astimezone() if bucket.tzinfo is not None else bucket
             key = local_time.strftime("%Y-%m-%d")
             if key in day_counter:
-                day_counter[key] = int(day_counter[key]) + int(
-                    record.production_quantity or 0
-                )
+                day_counter[key] = int(day_counter[key]) + quantity
         trend_output = [
             {"bucket": key, "quantity": int(value)}
             for key, value in sorted(day_counter.items(), key=lambda item: item[0])
@@ -703,63 +811,14 @@ def get_manual_production_data(
     *,
     filters: ProductionDataFilters,
 ) -> dict[str, Any]:
-    rows = _load_relevant_records(
-        db,
-        start_date=filters.start_date,
-        end_date=filters.end_date,
-    )
-    order_ids = {row.order_id for row in rows}
-    last_process_order_map = _build_last_process_order_map(db, order_ids=order_ids)
-    filtered_records = [
-        row
-        for row in rows
-        if _record_matches_common_filters(
-            row,
-            filters=filters,
-            last_process_order_map=last_process_order_map,
-        )
-    ]
-    table_rows = _build_manual_rows(
-        rows,
-        filters=filters,
-        last_process_order_map=last_process_order_map,
-    )
-    table_rows.sort(
-        key=lambda row: (
-            row["production_time"] or datetime.min,
-            str(row["order_code"]),
-            str(row["process_code"]),
-            int(row["order_id"]),
-        ),
-        reverse=True,
-    )
-
+    table_rows = _load_manual_rows(db, filters=filters)
     chart_data = _build_manual_chart_data(
         table_rows,
-        filtered_records=filtered_records,
+        trend_buckets=_load_manual_trend_buckets(db, filters=filters),
         start_date=filters.start_date,
         end_date=filters.end_date,
     )
-    filtered_total = int(sum(int(item.get("quantity", 0) or 0) for item in table_rows))
-
-    broad_filters = ProductionDataFilters(
-        stat_mode=filters.stat_mode,
-        start_date=filters.start_date,
-        end_date=filters.end_date,
-        product_ids=set(),
-        stage_ids=set(),
-        process_ids=set(),
-        operator_user_ids=set(),
-        order_status=filters.order_status,
-    )
-    broad_rows = _build_manual_rows(
-        rows,
-        filters=broad_filters,
-        last_process_order_map=last_process_order_map,
-    )
-    time_range_total = int(
-        sum(int(item.get("quantity", 0) or 0) for item in broad_rows)
-    )
+    filtered_total, time_range_total = _load_manual_totals(db, filters=filters)
     remaining_total = max(time_range_total - filtered_total, 0)
     chart_data["pie_output"] = [
         {"name": "筛选结果", "quantity": filtered_total},
@@ -789,6 +848,123 @@ def get_manual_production_data(
     }
 
 
+MANUAL_EXPORT_HEADERS = [
+    "订单编号",
+    "产品名称",
+    "工段编码",
+    "工段名称",
+    "工序编码",
+    "工序名称",
+    "操作员",
+    "产量",
+    "生产时间",
+    "订单状态",
+    "统计模式",
+]
+
+
+def _manual_export_row(row: dict[str, Any], *, stat_mode: str) -> list[object]:
+    return [
+        str(row.get("order_code") or ""),
+        str(row.get("product_name") or ""),
+        str(row.get("stage_code") or ""),
+        str(row.get("stage_name") or ""),
+        str(row.get("process_code") or ""),
+        str(row.get("process_name") or ""),
+        str(row.get("operator_username") or ""),
+        int(row.get("quantity", 0) or 0),
+        _format_datetime_text(row.get("production_time")),
+        order_status_label(str(row.get("order_status") or "")),
+        "主订单" if stat_mode == STAT_MODE_MAIN_ORDER else "子订单",
+    ]
+
+
+def _log_manual_export(
+    db: Session,
+    *,
+    filters: ProductionDataFilters,
+    operator: User | None,
+    order_ids: set[int],
+    row_count: int,
+) -> None:
+    if not order_ids:
+        return
+    for order_id in order_ids:
+        add_order_event_log(
+            db,
+            order_id=order_id,
+            event_type="production_data_manual_export",
+            event_title="生产数据导出",
+            event_detail="导出手动筛选结果",
+            operator_user_id=operator.id if operator else None,
+            payload={
+                "stat_mode": filters.stat_mode,
+                "start_date": filters.start_date.isoformat(),
+                "end_date": filters.end_date.isoformat(),
+                "product_ids": sorted(filters.product_ids),
+                "stage_ids": sorted(filters.stage_ids),
+                "process_ids": sorted(filters.process_ids),
+                "operator_user_ids": sorted(filters.operator_user_ids),
+                "order_status": filters.order_status or ORDER_STATUS_FILTER_ALL,
+                "rows": row_count,
+            },
+        )
+
+
+def count_manual_export_rows(db: Session, *, filters: ProductionDataFilters) -> int:
+    return count_statement_rows(db, _manual_rows_statement(filters))
+
+
+class ManualExportRows:
+    """手动筛选导出行：服务端游标逐批读取，迭代时记下涉及的订单与行数
+
+    只读不写，可以挂在只读副本会话上；导出日志由调用方写完文件后经 record_manual_export 记到主库。
+    """
+
+    def __init__(self, db: Session, *, filters: ProductionDataFilters) -> None:
+        self.db = db
+        self.filters = filters
+        self.order_ids: set[int] = set()
+        self.row_count = 0
+
+    def __iter__(self) -> Iterator[list[object]]:
+        sub_order_mode = self.filters.stat_mode != STAT_MODE_MAIN_ORDER
+        for row in iter_rows(self.db, _manual_rows_statement(self.filters)):
+            payload = _manual_row_payload(row, sub_order_mode=sub_order_mode)
+            self.order_ids.add(int(payload["order_id"]))
+            self.row_count += 1
+            yield _manual_export_row(payload, stat_mode=self.filters.stat_mode)
+
+
+def record_manual_export(
+    db: Session,
+    *,
+    operator: User | None,
+    rows: ManualExportRows,
+) -> None:
+    """导出完成后在主库记订单事件日志，不提交，由调用方统一提交"""
+    _log_manual_export(
+        db,
+        filters=rows.filters,
+        operator=operator,
+        order_ids=rows.order_ids,
+        row_count=rows.row_count,
+    )
+
+
+def iter_manual_export_rows(
+    db: Session,
+    *,
+    filters: ProductionDataFilters,
+    operator: User | None,
+) -> Iterator[list[object]]:
+    """流式导出手动筛选结果：全部输出后再在同一（主库）会话记导出日志"""
+    rows = ManualExportRows(db, filters=filters)
+    yield from rows
+    record_manual_export(db, operator=operator, rows=rows)
+    db.commit()
+
+
 def export_manual_production_data_csv(
     db: Session,
     *,
@@ -797,71 +973,23 @@ def export_manual_production_data_csv(
 ) -> dict[str, Any]:
     payload = get_manual_production_data(db, filters=filters)
     rows = payload["table_rows"]
-
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(
-        [
-            "订单编号",
-            "产品名称",
-            "工段编码",
-            "工段名称",
-            "工序编码",
-            "工序名称",
-            "操作员",
-            "产量",
-            "生产时间",
-            "订单状态",
-            "统计模式",
-        ]
-    )
-    for row in rows:
-        writer.writerow(
-            [
-                str(row.get("order_code") or ""),
-                str(row.get("product_name") or ""),
-                str(row.get("stage_code") or ""),
-                str(row.get("stage_name") or ""),
-                str(row.get("process_code") or ""),
-                str(row.get("process_name") or ""),
-                str(row.get("operator_username") or ""),
-                int(row.get("quantity", 0) or 0),
-                str(row.get("production_time_text") or ""),
-                order_status_label(str(row.get("order_status") or "")),
-                "主订单" if filters.stat_mode == STAT_MODE_MAIN_ORDER else "子订单",
-            ]
-        )
-    content_base64 = base64.b64encode(output.getvalue().encode("utf-8-sig")).decode(
-        "ascii"
+    content_base64 = encode_csv_base64(
+        MANUAL_EXPORT_HEADERS,
+        (_manual_export_row(row, stat_mode=filters.stat_mode) for row in rows),
     )
     file_name = f"production_manual_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
     mime_type = "text/csv"
 
-    unique_order_ids = {
-        int(row.get("order_id")) for row in rows if row.get("order_id") is not None
-    }
-    if unique_order_ids:
-        for order_id in unique_order_ids:
-            add_order_event_log(
-                db,
-                order_id=order_id,
-                event_type="production_data_manual_export",
-                event_title="生产数据导出",
-                event_detail="导出手动筛选结果",
-                operator_user_id=operator.id if operator else None,
-                payload={
-                    "stat_mode": filters.stat_mode,
-                    "start_date": filters.start_date.isoformat(),
-                    "end_date": filters.end_date.isoformat(),
-                    "product_ids": sorted(filters.product_ids),
-                    "stage_ids": sorted(filters.stage_ids),
-                    "process_ids": sorted(filters.process_ids),
-                    "operator_user_ids": sorted(filters.operator_user_ids),
-                    "order_status": filters.order_status or ORDER_STATUS_FILTER_ALL,
-                    "rows": len(rows),
-                },
-            )
-        db.commit()
+    _log_manual_export(
+        db,
+        filters=filters,
+        operator=operator,
+        order_ids={
+            int(row.get("order_id")) for row in rows if row.get("order_id") is not None
+        },
+        row_count=len(rows),
+    )
+    db.commit()
     return {
         "file_name": file_name,
         "mime_type": mime_type,
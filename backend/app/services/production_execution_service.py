@@ -62,6 +62,8 @@ from app.services.production_order_service import (
     list_user_parallel_block_reasons_for_process,
 )
 from app.services.production_repair_service import create_repair_order
+from app.services.production_rollup_service import add_production_records_to_rollup
+from app.services.quality_stats_cache_service import mark_quality_stats_changed
 
 
 def _get_today_verification_code(
@@ -819,6 +821,7 @@ def submit_first_article(
     )
     db.add(first_article_row)
     db.flush()
+    mark_quality_stats_changed(db)
     for participant_user_id in normalized_participant_user_ids:
         db.add(
             FirstArticleParticipant(
@@ -1078,6 +1081,7 @@ def end_production(
     )
     db.add(record_row)
     db.flush()
+    add_production_records_to_rollup(db, record_ids=[record_row.id])
 
     repair_row = None
     if defect_items:
@@ -1,14 +1,12 @@
 from __future__ import annotations
 
-import base64
-import csv
-import io
 import json
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
 from datetime import UTC, date, datetime
 from uuid import uuid4
 
-from sqlalchemy import exists, func, or_, select, update
+from sqlalchemy import Select, exists, func, or_, select, update
 from sqlalchemy.orm import Session, selectinload
 
 from app.core.production_constants import (
@@ -65,6 +63,17 @@ from app.services.assist_authorization_service import (
     ASSIST_STATUS_CONSUMED,
 )
 from app.services.authz_service import has_permission
+from app.services.export_stream_service import (
+    count_statement_rows,
+    encode_csv_base64,
+    iter_scalars,
+)
+from app.services.list_pagination_service import (
+    COUNT_MODE_EXACT,
+    KeysetOrder,
+    count_list_total,
+)
+from app.services.keyword_search_service import keyword_filter
 from app.services.production_event_log_service import add_order_event_log
 
 
@@ -700,9 +709,13 @@ def get_user_parallel_block_reason_for_process(
     normalized_user_id = int(user_id)
     if normalized_user_id <= 0:
         return "用户无效"
-    summaries = occupancy_summaries or _load_user_active_session_summaries(
-        db,
-        user_ids={normalized_user_id},
+    summaries = (
+        occupancy_summaries
+        if occupancy_summaries is not None
+        else _load_user_active_session_summaries(
+            db,
+            user_ids={normalized_user_id},
+        )
     )
     summary = summaries.get(normalized_user_id, {})
     active_session_count = int(summary.get("active_session_count") or 0)
@@ -995,17 +1008,22 @@ def _normalize_my_order_sub_order_visibility(
     *,
     process_row: ProductionOrderProcess,
     sub_order: ProductionSubOrder | None,
+    prefetch: _MyOrderPrefetch | None = None,
 ) -> bool:
     if sub_order is not None and sub_order.status == SUB_ORDER_STATUS_IN_PROGRESS:
         return True
-    process_remaining = get_process_remaining_quantity(
-        db,
-        process_row=process_row,
-    )
-    in_progress_count = get_in_progress_sub_order_count(
-        db,
-        order_process_id=process_row.id,
-    )
+    if prefetch is not None:
+        process_remaining = prefetch.process_remaining_quantity(process_row)
+        in_progress_count = prefetch.in_progress_count(process_row.id)
+    else:
+        process_remaining = get_process_remaining_quantity(
+            db,
+            process_row=process_row,
+        )
+        in_progress_count = get_in_progress_sub_order_count(
+            db,
+            order_process_id=process_row.id,
+        )
     current_sub_order_status = (
         sub_order.status if sub_order is not None else SUB_ORDER_STATUS_PENDING
     )
@@ -1431,35 +1449,34 @@ def update_order_pipeline_mode(
     }
 
 
-def list_orders(
-    db: Session,
+ORDER_LIST_KEYSET = KeysetOrder(
+    columns=((ProductionOrder.updated_at, True), (ProductionOrder.id, True)),
+    row_values=lambda row: (row.updated_at, row.id),
+)
+
+
+def _order_list_statement(
     *,
-    page: int,
-    page_size: int,
     keyword: str | None,
     status: str | None,
-    product_name: str | None = None,
-    pipeline_enabled: bool | None = None,
-    start_date_from: date | None = None,
-    start_date_to: date | None = None,
-    due_date_from: date | None = None,
-    due_date_to: date | None = None,
-) -> tuple[int, list[ProductionOrder]]:
+    product_name: str | None,
+    pipeline_enabled: bool | None,
+    start_date_from: date | None,
+    start_date_to: date | None,
+    due_date_from: date | None,
+    due_date_to: date | None,
+) -> Select:
     stmt = select(ProductionOrder).join(
         Product, Product.id == ProductionOrder.product_id
     )
-    if keyword:
-        like_pattern = f"%{keyword.strip()}%"
-        stmt = stmt.where(
-            or_(
-                ProductionOrder.order_code.ilike(like_pattern),
-                Product.name.ilike(like_pattern),
-            )
-        )
+    keyword_clause = keyword_filter(keyword, ProductionOrder.order_code, Product.name)
+    if keyword_clause is not None:
+        stmt = stmt.where(keyword_clause)
     if status:
         stmt = stmt.where(ProductionOrder.status == status.strip())
-    if product_name:
-        stmt = stmt.where(Product.name.ilike(f"%{product_name.strip()}%"))
+    product_name_clause = keyword_filter(product_name, Product.name)
+    if product_name_clause is not None:
+        stmt = stmt.where(product_name_clause)
     if pipeline_enabled is not None:
         stmt = stmt.where(ProductionOrder.pipeline_enabled == pipeline_enabled)
     if start_date_from:
@@ -1470,20 +1487,56 @@ def list_orders(
         stmt = stmt.where(ProductionOrder.due_date >= due_date_from)
     if due_date_to:
         stmt = stmt.where(ProductionOrder.due_date <= due_date_to)
+    return ORDER_LIST_KEYSET.order_by(stmt)
 
-    stmt = stmt.order_by(ProductionOrder.updated_at.desc(), ProductionOrder.id.desc())
-    total = db.execute(select(func.count()).select_from(stmt.subquery())).scalar_one()
-    offset = (page - 1) * page_size
+
+def _with_order_list_relations(stmt: Select) -> Select:
+    return stmt.options(
+        selectinload(ProductionOrder.product),
+        selectinload(ProductionOrder.created_by),
+        selectinload(ProductionOrder.processes),
+    )
+
+
+def list_orders(
+    db: Session,
+    *,
+    page: int,
+    page_size: int,
+    keyword: str | None,
+    status: str | None,
+    product_name: str | None = None,
+    pipeline_enabled: bool | None = None,
+    start_date_from: date | None = None,
+    start_date_to: date | None = None,
+    due_date_from: date | None = None,
+    due_date_to: date | None = None,
+    cursor: str | None = None,
+    count_mode: str = COUNT_MODE_EXACT,
+) -> tuple[int, list[ProductionOrder]]:
+    """cursor 非空时按 (updated_at, id) 游标取下一页，忽略 page"""
+    stmt = _order_list_statement(
+        keyword=keyword,
+        status=status,
+        product_name=product_name,
+        pipeline_enabled=pipeline_enabled,
+        start_date_from=start_date_from,
+        start_date_to=start_date_to,
+        due_date_from=due_date_from,
+        due_date_to=due_date_to,
+    )
+    total = count_list_total(
+        db,
+        stmt,
+        count_mode=count_mode,
+        table_name=ProductionOrder.__tablename__,
+    )
+    if cursor:
+        paged_stmt = ORDER_LIST_KEYSET.after(stmt, cursor)
+    else:
+        paged_stmt = stmt.offset((page - 1) * page_size)
     rows = (
-        db.execute(
-            stmt.options(
-                selectinload(ProductionOrder.product),
-                selectinload(ProductionOrder.created_by),
-                selectinload(ProductionOrder.processes),
-            )
-            .offset(offset)
-            .limit(page_size)
-        )
+        db.execute(_with_order_list_relations(paged_stmt).limit(page_size))
         .scalars()
         .all()
     )
@@ -2173,6 +2226,205 @@ def _cascade_close_order_relations(
     }
 
 
+@dataclass(slots=True)
+class _MyOrderPrefetch:
+    """我的工单列表的批量预取结果。
+
+    逐行组装时原本每行要单独查待维修数量、在制人数、本轮手工送修数量、
+    并行实例与用户占用情况；这里按工序/子单一次性分组查回，组装时只查字典。
+    """
+
+    pending_repair_by_process_id: dict[int, int] = field(default_factory=dict)
+    in_progress_count_by_process_id: dict[int, int] = field(default_factory=dict)
+    manual_repair_by_process_operator: dict[tuple[int, int], int] = field(
+        default_factory=dict
+    )
+    pipeline_instances_by_sub_order: dict[
+        tuple[int, int], list[ProcessPipelineInstance]
+    ] = field(default_factory=dict)
+    occupancy_summaries: dict[int, dict[str, int | bool]] = field(default_factory=dict)
+
+    def process_remaining_quantity(self, process_row: ProductionOrderProcess) -> int:
+        pending_repair_quantity = max(
+            int(self.pending_repair_by_process_id.get(process_row.id, 0)),
+            0,
+        )
+        return max(
+            int(process_row.visible_quantity)
+            - int(process_row.completed_quantity)
+            - pending_repair_quantity,
+            0,
+        )
+
+    def in_progress_count(self, order_process_id: int) -> int:
+        return max(int(self.in_progress_count_by_process_id.get(order_process_id, 0)), 0)
+
+    def manual_repair_quantity(self, *, order_process_id: int, operator_user_id: int) -> int:
+        return max(
+            int(
+                self.manual_repair_by_process_operator.get(
+                    (order_process_id, operator_user_id), 0
+                )
+            ),
+            0,
+        )
+
+    def active_pipeline_instance(
+        self,
+        *,
+        sub_order_id: int,
+        order_process_id: int,
+    ) -> ProcessPipelineInstance | None:
+        rows = self.pipeline_instances_by_sub_order.get((sub_order_id, order_process_id))
+        if not rows:
+            return None
+        if len(rows) > 1:
+            raise RuntimeError(
+                "Multiple active pipeline instances found for current sub-order"
+            )
+        return rows[0]
+
+
+def _prefetch_my_order_aggregates(
+    db: Session,
+    *,
+    candidates: list[tuple[ProductionOrderProcess, ProductionSubOrder | None, int | None]],
+) -> _MyOrderPrefetch:
+    """candidates 为 (工序行, 子单, 运行期操作员) 列表，查询条数与行数无关"""
+    prefetch = _MyOrderPrefetch()
+    if not candidates:
+        return prefetch
+    process_ids = sorted({int(process_row.id) for process_row, _, _ in candidates})
+
+    for order_process_id, quantity in db.execute(
+        select(
+            RepairOrder.source_order_process_id,
+            func.coalesce(func.sum(RepairOrder.repair_quantity), 0),
+        )
+        .where(
+            RepairOrder.source_order_process_id.in_(process_ids),
+            RepairOrder.status == REPAIR_STATUS_IN_REPAIR,
+        )
+        .group_by(RepairOrder.source_order_process_id)
+    ).all():
+        prefetch.pending_repair_by_process_id[int(order_process_id)] = int(quantity or 0)
+
+    for order_process_id, count in db.execute(
+        select(ProductionSubOrder.order_process_id, func.count())
+        .where(
+            ProductionSubOrder.order_process_id.in_(process_ids),
+            ProductionSubOrder.status == SUB_ORDER_STATUS_IN_PROGRESS,
+        )
+        .group_by(ProductionSubOrder.order_process_id)
+    ).all():
+        prefetch.in_progress_count_by_process_id[int(order_process_id)] = int(count or 0)
+
+    in_progress_pairs = {
+        (int(process_row.id), int(sub_order.operator_user_id))
+        for process_row, sub_order, _ in candidates
+        if sub_order is not None and sub_order.status == SUB_ORDER_STATUS_IN_PROGRESS
+    }
+    if in_progress_pairs:
+        # 与 get_current_cycle_manual_repair_quantity 同口径：
+        # 本轮起点为最近一次有效首件通过时间，只统计其后的手工送修
+        cycle_started_subquery = (
+            select(
+                FirstArticleRecord.order_process_id.label("order_process_id"),
+                FirstArticleRecord.operator_user_id.label("operator_user_id"),
+                func.max(FirstArticleRecord.created_at).label("cycle_started_at"),
+            )
+            .where(
+                FirstArticleRecord.order_process_id.in_(
+                    sorted({pair[0] for pair in in_progress_pairs})
+                ),
+                FirstArticleRecord.operator_user_id.in_(
+                    sorted({pair[1] for pair in in_progress_pairs})
+                ),
+                FirstArticleRecord.result == "passed",
+                FirstArticleRecord.is_cancelled.is_(False),
+            )
+            .group_by(
+                FirstArticleRecord.order_process_id,
+                FirstArticleRecord.operator_user_id,
+            )
+            .subquery()
+        )
+        auto_report_repair_exists = (
+            select(RepairDefectPhenomenon.id).where(
+                RepairDefectPhenomenon.repair_order_id == RepairOrder.id,
+                RepairDefectPhenomenon.production_record_id.is_not(None),
+            )
+        ).exists()
+        for order_process_id, operator_user_id, quantity in db.execute(
+            select(
+                RepairOrder.source_order_process_id,
+                RepairOrder.sender_user_id,
+                func.coalesce(func.sum(RepairOrder.repair_quantity), 0),
+            )
+            .join(
+                cycle_started_subquery,
+                (
+                    cycle_started_subquery.c.order_process_id
+                    == RepairOrder.source_order_process_id
+                )
+                & (cycle_started_subquery.c.operator_user_id == RepairOrder.sender_user_id),
+            )
+            .where(
+                RepairOrder.status == REPAIR_STATUS_IN_REPAIR,
+                RepairOrder.repair_time >= cycle_started_subquery.c.cycle_started_at,
+                ~auto_report_repair_exists,
+            )
+            .group_by(RepairOrder.source_order_process_id, RepairOrder.sender_user_id)
+        ).all():
+            key = (int(order_process_id), int(operator_user_id))
+            if key in in_progress_pairs:
+                prefetch.manual_repair_by_process_operator[key] = int(quantity or 0)
+
+    pipeline_sub_order_ids = sorted(
+        {
+            int(sub_order.id)
+            for process_row, sub_order, _ in candidates
+            if sub_order is not None
+            and is_pipeline_process_selected_for_order(
+                order=process_row.order,
+                process_code=process_row.process_code,
+            )
+        }
+    )
+    if pipeline_sub_order_ids:
+        for instance in (
+            db.execute(
+                select(ProcessPipelineInstance)
+                .where(
+                    ProcessPipelineInstance.sub_order_id.in_(pipeline_sub_order_ids),
+                    ProcessPipelineInstance.is_active.is_(True),
+                )
+                .order_by(ProcessPipelineInstance.id.asc())
+            )
+            .scalars()
+            .all()
+        ):
+            prefetch.pipeline_instances_by_sub_order.setdefault(
+                (int(instance.sub_order_id), int(instance.order_process_id)),
+                [],
+            ).append(instance)
+
+    pending_operator_user_ids = {
+        int(sub_order.operator_user_id)
+        if sub_order is not None
+        else int(runtime_operator_user_id)
+        for _, sub_order, runtime_operator_user_id in candidates
+        if (sub_order is None or sub_order.status == SUB_ORDER_STATUS_PENDING)
+        and (sub_order is not None or runtime_operator_user_id is not None)
+    }
+    if pending_operator_user_ids:
+        prefetch.occupancy_summaries = _load_user_active_session_summaries(
+            db,
+            user_ids=pending_operator_user_ids,
+        )
+    return prefetch
+
+
 def _build_my_order_item(
     db: Session,
     *,
@@ -2187,15 +2439,20 @@ def _build_my_order_item(
     runtime_operator_username: str | None = None,
     can_first_article_override: bool | None = None,
     can_end_production_override: bool | None = None,
+    prefetch: _MyOrderPrefetch | None = None,
 ) -> dict[str, object]:
-    process_remaining = get_process_remaining_quantity(
-        db,
-        process_row=process_row,
-    )
-    active_operator_count = get_in_progress_sub_order_count(
-        db,
-        order_process_id=process_row.id,
-    )
+    if prefetch is not None:
+        process_remaining = prefetch.process_remaining_quantity(process_row)
+        active_operator_count = prefetch.in_progress_count(process_row.id)
+    else:
+        process_remaining = get_process_remaining_quantity(
+            db,
+            process_row=process_row,
+        )
+        active_operator_count = get_in_progress_sub_order_count(
+            db,
+            order_process_id=process_row.id,
+        )
     current_sub_order_status = (
         sub_order.status if sub_order is not None else SUB_ORDER_STATUS_PENDING
     )
@@ -2239,12 +2496,18 @@ def _build_my_order_item(
         and sub_order.status == SUB_ORDER_STATUS_IN_PROGRESS
         and effective_operator_user_id is not None
     ):
-        current_cycle_manual_repair_quantity = get_current_cycle_manual_repair_quantity(
-            db,
-            order_id=order.id,
-            order_process_id=process_row.id,
-            operator_user_id=effective_operator_user_id,
-        )
+        if prefetch is not None:
+            current_cycle_manual_repair_quantity = prefetch.manual_repair_quantity(
+                order_process_id=process_row.id,
+                operator_user_id=effective_operator_user_id,
+            )
+        else:
+            current_cycle_manual_repair_quantity = get_current_cycle_manual_repair_quantity(
+                db,
+                order_id=order.id,
+                order_process_id=process_row.id,
+                operator_user_id=effective_operator_user_id,
+            )
     if is_operator_context:
         sub_order_pending = sub_order is None or sub_order.status == SUB_ORDER_STATUS_PENDING
         sub_order_in_progress = sub_order is not None and sub_order.status == SUB_ORDER_STATUS_IN_PROGRESS
@@ -2253,11 +2516,17 @@ def _build_my_order_item(
             process_code=process_row.process_code,
         )
         if pipeline_process_selected and sub_order is not None:
-            pipeline_instance = get_active_pipeline_instance_for_sub_order(
-                db,
-                sub_order_id=sub_order.id,
-                order_process_id=process_row.id,
-            )
+            if prefetch is not None:
+                pipeline_instance = prefetch.active_pipeline_instance(
+                    sub_order_id=sub_order.id,
+                    order_process_id=process_row.id,
+                )
+            else:
+                pipeline_instance = get_active_pipeline_instance_for_sub_order(
+                    db,
+                    sub_order_id=sub_order.id,
+                    order_process_id=process_row.id,
+                )
         first_article_parallel_block_reason = None
         if sub_order_pending and effective_operator_user_id is not None:
             first_article_parallel_block_reason = get_user_parallel_block_reason_for_process(
@@ -2265,6 +2534,9 @@ def _build_my_order_item(
                 user_id=effective_operator_user_id,
                 process_row=process_row,
                 user_label=effective_operator_username,
+                occupancy_summaries=(
+                    prefetch.occupancy_summaries if prefetch is not None else None
+                ),
             )
         first_article_base = (
             process_row.status
@@ -2395,6 +2667,17 @@ def _build_my_order_item(
     }
 
 
+def _my_order_keyword_filter(keyword: str | None):
+    return keyword_filter(
+        keyword,
+        ProductionOrder.order_code,
+        Product.name,
+        ProductionOrder.supplier_name,
+        ProductionOrderProcess.process_code,
+        ProductionOrderProcess.process_name,
+    )
+
+
 def _collect_my_order_items(
     db: Session,
     *,
@@ -2417,7 +2700,10 @@ def _collect_my_order_items(
         permission_code=PERM_PROD_MY_ORDERS_PROXY,
     )
 
-    items: list[dict[str, object]] = []
+    # (工序行, 子单, 组装参数)：先收集候选行，再批量预取聚合，避免逐行查询
+    candidates: list[
+        tuple[ProductionOrderProcess, ProductionSubOrder | None, dict[str, object]]
+    ] = []
     if view_mode == "proxy":
         if not can_proxy_view:
             raise PermissionError("Current user has no permission for proxy view")
@@ -2437,9 +2723,15 @@ def _collect_my_order_items(
             )
             .options(
                 selectinload(ProductionSubOrder.operator),
+                selectinload(ProductionSubOrder.order_process).selectinload(
+                    ProductionOrderProcess.process
+                ),
                 selectinload(ProductionSubOrder.order_process)
                 .selectinload(ProductionOrderProcess.order)
                 .selectinload(ProductionOrder.product),
+                selectinload(ProductionSubOrder.order_process)
+                .selectinload(ProductionOrderProcess.order)
+                .selectinload(ProductionOrder.processes),
             )
             .order_by(ProductionOrder.updated_at.desc(), ProductionSubOrder.id.desc())
         )
@@ -2449,16 +2741,10 @@ def _collect_my_order_items(
             stmt = stmt.where(
                 ProductionSubOrder.order_process_id == exact_order_process_id
             )
-        if keyword:
-            like_pattern = f"%{keyword.strip()}%"
+        keyword_clause = _my_order_keyword_filter(keyword)
+        if keyword_clause is not None:
             stmt = stmt.join(Product, Product.id == ProductionOrder.product_id).where(
-                or_(
-                    ProductionOrder.order_code.ilike(like_pattern),
-                    Product.name.ilike(like_pattern),
-                    ProductionOrder.supplier_name.ilike(like_pattern),
-                    ProductionOrderProcess.process_code.ilike(like_pattern),
-                    ProductionOrderProcess.process_name.ilike(like_pattern),
-                )
+                keyword_clause
             )
         sub_orders = db.execute(stmt).scalars().all()
         for sub_order in sub_orders:
@@ -2466,22 +2752,16 @@ def _collect_my_order_items(
             order = process_row.order
             if order is None:
                 continue
-            if not _normalize_my_order_sub_order_visibility(
-                db,
-                process_row=process_row,
-                sub_order=sub_order,
-            ):
-                continue
-            items.append(
-                _build_my_order_item(
-                    db,
-                    order=order,
-                    process_row=process_row,
-                    sub_order=sub_order,
-                    is_operator_context=True,
-                    work_view="proxy",
-                    runtime_operator_user_id=proxy_operator.id,
-                    runtime_operator_username=proxy_operator.username,
+            candidates.append(
+                (
+                    process_row,
+                    sub_order,
+                    {
+                        "order": order,
+                        "work_view": "proxy",
+                        "runtime_operator_user_id": proxy_operator.id,
+                        "runtime_operator_username": proxy_operator.username,
+                    },
                 )
             )
     elif view_mode == "assist":
@@ -2496,7 +2776,12 @@ def _collect_my_order_items(
                 selectinload(ProductionAssistAuthorization.order).selectinload(
                     ProductionOrder.product
                 ),
-                selectinload(ProductionAssistAuthorization.order_process),
+                selectinload(ProductionAssistAuthorization.order).selectinload(
+                    ProductionOrder.processes
+                ),
+                selectinload(ProductionAssistAuthorization.order_process).selectinload(
+                    ProductionOrderProcess.process
+                ),
                 selectinload(ProductionAssistAuthorization.target_operator),
             )
             .order_by(
@@ -2510,29 +2795,45 @@ def _collect_my_order_items(
             stmt = stmt.where(
                 ProductionAssistAuthorization.order_process_id == exact_order_process_id
             )
-        assist_rows = db.execute(stmt).scalars().all()
-        for assist_row in assist_rows:
-            order = assist_row.order
-            process_row = assist_row.order_process
-            if order is None or process_row is None:
-                continue
-            if (
-                order.status == ORDER_STATUS_COMPLETED
-                or process_row.status == PROCESS_STATUS_COMPLETED
-            ):
-                continue
-            sub_order = (
+        assist_rows = [
+            assist_row
+            for assist_row in db.execute(stmt).scalars().all()
+            if assist_row.order is not None
+            and assist_row.order_process is not None
+            and assist_row.order.status != ORDER_STATUS_COMPLETED
+            and assist_row.order_process.status != PROCESS_STATUS_COMPLETED
+        ]
+        helper_sub_orders_by_key: dict[tuple[int, int], ProductionSubOrder] = {}
+        if assist_rows:
+            for helper_sub_order in (
                 db.execute(
                     select(ProductionSubOrder)
                     .where(
-                        ProductionSubOrder.order_process_id == process_row.id,
-                        ProductionSubOrder.operator_user_id
-                        == assist_row.helper_user_id,
+                        ProductionSubOrder.order_process_id.in_(
+                            sorted({int(row.order_process_id) for row in assist_rows})
+                        ),
+                        ProductionSubOrder.operator_user_id.in_(
+                            sorted({int(row.helper_user_id) for row in assist_rows})
+                        ),
                     )
                     .options(selectinload(ProductionSubOrder.operator))
+                    .order_by(ProductionSubOrder.id.asc())
                 )
                 .scalars()
-                .first()
+                .all()
+            ):
+                helper_sub_orders_by_key.setdefault(
+                    (
+                        int(helper_sub_order.order_process_id),
+                        int(helper_sub_order.operator_user_id),
+                    ),
+                    helper_sub_order,
+                )
+        for assist_row in assist_rows:
+            order = assist_row.order
+            process_row = assist_row.order_process
+            sub_order = helper_sub_orders_by_key.get(
+                (int(process_row.id), int(assist_row.helper_user_id))
             )
             if keyword:
                 key = keyword.strip().lower()
@@ -2546,24 +2847,18 @@ def _collect_my_order_items(
                 ):
                     continue
 
-            if not _normalize_my_order_sub_order_visibility(
-                db,
-                process_row=process_row,
-                sub_order=sub_order,
-            ):
-                continue
-            items.append(
-                _build_my_order_item(
-                    db,
-                    order=order,
-                    process_row=process_row,
-                    sub_order=sub_order,
-                    is_operator_context=True,
-                    work_view="assist",
-                    assist_authorization_id=assist_row.id,
-                    target_operator_user_id=assist_row.target_operator_user_id,
-                    runtime_operator_user_id=current_user.id,
-                    runtime_operator_username=current_user.username,
+            candidates.append(
+                (
+                    process_row,
+                    sub_order,
+                    {
+                        "order": order,
+                        "work_view": "assist",
+                        "assist_authorization_id": assist_row.id,
+                        "target_operator_user_id": assist_row.target_operator_user_id,
+                        "runtime_operator_user_id": current_user.id,
+                        "runtime_operator_username": current_user.username,
+                    },
                 )
             )
     else:
@@ -2574,7 +2869,13 @@ def _collect_my_order_items(
                 selectinload(ProductionOrderProcess.order).selectinload(
                     ProductionOrder.product
                 ),
-                selectinload(ProductionOrderProcess.sub_orders),
+                selectinload(ProductionOrderProcess.order).selectinload(
+                    ProductionOrder.processes
+                ),
+                selectinload(ProductionOrderProcess.process),
+                selectinload(ProductionOrderProcess.sub_orders).selectinload(
+                    ProductionSubOrder.operator
+                ),
             )
             .where(
                 ProductionOrderProcess.visible_quantity > 0,
@@ -2587,16 +2888,10 @@ def _collect_my_order_items(
             stmt = stmt.where(ProductionOrder.id == exact_order_id)
         if exact_order_process_id is not None:
             stmt = stmt.where(ProductionOrderProcess.id == exact_order_process_id)
-        if keyword:
-            like_pattern = f"%{keyword.strip()}%"
+        keyword_clause = _my_order_keyword_filter(keyword)
+        if keyword_clause is not None:
             stmt = stmt.outerjoin(Product, Product.id == ProductionOrder.product_id).where(
-                or_(
-                    ProductionOrder.order_code.ilike(like_pattern),
-                    Product.name.ilike(like_pattern),
-                    ProductionOrder.supplier_name.ilike(like_pattern),
-                    ProductionOrderProcess.process_code.ilike(like_pattern),
-                    ProductionOrderProcess.process_name.ilike(like_pattern),
-                )
+                keyword_clause
             )
         process_rows = db.execute(stmt).scalars().all()
         user_process_codes = {
@@ -2620,24 +2915,45 @@ def _collect_my_order_items(
                 ),
                 None,
             )
-            if not _normalize_my_order_sub_order_visibility(
+            candidates.append(
+                (
+                    process_row,
+                    sub_order,
+                    {
+                        "order": process_row.order,
+                        "work_view": "own",
+                        "runtime_operator_user_id": current_user.id,
+                        "runtime_operator_username": current_user.username,
+                    },
+                )
+            )
+
+    prefetch = _prefetch_my_order_aggregates(
+        db,
+        candidates=[
+            (process_row, sub_order, item_kwargs.get("runtime_operator_user_id"))
+            for process_row, sub_order, item_kwargs in candidates
+        ],
+    )
+    items: list[dict[str, object]] = []
+    for process_row, sub_order, item_kwargs in candidates:
+        if not _normalize_my_order_sub_order_visibility(
+            db,
+            process_row=process_row,
+            sub_order=sub_order,
+            prefetch=prefetch,
+        ):
+            continue
+        items.append(
+            _build_my_order_item(
                 db,
                 process_row=process_row,
                 sub_order=sub_order,
-            ):
-                continue
-            items.append(
-                _build_my_order_item(
-                    db,
-                    order=process_row.order,
-                    process_row=process_row,
-                    sub_order=sub_order,
-                    is_operator_context=True,
-                    work_view="own",
-                    runtime_operator_user_id=current_user.id,
-                    runtime_operator_username=current_user.username,
-                )
+                is_operator_context=True,
+                prefetch=prefetch,
+                **item_kwargs,
             )
+        )
 
     if (
         order_status is not None
@@ -2758,7 +3074,40 @@ def get_my_order_context(
     return items[0]
 
 
-def export_my_orders_csv(
+MY_ORDER_EXPORT_HEADERS = [
+    "订单编号",
+    "产品型号",
+    "供应商",
+    "工序",
+    "数量概况",
+    "状态",
+    "交货日期",
+    "备注",
+    "工单视角",
+    "操作员",
+    "更新时间",
+]
+
+
+def _my_order_export_row(item: dict[str, object]) -> list[str]:
+    due_date = item.get("due_date")
+    updated_at = item.get("updated_at")
+    return [
+        str(item.get("order_code") or ""),
+        str(item.get("product_name") or ""),
+        str(item.get("supplier_name") or ""),
+        str(item.get("current_process_name") or ""),
+        _my_order_producible_quantity_summary(item),
+        my_order_sub_order_status_label(str(item.get("sub_order_status") or "")),
+        str(due_date) if due_date else "",
+        str(item.get("remark") or ""),
+        _my_order_work_view_label(str(item.get("work_view") or "own")),
+        str(item.get("operator_username") or ""),
+        updated_at.strftime("%Y-%m-%d %H:%M:%S") if updated_at else "",
+    ]
+
+
+def iter_my_order_export_rows(
     db: Session,
     *,
     current_user: User,
@@ -2768,7 +3117,7 @@ def export_my_orders_csv(
     order_status: str | None = None,
     sub_order_status: str | None = None,
     current_process_id: int | None = None,
-) -> dict[str, object]:
+) -> Iterator[list[str]]:
     items = _collect_my_order_items(
         db,
         current_user=current_user,
@@ -2781,55 +3130,148 @@ def export_my_orders_csv(
         exact_order_id=None,
         exact_order_process_id=None,
     )
-    headers = [
-        "订单编号",
-        "产品型号",
-        "供应商",
-        "工序",
-        "数量概况",
-        "状态",
-        "交货日期",
-        "备注",
-        "工单视角",
-        "操作员",
-        "更新时间",
-    ]
-    csv_rows: list[list[str]] = []
     for item in items:
-        due_date = item.get("due_date")
-        updated_at = item.get("updated_at")
-        csv_rows.append(
-            [
-                str(item.get("order_code") or ""),
-                str(item.get("product_name") or ""),
-                str(item.get("supplier_name") or ""),
-                str(item.get("current_process_name") or ""),
-                _my_order_producible_quantity_summary(item),
-                my_order_sub_order_status_label(str(item.get("sub_order_status") or "")),
-                str(due_date) if due_date else "",
-                str(item.get("remark") or ""),
-                _my_order_work_view_label(str(item.get("work_view") or "own")),
-                str(item.get("operator_username") or ""),
-                updated_at.strftime("%Y-%m-%d %H:%M:%S") if updated_at else "",
-            ]
-        )
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(headers)
-    for row in csv_rows:
-        writer.writerow(row)
-    content_b64 = base64.b64encode(output.getvalue().encode("utf-8-sig")).decode(
-        "ascii"
+        yield _my_order_export_row(item)
+
+
+def export_my_orders_csv(
+    db: Session,
+    *,
+    current_user: User,
+    keyword: str | None = None,
+    view_mode: str = "own",
+    proxy_operator_user_id: int | None = None,
+    order_status: str | None = None,
+    sub_order_status: str | None = None,
+    current_process_id: int | None = None,
+) -> dict[str, object]:
+    items = _collect_my_order_items(
+        db,
+        current_user=current_user,
+        keyword=keyword,
+        view_mode=view_mode,
+        proxy_operator_user_id=proxy_operator_user_id,
+        order_status=order_status,
+        sub_order_status=sub_order_status,
+        current_process_id=current_process_id,
+        exact_order_id=None,
+        exact_order_process_id=None,
     )
+    csv_rows = [_my_order_export_row(item) for item in items]
     file_name = f"my_orders_{datetime.now(UTC).strftime('%Y%m%d%H%M%S')}.csv"
     return {
         "file_name": file_name,
         "mime_type": "text/csv",
-        "content_base64": content_b64,
+        "content_base64": encode_csv_base64(MY_ORDER_EXPORT_HEADERS, csv_rows),
         "exported_count": len(csv_rows),
     }
 
 
+ORDER_EXPORT_HEADERS = [
+    "订单号",
+    "产品名称",
+    "产品版本",
+    "数量",
+    "当前状态",
+    "当前工序",
+    "工艺模板",
+    "模板版本",
+    "并行模式",
+    "开始日期",
+    "交期",
+    "创建人",
+    "更新时间",
+]
+
+
+def _order_export_row(row: ProductionOrder) -> list[object]:
+    process_rows = sorted(row.processes, key=lambda item: (item.process_order, item.id))
+    current_process = next(
+        (item for item in process_rows if item.status != PROCESS_STATUS_COMPLETED),
+        None,
+    )
+    if current_process is None and row.current_process_code:
+        current_process = next(
+            (
+                item
+                for item in process_rows
+                if item.process_code == row.current_process_code
+            ),
+            None,
+        )
+    return [
+        row.order_code,
+        row.product.name if row.product else "",
+        row.product_version or "",
+        row.quantity,
+        order_status_label(row.status),
+        current_process.process_name if current_process else "",
+        row.process_template_name or "",
+        row.process_template_version or "",
+        pipeline_mode_label(bool(row.pipeline_enabled)),
+        str(row.start_date) if row.start_date else "",
+        str(row.due_date) if row.due_date else "",
+        row.created_by.username if row.created_by else "",
+        row.updated_at.strftime("%Y-%m-%d %H:%M:%S") if row.updated_at else "",
+    ]
+
+
+def iter_order_export_rows(
+    db: Session,
+    *,
+    keyword: str | None = None,
+    status: str | None = None,
+    product_name: str | None = None,
+    pipeline_enabled: bool | None = None,
+    start_date_from: date | None = None,
+    start_date_to: date | None = None,
+    due_date_from: date | None = None,
+    due_date_to: date | None = None,
+) -> Iterator[list[object]]:
+    """流式导出：服务端游标逐批读取订单，不设行数上限"""
+    stmt = _with_order_list_relations(
+        _order_list_statement(
+            keyword=keyword,
+            status=status,
+            product_name=product_name,
+            pipeline_enabled=pipeline_enabled,
+            start_date_from=start_date_from,
+            start_date_to=start_date_to,
+            due_date_from=due_date_from,
+            due_date_to=due_date_to,
+        )
+    )
+    for row in iter_scalars(db, stmt):
+        yield _order_export_row(row)
+
+
+def count_order_export_rows(
+    db: Session,
+    *,
+    keyword: str | None = None,
+    status: str | None = None,
+    product_name: str | None = None,
+    pipeline_enabled: bool | None = None,
+    start_date_from: date | None = None,
+    start_date_to: date | None = None,
+    due_date_from: date | None = None,
+    due_date_to: date | None = None,
+) -> int:
+    return count_statement_rows(
+        db,
+        _order_list_statement(
+            keyword=keyword,
+            status=status,
+            product_name=product_name,
+            pipeline_enabled=pipeline_enabled,
+            start_date_from=start_date_from,
+            start_date_to=start_date_to,
+            due_date_from=due_date_from,
+            due_date_to=due_date_to,
+        ),
+    )
+
+
 def export_orders_csv(
     db: Session,
     *,
@@ -2855,69 +3297,12 @@ def export_orders_csv(
         due_date_from=due_date_from,
         due_date_to=due_date_to,
     )
-    headers = [
-        "订单号",
-        "产品名称",
-        "产品版本",
-        "数量",
-        "当前状态",
-        "当前工序",
-        "工艺模板",
-        "模板版本",
-        "并行模式",
-        "开始日期",
-        "交期",
-        "创建人",
-        "更新时间",
-    ]
-    csv_rows = []
-    for row in rows:
-        process_rows = sorted(
-            row.processes, key=lambda item: (item.process_order, item.id)
-        )
-        current_process = next(
-            (item for item in process_rows if item.status != PROCESS_STATUS_COMPLETED),
-            None,
-        )
-        if current_process is None and row.current_process_code:
-            current_process = next(
-                (
-                    item
-                    for item in process_rows
-                    if item.process_code == row.current_process_code
-                ),
-                None,
-            )
-        csv_rows.append(
-            [
-                row.order_code,
-                row.product.name if row.product else "",
-                row.product_version or "",
-                row.quantity,
-                order_status_label(row.status),
-                current_process.process_name if current_process else "",
-                row.process_template_name or "",
-                row.process_template_version or "",
-                pipeline_mode_label(bool(row.pipeline_enabled)),
-                str(row.start_date) if row.start_date else "",
-                str(row.due_date) if row.due_date else "",
-                row.created_by.username if row.created_by else "",
-                row.updated_at.strftime("%Y-%m-%d %H:%M:%S") if row.updated_at else "",
-            ]
-        )
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(headers)
-    for r in csv_rows:
-        writer.writerow(r)
-    content_b64 = base64.b64encode(output.getvalue().encode("utf-8-sig")).decode(
-        "ascii"
-    )
+    csv_rows = [_order_export_row(row) for row in rows]
     file_name = f"orders_{datetime.now(UTC).strftime('%Y%m%d%H%M%S')}.csv"
     return {
         "file_name": file_name,
         "mime_type": "text/csv",
-        "content_base64": content_b64,
+        "content_base64": encode_csv_base64(ORDER_EXPORT_HEADERS, csv_rows),
         "exported_count": len(csv_rows),
     }
 
@@ -2942,12 +3327,13 @@ def list_pipeline_instances(
     )
     if order_id is not None:
         stmt = stmt.where(ProcessPipelineInstance.order_id == order_id)
-    if order_code is not None and order_code.strip():
+    order_code_clause = keyword_filter(order_code, ProductionOrder.order_code)
+    if order_code_clause is not None:
         stmt = stmt.join(
             ProductionOrder,
             ProductionOrder.id == ProcessPipelineInstance.order_id,
             isouter=False,
-        ).where(ProductionOrder.order_code.ilike(f"%{order_code.strip()}%"))
+        ).where(order_code_clause)
     if order_process_id is not None:
         stmt = stmt.where(
             ProcessPipelineInstance.order_process_id == order_process_id
@@ -1,15 +1,13 @@
 from __future__ import annotations
 
-import base64
-import csv
-import io
 import json
+from collections.abc import Iterator
 from dataclasses import dataclass
 from datetime import UTC, date, datetime, time
 from typing import Any
 from uuid import uuid4
 
-from sqlalchemy import func, or_, select
+from sqlalchemy import Select, func, or_, select
 from sqlalchemy.orm import Session, selectinload
 
 from app.core.production_constants import (
@@ -42,6 +40,12 @@ from app.services.assist_authorization_service import (
     ASSIST_OP_MANUAL_REPAIR,
     get_usable_assist_authorization_for_operation,
 )
+from app.services.export_stream_service import (
+    count_statement_rows,
+    encode_csv_base64,
+    iter_scalars,
+)
+from app.services.list_pagination_service import KeysetOrder, decode_cursor
 from app.services.production_event_log_service import add_order_event_log
 from app.services.production_order_service import (
     ensure_sub_orders_visible_quantity,
@@ -50,6 +54,7 @@ from app.services.production_order_service import (
     get_runtime_max_producible_quantity,
 )
 from app.services.message_service import create_message_for_users
+from app.services.quality_stats_cache_service import mark_quality_stats_changed
 from app.models.first_article_record import FirstArticleRecord
 
 
@@ -962,6 +967,7 @@ def create_repair_order(
         },
     )
     db.flush()
+    mark_quality_stats_changed(db)
     return repair_row
 
 
@@ -1260,6 +1266,7 @@ def complete_repair_order(
             },
         )
 
+    mark_quality_stats_changed(db)
     db.commit()
     db.refresh(repair_row)
 
@@ -1436,18 +1443,27 @@ def return_repair_order_to_production(
             },
         )
 
+    mark_quality_stats_changed(db)
     db.commit()
     db.refresh(repair_row)
     return repair_row
 
 
+REPAIR_ORDER_LIST_KEYSET = KeysetOrder(
+    columns=((RepairOrder.repair_time, True), (RepairOrder.id, True)),
+    row_values=lambda row: (row.repair_time, row.id),
+)
+
+
 def list_repair_orders(
     db: Session,
     *,
     page: int,
     page_size: int,
     filters: RepairListFilters,
+    cursor: str | None = None,
 ) -> tuple[int, list[RepairAggregateSnapshot]]:
+    """维修单按送修周期聚合后才能排序，游标在聚合结果上按 (repair_time, id) 截取"""
     normalized_status = normalize_repair_status(filters.status)
     _, rows = _list_repair_order_rows(
         db,
@@ -1466,6 +1482,13 @@ def list_repair_orders(
             row for row in aggregate_rows if str(row.status) == normalized_status
         ]
     total = len(aggregate_rows)
+    if cursor:
+        cursor_key = tuple(decode_cursor(cursor, size=2))
+        return total, [
+            row
+            for row in aggregate_rows
+            if (row.repair_time, row.id) < cursor_key
+        ][:page_size]
     offset = max(page - 1, 0) * page_size
     paged_rows = aggregate_rows[offset : offset + page_size]
     return total, paged_rows
@@ -1633,13 +1656,7 @@ def create_manual_repair_order(
     )
 
 
-def list_scrap_statistics(
-    db: Session,
-    *,
-    page: int,
-    page_size: int,
-    filters: ScrapStatisticsFilters,
-) -> tuple[int, list[ProductionScrapStatistics]]:
+def _scrap_statistics_statement(filters: ScrapStatisticsFilters) -> Select:
     normalized_progress = normalize_scrap_progress(filters.progress)
     start_at, end_at = _normalize_date_range(
         start_date=filters.start_date,
@@ -1670,6 +1687,17 @@ def list_scrap_statistics(
         stmt = stmt.where(ProductionScrapStatistics.product_name == product_name)
     if process_code:
         stmt = stmt.where(ProductionScrapStatistics.process_code == process_code)
+    return stmt
+
+
+def list_scrap_statistics(
+    db: Session,
+    *,
+    page: int,
+    page_size: int,
+    filters: ScrapStatisticsFilters,
+) -> tuple[int, list[ProductionScrapStatistics]]:
+    stmt = _scrap_statistics_statement(filters)
     count_stmt = select(func.count()).select_from(stmt.subquery())
     total = db.execute(count_stmt).scalar() or 0
     offset = (page - 1) * page_size
@@ -1686,12 +1714,61 @@ def list_scrap_statistics(
 
 
 def _build_csv_base64(headers: list[str], rows: list[list[Any]]) -> str:
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(headers)
-    for row in rows:
-        writer.writerow(row)
-    return base64.b64encode(output.getvalue().encode("utf-8-sig")).decode("ascii")
+    return encode_csv_base64(headers, rows)
+
+
+SCRAP_STATISTICS_EXPORT_HEADERS = [
+    "订单编号",
+    "产品名称",
+    "工序名称",
+    "报废原因",
+    "报废数量",
+    "最近报废时间",
+    "工序编码",
+    "操作员",
+    "进度",
+    "处理时间",
+]
+
+
+def _scrap_statistics_export_row(row: ProductionScrapStatistics) -> list[Any]:
+    return [
+        row.order_code or "",
+        row.product_name or "",
+        row.process_name or "",
+        row.scrap_reason,
+        int(row.scrap_quantity),
+        row.last_scrap_time.astimezone().strftime("%Y-%m-%d %H:%M:%S")
+        if row.last_scrap_time
+        else "",
+        row.process_code or "",
+        row.operator_username or "",
+        "待处理" if row.progress == SCRAP_PROGRESS_PENDING_APPLY else "已处理",
+        row.applied_at.astimezone().strftime("%Y-%m-%d %H:%M:%S")
+        if row.applied_at
+        else "",
+    ]
+
+
+def iter_scrap_statistics_export_rows(
+    db: Session,
+    *,
+    filters: ScrapStatisticsFilters,
+) -> Iterator[list[Any]]:
+    stmt = _scrap_statistics_statement(filters).order_by(
+        ProductionScrapStatistics.last_scrap_time.desc(),
+        ProductionScrapStatistics.id.desc(),
+    )
+    for row in iter_scalars(db, stmt):
+        yield _scrap_statistics_export_row(row)
+
+
+def count_scrap_statistics_export_rows(
+    db: Session,
+    *,
+    filters: ScrapStatisticsFilters,
+) -> int:
+    return count_statement_rows(db, _scrap_statistics_statement(filters))
 
 
 def export_scrap_statistics_csv(
@@ -1706,40 +1783,9 @@ def export_scrap_statistics_csv(
         page_size=200000,
         filters=filters,
     )
-    csv_rows: list[list[Any]] = []
-    for row in rows:
-        csv_rows.append(
-            [
-                row.order_code or "",
-                row.product_name or "",
-                row.process_name or "",
-                row.scrap_reason,
-                int(row.scrap_quantity),
-                row.last_scrap_time.astimezone().strftime("%Y-%m-%d %H:%M:%S")
-                if row.last_scrap_time
-                else "",
-                row.process_code or "",
-                row.operator_username or "",
-                "待处理" if row.progress == SCRAP_PROGRESS_PENDING_APPLY else "已处理",
-                row.applied_at.astimezone().strftime("%Y-%m-%d %H:%M:%S")
-                if row.applied_at
-                else "",
-            ]
-        )
     content_base64 = _build_csv_base64(
-        [
-            "订单编号",
-            "产品名称",
-            "工序名称",
-            "报废原因",
-            "报废数量",
-            "最近报废时间",
-            "工序编码",
-            "操作员",
-            "进度",
-            "处理时间",
-        ],
-        csv_rows,
+        SCRAP_STATISTICS_EXPORT_HEADERS,
+        [_scrap_statistics_export_row(row) for row in rows],
     )
     return {
         "file_name": f"production_scrap_statistics_{_now_utc().strftime('%Y%m%d_%H%M%S')}.csv",
@@ -1749,58 +1795,55 @@ def export_scrap_statistics_csv(
     }
 
 
-def export_repair_orders_csv(
+REPAIR_ORDER_EXPORT_HEADERS = [
+    "维修单编号",
+    "订单编号",
+    "产品名称",
+    "送修工序编码",
+    "送修工序",
+    "送修人",
+    "维修人",
+    "本次生产数量",
+    "送修数量",
+    "已修复数量",
+    "报废数量",
+    "报废已补充",
+    "维修状态",
+    "送修时间",
+    "完成时间",
+]
+
+
+def _repair_order_export_row(row: RepairAggregateSnapshot) -> list[Any]:
+    return [
+        row.repair_order_code,
+        row.source_order_code or "",
+        row.product_name or "",
+        row.source_process_code,
+        row.source_process_name,
+        row.sender_username or "",
+        row.repair_operator_username or "",
+        _format_repair_production_quantity_display(row),
+        int(row.repair_quantity),
+        int(row.repaired_quantity),
+        int(row.scrap_quantity),
+        "是" if row.scrap_replenished else "否",
+        _repair_status_label(row.status),
+        row.repair_time.astimezone().strftime("%Y-%m-%d %H:%M:%S")
+        if row.repair_time
+        else "",
+        row.completed_at.astimezone().strftime("%Y-%m-%d %H:%M:%S")
+        if row.completed_at
+        else "",
+    ]
+
+
+def _log_repair_orders_export(
     db: Session,
     *,
-    filters: RepairListFilters,
+    rows: list[RepairAggregateSnapshot],
     operator: User,
-) -> dict[str, Any]:
-    _, rows = list_repair_orders(db, page=1, page_size=200000, filters=filters)
-    csv_rows: list[list[Any]] = []
-    for row in rows:
-        csv_rows.append(
-            [
-                row.repair_order_code,
-                row.source_order_code or "",
-                row.product_name or "",
-                row.source_process_code,
-                row.source_process_name,
-                row.sender_username or "",
-                row.repair_operator_username or "",
-                _format_repair_production_quantity_display(row),
-                int(row.repair_quantity),
-                int(row.repaired_quantity),
-                int(row.scrap_quantity),
-                "是" if row.scrap_replenished else "否",
-                _repair_status_label(row.status),
-                row.repair_time.astimezone().strftime("%Y-%m-%d %H:%M:%S")
-                if row.repair_time
-                else "",
-                row.completed_at.astimezone().strftime("%Y-%m-%d %H:%M:%S")
-                if row.completed_at
-                else "",
-            ]
-        )
-    content_base64 = _build_csv_base64(
-        [
-            "维修单编号",
-            "订单编号",
-            "产品名称",
-            "送修工序编码",
-            "送修工序",
-            "送修人",
-            "维修人",
-            "本次生产数量",
-            "送修数量",
-            "已修复数量",
-            "报废数量",
-            "报废已补充",
-            "维修状态",
-            "送修时间",
-            "完成时间",
-        ],
-        csv_rows,
-    )
+) -> None:
     unique_order_ids = sorted(
         {int(row.source_order_id) for row in rows if row.source_order_id}
     )
@@ -1817,6 +1860,62 @@ def export_repair_orders_csv(
                 "repair_order_ids": [int(row.id) for row in rows],
             },
         )
+
+
+class RepairOrderExportRows:
+    """维修单导出行：首次迭代时按锚点聚合并保留快照，只读不写，可挂在只读副本会话上
+
+    导出日志由调用方写完文件后经 record_repair_orders_export 记到主库。
+    """
+
+    def __init__(self, db: Session, *, filters: RepairListFilters) -> None:
+        self.db = db
+        self.filters = filters
+        self.snapshots: list[RepairAggregateSnapshot] = []
+
+    def __iter__(self) -> Iterator[list[Any]]:
+        _, self.snapshots = list_repair_orders(
+            self.db, page=1, page_size=200000, filters=self.filters
+        )
+        for row in self.snapshots:
+            yield _repair_order_export_row(row)
+
+
+def record_repair_orders_export(
+    db: Session,
+    *,
+    operator: User,
+    rows: RepairOrderExportRows,
+) -> None:
+    """导出完成后在主库记订单事件日志，不提交，由调用方统一提交"""
+    _log_repair_orders_export(db, rows=rows.snapshots, operator=operator)
+
+
+def iter_repair_order_export_rows(
+    db: Session,
+    *,
+    filters: RepairListFilters,
+    operator: User,
+) -> Iterator[list[Any]]:
+    """维修单需在内存中按锚点聚合，这里只把编码与写文件流式化，输出完再在同一（主库）会话记导出日志"""
+    rows = RepairOrderExportRows(db, filters=filters)
+    yield from rows
+    record_repair_orders_export(db, operator=operator, rows=rows)
+    db.commit()
+
+
+def export_repair_orders_csv(
+    db: Session,
+    *,
+    filters: RepairListFilters,
+    operator: User,
+) -> dict[str, Any]:
+    _, rows = list_repair_orders(db, page=1, page_size=200000, filters=filters)
+    content_base64 = _build_csv_base64(
+        REPAIR_ORDER_EXPORT_HEADERS,
+        [_repair_order_export_row(row) for row in rows],
+    )
+    _log_repair_orders_export(db, rows=rows, operator=operator)
     db.commit()
     now = _now_utc()
     return {
@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Any
+
+from sqlalchemy import Date, Select, cast, delete, func, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, aliased
+
+from app.core.production_constants import RECORD_TYPE_PRODUCTION
+from app.models.production_daily_rollup import ProductionDailyRollup
+from app.models.production_order import ProductionOrder
+from app.models.production_order_process import ProductionOrderProcess
+from app.models.production_record import ProductionRecord
+from app.services.production_data_query_service import (
+    STAT_MODE_MAIN_ORDER,
+    STAT_MODE_SUB_ORDER,
+)
+
+
+ROLLUP_KEY_COLUMNS = (
+    "stat_date",
+    "stat_mode",
+    "product_id",
+    "stage_id",
+    "process_id",
+    "operator_user_id",
+)
+ROLLUP_MEASURE_COLUMNS = (
+    "production_quantity",
+    "production_record_count",
+    "last_production_at",
+)
+ROLLUP_STAT_MODES = (STAT_MODE_MAIN_ORDER, STAT_MODE_SUB_ORDER)
+
+
+@dataclass(slots=True)
+class ProductionRollupMismatch:
+    key: dict[str, Any]
+    expected: dict[str, Any]
+    actual: dict[str, Any]
+
+
+def _date_window_conditions(
+    column,
+    *,
+    start_date: date | None,
+    end_date: date | None,
+) -> list[Any]:
+    # 与 CAST(column AS date) 同样按数据库会话时区切日，保证重建区间与汇总日期对齐
+    conditions: list[Any] = []
+    if start_date is not None:
+        conditions.append(column >= datetime.combine(start_date, time.min))
+    if end_date is not None:
+        conditions.append(
+            column < datetime.combine(end_date + timedelta(days=1), time.min)
+        )
+    return conditions
+
+
+def _is_last_process_condition() -> Any:
+    last_process = aliased(ProductionOrderProcess)
+    last_process_order = (
+        select(func.max(last_process.process_order))
+        .where(last_process.order_id == ProductionOrderProcess.order_id)
+        .correlate(ProductionOrderProcess)
+        .scalar_subquery()
+    )
+    return ProductionOrderProcess.process_order == last_process_order
+
+
+def _dimension_columns(
+    stat_date_column,
+    *,
+    stat_mode: str,
+    operator_column,
+) -> list[Any]:
+    return [
+        cast(stat_date_column, Date).label("stat_date"),
+        literal(stat_mode).label("stat_mode"),
+        ProductionOrder.product_id.label("product_id"),
+        func.coalesce(ProductionOrderProcess.stage_id, 0).label("stage_id"),
+        ProductionOrderProcess.process_id.label("process_id"),
+        func.coalesce(operator_column, 0).label("operator_user_id"),
+    ]
+
+
+def _grouped_source(
+    dimension_columns: list[Any],
+    measure_columns: list[Any],
+    *,
+    stat_mode: str,
+    join_from,
+    join_on,
+    conditions: list[Any],
+) -> Select:
+    stmt = (
+        select(*dimension_columns, *measure_columns)
+        .select_from(join_from)
+        .join(ProductionOrderProcess, join_on)
+        .join(ProductionOrder, ProductionOrder.id == ProductionOrderProcess.order_id)
+        .where(*conditions)
+        # 口径列是常量，不参与分组
+        .group_by(*[column for column in dimension_columns if column.name != "stat_mode"])
+    )
+    if stat_mode == STAT_MODE_MAIN_ORDER:
+        stmt = stmt.where(_is_last_process_condition())
+    return stmt
+
+
+def _production_source(stat_mode: str, conditions: list[Any]) -> Select:
+    return _grouped_source(
+        _dimension_columns(
+            ProductionRecord.created_at,
+            stat_mode=stat_mode,
+            operator_column=ProductionRecord.operator_user_id,
+        ),
+        [
+            func.sum(ProductionRecord.production_quantity).label("production_quantity"),
+            func.count(ProductionRecord.id).label("production_record_count"),
+            func.max(ProductionRecord.created_at).label("last_production_at"),
+        ],
+        stat_mode=stat_mode,
+        join_from=ProductionRecord,
+        join_on=ProductionOrderProcess.id == ProductionRecord.order_process_id,
+        conditions=[ProductionRecord.record_type == RECORD_TYPE_PRODUCTION, *conditions],
+    )
+
+
+def _upsert_from_source(db: Session, source: Select) -> int:
+    """把一组已按汇总键分组的增量累加进日汇总表，同键并发写入由 ON CONFLICT 串行化"""
+    table = ProductionDailyRollup.__table__
+    insert_stmt = pg_insert(ProductionDailyRollup).from_select(
+        [*ROLLUP_KEY_COLUMNS, *ROLLUP_MEASURE_COLUMNS],
+        source,
+    )
+    excluded = insert_stmt.excluded
+    result = db.execute(
+        insert_stmt.on_conflict_do_update(
+            constraint="uq_mes_production_daily_rollup_key",
+            set_={
+                "production_quantity": table.c.production_quantity
+                + excluded.production_quantity,
+                "production_record_count": table.c.production_record_count
+                + excluded.production_record_count,
+                "last_production_at": func.greatest(
+                    table.c.last_production_at,
+                    excluded.last_production_at,
+                ),
+                "updated_at": func.now(),
+            },
+        )
+    )
+    return int(result.rowcount or 0)
+
+
+def add_production_records_to_rollup(db: Session, *, record_ids: list[int]) -> None:
+    """报工写入后把对应生产记录累加进日汇总（调用方负责先 flush 并在同一事务内提交）"""
+    if not record_ids:
+        return
+    conditions = [ProductionRecord.id.in_(sorted(set(record_ids)))]
+    for stat_mode in ROLLUP_STAT_MODES:
+        _upsert_from_source(db, _production_source(stat_mode, conditions))
+
+
+def _source_statements(
+    *,
+    start_date: date | None,
+    end_date: date | None,
+) -> list[Select]:
+    production_conditions = _date_window_conditions(
+        ProductionRecord.created_at, start_date=start_date, end_date=end_date
+    )
+    return [
+        _production_source(stat_mode, production_conditions)
+        for stat_mode in ROLLUP_STAT_MODES
+    ]
+
+
+def _rollup_date_conditions(
+    *,
+    start_date: date | None,
+    end_date: date | None,
+) -> list[Any]:
+    conditions: list[Any] = []
+    if start_date is not None:
+        conditions.append(ProductionDailyRollup.stat_date >= start_date)
+    if end_date is not None:
+        conditions.append(ProductionDailyRollup.stat_date <= end_date)
+    return conditions
+
+
+def get_rollup_source_date_range(db: Session) -> tuple[date, date] | None:
+    """源数据覆盖的日期范围，供不带区间参数的全量重建确定起止日"""
+    start_at, end_at = db.execute(
+        select(
+            func.min(ProductionRecord.created_at),
+            func.max(ProductionRecord.created_at),
+        ).where(ProductionRecord.record_type == RECORD_TYPE_PRODUCTION)
+    ).one()
+    if start_at is None or end_at is None:
+        return None
+    # 与 CAST(... AS date) 口径一致：按本地时区取日期，再向两侧各放宽一天兜住时区差
+    return (
+        start_at.astimezone().date() - timedelta(days=1),
+        end_at.astimezone().date() + timedelta(days=1),
+    )
+
+
+def rebuild_production_daily_rollup(
+    db: Session,
+    *,
+    start_date: date,
+    end_date: date,
+) -> int:
+    """删除区间内的汇总行后从源数据重新聚合（不提交，由调用方控制事务粒度）"""
+    if end_date < start_date:
+        raise ValueError("end_date must be greater than or equal to start_date")
+    db.execute(
+        delete(ProductionDailyRollup).where(
+            *_rollup_date_conditions(start_date=start_date, end_date=end_date)
+        )
+    )
+    for statement in _source_statements(start_date=start_date, end_date=end_date):
+        _upsert_from_source(db, statement)
+    return int(
+        db.execute(
+            select(func.count(ProductionDailyRollup.id)).where(
+                *_rollup_date_conditions(start_date=start_date, end_date=end_date)
+            )
+        ).scalar_one()
+    )
+
+
+def _empty_measures() -> dict[str, Any]:
+    return {
+        "production_quantity": 0,
+        "production_record_count": 0,
+        "last_production_at": None,
+    }
+
+
+def _merge_measures(target: dict[str, Any], row: Any) -> None:
+    mapping = row._mapping
+    for column in ("production_quantity", "production_record_count"):
+        target[column] += int(mapping[column] or 0)
+    last_production_at = mapping["last_production_at"]
+    if last_production_at is not None and (
+        target["last_production_at"] is None
+        or last_production_at > target["last_production_at"]
+    ):
+        target["last_production_at"] = last_production_at
+
+
+def check_production_daily_rollup(
+    db: Session,
+    *,
+    start_date: date,
+    end_date: date,
+) -> list[ProductionRollupMismatch]:
+    """对比区间内汇总行与源数据现算结果，返回不一致的汇总键（为空即一致）"""
+    expected: dict[tuple, dict[str, Any]] = {}
+    for statement in _source_statements(start_date=start_date, end_date=end_date):
+        for row in db.execute(statement).all():
+            key = tuple(row._mapping[column] for column in ROLLUP_KEY_COLUMNS)
+            _merge_measures(expected.setdefault(key, _empty_measures()), row)
+
+    actual: dict[tuple, dict[str, Any]] = {}
+    rollup_rows = db.execute(
+        select(
+            *[getattr(ProductionDailyRollup, column) for column in ROLLUP_KEY_COLUMNS],
+            *[getattr(ProductionDailyRollup, column) for column in ROLLUP_MEASURE_COLUMNS],
+        ).where(*_rollup_date_conditions(start_date=start_date, end_date=end_date))
+    ).all()
+    for row in rollup_rows:
+        key = tuple(row._mapping[column] for column in ROLLUP_KEY_COLUMNS)
+        _merge_measures(actual.setdefault(key, _empty_measures()), row)
+
+    mismatches: list[ProductionRollupMismatch] = []
+    for key in sorted(set(expected) | set(actual), key=lambda item: tuple(map(str, item))):
+        expected_measures = expected.get(key, _empty_measures())
+        actual_measures = actual.get(key, _empty_measures())
+        if expected_measures != actual_measures:
+            mismatches.append(
+                ProductionRollupMismatch(
+                    key=dict(zip(ROLLUP_KEY_COLUMNS, key)),
+                    expected=expected_measures,
+                    actual=actual_measures,
+                )
+            )
+    return mismatches
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
-from collections import defaultdict
-from datetime import date
+from datetime import date, timedelta
 
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
@@ -22,41 +21,29 @@ from app.models.production_record import ProductionRecord
 from app.models.user import User
 
 
-def get_overview_stats(
-    db: Session,
+def _date_window_filters(
+    column,
     *,
-    start_date: date | None = None,
-    end_date: date | None = None,
-) -> dict[str, int]:
+    start_date: date | None,
+    end_date: date | None,
+) -> list:
+    # 结束日期按整天包含，与生产数据手动筛选口径一致
     filters = []
     if start_date is not None:
-        filters.append(ProductionOrder.created_at >= start_date)
+        filters.append(column >= start_date)
     if end_date is not None:
-        filters.append(ProductionOrder.created_at < (end_date))
+        filters.append(column < end_date + timedelta(days=1))
+    return filters
 
-    total_orders = db.execute(
-        select(func.count()).select_from(ProductionOrder).where(*filters)
-    ).scalar_one()
-    pending_orders = db.execute(
-        select(func.count())
-        .select_from(ProductionOrder)
-        .where(*filters, ProductionOrder.status == ORDER_STATUS_PENDING)
-    ).scalar_one()
-    in_progress_orders = db.execute(
-        select(func.count())
-        .select_from(ProductionOrder)
-        .where(*filters, ProductionOrder.status == ORDER_STATUS_IN_PROGRESS)
-    ).scalar_one()
-    completed_orders = db.execute(
-        select(func.count())
-        .select_from(ProductionOrder)
-        .where(*filters, ProductionOrder.status == ORDER_STATUS_COMPLETED)
-    ).scalar_one()
-    total_quantity = db.execute(
-        select(func.coalesce(func.sum(ProductionOrder.quantity), 0)).where(*filters)
-    ).scalar_one()
 
-    last_process_subquery = (
+def get_overview_stats(
+    db: Session,
+    *,
+    start_date: date | None = None,
+    end_date: date | None = None,
+) -> dict[str, int]:
+    """订单总览：一次条件聚合（FILTER）同时得到各状态订单数、计划数量与末道工序完工数"""
+    last_process_order = (
         select(
             ProductionOrderProcess.order_id,
             func.max(ProductionOrderProcess.process_order).label("max_process_order"),
@@ -64,17 +51,57 @@ def get_overview_stats(
         .group_by(ProductionOrderProcess.order_id)
         .subquery()
     )
-    finished_quantity = db.execute(
-        select(func.coalesce(func.sum(ProductionOrderProcess.completed_quantity), 0))
+    finished_by_order = (
+        select(
+            ProductionOrderProcess.order_id,
+            func.sum(ProductionOrderProcess.completed_quantity).label(
+                "finished_quantity"
+            ),
+        )
         .join(
-            last_process_subquery,
-            (ProductionOrderProcess.order_id == last_process_subquery.c.order_id)
-            & (ProductionOrderProcess.process_order == last_process_subquery.c.max_process_order),
+            last_process_order,
+            (ProductionOrderProcess.order_id == last_process_order.c.order_id)
+            & (
+                ProductionOrderProcess.process_order
+                == last_process_order.c.max_process_order
+            ),
         )
-        .join(ProductionOrder, ProductionOrder.id == ProductionOrderProcess.order_id)
-        .where(*filters)
-    ).scalar_one()
-
+        .group_by(ProductionOrderProcess.order_id)
+        .subquery()
+    )
+    row = db.execute(
+        select(
+            func.count(ProductionOrder.id),
+            func.count(ProductionOrder.id).filter(
+                ProductionOrder.status == ORDER_STATUS_PENDING
+            ),
+            func.count(ProductionOrder.id).filter(
+                ProductionOrder.status == ORDER_STATUS_IN_PROGRESS
+            ),
+            func.count(ProductionOrder.id).filter(
+                ProductionOrder.status == ORDER_STATUS_COMPLETED
+            ),
+            func.coalesce(func.sum(ProductionOrder.quantity), 0),
+            func.coalesce(func.sum(finished_by_order.c.finished_quantity), 0),
+        )
+        .select_from(ProductionOrder)
+        .outerjoin(finished_by_order, finished_by_order.c.order_id == ProductionOrder.id)
+        .where(
+            *_date_window_filters(
+                ProductionOrder.created_at,
+                start_date=start_date,
+                end_date=end_date,
+            )
+        )
+    ).one()
+    (
+        total_orders,
+        pending_orders,
+        in_progress_orders,
+        completed_orders,
+        total_quantity,
+        finished_quantity,
+    ) = row
     return {
         "total_orders": int(total_orders or 0),
         "pending_orders": int(pending_orders or 0),
@@ -85,80 +112,123 @@ def get_overview_stats(
     }
 
 
-def get_process_stats(db: Session) -> list[dict[str, int | str]]:
-    rows = (
-        db.execute(
-            select(ProductionOrderProcess).order_by(
-                ProductionOrderProcess.process_code.asc(),
-                ProductionOrderProcess.process_order.asc(),
+def get_process_stats(
+    db: Session,
+    *,
+    start_date: date | None = None,
+    end_date: date | None = None,
+) -> list[dict[str, int | str]]:
+    """按工序编码分组，一次条件聚合得到各状态工单数与可见 / 完工数量"""
+    status_column = ProductionOrderProcess.status
+    rows = db.execute(
+        select(
+            ProductionOrderProcess.process_code,
+            func.min(ProductionOrderProcess.process_name),
+            func.count(ProductionOrderProcess.id),
+            func.count(ProductionOrderProcess.id).filter(
+                status_column == PROCESS_STATUS_PENDING
+            ),
+            func.count(ProductionOrderProcess.id).filter(
+                status_column == PROCESS_STATUS_IN_PROGRESS
+            ),
+            func.count(ProductionOrderProcess.id).filter(
+                status_column == PROCESS_STATUS_PARTIAL
+            ),
+            func.count(ProductionOrderProcess.id).filter(
+                status_column == PROCESS_STATUS_COMPLETED
+            ),
+            func.coalesce(func.sum(ProductionOrderProcess.visible_quantity), 0),
+            func.coalesce(func.sum(ProductionOrderProcess.completed_quantity), 0),
+        )
+        .where(
+            *_date_window_filters(
+                ProductionOrderProcess.created_at,
+                start_date=start_date,
+                end_date=end_date,
             )
         )
-        .scalars()
-        .all()
-    )
-
-    grouped: dict[str, dict[str, int | str]] = {}
-    for row in rows:
-        key = row.process_code
-        if key not in grouped:
-            grouped[key] = {
-                "process_code": row.process_code,
-                "process_name": row.process_name,
-                "total_orders": 0,
-                "pending_orders": 0,
-                "in_progress_orders": 0,
-                "partial_orders": 0,
-                "completed_orders": 0,
-                "total_visible_quantity": 0,
-                "total_completed_quantity": 0,
-            }
-        item = grouped[key]
-        item["total_orders"] = int(item["total_orders"]) + 1
-        item["total_visible_quantity"] = int(item["total_visible_quantity"]) + row.visible_quantity
-        item["total_completed_quantity"] = int(item["total_completed_quantity"]) + row.completed_quantity
-        if row.status == PROCESS_STATUS_PENDING:
-            item["pending_orders"] = int(item["pending_orders"]) + 1
-        elif row.status == PROCESS_STATUS_IN_PROGRESS:
-            item["in_progress_orders"] = int(item["in_progress_orders"]) + 1
-        elif row.status == PROCESS_STATUS_PARTIAL:
-            item["partial_orders"] = int(item["partial_orders"]) + 1
-        elif row.status == PROCESS_STATUS_COMPLETED:
-            item["completed_orders"] = int(item["completed_orders"]) + 1
-
-    return list(grouped.values())
-
-
-def get_operator_stats(db: Session) -> list[dict[str, int | str]]:
-    rows = (
-        db.execute(
-            select(ProductionRecord)
-            .where(ProductionRecord.record_type == RECORD_TYPE_PRODUCTION)
-            .order_by(ProductionRecord.created_at.desc(), ProductionRecord.id.desc())
+        .group_by(ProductionOrderProcess.process_code)
+        .order_by(ProductionOrderProcess.process_code.asc())
+    ).all()
+    return [
+        {
+            "process_code": process_code,
+            "process_name": process_name or "",
+            "total_orders": int(total_orders or 0),
+            "pending_orders": int(pending_orders or 0),
+            "in_progress_orders": int(in_progress_orders or 0),
+            "partial_orders": int(partial_orders or 0),
+            "completed_orders": int(completed_orders or 0),
+            "total_visible_quantity": int(total_visible_quantity or 0),
+            "total_completed_quantity": int(total_completed_quantity or 0),
+        }
+        for (
+            process_code,
+            process_name,
+            total_orders,
+            pending_orders,
+            in_progress_orders,
+            partial_orders,
+            completed_orders,
+            total_visible_quantity,
+            total_completed_quantity,
+        ) in rows
+    ]
+
+
+def get_operator_stats(
+    db: Session,
+    *,
+    start_date: date | None = None,
+    end_date: date | None = None,
+) -> list[dict[str, int | str]]:
+    """按 操作员 × 工序 分组统计报工次数与产量，最近报工的分组排在前面"""
+    process_code = func.coalesce(ProductionOrderProcess.process_code, "")
+    last_production_at = func.max(ProductionRecord.created_at)
+    rows = db.execute(
+        select(
+            ProductionRecord.operator_user_id,
+            func.coalesce(func.min(User.username), ""),
+            process_code,
+            func.coalesce(func.min(ProductionOrderProcess.process_name), ""),
+            func.count(ProductionRecord.id),
+            func.coalesce(func.sum(ProductionRecord.production_quantity), 0),
+            last_production_at,
         )
-        .scalars()
-        .all()
-    )
-    user_rows = db.execute(select(User)).scalars().all()
-    username_by_id = {row.id: row.username for row in user_rows}
-
-    grouped: dict[tuple[int, str], dict[str, int | str]] = defaultdict(dict)
-    for row in rows:
-        key = (row.operator_user_id, row.order_process.process_code if row.order_process else "")
-        item = grouped.get(key)
-        if not item:
-            item = {
-                "operator_user_id": row.operator_user_id,
-                "operator_username": username_by_id.get(row.operator_user_id, ""),
-                "process_code": row.order_process.process_code if row.order_process else "",
-                "process_name": row.order_process.process_name if row.order_process else "",
-                "production_records": 0,
-                "production_quantity": 0,
-                "last_production_at": None,
-            }
-            grouped[key] = item
-        item["production_records"] = int(item["production_records"]) + 1
-        item["production_quantity"] = int(item["production_quantity"]) + row.production_quantity
-        if item["last_production_at"] is None:
-            item["last_production_at"] = row.created_at
-
-    return list(grouped.values())
+        .select_from(ProductionRecord)
+        .outerjoin(
+            ProductionOrderProcess,
+            ProductionOrderProcess.id == ProductionRecord.order_process_id,
+        )
+        .outerjoin(User, User.id == ProductionRecord.operator_user_id)
+        .where(
+            ProductionRecord.record_type == RECORD_TYPE_PRODUCTION,
+            *_date_window_filters(
+                ProductionRecord.created_at,
+                start_date=start_date,
+                end_date=end_date,
+            ),
+        )
+        .group_by(ProductionRecord.operator_user_id, process_code)
+        .order_by(last_production_at.desc(), func.max(ProductionRecord.id).desc())
+    ).all()
+    return [
+        {
+            "operator_user_id": int(operator_user_id),
+            "operator_username": operator_username,
+            "process_code": row_process_code,
+            "process_name": process_name,
+            "production_records": int(production_records or 0),
+            "production_quantity": int(production_quantity or 0),
+            "last_production_at": row_last_production_at,
+        }
+        for (
+            operator_user_id,
+            operator_username,
+            row_process_code,
+            process_name,
+            production_records,
+            production_quantity,
+            row_last_production_at,
+        ) in rows
+    ]
@@ -1,19 +1,18 @@
 from __future__ import annotations
 
 import base64
-import copy
 import csv
 import io
-import threading
 from collections import defaultdict
+from collections.abc import Callable, Iterator, Mapping
 from dataclasses import dataclass
 from datetime import UTC, date, datetime, time, timedelta
-from time import monotonic
 from typing import Any
 from uuid import uuid4
 
-from sqlalchemy import exists, func, or_, select
+from sqlalchemy import Row, Select, case, exists, func, or_, select, tuple_
 from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.sql.elements import Label
 
 from app.core.config import (
     production_default_verification_code_is_secure,
@@ -51,7 +50,14 @@ from app.models.repair_cause import RepairCause
 from app.models.repair_order import RepairOrder
 from app.models.repair_defect_phenomenon import RepairDefectPhenomenon
 from app.models.user import User
+from app.services.export_stream_service import encode_csv_base64, iter_paged
 from app.services.production_event_log_service import add_order_event_log
+from app.services.quality_stats_cache_service import (
+    bump_quality_stats_version,
+    freeze_value,
+    get_or_load_quality_stats,
+    mark_quality_stats_changed,
+)
 from app.services.production_repair_service import (
     RepairAggregateSnapshot,
     RepairListFilters,
@@ -59,13 +65,9 @@ from app.services.production_repair_service import (
     _list_repair_order_rows,
 )
 
-_QUALITY_ROWS_LOCAL_CACHE: dict[
-    tuple[object, ...], tuple[float, list[dict[str, object]]]
-] = {}
-_QUALITY_RELATED_TOTALS_LOCAL_CACHE: dict[
-    tuple[object, ...], tuple[float, dict[str, Any]]
-] = {}
-_QUALITY_STATS_CACHE_LOCK = threading.Lock()
+# 首件汇总与关联统计经 quality_stats_cache_service 两级缓存，结果均为不可变对象，命中时直接共享
+_QUALITY_STATS_KIND_FIRST_ARTICLE = "first_article"
+_QUALITY_STATS_KIND_RELATED_TOTALS = "related_totals"
 
 
 @dataclass(slots=True)
@@ -81,6 +83,90 @@ class _FirstArticleActionContext:
     has_following_production: bool
 
 
+@dataclass(frozen=True, slots=True)
+class _FirstArticleCounts:
+    total: int = 0
+    passed: int = 0
+    failed: int = 0
+    latest_at: datetime | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class _FirstArticleAggregates:
+    """首件记录按维度汇总后的结果，只含聚合值，不含逐条记录
+
+    by_process / by_operator / by_product 的每项为 (键, 名称, 计数)，
+    键相同而名称不同的多组由调用方按原有规则合并。
+    """
+
+    overall: _FirstArticleCounts
+    order_ids: frozenset[int]
+    by_process: tuple[tuple[str, str, _FirstArticleCounts], ...]
+    by_operator: tuple[tuple[int | None, str, _FirstArticleCounts], ...]
+    by_product: tuple[tuple[int | None, str, _FirstArticleCounts], ...]
+
+
+_EMPTY_FIRST_ARTICLE_AGGREGATES = _FirstArticleAggregates(
+    overall=_FirstArticleCounts(),
+    order_ids=frozenset(),
+    by_process=(),
+    by_operator=(),
+    by_product=(),
+)
+
+
+def _execute_grouping_sets(
+    db: Session,
+    build_stmt: Callable[..., Select],
+    *,
+    grouping_sets: dict[str, tuple[Label, ...]],
+    measures: tuple[Label, ...],
+) -> dict[str, list[Row]]:
+    """同一过滤条件下按多组维度汇总
+
+    PostgreSQL 下合成一条 GROUP BY GROUPING SETS，只扫描一次明细；其他方言（单元测试的
+    SQLite）逐组执行 GROUP BY。各组的维度列互不重叠，空元组表示整体合计。
+    build_stmt 接收 select 列并返回带 FROM / JOIN / WHERE 的语句。
+    """
+    grouped: dict[str, list[Row]] = {name: [] for name in grouping_sets}
+    if db.get_bind().dialect.name != "postgresql":
+        for name, columns in grouping_sets.items():
+            stmt = build_stmt(*columns, *measures)
+            if columns:
+                stmt = stmt.group_by(*(column.element for column in columns))
+            grouped[name].extend(db.execute(stmt).all())
+        return grouped
+
+    flag_names = {
+        name: f"grouping_{name}" for name, columns in grouping_sets.items() if columns
+    }
+    total_name = next((name for name, columns in grouping_sets.items() if not columns), None)
+    stmt = build_stmt(
+        *(column for columns in grouping_sets.values() for column in columns),
+        *(
+            func.grouping(grouping_sets[name][0].element).label(flag_name)
+            for name, flag_name in flag_names.items()
+        ),
+        *measures,
+    ).group_by(
+        func.grouping_sets(
+            *(
+                tuple_(*(column.element for column in columns))
+                for columns in grouping_sets.values()
+            )
+        )
+    )
+    for row in db.execute(stmt).all():
+        mapping = row._mapping
+        name = next(
+            (name for name, flag_name in flag_names.items() if mapping[flag_name] == 0),
+            total_name,
+        )
+        if name is not None:
+            grouped[name].append(row)
+    return grouped
+
+
 def _build_datetime_range_filters(
     column,
     *,
@@ -213,15 +299,6 @@ def _coerce_int(value: object, default: int = 0) -> int:
     return default
 
 
-def _quality_stats_cache_ttl_seconds() -> float:
-    configured = getattr(settings, "quality_stats_cache_ttl_seconds", 5)
-    try:
-        ttl = float(configured)
-    except (TypeError, ValueError):
-        ttl = 5.0
-    return max(0.0, ttl)
-
-
 def _normalize_cache_text(value: str | None) -> str:
     return (value or "").strip().lower()
 
@@ -247,10 +324,12 @@ def _quality_stats_cache_key(
     )
 
 
-def _invalidate_quality_stats_cache() -> None:
-    with _QUALITY_STATS_CACHE_LOCK:
-        _QUALITY_ROWS_LOCAL_CACHE.clear()
-        _QUALITY_RELATED_TOTALS_LOCAL_CACHE.clear()
+def _invalidate_quality_stats_cache(db: Session | None = None) -> None:
+    """传入会话时在事务提交后再失效一次，见 mark_quality_stats_changed"""
+    if db is None:
+        bump_quality_stats_version()
+        return
+    mark_quality_stats_changed(db)
 
 
 def _first_article_record_status(row: FirstArticleRecord) -> str:
@@ -543,22 +622,6 @@ def _row_value(row: object, name: str, default: object = None) -> object:
     return getattr(row, name, default)
 
 
-def _row_process_code(row: object) -> str:
-    code = str(_row_value(row, "process_code", "") or "").strip()
-    if code:
-        return code
-    process_row = _row_value(row, "order_process")
-    return str(getattr(process_row, "process_code", "") or "").strip()
-
-
-def _row_process_name(row: object) -> str:
-    process_name = str(_row_value(row, "process_name", "") or "").strip()
-    if process_name:
-        return process_name
-    process_row = _row_value(row, "order_process")
-    return str(getattr(process_row, "process_name", "") or "").strip()
-
-
 def _row_operator_user_id(row: object) -> int | None:
     user_id = _row_value(row, "operator_user_id")
     if user_id is None:
@@ -575,15 +638,6 @@ def _row_operator_username(row: object) -> str:
     return str(getattr(operator, "username", "") or "").strip()
 
 
-def _row_result(row: object) -> str:
-    return str(_row_value(row, "result", "") or "").strip().lower()
-
-
-def _row_created_at(row: object) -> datetime | None:
-    value = _row_value(row, "created_at")
-    return value if isinstance(value, datetime) else None
-
-
 def _row_order_id(row: object) -> int | None:
     order_id = _row_value(row, "order_id")
     if order_id is None:
@@ -604,15 +658,6 @@ def _row_product_id(row: object) -> int | None:
     return normalized if normalized > 0 else None
 
 
-def _row_product_name(row: object) -> str:
-    name = str(_row_value(row, "product_name", "") or "").strip()
-    if name:
-        return name
-    order = _row_value(row, "order")
-    product = getattr(order, "product", None) if order is not None else None
-    return str(getattr(product, "name", "") or "").strip()
-
-
 def _aggregate_quality_related_totals(
     db: Session,
     *,
@@ -622,7 +667,8 @@ def _aggregate_quality_related_totals(
     product_name: str | None = None,
     process_code: str | None = None,
     operator_username: str | None = None,
-) -> dict[str, Any]:
+) -> Mapping[str, Any]:
+    """报废 / 返修 / 不良按产品、工序、人员汇总；返回逐层冻结的映射，调用方只读"""
     cache_key = _quality_stats_cache_key(
         start_date=start_date,
         end_date=end_date,
@@ -631,14 +677,32 @@ def _aggregate_quality_related_totals(
         process_code=process_code,
         operator_username=operator_username,
     )
-    ttl_seconds = _quality_stats_cache_ttl_seconds()
-    now = monotonic()
-    if ttl_seconds > 0:
-        with _QUALITY_STATS_CACHE_LOCK:
-            cached = _QUALITY_RELATED_TOTALS_LOCAL_CACHE.get(cache_key)
-            if cached is not None and cached[0] > now:
-                return copy.deepcopy(cached[1])
+    return get_or_load_quality_stats(
+        _QUALITY_STATS_KIND_RELATED_TOTALS,
+        cache_key,
+        lambda: _load_quality_related_totals(
+            db,
+            start_date=start_date,
+            end_date=end_date,
+            keyword=keyword,
+            product_name=product_name,
+            process_code=process_code,
+            operator_username=operator_username,
+        ),
+        db=db,
+    )
 
+
+def _load_quality_related_totals(
+    db: Session,
+    *,
+    start_date: date | None,
+    end_date: date | None,
+    keyword: str | None,
+    product_name: str | None,
+    process_code: str | None,
+    operator_username: str | None,
+) -> Mapping[str, Any]:
     scrap_by_product: dict[int, int] = {}
     scrap_by_process: dict[str, int] = {}
     scrap_by_operator: dict[str, int] = {}
@@ -824,13 +888,7 @@ def _aggregate_quality_related_totals(
         "covered_process_keys": {"all": covered_process_keys},
         "covered_operator_keys": {"all": covered_operator_keys},
     }
-    if ttl_seconds > 0:
-        with _QUALITY_STATS_CACHE_LOCK:
-            _QUALITY_RELATED_TOTALS_LOCAL_CACHE[cache_key] = (
-                now + ttl_seconds,
-                copy.deepcopy(result),
-            )
-    return result
+    return freeze_value(result)
 
 
 def _append_exact_or_like_filter(
@@ -1215,7 +1273,74 @@ def _resolve_first_article_range_verification_code(
     return None, "none"
 
 
-def _load_first_article_rows(
+def _first_article_counts(row: Row) -> _FirstArticleCounts:
+    return _FirstArticleCounts(
+        total=int(row.first_article_total or 0),
+        passed=int(row.passed_total or 0),
+        failed=int(row.failed_total or 0),
+        latest_at=row.latest_first_article_at,
+    )
+
+
+def _add_first_article_counts(item: dict[str, Any], counts: _FirstArticleCounts) -> None:
+    item["first_article_total"] = _coerce_int(item["first_article_total"]) + counts.total
+    item["passed_total"] = _coerce_int(item["passed_total"]) + counts.passed
+    item["failed_total"] = _coerce_int(item["failed_total"]) + counts.failed
+    if counts.latest_at is not None and (
+        item["latest_first_article_at"] is None
+        or counts.latest_at > item["latest_first_article_at"]
+    ):
+        item["latest_first_article_at"] = counts.latest_at
+
+
+def _first_article_counts_to_payload(counts: _FirstArticleCounts) -> tuple:
+    return (counts.total, counts.passed, counts.failed, counts.latest_at)
+
+
+def _first_article_counts_from_payload(payload: tuple) -> _FirstArticleCounts:
+    total, passed, failed, latest_at = payload
+    return _FirstArticleCounts(
+        total=int(total), passed=int(passed), failed=int(failed), latest_at=latest_at
+    )
+
+
+def _first_article_aggregates_to_payload(aggregates: _FirstArticleAggregates) -> tuple:
+    return (
+        _first_article_counts_to_payload(aggregates.overall),
+        aggregates.order_ids,
+        *(
+            tuple(
+                (key, name, _first_article_counts_to_payload(counts))
+                for key, name, counts in breakdown
+            )
+            for breakdown in (
+                aggregates.by_process,
+                aggregates.by_operator,
+                aggregates.by_product,
+            )
+        ),
+    )
+
+
+def _first_article_aggregates_from_payload(payload: tuple) -> _FirstArticleAggregates:
+    overall, order_ids, by_process, by_operator, by_product = payload
+
+    def _breakdown(items: tuple) -> tuple:
+        return tuple(
+            (key, name, _first_article_counts_from_payload(counts))
+            for key, name, counts in items
+        )
+
+    return _FirstArticleAggregates(
+        overall=_first_article_counts_from_payload(overall),
+        order_ids=frozenset(order_ids),
+        by_process=_breakdown(by_process),
+        by_operator=_breakdown(by_operator),
+        by_product=_breakdown(by_product),
+    )
+
+
+def _load_first_article_aggregates(
     db: Session,
     *,
     start_date: date | None,
@@ -1225,7 +1350,7 @@ def _load_first_article_rows(
     process_code: str | None = None,
     operator_username: str | None = None,
     result_filter: str | None = None,
-) -> list[dict[str, object]]:
+) -> _FirstArticleAggregates:
     cache_key = _quality_stats_cache_key(
         start_date=start_date,
         end_date=end_date,
@@ -1235,50 +1360,49 @@ def _load_first_article_rows(
         operator_username=operator_username,
         result_filter=result_filter,
     )
-    ttl_seconds = _quality_stats_cache_ttl_seconds()
-    now = monotonic()
-    if ttl_seconds > 0:
-        with _QUALITY_STATS_CACHE_LOCK:
-            cached = _QUALITY_ROWS_LOCAL_CACHE.get(cache_key)
-            if cached is not None and cached[0] > now:
-                return [dict(item) for item in cached[1]]
+    return get_or_load_quality_stats(
+        _QUALITY_STATS_KIND_FIRST_ARTICLE,
+        cache_key,
+        lambda: _query_first_article_aggregates(
+            db,
+            start_date=start_date,
+            end_date=end_date,
+            keyword=keyword,
+            product_name=product_name,
+            process_code=process_code,
+            operator_username=operator_username,
+            result_filter=result_filter,
+        ),
+        to_payload=_first_article_aggregates_to_payload,
+        from_payload=_first_article_aggregates_from_payload,
+        db=db,
+    )
+
 
+def _query_first_article_aggregates(
+    db: Session,
+    *,
+    start_date: date | None,
+    end_date: date | None,
+    keyword: str | None,
+    product_name: str | None,
+    process_code: str | None,
+    operator_username: str | None,
+    result_filter: str | None,
+) -> _FirstArticleAggregates:
     filters = _build_created_at_filters(start_date=start_date, end_date=end_date)
-    stmt = (
-        select(
-            FirstArticleRecord.order_id.label("order_id"),
-            ProductionOrder.product_id.label("product_id"),
-            Product.name.label("product_name"),
-            ProductionOrderProcess.process_code.label("process_code"),
-            ProductionOrderProcess.process_name.label("process_name"),
-            FirstArticleRecord.operator_user_id.label("operator_user_id"),
-            User.username.label("operator_username"),
-            FirstArticleRecord.result.label("result"),
-            FirstArticleRecord.created_at.label("created_at"),
-        )
-        .select_from(FirstArticleRecord)
-        .join(ProductionOrder, ProductionOrder.id == FirstArticleRecord.order_id)
-        .join(Product, Product.id == ProductionOrder.product_id)
-        .join(
-            ProductionOrderProcess,
-            ProductionOrderProcess.id == FirstArticleRecord.order_process_id,
-        )
-        .join(User, User.id == FirstArticleRecord.operator_user_id)
-        .where(FirstArticleRecord.is_cancelled.is_(False))
-        .where(*filters)
-    )
     if product_name and product_name.strip():
-        stmt = stmt.where(Product.name.ilike(f"%{product_name.strip()}%"))
+        filters.append(Product.name.ilike(f"%{product_name.strip()}%"))
     if process_code and process_code.strip():
-        stmt = stmt.where(
+        filters.append(
             ProductionOrderProcess.process_code.ilike(f"%{process_code.strip()}%")
         )
     if operator_username and operator_username.strip():
-        stmt = stmt.where(User.username.ilike(f"%{operator_username.strip()}%"))
+        filters.append(User.username.ilike(f"%{operator_username.strip()}%"))
     normalized_keyword = (keyword or "").strip()
     if normalized_keyword:
         like_pattern = f"%{normalized_keyword}%"
-        stmt = stmt.where(
+        filters.append(
             or_(
                 Product.name.ilike(like_pattern),
                 ProductionOrderProcess.process_code.ilike(like_pattern),
@@ -1288,15 +1412,88 @@ def _load_first_article_rows(
         )
     normalized_result = (result_filter or "").strip().lower()
     if normalized_result in ("passed", "failed"):
-        stmt = stmt.where(FirstArticleRecord.result == normalized_result)
-    rows = [dict(row._mapping) for row in db.execute(stmt).all()]
-    if ttl_seconds > 0:
-        with _QUALITY_STATS_CACHE_LOCK:
-            _QUALITY_ROWS_LOCAL_CACHE[cache_key] = (
-                now + ttl_seconds,
-                [dict(item) for item in rows],
+        filters.append(FirstArticleRecord.result == normalized_result)
+
+    def _build_stmt(*columns) -> Select:
+        return (
+            select(*columns)
+            .select_from(FirstArticleRecord)
+            .join(ProductionOrder, ProductionOrder.id == FirstArticleRecord.order_id)
+            .join(Product, Product.id == ProductionOrder.product_id)
+            .join(
+                ProductionOrderProcess,
+                ProductionOrderProcess.id == FirstArticleRecord.order_process_id,
             )
-    return rows
+            .join(User, User.id == FirstArticleRecord.operator_user_id)
+            .where(FirstArticleRecord.is_cancelled.is_(False))
+            .where(*filters)
+        )
+
+    grouped = _execute_grouping_sets(
+        db,
+        _build_stmt,
+        grouping_sets={
+            "overall": (),
+            "order": (FirstArticleRecord.order_id.label("order_id"),),
+            "process": (
+                ProductionOrderProcess.process_code.label("process_code"),
+                ProductionOrderProcess.process_name.label("process_name"),
+            ),
+            "operator": (
+                FirstArticleRecord.operator_user_id.label("operator_user_id"),
+                User.username.label("operator_username"),
+            ),
+            "product": (
+                ProductionOrder.product_id.label("product_id"),
+                Product.name.label("product_name"),
+            ),
+        },
+        measures=(
+            func.count().label("first_article_total"),
+            func.sum(case((FirstArticleRecord.result == "passed", 1), else_=0)).label(
+                "passed_total"
+            ),
+            func.sum(case((FirstArticleRecord.result == "failed", 1), else_=0)).label(
+                "failed_total"
+            ),
+            func.max(FirstArticleRecord.created_at).label("latest_first_article_at"),
+        ),
+    )
+    overall_rows = grouped["overall"]
+    return _FirstArticleAggregates(
+        overall=(
+            _first_article_counts(overall_rows[0]) if overall_rows else _FirstArticleCounts()
+        ),
+        order_ids=frozenset(
+            order_id
+            for order_id in (_row_order_id(row) for row in grouped["order"])
+            if order_id is not None
+        ),
+        by_process=tuple(
+            (
+                _normalize_process_key(row.process_code),
+                str(row.process_name or "").strip(),
+                _first_article_counts(row),
+            )
+            for row in grouped["process"]
+        ),
+        by_operator=tuple(
+            (
+                _row_operator_user_id(row),
+                _row_operator_username(row),
+                _first_article_counts(row),
+            )
+            for row in grouped["operator"]
+        ),
+        by_product=tuple(
+            (
+                _row_product_id(row),
+                str(row.product_name or "").strip(),
+                _first_article_counts(row),
+            )
+            for row in grouped["product"]
+        ),
+    )
 
 
 def get_quality_overview(
@@ -1310,7 +1507,7 @@ def get_quality_overview(
     operator_username: str | None = None,
     result_filter: str | None = None,
 ) -> dict[str, object]:
-    rows = _load_first_article_rows(
+    aggregates = _load_first_article_aggregates(
         db,
         start_date=start_date,
         end_date=end_date,
@@ -1329,21 +1526,14 @@ def get_quality_overview(
         process_code=process_code,
         operator_username=operator_username,
     )
-    first_article_total = len(rows)
-    passed_total = sum(1 for row in rows if _row_result(row) == "passed")
-    failed_total = sum(1 for row in rows if _row_result(row) == "failed")
-    latest_first_article_at = max(
-        (created_at for created_at in (_row_created_at(row) for row in rows) if created_at),
-        default=None,
-    )
+    first_article_total = aggregates.overall.total
+    passed_total = aggregates.overall.passed
+    failed_total = aggregates.overall.failed
+    latest_first_article_at = aggregates.overall.latest_at
 
-    covered_order_ids = {
-        order_id for order_id in (_row_order_id(row) for row in rows) if order_id is not None
-    }
+    covered_order_ids = set(aggregates.order_ids)
     covered_process_codes = {
-        process_key
-        for process_key in (_normalize_process_key(_row_process_code(row)) for row in rows)
-        if process_key
+        process_key for process_key, _, _ in aggregates.by_process if process_key
     }
     related_order_ids = related_totals.get("covered_order_ids", {}).get("all", set())
     related_process_keys = related_totals.get("covered_process_keys", {}).get(
@@ -1352,19 +1542,18 @@ def get_quality_overview(
     related_operator_keys = related_totals.get("covered_operator_keys", {}).get(
         "all", set()
     )
-    if isinstance(related_order_ids, set):
+    if isinstance(related_order_ids, (set, frozenset)):
         covered_order_ids.update(related_order_ids)
-    if isinstance(related_process_keys, set):
+    if isinstance(related_process_keys, (set, frozenset)):
         covered_process_codes.update(related_process_keys)
     covered_operator_keys = (
-        set(related_operator_keys) if isinstance(related_operator_keys, set) else set()
+        set(related_operator_keys)
+        if isinstance(related_operator_keys, (set, frozenset))
+        else set()
     )
-    for row in rows:
+    for operator_user_id, operator_name, _ in aggregates.by_operator:
         covered_operator_keys.add(
-            _normalize_operator_key(
-                user_id=_row_operator_user_id(row),
-                username=_row_operator_username(row),
-            )
+            _normalize_operator_key(user_id=operator_user_id, username=operator_name)
         )
 
     return {
@@ -1393,7 +1582,7 @@ def get_quality_process_stats(
     operator_username: str | None = None,
     result_filter: str | None = None,
 ) -> list[dict[str, object]]:
-    rows = _load_first_article_rows(
+    aggregates = _load_first_article_aggregates(
         db,
         start_date=start_date,
         end_date=end_date,
@@ -1413,9 +1602,7 @@ def get_quality_process_stats(
         operator_username=operator_username,
     )
     grouped: dict[str, dict[str, object]] = {}
-    for row in rows:
-        process_key = _normalize_process_key(_row_process_code(row))
-        process_name = _row_process_name(row)
+    for process_key, process_name, counts in aggregates.by_process:
         if process_key not in grouped:
             grouped[process_key] = {
                 "process_code": process_key,
@@ -1431,17 +1618,9 @@ def get_quality_process_stats(
             }
 
         item = grouped[process_key]
-        item["first_article_total"] = _coerce_int(item["first_article_total"]) + 1
-        if _row_result(row) == "passed":
-            item["passed_total"] = _coerce_int(item["passed_total"]) + 1
-        elif _row_result(row) == "failed":
-            item["failed_total"] = _coerce_int(item["failed_total"]) + 1
-        created_at = _row_created_at(row)
-        if created_at is not None and (
-            item["latest_first_article_at"] is None
-            or created_at > item["latest_first_article_at"]
-        ):
-            item["latest_first_article_at"] = created_at
+        _add_first_article_counts(item, counts)
+        if not item["process_name"] and process_name:
+            item["process_name"] = process_name
 
     for process_key, process_name in related_totals["process_name_by_code"].items():
         grouped.setdefault(
@@ -1496,7 +1675,7 @@ def get_quality_operator_stats(
     operator_username: str | None = None,
     result_filter: str | None = None,
 ) -> list[dict[str, object]]:
-    rows = _load_first_article_rows(
+    aggregates = _load_first_article_aggregates(
         db,
         start_date=start_date,
         end_date=end_date,
@@ -1516,10 +1695,9 @@ def get_quality_operator_stats(
         operator_username=operator_username,
     )
     grouped: dict[str, dict[str, object]] = {}
-    for row in rows:
-        operator_name = _row_operator_username(row)
+    for operator_user_id, operator_name, counts in aggregates.by_operator:
         operator_key = _normalize_operator_key(
-            user_id=_row_operator_user_id(row),
+            user_id=operator_user_id,
             username=operator_name,
         )
         if not operator_key:
@@ -1527,7 +1705,7 @@ def get_quality_operator_stats(
         item = grouped.get(operator_key)
         if item is None:
             item = {
-                "operator_user_id": _row_operator_user_id(row),
+                "operator_user_id": operator_user_id,
                 "operator_username": operator_name,
                 "first_article_total": 0,
                 "passed_total": 0,
@@ -1540,17 +1718,7 @@ def get_quality_operator_stats(
             }
             grouped[operator_key] = item
 
-        item["first_article_total"] = _coerce_int(item["first_article_total"]) + 1
-        if _row_result(row) == "passed":
-            item["passed_total"] = _coerce_int(item["passed_total"]) + 1
-        elif _row_result(row) == "failed":
-            item["failed_total"] = _coerce_int(item["failed_total"]) + 1
-        created_at = _row_created_at(row)
-        if created_at is not None and (
-            item["latest_first_article_at"] is None
-            or created_at > item["latest_first_article_at"]
-        ):
-            item["latest_first_article_at"] = created_at
+        _add_first_article_counts(item, counts)
 
     for operator_key, meta in related_totals["operator_meta_by_key"].items():
         grouped.setdefault(
@@ -1774,7 +1942,7 @@ def cancel_first_article(
             "review_session_ids": [session.id for session in context.review_sessions],
         },
     )
-    _invalidate_quality_stats_cache()
+    _invalidate_quality_stats_cache(db)
     db.flush()
     return {
         "record_id": record.id,
@@ -1871,13 +2039,64 @@ def delete_first_article(
             "review_session_ids": [session.id for session in context.review_sessions],
         },
     )
-    _invalidate_quality_stats_cache()
+    _invalidate_quality_stats_cache(db)
     db.flush()
     snapshot["rolled_back_execution_state"] = rolled_back_execution_state
     snapshot["deleted"] = True
     return snapshot
 
 
+FIRST_ARTICLE_EXPORT_HEADERS = [
+    "提交时间",
+    "订单号",
+    "产品",
+    "工序编码",
+    "工序名称",
+    "操作员",
+    "结果",
+    "记录状态",
+    "校验日期",
+    "校验码",
+    "备注",
+]
+
+
+def _first_article_export_row(item: dict[str, Any]) -> list[object]:
+    result_label = "通过" if item["result"] == "passed" else "不通过"
+    record_status_label = (
+        "已取消" if item.get("record_status") == "cancelled" else "有效"
+    )
+    return [
+        str(item["created_at"])[:19] if item["created_at"] else "",
+        item["order_code"],
+        item["product_name"],
+        item["process_code"],
+        item["process_name"],
+        item["operator_username"],
+        result_label,
+        record_status_label,
+        str(item["verification_date"]),
+        item["verification_code"] or "",
+        item["remark"] or "",
+    ]
+
+
+def count_first_article_export_rows(db: Session, **filters: Any) -> int:
+    payload = list_first_articles(db, **filters, page=1, page_size=1)
+    return int(payload["total"])
+
+
+def iter_first_article_export_rows(db: Session, **filters: Any) -> Iterator[list[object]]:
+    """异步导出按页拉取首件记录，单页内存有上限"""
+    pages = iter_paged(
+        lambda page, page_size: list_first_articles(
+            db, **filters, page=page, page_size=page_size
+        )["items"],
+    )
+    for item in pages:
+        yield _first_article_export_row(item)
+
+
 def export_first_articles_csv(
     db: Session,
     *,
@@ -1906,47 +2125,10 @@ def export_first_articles_csv(
         page_size=10000,
     )
     items = payload["items"]
-
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(
-        [
-            "提交时间",
-            "订单号",
-            "产品",
-            "工序编码",
-            "工序名称",
-            "操作员",
-            "结果",
-            "记录状态",
-            "校验日期",
-            "校验码",
-            "备注",
-        ]
+    content_base64 = encode_csv_base64(
+        FIRST_ARTICLE_EXPORT_HEADERS,
+        (_first_article_export_row(item) for item in items),
     )
-    for item in items:
-        result_label = "通过" if item["result"] == "passed" else "不通过"
-        record_status_label = (
-            "已取消" if item.get("record_status") == "cancelled" else "有效"
-        )
-        writer.writerow(
-            [
-                str(item["created_at"])[:19] if item["created_at"] else "",
-                item["order_code"],
-                item["product_name"],
-                item["process_code"],
-                item["process_name"],
-                item["operator_username"],
-                result_label,
-                record_status_label,
-                str(item["verification_date"]),
-                item["verification_code"] or "",
-                item["remark"] or "",
-            ]
-        )
-
-    csv_bytes = output.getvalue().encode("utf-8-sig")
-    content_base64 = base64.b64encode(csv_bytes).decode("ascii")
     filename = (
         f"首件记录_{resolved_start_date}_{resolved_end_date}_{uuid4().hex[:8]}.csv"
     )
@@ -1968,7 +2150,7 @@ def get_quality_product_stats(
     operator_username: str | None = None,
     result_filter: str | None = None,
 ) -> list[dict[str, Any]]:
-    rows = _load_first_article_rows(
+    aggregates = _load_first_article_aggregates(
         db,
         start_date=start_date,
         end_date=end_date,
@@ -1989,11 +2171,9 @@ def get_quality_product_stats(
     )
 
     grouped: dict[int, dict[str, Any]] = {}
-    for row in rows:
-        product_id = _row_product_id(row)
+    for product_id, product_name_value, counts in aggregates.by_product:
         if product_id is None:
             continue
-        product_name_value = _row_product_name(row)
         if not product_name_value:
             continue
         if product_id not in grouped:
@@ -2009,11 +2189,9 @@ def get_quality_product_stats(
                 "repair_total": 0,
             }
         item = grouped[product_id]
-        item["first_article_total"] = int(item["first_article_total"]) + 1
-        if _row_result(row) == "passed":
-            item["passed_total"] = int(item["passed_total"]) + 1
-        elif _row_result(row) == "failed":
-            item["failed_total"] = int(item["failed_total"]) + 1
+        item["first_article_total"] = int(item["first_article_total"]) + counts.total
+        item["passed_total"] = int(item["passed_total"]) + counts.passed
+        item["failed_total"] = int(item["failed_total"]) + counts.failed
 
     scrap_rows = db.execute(
         select(
@@ -2149,8 +2327,22 @@ def get_quality_trend(
     if result_filter and result_filter.strip():
         base_filters.append(FirstArticleRecord.result == result_filter.strip())
 
-    stmt = select(FirstArticleRecord).where(
-        *_build_created_at_filters(start_date=resolved_start, end_date=resolved_end)
+    created_day = func.date(FirstArticleRecord.created_at)
+    stmt = (
+        select(
+            created_day.label("d"),
+            func.count().label("total"),
+            func.sum(case((FirstArticleRecord.result == "passed", 1), else_=0)).label(
+                "passed"
+            ),
+            func.sum(case((FirstArticleRecord.result == "failed", 1), else_=0)).label(
+                "failed"
+            ),
+        )
+        .select_from(FirstArticleRecord)
+        .where(
+            *_build_created_at_filters(start_date=resolved_start, end_date=resolved_end)
+        )
     )
     if base_filters:
         stmt = stmt.where(*base_filters)
@@ -2162,9 +2354,9 @@ def get_quality_trend(
             .join(FirstArticleRecord.operator)
             .where(*joined_filters)
         )
+    first_article_rows = db.execute(stmt.group_by(created_day)).all()
 
-    rows = db.execute(stmt).scalars().all()
-
+    # 按天补零：只在汇总后的少量行上做
     grouped: dict[date, dict[str, Any]] = {}
     current = resolved_start
     while current <= resolved_end:
@@ -2180,16 +2372,14 @@ def get_quality_trend(
         }
         current += timedelta(days=1)
 
-    for row in rows:
-        d = row.created_at.date() if row.created_at else None
-        if d is None or d not in grouped:
+    for fr in first_article_rows:
+        stat_date = _normalize_stat_date(fr.d)
+        if stat_date is None or stat_date not in grouped:
             continue
-        item = grouped[d]
-        item["first_article_total"] = int(item["first_article_total"]) + 1
-        if row.result == "passed":
-            item["passed_total"] = int(item["passed_total"]) + 1
-        elif row.result == "failed":
-            item["failed_total"] = int(item["failed_total"]) + 1
+        item = grouped[stat_date]
+        item["first_article_total"] = int(fr.total or 0)
+        item["passed_total"] = int(fr.passed or 0)
+        item["failed_total"] = int(fr.failed or 0)
 
     defect_rows = db.execute(
         select(
@@ -2577,46 +2767,29 @@ def submit_first_article_disposition(
     return disposition
 
 
-def get_defect_analysis(
-    db: Session,
+def _build_defect_analysis_filters(
     *,
-    start_date: date | None = None,
-    end_date: date | None = None,
-    keyword: str | None = None,
-    product_id: int | None = None,
-    product_name: str | None = None,
-    process_code: str | None = None,
-    operator_username: str | None = None,
-    phenomenon: str | None = None,
-    top_n: int = 10,
-) -> dict:
-    from app.schemas.quality import (
-        DefectAnalysisResult,
-        DefectByDateItem,
-        DefectByOperatorItem,
-        DefectByProcessItem,
-        DefectByProductItem,
-        DefectReasonItem,
-        DefectTopItem,
-    )
-
-    stmt = select(RepairDefectPhenomenon).where(
-        _exclude_returned_repair_defects_filter()
-    )
-    if start_date is not None:
-        stmt = stmt.where(
-            RepairDefectPhenomenon.production_time
-            >= datetime.combine(start_date, time.min)
-        )
-    if end_date is not None:
-        stmt = stmt.where(
-            RepairDefectPhenomenon.production_time
-            < datetime.combine(end_date + timedelta(days=1), time.min)
+    start_date: date | None,
+    end_date: date | None,
+    keyword: str | None,
+    product_id: int | None,
+    product_name: str | None,
+    process_code: str | None,
+    operator_username: str | None,
+    phenomenon: str | None,
+) -> list[object]:
+    filters: list[object] = [_exclude_returned_repair_defects_filter()]
+    filters.extend(
+        _build_datetime_range_filters(
+            RepairDefectPhenomenon.production_time,
+            start_date=start_date,
+            end_date=end_date,
         )
+    )
     normalized_keyword = (keyword or "").strip()
     if normalized_keyword:
         like_pattern = f"%{normalized_keyword}%"
-        stmt = stmt.where(
+        filters.append(
             or_(
                 RepairDefectPhenomenon.product_name.ilike(like_pattern),
                 RepairDefectPhenomenon.process_code.ilike(like_pattern),
@@ -2626,66 +2799,132 @@ def get_defect_analysis(
             )
         )
     if product_id is not None:
-        stmt = stmt.where(RepairDefectPhenomenon.product_id == product_id)
+        filters.append(RepairDefectPhenomenon.product_id == product_id)
     if product_name and product_name.strip():
-        stmt = stmt.where(
+        filters.append(
             RepairDefectPhenomenon.product_name.ilike(f"%{product_name.strip()}%")
         )
     if process_code:
-        stmt = stmt.where(RepairDefectPhenomenon.process_code == process_code)
+        filters.append(RepairDefectPhenomenon.process_code == process_code)
     if operator_username and operator_username.strip():
-        stmt = stmt.where(
+        filters.append(
             RepairDefectPhenomenon.operator_username.ilike(
                 f"%{operator_username.strip()}%"
             )
         )
     if phenomenon and phenomenon.strip():
-        stmt = stmt.where(
+        filters.append(
             RepairDefectPhenomenon.phenomenon.ilike(f"%{phenomenon.strip()}%")
         )
+    return filters
+
+
+def _sorted_by_quantity(counts: dict[Any, int]) -> list[tuple[Any, int]]:
+    """按数量降序；数量相同时按键排序，结果不依赖数据库返回顺序"""
+    return sorted(counts.items(), key=lambda item: (-item[1], str(item[0])))
+
+
+def get_defect_analysis(
+    db: Session,
+    *,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    keyword: str | None = None,
+    product_id: int | None = None,
+    product_name: str | None = None,
+    process_code: str | None = None,
+    operator_username: str | None = None,
+    phenomenon: str | None = None,
+    top_n: int = 10,
+) -> dict:
+    from app.schemas.quality import (
+        DefectAnalysisResult,
+        DefectByDateItem,
+        DefectByOperatorItem,
+        DefectByProcessItem,
+        DefectByProductItem,
+        DefectReasonItem,
+        DefectTopItem,
+    )
 
-    rows = db.execute(stmt).scalars().all()
+    filters = _build_defect_analysis_filters(
+        start_date=start_date,
+        end_date=end_date,
+        keyword=keyword,
+        product_id=product_id,
+        product_name=product_name,
+        process_code=process_code,
+        operator_username=operator_username,
+        phenomenon=phenomenon,
+    )
 
-    total = sum(r.quantity for r in rows)
+    def _build_stmt(*columns) -> Select:
+        return select(*columns).select_from(RepairDefectPhenomenon).where(*filters)
+
+    grouped = _execute_grouping_sets(
+        db,
+        _build_stmt,
+        grouping_sets={
+            "total": (),
+            "phenomenon": (RepairDefectPhenomenon.phenomenon.label("phenomenon"),),
+            "process": (
+                RepairDefectPhenomenon.process_code.label("process_code"),
+                RepairDefectPhenomenon.process_name.label("process_name"),
+            ),
+            "product": (
+                RepairDefectPhenomenon.product_id.label("product_id"),
+                RepairDefectPhenomenon.product_name.label("product_name"),
+            ),
+            "operator": (
+                RepairDefectPhenomenon.operator_user_id.label("operator_user_id"),
+                RepairDefectPhenomenon.operator_username.label("operator_username"),
+            ),
+            "date": (func.date(RepairDefectPhenomenon.production_time).label("stat_date"),),
+        },
+        measures=(func.sum(RepairDefectPhenomenon.quantity).label("quantity"),),
+    )
+
+    total = sum(int(row.quantity or 0) for row in grouped["total"])
 
     # Top 缺陷现象
     phenomenon_counts: dict[str, int] = defaultdict(int)
-    for r in rows:
-        phenomenon_counts[r.phenomenon] += r.quantity
-    sorted_phenomena = sorted(
-        phenomenon_counts.items(), key=lambda x: x[1], reverse=True
-    )
+    for row in grouped["phenomenon"]:
+        phenomenon_counts[row.phenomenon] += int(row.quantity or 0)
     top_defects = [
         DefectTopItem(
             phenomenon=ph,
             quantity=qty,
             ratio=round(qty * 100.0 / total, 2) if total > 0 else 0.0,
         )
-        for ph, qty in sorted_phenomena[:top_n]
+        for ph, qty in _sorted_by_quantity(phenomenon_counts)[:top_n]
     ]
 
-    repair_order_ids = {
-        int(row.repair_order_id) for row in rows if row.repair_order_id is not None
-    }
-    reason_counts: dict[str, int] = defaultdict(int)
-    if repair_order_ids:
-        cause_stmt = select(RepairCause).where(
-            RepairCause.repair_order_id.in_(repair_order_ids)
+    # 原因只统计命中缺陷所属的维修单，维修单集合以子查询下推到数据库
+    cause_stmt = (
+        select(
+            RepairCause.reason,
+            func.sum(RepairCause.quantity).label("quantity"),
         )
-        if phenomenon and phenomenon.strip():
-            cause_stmt = cause_stmt.where(
-                RepairCause.phenomenon.ilike(f"%{phenomenon.strip()}%")
+        .where(
+            RepairCause.repair_order_id.in_(
+                _build_stmt(RepairDefectPhenomenon.repair_order_id).where(
+                    RepairDefectPhenomenon.repair_order_id.is_not(None)
+                )
             )
-        cause_rows = db.execute(cause_stmt).scalars().all()
-        for row in cause_rows:
-            reason = (row.reason or "").strip()
-            if not reason:
-                continue
-            reason_counts[reason] += int(row.quantity or 0)
-    total_reason_quantity = sum(reason_counts.values())
-    sorted_reasons = sorted(
-        reason_counts.items(), key=lambda item: item[1], reverse=True
+        )
+        .group_by(RepairCause.reason)
     )
+    if phenomenon and phenomenon.strip():
+        cause_stmt = cause_stmt.where(
+            RepairCause.phenomenon.ilike(f"%{phenomenon.strip()}%")
+        )
+    reason_counts: dict[str, int] = defaultdict(int)
+    for row in db.execute(cause_stmt).all():
+        reason = (row.reason or "").strip()
+        if not reason:
+            continue
+        reason_counts[reason] += int(row.quantity or 0)
+    total_reason_quantity = sum(reason_counts.values())
     top_reasons = [
         DefectReasonItem(
             reason=reason,
@@ -2694,50 +2933,48 @@ def get_defect_analysis(
             if total_reason_quantity > 0
             else 0.0,
         )
-        for reason, quantity in sorted_reasons[:top_n]
+        for reason, quantity in _sorted_by_quantity(reason_counts)[:top_n]
     ]
 
     # 按工序分布
     process_counts: dict[tuple, int] = defaultdict(int)
-    for r in rows:
-        key = (r.process_code or "", r.process_name or "")
-        process_counts[key] += r.quantity
+    for row in grouped["process"]:
+        key = (row.process_code or "", row.process_name or "")
+        process_counts[key] += int(row.quantity or 0)
     by_process = [
         DefectByProcessItem(process_code=k[0], process_name=k[1] or None, quantity=v)
-        for k, v in sorted(process_counts.items(), key=lambda x: x[1], reverse=True)
+        for k, v in _sorted_by_quantity(process_counts)
     ]
 
     # 按产品分布
     product_counts: dict[tuple, int] = defaultdict(int)
-    for r in rows:
-        key = (r.product_id, r.product_name or "")
-        product_counts[key] += r.quantity
+    for row in grouped["product"]:
+        key = (row.product_id, row.product_name or "")
+        product_counts[key] += int(row.quantity or 0)
     by_product = [
         DefectByProductItem(product_id=k[0], product_name=k[1] or None, quantity=v)
-        for k, v in sorted(product_counts.items(), key=lambda x: x[1], reverse=True)
+        for k, v in _sorted_by_quantity(product_counts)
     ]
 
     operator_counts: dict[tuple[int | None, str], int] = defaultdict(int)
-    for r in rows:
-        key = (r.operator_user_id, r.operator_username or "")
-        operator_counts[key] += r.quantity
+    for row in grouped["operator"]:
+        key = (row.operator_user_id, row.operator_username or "")
+        operator_counts[key] += int(row.quantity or 0)
     by_operator = [
         DefectByOperatorItem(
             operator_user_id=key[0],
             operator_username=key[1] or None,
             quantity=quantity,
         )
-        for key, quantity in sorted(
-            operator_counts.items(), key=lambda item: item[1], reverse=True
-        )
+        for key, quantity in _sorted_by_quantity(operator_counts)
     ]
 
     date_counts: dict[date, int] = defaultdict(int)
-    for r in rows:
-        stat_date = _normalize_stat_date(r.production_time)
+    for row in grouped["date"]:
+        stat_date = _normalize_stat_date(row.stat_date)
         if stat_date is None:
             continue
-        date_counts[stat_date] += r.quantity
+        date_counts[stat_date] += int(row.quantity or 0)
     by_date = [
         DefectByDateItem(stat_date=stat_date, quantity=quantity)
         for stat_date, quantity in sorted(date_counts.items(), key=lambda item: item[0])
@@ -2784,51 +3021,19 @@ def export_defect_analysis_csv(
 ) -> dict:
     from app.schemas.quality import DefectAnalysisExportResult
 
-    stmt = select(RepairDefectPhenomenon).where(
-        _exclude_returned_repair_defects_filter()
+    filters = _build_defect_analysis_filters(
+        start_date=start_date,
+        end_date=end_date,
+        keyword=keyword,
+        product_id=product_id,
+        product_name=product_name,
+        process_code=process_code,
+        operator_username=operator_username,
+        phenomenon=phenomenon,
+    )
+    rows = (
+        db.execute(select(RepairDefectPhenomenon).where(*filters)).scalars().all()
     )
-    if start_date is not None:
-        stmt = stmt.where(
-            RepairDefectPhenomenon.production_time
-            >= datetime.combine(start_date, time.min)
-        )
-    if end_date is not None:
-        stmt = stmt.where(
-            RepairDefectPhenomenon.production_time
-            < datetime.combine(end_date + timedelta(days=1), time.min)
-        )
-    normalized_keyword = (keyword or "").strip()
-    if normalized_keyword:
-        like_pattern = f"%{normalized_keyword}%"
-        stmt = stmt.where(
-            or_(
-                RepairDefectPhenomenon.product_name.ilike(like_pattern),
-                RepairDefectPhenomenon.process_code.ilike(like_pattern),
-                RepairDefectPhenomenon.process_name.ilike(like_pattern),
-                RepairDefectPhenomenon.operator_username.ilike(like_pattern),
-                RepairDefectPhenomenon.phenomenon.ilike(like_pattern),
-            )
-        )
-    if product_id is not None:
-        stmt = stmt.where(RepairDefectPhenomenon.product_id == product_id)
-    if product_name and product_name.strip():
-        stmt = stmt.where(
-            RepairDefectPhenomenon.product_name.ilike(f"%{product_name.strip()}%")
-        )
-    if process_code:
-        stmt = stmt.where(RepairDefectPhenomenon.process_code == process_code)
-    if operator_username and operator_username.strip():
-        stmt = stmt.where(
-            RepairDefectPhenomenon.operator_username.ilike(
-                f"%{operator_username.strip()}%"
-            )
-        )
-    if phenomenon and phenomenon.strip():
-        stmt = stmt.where(
-            RepairDefectPhenomenon.phenomenon.ilike(f"%{phenomenon.strip()}%")
-        )
-
-    rows = db.execute(stmt).scalars().all()
 
     output = io.StringIO()
     writer = csv.writer(output)
@@ -0,0 +1,393 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import time
+from collections.abc import Callable, Mapping
+from datetime import date, datetime
+from threading import Lock
+from types import MappingProxyType
+from typing import Any, TypeVar
+
+try:
+    from redis import Redis
+    from redis.exceptions import RedisError
+except Exception:  # pragma: no cover - 依赖缺失时仅启用进程内缓存
+    Redis = None  # type: ignore[assignment]
+
+    class RedisError(Exception):
+        pass
+
+from sqlalchemy import event
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.local_cache import LocalTTLCache
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# ── 质量统计缓存 ──────────────────────────────────────────────────────────────
+# 质量总览 / 工序 / 人员 / 产品统计共用两类聚合（首件汇总、报废返修不良汇总），两级缓存：
+#   • 进程内：短 TTL 的 LocalTTLCache，存放不可变快照（MappingProxyType / frozenset /
+#     tuple / frozen dataclass），命中直接共享，不再逐次 deepcopy；
+#   • Redis：序列化后的聚合结果，跨 worker 共享，进程内未命中时与版本号一次往返取回。
+# 键为 (统计种类, 规范化后的筛选条件)。首件、维修、报废写入后递增版本号：
+#   • 本进程立即清空进程内快照（LocalTTLCache.clear 同时阻止加载中的旧结果回填）；
+#   • Redis 版本号 INCR，旧版本写入的 payload 随即失配，其他 worker 进程内快照由本地 TTL 兜底；
+#   • 同时写入带过期的递增标记（DB_REPLICA_MAX_LAG_SECONDS）：标记存在期间副本可能尚未追上本次写入，
+#     从副本加载的结果只进进程内短 TTL 快照，不回填 Redis，避免旧数据以新版本号被共享 300 秒。
+# Redis 不可用时退化为纯进程内缓存，行为与引入前一致。
+_QUALITY_STATS_KEY_PREFIX = "mes:quality_stats"
+_QUALITY_STATS_VERSION_KEY = f"{_QUALITY_STATS_KEY_PREFIX}:version"
+_QUALITY_STATS_BUMPED_KEY = f"{_QUALITY_STATS_KEY_PREFIX}:bumped_at"
+_QUALITY_STATS_LOCAL_MAX_SIZE = 256
+_QUALITY_STATS_LOCAL_CACHE: LocalTTLCache[tuple[object, ...], Any] = LocalTTLCache(
+    "quality.stats",
+    max_size=_QUALITY_STATS_LOCAL_MAX_SIZE,
+    ttl_seconds=5,
+)
+
+_QUALITY_STATS_REDIS_CLIENT: Redis | None = None
+_QUALITY_STATS_REDIS_INIT = False
+_QUALITY_STATS_REDIS_DISABLED_UNTIL = 0.0
+_QUALITY_STATS_REDIS_BACKOFF_SECONDS = 30.0
+
+_QUALITY_STATS_VERSION_LOCK = Lock()
+_QUALITY_STATS_LOCAL_VERSION = 0
+
+_QUALITY_STATS_SESSION_FLAG = "quality_stats_invalidation_registered"
+
+
+def _quality_stats_local_ttl_seconds() -> float:
+    try:
+        ttl = float(settings.quality_stats_cache_ttl_seconds)
+    except (TypeError, ValueError):
+        ttl = 5.0
+    return max(0.0, ttl)
+
+
+def _quality_stats_redis_ttl_seconds() -> int:
+    try:
+        ttl = int(settings.quality_stats_cache_redis_ttl_seconds)
+    except (TypeError, ValueError):
+        ttl = 300
+    return max(0, ttl)
+
+
+def _replica_settle_ms() -> int:
+    try:
+        lag_seconds = float(settings.db_replica_max_lag_seconds)
+    except (TypeError, ValueError):
+        lag_seconds = 5.0
+    return max(0, int(lag_seconds * 1000))
+
+
+def _is_replica_session(db: Session | None) -> bool:
+    info = getattr(db, "info", None)
+    return isinstance(info, Mapping) and info.get("db_role") == "replica"
+
+
+def _quality_stats_payload_key(kind: str, key: tuple[object, ...]) -> str:
+    digest = hashlib.sha1(
+        json.dumps(_encode_value(key), ensure_ascii=False, separators=(",", ":")).encode(
+            "utf-8"
+        )
+    ).hexdigest()
+    return f"{_QUALITY_STATS_KEY_PREFIX}:{kind}:{digest}"
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Immutable snapshots & codec
+# ─────────────────────────────────────────────────────────────────────────────
+
+def freeze_value(value: Any) -> Any:
+    """dict → MappingProxyType、set → frozenset、list → tuple，逐层冻结"""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: freeze_value(item) for key, item in value.items()})
+    if isinstance(value, (set, frozenset)):
+        return frozenset(freeze_value(item) for item in value)
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze_value(item) for item in value)
+    return value
+
+
+# JSON 没有集合 / 元组 / 日期，也不保留 dict 的 int 键；容器与日期一律编码为单键对象，
+# 标量原样输出，解码时直接还原为冻结结构
+def _encode_value(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, Mapping):
+        return {"m": [[_encode_value(key), _encode_value(item)] for key, item in value.items()]}
+    if isinstance(value, (set, frozenset)):
+        return {"s": [_encode_value(item) for item in value]}
+    if isinstance(value, (list, tuple)):
+        return {"t": [_encode_value(item) for item in value]}
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    raise TypeError(f"质量统计缓存不支持的类型: {type(value).__name__}")
+
+
+def _decode_value(value: Any) -> Any:
+    if not isinstance(value, dict):
+        return value
+    ((tag, raw),) = value.items()
+    if tag == "m":
+        return MappingProxyType(
+            {_decode_value(key): _decode_value(item) for key, item in raw}
+        )
+    if tag == "s":
+        return frozenset(_decode_value(item) for item in raw)
+    if tag == "t":
+        return tuple(_decode_value(item) for item in raw)
+    if tag == "dt":
+        return datetime.fromisoformat(raw)
+    if tag == "d":
+        return date.fromisoformat(raw)
+    raise ValueError(f"未知的质量统计缓存标记: {tag}")
+
+
+def _serialize_payload(version: int, value: Any) -> str:
+    return json.dumps(
+        {"v": version, "data": _encode_value(value)},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+
+
+def _deserialize_payload(payload: str, *, version: int) -> tuple[bool, Any]:
+    try:
+        data = json.loads(payload)
+        if int(data["v"]) != version:
+            return False, None
+        return True, _decode_value(data["data"])
+    except (TypeError, ValueError, KeyError):
+        return False, None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Redis client helpers
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _build_quality_stats_redis_client(*, socket_timeout: float | None) -> Redis:
+    return Redis(
+        host=settings.redis_host,
+        port=settings.redis_port,
+        db=settings.redis_db,
+        password=settings.redis_password or None,
+        ssl=settings.redis_ssl,
+        decode_responses=True,
+        socket_timeout=socket_timeout,
+        socket_connect_timeout=max(0.05, settings.redis_connect_timeout_seconds),
+    )
+
+
+def _get_quality_stats_redis_client() -> Redis | None:
+    global _QUALITY_STATS_REDIS_CLIENT, _QUALITY_STATS_REDIS_INIT
+
+    if not settings.quality_stats_cache_redis_enabled:
+        return None
+    if _QUALITY_STATS_REDIS_DISABLED_UNTIL > time.monotonic():
+        return None
+    if _QUALITY_STATS_REDIS_INIT:
+        return _QUALITY_STATS_REDIS_CLIENT
+    _QUALITY_STATS_REDIS_INIT = True
+    if Redis is None:
+        return None
+    try:
+        _QUALITY_STATS_REDIS_CLIENT = _build_quality_stats_redis_client(
+            socket_timeout=max(0.05, settings.redis_socket_timeout_seconds)
+        )
+        _QUALITY_STATS_REDIS_CLIENT.ping()
+    except Exception:
+        _mark_quality_stats_redis_unavailable()
+        logger.warning(
+            "[QUALITY_STATS] Redis 连接失败，质量统计缓存退化为进程内（backoff %ds）。",
+            _QUALITY_STATS_REDIS_BACKOFF_SECONDS,
+            exc_info=True,
+        )
+    return _QUALITY_STATS_REDIS_CLIENT
+
+
+def _mark_quality_stats_redis_unavailable() -> None:
+    global _QUALITY_STATS_REDIS_CLIENT, _QUALITY_STATS_REDIS_INIT
+    global _QUALITY_STATS_REDIS_DISABLED_UNTIL
+    _QUALITY_STATS_REDIS_CLIENT = None
+    _QUALITY_STATS_REDIS_INIT = False
+    _QUALITY_STATS_REDIS_DISABLED_UNTIL = (
+        time.monotonic() + _QUALITY_STATS_REDIS_BACKOFF_SECONDS
+    )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Redis tier
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _read_remote(redis_client: Redis, payload_key: str) -> tuple[int, bool, bool, Any]:
+    """一次往返取回 (当前版本号, 最近是否有写入, 是否命中, 冻结结果)"""
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.get(_QUALITY_STATS_VERSION_KEY)
+    pipe.get(_QUALITY_STATS_BUMPED_KEY)
+    pipe.get(payload_key)
+    raw_version, bumped_at, payload = pipe.execute()
+    try:
+        version = int(raw_version or 0)
+    except (TypeError, ValueError):
+        version = 0
+    recently_bumped = bumped_at is not None
+    if payload is None:
+        return version, recently_bumped, False, None
+    hit, value = _deserialize_payload(payload, version=version)
+    return version, recently_bumped, hit, value
+
+
+def _load_through_redis(
+    kind: str,
+    key: tuple[object, ...],
+    loader: Callable[[], T],
+    *,
+    to_payload: Callable[[T], Any],
+    from_payload: Callable[[Any], T],
+    from_replica: bool,
+) -> T:
+    redis_client = _get_quality_stats_redis_client()
+    if redis_client is None:
+        return loader()
+    payload_key = _quality_stats_payload_key(kind, key)
+    try:
+        version, recently_bumped, hit, value = _read_remote(redis_client, payload_key)
+    except RedisError:
+        _mark_quality_stats_redis_unavailable()
+        return loader()
+    if hit:
+        try:
+            return from_payload(value)
+        except (TypeError, ValueError, KeyError):
+            logger.warning("[QUALITY_STATS] 缓存 payload 无法还原，回源数据库。", exc_info=True)
+    result = loader()
+    redis_ttl = _quality_stats_redis_ttl_seconds()
+    if redis_ttl <= 0:
+        return result
+    if from_replica and recently_bumped:
+        # 副本可能还没追上刚提交的写入，这份结果不能以新版本号共享给其他 worker
+        return result
+    try:
+        # 版本号取自加载之前：加载期间若有写入递增版本，这份结果写入后也不会被采用
+        redis_client.setex(payload_key, redis_ttl, _serialize_payload(version, to_payload(result)))
+    except RedisError:
+        _mark_quality_stats_redis_unavailable()
+    return result
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Public API
+# ─────────────────────────────────────────────────────────────────────────────
+
+def get_or_load_quality_stats(
+    kind: str,
+    key: tuple[object, ...],
+    loader: Callable[[], T],
+    *,
+    to_payload: Callable[[T], Any] = lambda value: value,
+    from_payload: Callable[[Any], T] = lambda value: value,
+    db: Session | None = None,
+) -> T:
+    """按 (种类, 规范化筛选条件) 读取质量统计；loader 须返回不可变结果，命中时直接共享
+
+    to_payload / from_payload 负责结果与可编码结构（标量、映射、集合、元组、日期）之间的转换。
+    db 为 loader 使用的会话；副本会话在最近一次写入后的复制延迟窗口内不回填 Redis。
+    """
+    ttl_seconds = _quality_stats_local_ttl_seconds()
+    if ttl_seconds <= 0:
+        return loader()
+    return _QUALITY_STATS_LOCAL_CACHE.get_or_load(
+        (kind, key),
+        lambda: _load_through_redis(
+            kind,
+            key,
+            loader,
+            to_payload=to_payload,
+            from_payload=from_payload,
+            from_replica=_is_replica_session(db),
+        ),
+        ttl_seconds=ttl_seconds,
+    )
+
+
+def quality_stats_version() -> int:
+    return _QUALITY_STATS_LOCAL_VERSION
+
+
+def bump_quality_stats_version() -> int:
+    """首件 / 维修 / 报废数据变化后调用：清空本进程快照并递增 Redis 版本号"""
+    global _QUALITY_STATS_LOCAL_VERSION
+    with _QUALITY_STATS_VERSION_LOCK:
+        _QUALITY_STATS_LOCAL_VERSION += 1
+        version = _QUALITY_STATS_LOCAL_VERSION
+    _QUALITY_STATS_LOCAL_CACHE.clear()
+    redis_client = _get_quality_stats_redis_client()
+    if redis_client is None:
+        return version
+    try:
+        redis_client.incr(_QUALITY_STATS_VERSION_KEY)
+        settle_ms = _replica_settle_ms()
+        if settle_ms > 0:
+            redis_client.set(_QUALITY_STATS_BUMPED_KEY, f"{time.time():.3f}", px=settle_ms)
+    except RedisError:
+        _mark_quality_stats_redis_unavailable()
+        logger.warning(
+            "[QUALITY_STATS] 版本号递增失败，其他进程依赖缓存 TTL 过期。",
+            exc_info=True,
+        )
+    return version
+
+
+def mark_quality_stats_changed(db: Session) -> None:
+    """写入首件 / 维修 / 报废数据时调用：立即失效一次，事务提交后再失效一次
+
+    提交前的失效防止本请求随后读到旧快照，提交后的失效覆盖提交前被其他请求回填的旧结果。
+    同一会话在一次事务内只登记一个提交回调。
+    """
+    bump_quality_stats_version()
+    info = getattr(db, "info", None)
+    if info is None or info.get(_QUALITY_STATS_SESSION_FLAG):
+        return
+
+    def _after_commit(session: Session) -> None:
+        session.info.pop(_QUALITY_STATS_SESSION_FLAG, None)
+        bump_quality_stats_version()
+
+    def _after_rollback(session: Session) -> None:
+        session.info.pop(_QUALITY_STATS_SESSION_FLAG, None)
+
+    try:
+        event.listen(db, "after_commit", _after_commit, once=True)
+        event.listen(db, "after_soft_rollback", _after_rollback, once=True)
+    except InvalidRequestError:
+        # 单元测试中的非 ORM 会话替身不支持事件，立即失效已足够
+        return
+    info[_QUALITY_STATS_SESSION_FLAG] = True
+
+
+def clear_local_quality_stats() -> None:
+    _QUALITY_STATS_LOCAL_CACHE.clear()
+
+
+def _reset_quality_stats_cache_after_fork() -> None:
+    global _QUALITY_STATS_REDIS_CLIENT, _QUALITY_STATS_REDIS_INIT
+    global _QUALITY_STATS_VERSION_LOCK
+    # fork 出的 worker 不能沿用父进程的连接（本地缓存由 local_cache 统一重置）
+    _QUALITY_STATS_VERSION_LOCK = Lock()
+    _QUALITY_STATS_REDIS_CLIENT = None
+    _QUALITY_STATS_REDIS_INIT = False
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_quality_stats_cache_after_fork)
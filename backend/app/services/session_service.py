@@ -1,13 +1,16 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+import threading
 import time
 from datetime import UTC, datetime, timedelta
 from dataclasses import dataclass
 from threading import Lock
 from uuid import uuid4
 
-from sqlalchemy import and_, delete, func, select, update
+from sqlalchemy import DateTime, String, and_, column, delete, event, func, or_, select, update, values
+from sqlalchemy.exc import InvalidRequestError
 from sqlalchemy.orm import Session
 
 try:
@@ -24,6 +27,20 @@ from app.models.process_stage import ProcessStage
 from app.models.role import Role
 from app.models.user import User
 from app.models.user_session import UserSession
+from app.services.keyword_search_service import keyword_filter
+from app.services.list_pagination_service import (
+    COUNT_MODE_EXACT,
+    KeysetOrder,
+    count_list_total,
+)
+from app.services.session_state_cache_service import (
+    CachedSessionState,
+    cache_session_state,
+    get_cached_session_state,
+    invalidate_session_states,
+    note_session_state_touched,
+    session_state_from_row,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -55,6 +72,17 @@ _SUCCESS_LOGIN_LOG_MIN_INTERVAL_SECONDS = 60
 
 _TERMINAL_INFO_MAX_LENGTH = 255
 
+# ── Write-behind session touch buffer ─────────────────────────────────────────
+# 请求链路只把 last_active_at 记进进程内缓冲；定时器把缓冲合并写入 Redis 哈希，
+# 由 worker 统一以一条 UPDATE ... FROM (VALUES ...) 批量落库。Redis 不可用时
+# 定时器直接在本进程批量落库，保证 last_active_at 最终一致。
+
+_SESSION_TOUCH_PENDING_KEY = "mes:session:touch_pending"
+_SESSION_TOUCH_LOCK = Lock()
+_SESSION_TOUCH_PENDING: dict[str, float] = {}
+_SESSION_TOUCH_FLUSH_TIMER: threading.Timer | None = None
+_SESSION_TOUCH_BATCH_SIZE = 1000
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Redis client helpers
@@ -303,8 +331,9 @@ def _build_login_log_filters(
     end_time: datetime | None = None,
 ) -> list[object]:
     filters: list[object] = []
-    if username:
-        filters.append(LoginLog.username.ilike(f"%{username.strip()}%"))
+    username_clause = keyword_filter(username, LoginLog.username)
+    if username_clause is not None:
+        filters.append(username_clause)
     if success is not None:
         filters.append(LoginLog.success.is_(success))
     if start_time:
@@ -320,8 +349,9 @@ def _build_online_session_filters(
     status_filter: str | None = None,
 ) -> list[object]:
     filters: list[object] = [User.is_deleted.is_(False)]
-    if keyword:
-        filters.append(User.username.ilike(f"%{keyword.strip()}%"))
+    keyword_clause = keyword_filter(keyword, User.username)
+    if keyword_clause is not None:
+        filters.append(keyword_clause)
     if status_filter:
         if status_filter == "offline":
             filters.append(UserSession.status != "active")
@@ -635,81 +665,291 @@ def get_session_by_token_id(db: Session, session_token_id: str) -> UserSession |
     return db.execute(stmt).scalars().first()
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Write-behind session touches
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _session_touch_flush_interval_seconds() -> float:
+    return max(settings.session_touch_flush_interval_seconds, 0.05)
+
+
+def _schedule_session_touch_flush_locked() -> None:
+    global _SESSION_TOUCH_FLUSH_TIMER
+    if _SESSION_TOUCH_FLUSH_TIMER is not None:
+        return
+    timer = threading.Timer(
+        _session_touch_flush_interval_seconds(),
+        flush_local_session_touches,
+    )
+    timer.daemon = True
+    _SESSION_TOUCH_FLUSH_TIMER = timer
+    timer.start()
+
+
+def record_session_touch(session_token_id: str, *, touched_at: datetime) -> None:
+    """登记一次会话活跃；同一会话在一个刷新周期内只保留最新时间"""
+    normalized_token = session_token_id.strip()
+    if not normalized_token:
+        return
+    touched_ts = touched_at.timestamp()
+    with _SESSION_TOUCH_LOCK:
+        if _SESSION_TOUCH_PENDING.get(normalized_token, 0.0) < touched_ts:
+            _SESSION_TOUCH_PENDING[normalized_token] = touched_ts
+        _schedule_session_touch_flush_locked()
+
+
+def _discard_pending_session_touch(session_token_id: str) -> None:
+    with _SESSION_TOUCH_LOCK:
+        _SESSION_TOUCH_PENDING.pop(session_token_id.strip(), None)
+
+
+def _merge_session_touches(
+    target: dict[str, float],
+    source: dict[str, float],
+) -> None:
+    for token_id, touched_ts in source.items():
+        if target.get(token_id, 0.0) < touched_ts:
+            target[token_id] = touched_ts
+
+
+def apply_session_touches(db: Session, touches: dict[str, float]) -> int:
+    """以 UPDATE ... FROM (VALUES ...) 批量回写 last_active_at，只前进不后退"""
+    if not touches:
+        return 0
+    items = sorted(touches.items())
+    updated = 0
+    for offset in range(0, len(items), _SESSION_TOUCH_BATCH_SIZE):
+        batch = items[offset : offset + _SESSION_TOUCH_BATCH_SIZE]
+        touch_values = values(
+            column("session_token_id", String(64)),
+            column("last_active_at", DateTime(timezone=True)),
+            name="session_touch",
+        ).data(
+            [
+                (token_id, datetime.fromtimestamp(touched_ts, UTC))
+                for token_id, touched_ts in batch
+            ]
+        )
+        result = db.execute(
+            update(UserSession)
+            .where(
+                UserSession.session_token_id == touch_values.c.session_token_id,
+                UserSession.status == "active",
+                or_(
+                    UserSession.last_active_at.is_(None),
+                    UserSession.last_active_at < touch_values.c.last_active_at,
+                ),
+            )
+            .values(last_active_at=touch_values.c.last_active_at)
+            .execution_options(synchronize_session=False)
+        )
+        updated += int(result.rowcount or 0)
+    return updated
+
+
+def _write_session_touches_to_db(touches: dict[str, float]) -> int:
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        updated = apply_session_touches(db, touches)
+        db.commit()
+        return updated
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def flush_local_session_touches() -> int:
+    """把本进程缓冲转入 Redis 哈希（一次 HSET）；Redis 不可用时直接批量落库"""
+    global _SESSION_TOUCH_FLUSH_TIMER
+    with _SESSION_TOUCH_LOCK:
+        _SESSION_TOUCH_FLUSH_TIMER = None
+        pending = dict(_SESSION_TOUCH_PENDING)
+        _SESSION_TOUCH_PENDING.clear()
+    if not pending:
+        return 0
+
+    redis_client = _get_session_redis_client()
+    if redis_client is not None:
+        try:
+            redis_client.hset(
+                _SESSION_TOUCH_PENDING_KEY,
+                mapping={token_id: f"{touched_ts:.3f}" for token_id, touched_ts in pending.items()},
+            )
+            return len(pending)
+        except RedisError:
+            _mark_session_redis_unavailable()
+
+    try:
+        return _write_session_touches_to_db(pending)
+    except Exception:
+        logger.warning("[SESSION] 会话活跃时间批量落库失败，下一周期重试。", exc_info=True)
+        with _SESSION_TOUCH_LOCK:
+            _merge_session_touches(_SESSION_TOUCH_PENDING, pending)
+            _schedule_session_touch_flush_locked()
+        return 0
+
+
+def _drain_redis_session_touches() -> dict[str, float]:
+    redis_client = _get_session_redis_client()
+    if redis_client is None:
+        return {}
+    try:
+        pipe = redis_client.pipeline(transaction=True)
+        pipe.hgetall(_SESSION_TOUCH_PENDING_KEY)
+        pipe.delete(_SESSION_TOUCH_PENDING_KEY)
+        raw, _ = pipe.execute()
+    except RedisError:
+        _mark_session_redis_unavailable()
+        return {}
+    touches: dict[str, float] = {}
+    for token_id, raw_ts in (raw or {}).items():
+        try:
+            touches[str(token_id)] = float(raw_ts)
+        except (TypeError, ValueError):
+            continue
+    return touches
+
+
+def flush_session_touches() -> int:
+    """worker 周期任务：取走 Redis 与本进程的全部待写活跃时间并一次性落库"""
+    touches = _drain_redis_session_touches()
+    with _SESSION_TOUCH_LOCK:
+        _merge_session_touches(touches, _SESSION_TOUCH_PENDING)
+        _SESSION_TOUCH_PENDING.clear()
+    if not touches:
+        return 0
+    try:
+        return _write_session_touches_to_db(touches)
+    except Exception:
+        # 放回本进程缓冲，由下一轮重试；期间的新 touch 会按时间取大合并
+        with _SESSION_TOUCH_LOCK:
+            _merge_session_touches(_SESSION_TOUCH_PENDING, touches)
+        raise
+
+
+async def run_session_touch_flush_loop() -> None:
+    interval_seconds = max(settings.session_touch_flush_interval_seconds, 1.0)
+    logger.info(
+        "[SESSION] 会话活跃时间批量回写循环已启动，间隔 %s 秒。",
+        interval_seconds,
+    )
+    while True:
+        try:
+            await asyncio.to_thread(flush_session_touches)
+        except Exception:
+            logger.exception("[SESSION] 会话活跃时间批量回写失败")
+        await asyncio.sleep(interval_seconds)
+
+
+def _invalidate_session_state_cache(db: Session, session_token_ids: list[str]) -> None:
+    """立即失效并在事务提交后再失效一次：提交前并发请求可能用旧的 active 行回填缓存"""
+    token_ids = list(session_token_ids)
+    if not token_ids:
+        return
+    invalidate_session_states(token_ids)
+    try:
+        event.listen(
+            db,
+            "after_commit",
+            lambda _session: invalidate_session_states(token_ids),
+            once=True,
+        )
+    except InvalidRequestError:
+        # 测试替身等非 ORM Session 不支持事件注册，立即失效已足够
+        pass
+
+
 def touch_session_by_token_id(
     db: Session,
     session_token_id: str,
     *,
     require_user_id: int | None = None,
-) -> tuple[UserSession | SessionStatusSnapshot | None, bool]:
+) -> tuple[UserSession | CachedSessionState | SessionStatusSnapshot | None, bool]:
     """
-    Touch a session, optionally verifying the caller-supplied user_id against Redis.
+    Touch a session, optionally verifying the caller-supplied user_id.
 
-    **require_user_id**: if provided, the Redis-active marker must belong to this
-    user_id.  This eliminates the allow_cached_active identity-bypass that existed
+    **require_user_id**: if provided, the session must belong to this user_id.
+    This eliminates the allow_cached_active identity-bypass that existed
     in the old in-process cache path.
 
-    Returns (session_row_or_snapshot, was_db_touched).
-    """
-    redis_active, redis_user_id = _get_session_active_from_redis(session_token_id)
+    会话状态优先读 session_state_cache_service（进程内 → Redis），命中时零 SQL；
+    未命中才回源数据库并回填。状态变更路径（注销、强制下线、续期、过期）都会显式
+    失效缓存，因此缓存里只可能是 active 会话。last_active_at 走 write-behind 缓冲
+    （见 record_session_touch），请求链路不再 UPDATE + commit。
 
-    # ── DB path (authoritative) — always check DB for fingerprint & status ──
-    # IMPORTANT: even if Redis says "active", we must verify against DB because:
-    #   1. Redis may be stale (DB force-offline doesn't invalidate Redis key atomically)
-    #   2. SessionStatusSnapshot lacks login_ip/terminal_info for fingerprint validation
-    #   3. Auth decisions must never trust stale Redis alone
-    row = get_session_by_token_id(db, session_token_id)
-    if not row:
-        _delete_session_active_in_redis(session_token_id)
-        return None, False
+    Returns (session_row_or_state, was_db_touched).
+    """
+    row: UserSession | None = None
+    state: UserSession | CachedSessionState | None = get_cached_session_state(session_token_id)
+    if state is None:
+        row = get_session_by_token_id(db, session_token_id)
+        if not row:
+            _delete_session_active_in_redis(session_token_id)
+            return None, False
+        if row.status != "active":
+            _delete_session_active_in_redis(session_token_id)
+            return row, False
+        state = row
 
     now = _now_utc()
-    if row.status != "active":
+    if state.expires_at <= now:
+        if row is None:
+            row = get_session_by_token_id(db, session_token_id)
+        _invalidate_session_state_cache(db, [session_token_id])
         _delete_session_active_in_redis(session_token_id)
+        _discard_pending_session_touch(session_token_id)
+        if row is None:
+            return None, False
+        if row.status == "active":
+            row.status = "expired"
+            row.logout_time = now
+            db.flush()
+            return row, True
         return row, False
 
-    if row.expires_at <= now:
-        row.status = "expired"
-        row.logout_time = now
-        db.flush()
-        _delete_session_active_in_redis(session_token_id)
-        return row, True
-
     # Verify user_id if provided (prevents token hijacking across users)
-    if require_user_id is not None and row.user_id != require_user_id:
+    if require_user_id is not None and state.user_id != require_user_id:
         _delete_session_active_in_redis(session_token_id)
-        return SessionStatusSnapshot(status="invalidated", user_id=row.user_id), False
+        return SessionStatusSnapshot(status="invalidated", user_id=state.user_id), False
+
+    if row is not None:
+        cache_session_state(session_state_from_row(session_token_id, row))
 
     min_touch_interval = _session_touch_interval_seconds()
-    if row.last_active_at is not None:
-        elapsed = (now - row.last_active_at).total_seconds()
+    if state.last_active_at is not None:
+        elapsed = (now - state.last_active_at).total_seconds()
         if elapsed < min_touch_interval:
             # Refresh Redis TTL without touching DB
             cache_ttl = _cap_session_cache_ttl(
                 max(1, int(min_touch_interval - elapsed)),
-                expires_at=row.expires_at,
+                expires_at=state.expires_at,
                 now=now,
             )
             _touch_session_active_in_redis(
                 session_token_id,
-                user_id=row.user_id,
+                user_id=state.user_id,
                 ttl_seconds=cache_ttl,
             )
-            return row, False
+            return state, False
 
-    # Actual DB touch
-    row.last_active_at = now
-    db.flush()
+    # Write-behind：登记到缓冲，由批量回写落库
+    record_session_touch(session_token_id, touched_at=now)
+    note_session_state_touched(session_token_id, touched_at=now)
     cache_ttl = _cap_session_cache_ttl(
         min_touch_interval,
-        expires_at=row.expires_at,
+        expires_at=state.expires_at,
         now=now,
     )
     _touch_session_active_in_redis(
         session_token_id,
-        user_id=row.user_id,
+        user_id=state.user_id,
         ttl_seconds=cache_ttl,
     )
-    return row, True
+    return state, False
 
 
 def mark_session_logout(
@@ -727,7 +967,9 @@ def mark_session_logout(
     row.logout_time = now
     row.last_active_at = now
     db.flush()
+    _invalidate_session_state_cache(db, [session_token_id])
     _delete_session_active_in_redis(session_token_id)
+    _discard_pending_session_touch(session_token_id)
     return row
 
 
@@ -744,6 +986,7 @@ def renew_session(
     row.expires_at = row.expires_at + timedelta(seconds=extend_seconds)
     row.last_active_at = now
     db.flush()
+    _invalidate_session_state_cache(db, [session_token_id])
     _touch_session_active_in_redis(
         session_token_id,
         user_id=row.user_id,
@@ -876,6 +1119,12 @@ def list_online_sessions(
     return total, items
 
 
+LOGIN_LOG_KEYSET = KeysetOrder(
+    columns=((LoginLog.login_time, True), (LoginLog.id, True)),
+    row_values=lambda row: (row.login_time, row.id),
+)
+
+
 def list_login_logs(
     db: Session,
     *,
@@ -885,8 +1134,11 @@ def list_login_logs(
     success: bool | None = None,
     start_time: datetime | None = None,
     end_time: datetime | None = None,
+    cursor: str | None = None,
+    count_mode: str = COUNT_MODE_EXACT,
 ) -> tuple[int, list[LoginLog]]:
-    stmt = select(LoginLog).order_by(LoginLog.login_time.desc(), LoginLog.id.desc())
+    """cursor 非空时按 (login_time, id) 游标取下一页，忽略 page"""
+    stmt = LOGIN_LOG_KEYSET.order_by(select(LoginLog))
     filters = _build_login_log_filters(
         username=username,
         success=success,
@@ -898,8 +1150,18 @@ def list_login_logs(
     total_stmt = select(func.count(LoginLog.id))
     if filters:
         total_stmt = total_stmt.where(and_(*filters))
-    total = int(db.execute(total_stmt).scalar_one())
-    rows = db.execute(stmt.offset((page - 1) * page_size).limit(page_size)).scalars().all()
+    total = count_list_total(
+        db,
+        stmt,
+        count_mode=count_mode,
+        exact_count_stmt=total_stmt,
+        table_name=LoginLog.__tablename__,
+    )
+    if cursor:
+        paged_stmt = LOGIN_LOG_KEYSET.after(stmt, cursor)
+    else:
+        paged_stmt = stmt.offset((page - 1) * page_size)
+    rows = db.execute(paged_stmt.limit(page_size)).scalars().all()
     return total, rows
 
 
@@ -931,6 +1193,7 @@ def force_offline_sessions(
         _delete_session_active_in_redis(row.session_token_id)
     if rows:
         db.flush()
+        _invalidate_session_state_cache(db, [row.session_token_id for row in rows])
     return len(rows)
 
 
@@ -967,6 +1230,7 @@ def force_offline_user_sessions_except(
 
     if rows:
         db.flush()
+        _invalidate_session_state_cache(db, [row.session_token_id for row in rows])
     return len(rows)
 
 
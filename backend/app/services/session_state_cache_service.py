@@ -0,0 +1,385 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, replace
+from datetime import UTC, datetime
+from threading import Event, Lock, Thread
+
+try:
+    from redis import Redis
+    from redis.exceptions import RedisError
+except Exception:  # pragma: no cover - 依赖缺失时仅启用进程内缓存
+    Redis = None  # type: ignore[assignment]
+
+    class RedisError(Exception):
+        pass
+
+from app.core.config import settings
+from app.core.local_cache import LocalTTLCache
+
+
+logger = logging.getLogger(__name__)
+
+# ── 会话状态缓存 ──────────────────────────────────────────────────────────────
+# 鉴权热路径只需要会话的 status / user_id / 指纹 / 过期时间，两级缓存：
+#   • 进程内：短 TTL 的 LocalTTLCache，命中即零 SQL、零网络
+#   • Redis：跨 worker 共享，进程内未命中时一次 GET
+# 会话状态变更（注销、强制下线、续期、过期）时显式失效：删除 Redis key 并
+# PUBLISH 会话 ID，各进程的监听线程收到后剔除本地条目。监听断线期间清空本地缓存，
+# 进程内 TTL 兜底漏收的消息。
+_SESSION_STATE_KEY_PREFIX = "mes:session:state"
+_SESSION_STATE_LOCAL_MAX_SIZE = 20_000
+_SESSION_STATE_LOCAL_CACHE: LocalTTLCache[str, CachedSessionState] = LocalTTLCache(
+    "session.state",
+    max_size=_SESSION_STATE_LOCAL_MAX_SIZE,
+    ttl_seconds=settings.session_state_cache_local_ttl_seconds,
+)
+
+_SESSION_STATE_REDIS_CLIENT: Redis | None = None
+_SESSION_STATE_REDIS_INIT = False
+_SESSION_STATE_REDIS_DISABLED_UNTIL = 0.0
+_SESSION_STATE_REDIS_BACKOFF_SECONDS = 30.0
+
+_SESSION_STATE_BUS_LOCK = Lock()
+_SESSION_STATE_BUS_STARTED = False
+_SESSION_STATE_BUS_THREAD: Thread | None = None
+_SESSION_STATE_BUS_STOP = Event()
+_SESSION_STATE_BUS_POLL_SECONDS = 1.0
+
+
+@dataclass(frozen=True, slots=True)
+class CachedSessionState:
+    session_token_id: str
+    status: str
+    user_id: int
+    login_ip: str | None
+    terminal_info: str | None
+    expires_at: datetime
+    last_active_at: datetime | None = None
+
+
+def session_state_from_row(session_token_id: str, row: object) -> CachedSessionState:
+    return CachedSessionState(
+        session_token_id=session_token_id,
+        status=str(getattr(row, "status")),
+        user_id=int(getattr(row, "user_id")),
+        login_ip=getattr(row, "login_ip", None),
+        terminal_info=getattr(row, "terminal_info", None),
+        expires_at=getattr(row, "expires_at"),
+        last_active_at=getattr(row, "last_active_at", None),
+    )
+
+
+def _session_state_cache_enabled() -> bool:
+    return bool(settings.session_state_cache_enabled)
+
+
+def _session_state_key(session_token_id: str) -> str:
+    return f"{_SESSION_STATE_KEY_PREFIX}:{session_token_id}"
+
+
+def _serialize_session_state(state: CachedSessionState) -> str:
+    return json.dumps(
+        {
+            "status": state.status,
+            "user_id": state.user_id,
+            "login_ip": state.login_ip,
+            "terminal_info": state.terminal_info,
+            "expires_at": state.expires_at.isoformat(),
+            "last_active_at": (
+                state.last_active_at.isoformat() if state.last_active_at else None
+            ),
+        },
+        ensure_ascii=False,
+    )
+
+
+def _deserialize_session_state(
+    session_token_id: str,
+    payload: str,
+) -> CachedSessionState | None:
+    try:
+        data = json.loads(payload)
+        last_active_raw = data.get("last_active_at")
+        return CachedSessionState(
+            session_token_id=session_token_id,
+            status=str(data["status"]),
+            user_id=int(data["user_id"]),
+            login_ip=data.get("login_ip"),
+            terminal_info=data.get("terminal_info"),
+            expires_at=datetime.fromisoformat(data["expires_at"]),
+            last_active_at=(
+                datetime.fromisoformat(last_active_raw) if last_active_raw else None
+            ),
+        )
+    except (TypeError, ValueError, KeyError):
+        return None
+
+
+def _remaining_seconds(state: CachedSessionState) -> float:
+    return (state.expires_at - datetime.now(UTC)).total_seconds()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Redis client helpers
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _build_session_state_redis_client(*, socket_timeout: float | None) -> Redis:
+    return Redis(
+        host=settings.redis_host,
+        port=settings.redis_port,
+        db=settings.redis_db,
+        password=settings.redis_password or None,
+        ssl=settings.redis_ssl,
+        decode_responses=True,
+        socket_timeout=socket_timeout,
+        socket_connect_timeout=max(0.05, settings.redis_connect_timeout_seconds),
+    )
+
+
+def _get_session_state_redis_client() -> Redis | None:
+    global _SESSION_STATE_REDIS_CLIENT, _SESSION_STATE_REDIS_INIT
+
+    if _SESSION_STATE_REDIS_DISABLED_UNTIL > time.monotonic():
+        return None
+    if _SESSION_STATE_REDIS_INIT:
+        return _SESSION_STATE_REDIS_CLIENT
+    _SESSION_STATE_REDIS_INIT = True
+    if Redis is None:
+        return None
+    try:
+        _SESSION_STATE_REDIS_CLIENT = _build_session_state_redis_client(
+            socket_timeout=max(0.05, settings.redis_socket_timeout_seconds)
+        )
+        _SESSION_STATE_REDIS_CLIENT.ping()
+    except Exception:
+        _mark_session_state_redis_unavailable()
+        logger.warning(
+            "[SESSION_STATE] Redis 连接失败，会话状态缓存退化为进程内（backoff %ds）。",
+            _SESSION_STATE_REDIS_BACKOFF_SECONDS,
+            exc_info=True,
+        )
+    return _SESSION_STATE_REDIS_CLIENT
+
+
+def _mark_session_state_redis_unavailable() -> None:
+    global _SESSION_STATE_REDIS_CLIENT, _SESSION_STATE_REDIS_INIT
+    global _SESSION_STATE_REDIS_DISABLED_UNTIL
+    _SESSION_STATE_REDIS_CLIENT = None
+    _SESSION_STATE_REDIS_INIT = False
+    _SESSION_STATE_REDIS_DISABLED_UNTIL = (
+        time.monotonic() + _SESSION_STATE_REDIS_BACKOFF_SECONDS
+    )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Local tier
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _get_local_session_state(session_token_id: str) -> CachedSessionState | None:
+    return _SESSION_STATE_LOCAL_CACHE.get(session_token_id)
+
+
+def _set_local_session_state(state: CachedSessionState, *, ttl_seconds: float) -> None:
+    _SESSION_STATE_LOCAL_CACHE.set(state.session_token_id, state, ttl_seconds=ttl_seconds)
+
+
+def _forget_local_session_states(session_token_ids: list[str]) -> None:
+    for session_token_id in session_token_ids:
+        _SESSION_STATE_LOCAL_CACHE.pop(session_token_id)
+
+
+def clear_local_session_states() -> None:
+    _SESSION_STATE_LOCAL_CACHE.clear()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Public API
+# ─────────────────────────────────────────────────────────────────────────────
+
+def get_cached_session_state(session_token_id: str) -> CachedSessionState | None:
+    """先查进程内，再查 Redis；均未命中返回 None，由调用方回源数据库"""
+    if not _session_state_cache_enabled():
+        return None
+    _ensure_session_state_bus_started()
+    state = _get_local_session_state(session_token_id)
+    if state is not None:
+        return state
+    redis_client = _get_session_state_redis_client()
+    if redis_client is None:
+        return None
+    try:
+        payload = redis_client.get(_session_state_key(session_token_id))
+    except RedisError:
+        _mark_session_state_redis_unavailable()
+        return None
+    if payload is None:
+        return None
+    state = _deserialize_session_state(session_token_id, payload)
+    if state is None:
+        return None
+    _set_local_session_state(
+        state,
+        ttl_seconds=min(
+            float(settings.session_state_cache_local_ttl_seconds),
+            _remaining_seconds(state),
+        ),
+    )
+    return state
+
+
+def cache_session_state(state: CachedSessionState) -> None:
+    """只缓存 active 会话；TTL 不超过会话剩余有效期"""
+    if not _session_state_cache_enabled() or state.status != "active":
+        return
+    remaining = _remaining_seconds(state)
+    if remaining <= 0:
+        return
+    _ensure_session_state_bus_started()
+    _set_local_session_state(
+        state,
+        ttl_seconds=min(float(settings.session_state_cache_local_ttl_seconds), remaining),
+    )
+    redis_client = _get_session_state_redis_client()
+    if redis_client is None:
+        return
+    redis_ttl = max(1, int(min(settings.session_state_cache_redis_ttl_seconds, remaining)))
+    try:
+        redis_client.setex(
+            _session_state_key(state.session_token_id),
+            redis_ttl,
+            _serialize_session_state(state),
+        )
+    except RedisError:
+        _mark_session_state_redis_unavailable()
+
+
+def note_session_state_touched(session_token_id: str, *, touched_at: datetime) -> None:
+    """本进程登记 touch 后同步本地条目的 last_active_at，避免刷新周期内重复登记"""
+    state = _SESSION_STATE_LOCAL_CACHE.get(session_token_id)
+    if state is None:
+        return
+    _SESSION_STATE_LOCAL_CACHE.replace(
+        session_token_id,
+        replace(state, last_active_at=touched_at),
+    )
+
+
+def invalidate_session_states(session_token_ids: list[str]) -> None:
+    """会话状态变更后调用：本进程立即剔除，Redis 删除并广播给其他进程"""
+    normalized_ids = sorted({token.strip() for token in session_token_ids if token and token.strip()})
+    if not normalized_ids:
+        return
+    _forget_local_session_states(normalized_ids)
+    if not _session_state_cache_enabled():
+        return
+    redis_client = _get_session_state_redis_client()
+    if redis_client is None:
+        return
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.delete(*[_session_state_key(token) for token in normalized_ids])
+        pipe.publish(
+            settings.session_state_invalidation_channel,
+            ",".join(normalized_ids),
+        )
+        pipe.execute()
+    except RedisError:
+        _mark_session_state_redis_unavailable()
+        logger.warning(
+            "[SESSION_STATE] 会话状态失效广播失败，其他进程依赖本地 TTL 过期。",
+            exc_info=True,
+        )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Invalidation bus
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _run_session_state_bus_listener() -> None:
+    # 每次断线只清空一次；Redis 持续不可用时，退避重连不再反复清空本地缓存。
+    # 断线期间加载的条目可能错过其他进程的失效，重连成功后再清空一次。
+    cleared_for_outage = False
+    while not _SESSION_STATE_BUS_STOP.is_set():
+        pubsub = None
+        try:
+            redis_client = _build_session_state_redis_client(socket_timeout=None)
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(settings.session_state_invalidation_channel)
+            if cleared_for_outage:
+                clear_local_session_states()
+                cleared_for_outage = False
+            while not _SESSION_STATE_BUS_STOP.is_set():
+                message = pubsub.get_message(timeout=_SESSION_STATE_BUS_POLL_SECONDS)
+                if message and message.get("type") == "message":
+                    payload = str(message.get("data") or "")
+                    _forget_local_session_states(
+                        [token for token in payload.split(",") if token]
+                    )
+        except Exception:
+            logger.warning(
+                "[SESSION_STATE] 失效总线监听中断，%ds 后重连。",
+                _SESSION_STATE_REDIS_BACKOFF_SECONDS,
+                exc_info=True,
+            )
+            # 断线期间可能漏收失效，清空本地缓存回落到 Redis / 数据库
+            if not cleared_for_outage:
+                clear_local_session_states()
+                cleared_for_outage = True
+            _SESSION_STATE_BUS_STOP.wait(_SESSION_STATE_REDIS_BACKOFF_SECONDS)
+        finally:
+            if pubsub is not None:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+
+
+def _ensure_session_state_bus_started() -> None:
+    global _SESSION_STATE_BUS_STARTED, _SESSION_STATE_BUS_THREAD
+    if _SESSION_STATE_BUS_STARTED:
+        return
+    with _SESSION_STATE_BUS_LOCK:
+        if _SESSION_STATE_BUS_STARTED:
+            return
+        _SESSION_STATE_BUS_STARTED = True
+        if Redis is None:
+            return
+        _SESSION_STATE_BUS_STOP.clear()
+        _SESSION_STATE_BUS_THREAD = Thread(
+            target=_run_session_state_bus_listener,
+            name="session-state-bus",
+            daemon=True,
+        )
+        _SESSION_STATE_BUS_THREAD.start()
+
+
+def stop_session_state_bus() -> None:
+    global _SESSION_STATE_BUS_STARTED, _SESSION_STATE_BUS_THREAD
+    with _SESSION_STATE_BUS_LOCK:
+        _SESSION_STATE_BUS_STOP.set()
+        thread = _SESSION_STATE_BUS_THREAD
+        _SESSION_STATE_BUS_THREAD = None
+        _SESSION_STATE_BUS_STARTED = False
+    if thread is not None and thread.is_alive():
+        thread.join(timeout=_SESSION_STATE_BUS_POLL_SECONDS * 2)
+
+
+def _reset_session_state_cache_after_fork() -> None:
+    global _SESSION_STATE_BUS_STARTED, _SESSION_STATE_BUS_THREAD
+    global _SESSION_STATE_BUS_STOP, _SESSION_STATE_BUS_LOCK
+    global _SESSION_STATE_REDIS_CLIENT, _SESSION_STATE_REDIS_INIT
+    # fork 出的 worker 不继承监听线程，也不能沿用父进程的连接（本地缓存由 local_cache 统一重置）
+    _SESSION_STATE_BUS_LOCK = Lock()
+    _SESSION_STATE_BUS_STOP = Event()
+    _SESSION_STATE_BUS_STARTED = False
+    _SESSION_STATE_BUS_THREAD = None
+    _SESSION_STATE_REDIS_CLIENT = None
+    _SESSION_STATE_REDIS_INIT = False
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_session_state_cache_after_fork)
@@ -1,12 +1,12 @@
 from __future__ import annotations
 
-import csv
-import io
+import time
+from collections.abc import Iterator
 from datetime import UTC, datetime, timedelta
 from pathlib import Path
 from uuid import uuid4
 
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 
 from app.db.session import SessionLocal
@@ -14,6 +14,13 @@ from app.models.user import User
 from app.models.user_export_task import UserExportTask
 from app.schemas.user import UserDeleteResult, UserItem
 from app.services.audit_service import write_audit_log
+from app.services.export_stream_service import (
+    EXPORT_FORMAT_CSV,
+    EXPORT_FORMAT_XLSX,
+    EXPORT_MIME_TYPES,
+    iter_scalars,
+    write_export_file,
+)
 from app.services.session_service import list_online_user_ids
 from app.services.user_service import (
     DELETED_SCOPE_ACTIVE,
@@ -29,11 +36,29 @@ USER_EXPORT_STATUS_EXPIRED = "expired"
 USER_EXPORT_PROCESSING_TIMEOUT_MINUTES = 30
 USER_EXPORT_RETENTION_DAYS = 7
 USER_EXPORT_TASK_LIST_LIMIT = 20
+USER_EXPORT_CLEANUP_MIN_INTERVAL_SECONDS = 60
+USER_EXPORT_HEADERS = [
+    "id",
+    "用户名",
+    "角色",
+    "工段",
+    "在线状态",
+    "账号状态",
+    "是否已删除",
+    "首次登录需改密",
+    "创建时间",
+    "最近登录时间",
+    "删除时间",
+    "备注",
+]
 RUNTIME_EXPORT_DIR = (
     Path(__file__).resolve().parents[2] / "runtime_exports" / "user"
 )
 
 
+_USER_EXPORT_TASK_CLEANUP_NEXT_AT = 0.0
+
+
 def _now_utc() -> datetime:
     return datetime.now(UTC)
 
@@ -70,113 +95,75 @@ def build_user_export_filename(
     return f"{base_name}_{timestamp}.{extension}"
 
 
-def _build_export_rows(users: list[User], online_user_ids: set[int]) -> list[list[str]]:
-    rows: list[list[str]] = []
-    for user in users:
-        rows.append(
-            [
-                str(user.id),
-                user.username,
-                next(iter(sorted(role.name for role in user.roles)), "/"),
-                user.stage.name if user.stage else "/",
-                "在线" if user.id in online_user_ids else "离线",
-                "启用" if user.is_active else "停用",
-                "是" if user.is_deleted else "否",
-                "是" if user.must_change_password else "否",
-                user.created_at.isoformat() if user.created_at else "",
-                user.last_login_at.isoformat() if user.last_login_at else "",
-                user.deleted_at.isoformat() if user.deleted_at else "",
-                user.remark or "",
-            ]
+def _build_export_row(user: User, online_user_ids: set[int]) -> list[str]:
+    return [
+        str(user.id),
+        user.username,
+        next(iter(sorted(role.name for role in user.roles)), "/"),
+        user.stage.name if user.stage else "/",
+        "在线" if user.id in online_user_ids else "离线",
+        "启用" if user.is_active else "停用",
+        "是" if user.is_deleted else "否",
+        "是" if user.must_change_password else "否",
+        user.created_at.isoformat() if user.created_at else "",
+        user.last_login_at.isoformat() if user.last_login_at else "",
+        user.deleted_at.isoformat() if user.deleted_at else "",
+        user.remark or "",
+    ]
+
+
+def _run_cleanup_user_export_tasks(db: Session) -> None:
+    """只按 (status, 时间) 过滤需要处理的任务，不再全表扫描"""
+    now = _now_utc()
+    ensure_user_export_runtime_dir()
+    interrupted = db.execute(
+        update(UserExportTask)
+        .where(
+            UserExportTask.status == USER_EXPORT_STATUS_PROCESSING,
+            UserExportTask.started_at
+            < now - timedelta(minutes=USER_EXPORT_PROCESSING_TIMEOUT_MINUTES),
         )
-    return rows
-
-
-def _build_csv_bytes(rows: list[list[str]]) -> bytes:
-    buffer = io.StringIO()
-    buffer.write("\ufeff")
-    writer = csv.writer(buffer)
-    writer.writerow(
-        [
-            "id",
-            "用户名",
-            "角色",
-            "工段",
-            "在线状态",
-            "账号状态",
-            "是否已删除",
-            "首次登录需改密",
-            "创建时间",
-            "最近登录时间",
-            "删除时间",
-            "备注",
-        ]
-    )
-    writer.writerows(rows)
-    return buffer.getvalue().encode("utf-8")
+        .values(
+            status=USER_EXPORT_STATUS_FAILED,
+            failure_reason="任务执行中断，请重新导出",
+            finished_at=now,
+        )
+    ).rowcount
+    expired_rows = db.execute(
+        select(UserExportTask.id, UserExportTask.storage_path).where(
+            UserExportTask.status == USER_EXPORT_STATUS_SUCCEEDED,
+            UserExportTask.expires_at <= now,
+        )
+    ).all()
+    for _, storage_path in expired_rows:
+        if storage_path:
+            Path(storage_path).unlink(missing_ok=True)
+    if expired_rows:
+        db.execute(
+            update(UserExportTask)
+            .where(UserExportTask.id.in_([int(task_id) for task_id, _ in expired_rows]))
+            .values(status=USER_EXPORT_STATUS_EXPIRED)
+        )
+    if interrupted or expired_rows:
+        db.commit()
 
 
-def _build_excel_bytes(rows: list[list[str]]) -> bytes:
+def cleanup_user_export_tasks(
+    db: Session,
+    *,
+    min_interval_seconds: float = USER_EXPORT_CLEANUP_MIN_INTERVAL_SECONDS,
+) -> None:
+    """列表 / 详情接口频繁调用，按进程节流；执行失败时放开窗口以便下次重试"""
+    global _USER_EXPORT_TASK_CLEANUP_NEXT_AT
+    now = time.monotonic()
+    if now < _USER_EXPORT_TASK_CLEANUP_NEXT_AT:
+        return
+    _USER_EXPORT_TASK_CLEANUP_NEXT_AT = now + min_interval_seconds
     try:
-        import openpyxl
-    except ImportError as exc:
-        raise RuntimeError("Excel 导出不可用：缺少 openpyxl") from exc
-
-    workbook = openpyxl.Workbook()
-    worksheet = workbook.active
-    assert worksheet is not None
-    worksheet.title = "用户列表"
-    worksheet.append(
-        [
-            "id",
-            "用户名",
-            "角色",
-            "工段",
-            "在线状态",
-            "账号状态",
-            "是否已删除",
-            "首次登录需改密",
-            "创建时间",
-            "最近登录时间",
-            "删除时间",
-            "备注",
-        ]
-    )
-    for row in rows:
-        worksheet.append(row)
-    buffer = io.BytesIO()
-    workbook.save(buffer)
-    return buffer.getvalue()
-
-
-def cleanup_user_export_tasks(db: Session) -> None:
-    now = _now_utc()
-    changed = False
-    ensure_user_export_runtime_dir()
-    tasks = db.execute(select(UserExportTask)).scalars().all()
-    for task in tasks:
-        if (
-            task.status == USER_EXPORT_STATUS_PROCESSING
-            and task.started_at is not None
-            and now - task.started_at > timedelta(minutes=USER_EXPORT_PROCESSING_TIMEOUT_MINUTES)
-        ):
-            task.status = USER_EXPORT_STATUS_FAILED
-            task.failure_reason = "任务执行中断，请重新导出"
-            task.finished_at = now
-            changed = True
-        if (
-            task.status == USER_EXPORT_STATUS_SUCCEEDED
-            and task.expires_at is not None
-            and task.expires_at <= now
-        ):
-            if task.storage_path:
-                file_path = Path(task.storage_path)
-                if file_path.exists():
-                    file_path.unlink(missing_ok=True)
-            task.status = USER_EXPORT_STATUS_EXPIRED
-            changed = True
-    if changed:
-        db.commit()
+        _run_cleanup_user_export_tasks(db)
+    except Exception:
+        _USER_EXPORT_TASK_CLEANUP_NEXT_AT = 0.0
+        raise
 
 
 def create_user_export_task(
@@ -250,24 +237,26 @@ def run_user_export_task(task_id: int) -> None:
         task.record_count = 0
         db.commit()
 
-        online_user_ids_for_filter = None
-        if task.deleted_scope != DELETED_SCOPE_DELETED:
-            online_user_ids_for_filter = list_online_user_ids(db)
-
         stmt = query_users(
             keyword=task.keyword,
             role_code=task.role_code,
             is_active=task.is_active,
             deleted_scope=task.deleted_scope,
         )
-        users = db.execute(stmt).scalars().all()
-        candidate_user_ids = [int(user.id) for user in users]
+        # 在线用户集合规模有限，一次取全量；用户行走服务端游标分批写文件
         online_user_ids = (
-            list_online_user_ids(db, candidate_user_ids=candidate_user_ids)
-            if candidate_user_ids
+            list_online_user_ids(db)
+            if task.deleted_scope != DELETED_SCOPE_DELETED
             else set()
         )
-        rows = _build_export_rows(users, online_user_ids)
+        record_count = 0
+
+        def export_rows() -> Iterator[list[str]]:
+            nonlocal record_count
+            for user in iter_scalars(db, stmt):
+                record_count += 1
+                yield _build_export_row(user, online_user_ids)
+
         file_name = build_user_export_filename(
             deleted_scope=task.deleted_scope,
             format=task.format,
@@ -276,16 +265,18 @@ def run_user_export_task(task_id: int) -> None:
         )
         runtime_dir = ensure_user_export_runtime_dir()
         file_path = runtime_dir / file_name
-        if task.format == "excel":
-            content_bytes = _build_excel_bytes(rows)
-            mime_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        else:
-            content_bytes = _build_csv_bytes(rows)
-            mime_type = "text/csv"
-        file_path.write_bytes(content_bytes)
+        export_format = EXPORT_FORMAT_XLSX if task.format == "excel" else EXPORT_FORMAT_CSV
+        write_export_file(
+            file_path,
+            USER_EXPORT_HEADERS,
+            export_rows(),
+            format=export_format,
+            sheet_title="用户列表",
+        )
+        mime_type = EXPORT_MIME_TYPES[export_format]
 
         task.status = USER_EXPORT_STATUS_SUCCEEDED
-        task.record_count = len(rows)
+        task.record_count = record_count
         task.file_name = file_name
         task.mime_type = mime_type
         task.storage_path = str(file_path.resolve())
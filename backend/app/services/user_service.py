@@ -29,6 +29,7 @@ from app.models.user import User
 from app.models.user_session import UserSession
 from app.schemas.user import UserCreate, UserUpdate
 from app.services.authz_service import get_permission_codes_for_role_codes
+from app.services.keyword_search_service import keyword_filter
 from app.services.online_status_service import clear_user, get_user_online_snapshot
 from app.services.role_service import (
     get_role_by_code_case_insensitive,
@@ -112,8 +113,9 @@ def _build_user_filter_conditions(
         conditions.append(User.is_deleted.is_(False))
     elif deleted_scope == DELETED_SCOPE_DELETED:
         conditions.append(User.is_deleted.is_(True))
-    if keyword:
-        conditions.append(User.username.ilike(f"%{keyword}%"))
+    keyword_clause = keyword_filter(keyword, User.username)
+    if keyword_clause is not None:
+        conditions.append(keyword_clause)
     if role_code:
         requires_role_join = True
         conditions.append(Role.code == role_code)
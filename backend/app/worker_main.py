@@ -5,8 +5,12 @@ import logging
 
 from app.bootstrap import run_startup_bootstrap
 from app.core.config import ensure_runtime_settings_secure, settings
+from app.services.export_job_service import run_export_job_worker_loop
 from app.services.maintenance_scheduler_service import run_maintenance_auto_generate_loop
+from app.services.message_connection_manager import message_connection_manager
+from app.services.message_fanout_service import build_message_fanout_bus
 from app.services.message_service import run_message_delivery_maintenance_loop
+from app.services.session_service import run_session_touch_flush_loop
 
 
 logger = logging.getLogger(__name__)
@@ -21,11 +25,25 @@ async def run_worker() -> None:
         logger.info("[WORKER] 后台循环已禁用，worker 直接退出。")
         return
 
+    if settings.message_delivery_maintenance_enabled:
+        # worker 进程不持有 WebSocket，只把补偿/重试推送转发给持有连接的 web worker。
+        await message_connection_manager.start_fanout(
+            build_message_fanout_bus(),
+            subscribe=False,
+        )
+
     tasks: list[asyncio.Task[None]] = []
     if settings.maintenance_auto_generate_enabled:
         tasks.append(asyncio.create_task(run_maintenance_auto_generate_loop()))
     if settings.message_delivery_maintenance_enabled:
         tasks.append(asyncio.create_task(run_message_delivery_maintenance_loop()))
+    if settings.export_job_worker_enabled:
+        for worker_index in range(max(settings.export_job_worker_concurrency, 1)):
+            tasks.append(
+                asyncio.create_task(run_export_job_worker_loop(worker_index=worker_index))
+            )
+    if settings.session_touch_flush_enabled:
+        tasks.append(asyncio.create_task(run_session_touch_flush_loop()))
     if not tasks:
         logger.info("[WORKER] 没有可运行的后台循环，worker 直接退出。")
         return
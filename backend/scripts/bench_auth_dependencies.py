@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import deps
+from app.db.session import get_db
+from app.models.user import User
+
+_BENCH_PERMISSION = "authz.permissions.catalog.view"
+_BENCH_USER_AGENT = "bench-auth/1.0"
+_BENCH_CLIENT_HOST = "testclient"
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description=(
+            "测量鉴权依赖在单个请求内的开销：JWT 解码、会话校验、用户加载次数与平均耗时。"
+            "会话 / 用户 / 权限查询以固定延迟的桩函数模拟，不依赖数据库。"
+        )
+    )
+    parser.add_argument("--requests", type=int, default=2000, help="每个场景的请求数。")
+    parser.add_argument(
+        "--io-latency-ms",
+        type=float,
+        default=0.0,
+        help="模拟每次会话 / 用户 / 权限查询的往返延迟（毫秒）。",
+    )
+    return parser
+
+
+def _build_bench_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/bench/fast-only")
+    def fast_only(
+        _: None = Depends(deps.require_permission_fast(_BENCH_PERMISSION)),
+    ) -> dict[str, bool]:
+        return {"ok": True}
+
+    @app.get("/api/v1/bench/fast-with-user")
+    def fast_with_user(
+        current_user: User = Depends(deps.get_current_user),
+        _: None = Depends(deps.require_permission_fast(_BENCH_PERMISSION)),
+    ) -> dict[str, int]:
+        return {"user_id": current_user.id}
+
+    @app.get("/api/v1/bench/permission-with-user")
+    def permission_with_user(
+        current_user: User = Depends(deps.get_current_user),
+        _: User = Depends(deps.require_permission(_BENCH_PERMISSION)),
+    ) -> dict[str, int]:
+        return {"user_id": current_user.id}
+
+    app.dependency_overrides[get_db] = lambda: SimpleNamespace(commit=lambda: None)
+    return app
+
+
+def _counting(counter: Counter, name: str, result, *, latency_seconds: float):
+    def _fake(*_args, **_kwargs):
+        counter[name] += 1
+        if latency_seconds > 0:
+            time.sleep(latency_seconds)
+        return result
+
+    return _fake
+
+
+def _reset_deps_caches() -> None:
+    for cache in (
+        deps._AUTH_USER_CACHE,
+        deps._PERMISSION_DECISION_CACHE,
+        deps._SESSION_PERMISSION_DECISION_CACHE,
+    ):
+        cache.clear()
+
+
+def run_benchmark(*, request_count: int, io_latency_ms: float) -> list[dict[str, object]]:
+    latency_seconds = max(io_latency_ms, 0.0) / 1000
+    user = SimpleNamespace(
+        id=7,
+        is_deleted=False,
+        is_active=True,
+        roles=[SimpleNamespace(code="system_admin", is_enabled=True)],
+    )
+    session_row = SimpleNamespace(
+        status="active",
+        user_id=7,
+        login_ip=_BENCH_CLIENT_HOST,
+        terminal_info=_BENCH_USER_AGENT,
+    )
+    client = TestClient(_build_bench_app())
+    headers = {"Authorization": "Bearer bench-token", "User-Agent": _BENCH_USER_AGENT}
+    results: list[dict[str, object]] = []
+    for path in (
+        "/api/v1/bench/fast-only",
+        "/api/v1/bench/fast-with-user",
+        "/api/v1/bench/permission-with-user",
+    ):
+        counter: Counter = Counter()
+        _reset_deps_caches()
+        with (
+            patch.object(
+                deps,
+                "decode_access_token",
+                _counting(
+                    counter,
+                    "decode_access_token",
+                    {"sub": "7", "sid": "sid-bench", "login_type": "web"},
+                    latency_seconds=0,
+                ),
+            ),
+            patch.object(
+                deps,
+                "touch_session_by_token_id",
+                _counting(
+                    counter,
+                    "touch_session",
+                    (session_row, False),
+                    latency_seconds=latency_seconds,
+                ),
+            ),
+            patch.object(
+                deps,
+                "get_session_by_token_id",
+                _counting(
+                    counter,
+                    "get_session",
+                    session_row,
+                    latency_seconds=latency_seconds,
+                ),
+            ),
+            patch.object(
+                deps,
+                "get_user_for_auth",
+                _counting(counter, "get_user", user, latency_seconds=latency_seconds),
+            ),
+            patch.object(
+                deps,
+                "get_user_permission_codes",
+                _counting(
+                    counter,
+                    "get_permission_codes",
+                    {_BENCH_PERMISSION},
+                    latency_seconds=latency_seconds,
+                ),
+            ),
+            patch.object(deps, "touch_user", _counting(counter, "touch_user", None, latency_seconds=0)),
+        ):
+            # 预热一次，排除首个请求的路由编译与权限缓存填充
+            client.get(path, headers=headers).raise_for_status()
+            counter.clear()
+            started = time.perf_counter()
+            for _ in range(request_count):
+                client.get(path, headers=headers).raise_for_status()
+            elapsed = time.perf_counter() - started
+        results.append(
+            {
+                "path": path,
+                "requests": request_count,
+                "avg_us_per_request": round(elapsed / request_count * 1_000_000, 1),
+                "calls_per_request": {
+                    name: round(count / request_count, 2)
+                    for name, count in sorted(counter.items())
+                },
+            }
+        )
+    return results
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    for row in run_benchmark(
+        request_count=max(1, args.requests),
+        io_latency_ms=args.io_latency_ms,
+    ):
+        print(json.dumps(row, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
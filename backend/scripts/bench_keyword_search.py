@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from sqlalchemy import text
+
+from app.db.session import SessionLocal
+from app.services import production_order_service
+
+DEFAULT_SIZE = 1_000_000
+# 命中率从高到低：前缀几乎全中 / 中段数字 / 精确到单号 / 不足 3 个字符（无法用 trigram）
+DEFAULT_KEYWORDS = ("BENCH-", "04217", "BENCH-0731337", "供应", "不存在的关键字")
+
+_SEED_PRODUCTS_SQL = text(
+    """
+    INSERT INTO mes_product (name, created_at, updated_at)
+    SELECT 'bench-product-' || n, :now, :now
+    FROM generate_series(1, :product_count) AS n
+    """
+)
+
+_SEED_ORDERS_SQL = text(
+    """
+    WITH bench_products AS (
+        SELECT array_agg(id ORDER BY id) AS ids
+        FROM mes_product
+        WHERE name LIKE 'bench-product-%'
+    )
+    INSERT INTO mes_order (
+        order_code, product_id, supplier_name, quantity, status,
+        created_at, updated_at
+    )
+    SELECT
+        'BENCH-' || lpad(n::text, 7, '0'),
+        bench_products.ids[n % cardinality(bench_products.ids) + 1],
+        '供应商' || (n % 500),
+        100,
+        CASE n % 3 WHEN 0 THEN 'pending' WHEN 1 THEN 'in_progress' ELSE 'completed' END,
+        :now - (n % 365) * interval '1 day',
+        :now - (n % 365) * interval '1 day' - n * interval '1 second'
+    FROM generate_series(1, :size) AS n, bench_products
+    """
+)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description=(
+            "在事务内灌入样本工单并测量订单列表关键字搜索耗时，"
+            "对比 trigram 索引与强制顺序扫描，结束后回滚。"
+        )
+    )
+    parser.add_argument("--size", type=int, default=DEFAULT_SIZE, help="样本工单条数，默认 1000000。")
+    parser.add_argument(
+        "--products",
+        type=int,
+        default=2000,
+        help="样本产品数，工单按序号轮流挂到这些产品上。",
+    )
+    parser.add_argument(
+        "--keywords",
+        nargs="+",
+        default=list(DEFAULT_KEYWORDS),
+        help="要测量的关键字列表。",
+    )
+    parser.add_argument("--rounds", type=int, default=5, help="每个关键字重复次数，取中位数。")
+    parser.add_argument(
+        "--count-mode",
+        default="exact",
+        choices=["exact", "capped", "estimated"],
+        help="列表总数模式，与 /production/orders 的 count_mode 一致。",
+    )
+    parser.add_argument(
+        "--explain",
+        action="store_true",
+        help="额外打印每个关键字的 EXPLAIN (ANALYZE, BUFFERS)。",
+    )
+    return parser
+
+
+def _time_list_orders(db, *, keyword: str, rounds: int, count_mode: str) -> tuple[float, int]:
+    samples: list[float] = []
+    total = 0
+    for _ in range(rounds):
+        started = time.perf_counter()
+        total, _ = production_order_service.list_orders(
+            db,
+            page=1,
+            page_size=20,
+            keyword=keyword,
+            status=None,
+            count_mode=count_mode,
+        )
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), total
+
+
+def _print_plan(db, *, keyword: str) -> None:
+    stmt = production_order_service._order_list_statement(
+        keyword=keyword,
+        status=None,
+        product_name=None,
+        pipeline_enabled=None,
+        start_date_from=None,
+        start_date_to=None,
+        due_date_from=None,
+        due_date_to=None,
+    ).limit(20)
+    compiled = stmt.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True})
+    for row in db.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {compiled}")):
+        print(f"    {row[0]}")
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    db = SessionLocal()
+    try:
+        if db.get_bind().dialect.name != "postgresql":
+            raise SystemExit("该基准依赖 PostgreSQL 与 pg_trgm，请将 DATABASE_URL 指向 PostgreSQL。")
+        now = datetime.now(UTC)
+        product_count = max(1, args.products)
+        seed_started = time.perf_counter()
+        db.execute(_SEED_PRODUCTS_SQL, {"now": now, "product_count": product_count})
+        db.execute(
+            _SEED_ORDERS_SQL,
+            {"now": now, "size": args.size},
+        )
+        db.execute(text("ANALYZE mes_product"))
+        db.execute(text("ANALYZE mes_order"))
+        seed_ms = (time.perf_counter() - seed_started) * 1000
+        print(f"[size={args.size}] seeded in {seed_ms:.0f} ms")
+
+        rounds = max(1, args.rounds)
+        for keyword in args.keywords:
+            indexed_ms, total = _time_list_orders(
+                db, keyword=keyword, rounds=rounds, count_mode=args.count_mode
+            )
+            # 关闭位图 / 索引扫描，近似迁移前的顺序扫描基线
+            db.execute(text("SET LOCAL enable_bitmapscan = off"))
+            db.execute(text("SET LOCAL enable_indexscan = off"))
+            seqscan_ms, _ = _time_list_orders(
+                db, keyword=keyword, rounds=rounds, count_mode=args.count_mode
+            )
+            db.execute(text("SET LOCAL enable_bitmapscan = on"))
+            db.execute(text("SET LOCAL enable_indexscan = on"))
+            print(
+                f"[keyword={keyword!r}] total={total} trigram_ms={indexed_ms:.1f} "
+                f"seqscan_ms={seqscan_ms:.1f}"
+            )
+            if args.explain:
+                _print_plan(db, keyword=keyword)
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from sqlalchemy import event, text
+
+from app.db.session import SessionLocal
+from app.services import message_service
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+
+# 按比例混合：绑定来源的有效消息 / 过保留期的来源失效消息 / 已过期消息 / 普通通知
+_SEED_SQL = text(
+    """
+    INSERT INTO msg_message (
+        message_type, priority, title, source_module, source_type, source_id,
+        status, expires_at, created_at, updated_at
+    )
+    SELECT
+        CASE WHEN n % 4 = 0 THEN 'todo' ELSE 'notice' END,
+        'normal',
+        'bench-message-' || n,
+        CASE n % 4
+            WHEN 0 THEN 'user'
+            WHEN 1 THEN 'production'
+            WHEN 2 THEN 'quality'
+            ELSE NULL
+        END,
+        CASE n % 4
+            WHEN 0 THEN 'registration_request'
+            WHEN 1 THEN 'production_order'
+            WHEN 2 THEN 'repair_order'
+            ELSE NULL
+        END,
+        CASE WHEN n % 4 = 3 THEN NULL ELSE (-n)::text END,
+        CASE WHEN n % 10 = 0 THEN 'source_unavailable' ELSE 'active' END,
+        CASE WHEN n % 7 = 0 THEN :now - interval '60 days' ELSE NULL END,
+        :now - (n % 90) * interval '1 day',
+        :now - (n % 90) * interval '1 day'
+    FROM generate_series(1, :size) AS n
+    """
+)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="在事务内灌入样本消息并测量 run_message_maintenance 耗时，结束后回滚。"
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=list(DEFAULT_SIZES),
+        help="样本消息条数，默认 10000 100000 1000000。",
+    )
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        default=3,
+        help="每个规模连续执行维护的轮数（观察水位推进后的稳定耗时）。",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=message_service._MESSAGE_MAINTENANCE_BATCH_SIZE,
+        help="每轮来源检查 / 归档的批次大小。",
+    )
+    return parser
+
+
+def _bench_size(size: int, *, rounds: int, batch_size: int) -> None:
+    db = SessionLocal()
+    statement_count = 0
+
+    def _count_statement(*_args, **_kwargs) -> None:
+        nonlocal statement_count
+        statement_count += 1
+
+    connection = db.connection()
+    try:
+        now = datetime.now(UTC)
+        seed_started = time.perf_counter()
+        db.execute(_SEED_SQL, {"size": size, "now": now})
+        db.execute(text("ANALYZE msg_message"))
+        seed_ms = (time.perf_counter() - seed_started) * 1000
+        print(f"[size={size}] seeded in {seed_ms:.0f} ms")
+
+        message_service._MESSAGE_MAINTENANCE_SOURCE_WATERMARK = 0
+        event.listen(connection, "before_cursor_execute", _count_statement)
+        for round_index in range(1, rounds + 1):
+            statement_count = 0
+            started = time.perf_counter()
+            stats = message_service.run_message_maintenance(
+                db,
+                now=now,
+                batch_size=batch_size,
+            )
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            print(
+                f"[size={size}] round={round_index} elapsed_ms={elapsed_ms:.1f} "
+                f"statements={statement_count} stats={stats}"
+            )
+    finally:
+        if event.contains(connection, "before_cursor_execute", _count_statement):
+            event.remove(connection, "before_cursor_execute", _count_statement)
+        db.rollback()
+        db.close()
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    for size in args.sizes:
+        _bench_size(size, rounds=max(1, args.rounds), batch_size=max(1, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.db.session import SessionLocal
+from app.services.production_rollup_service import (
+    check_production_daily_rollup,
+    get_rollup_source_date_range,
+    rebuild_production_daily_rollup,
+)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="回填 / 重建生产日汇总表，或校验汇总与明细是否一致。"
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["rebuild", "check"],
+        default="rebuild",
+        help="rebuild=按区间删除并重新聚合；check=只校验，不一致时以非零码退出。",
+    )
+    parser.add_argument(
+        "--start-date",
+        type=date.fromisoformat,
+        default=None,
+        help="起始日期（YYYY-MM-DD），默认取源数据最早日期。",
+    )
+    parser.add_argument(
+        "--end-date",
+        type=date.fromisoformat,
+        default=None,
+        help="结束日期（YYYY-MM-DD，含当天），默认取源数据最晚日期。",
+    )
+    parser.add_argument(
+        "--chunk-days",
+        type=int,
+        default=31,
+        help="每个事务处理的天数，避免全量重建长时间持锁。",
+    )
+    parser.add_argument(
+        "--max-mismatches",
+        type=int,
+        default=20,
+        help="check 模式最多输出的不一致条数。",
+    )
+    return parser
+
+
+def _iter_chunks(start_date: date, end_date: date, chunk_days: int):
+    cursor = start_date
+    while cursor <= end_date:
+        chunk_end = min(cursor + timedelta(days=chunk_days - 1), end_date)
+        yield cursor, chunk_end
+        cursor = chunk_end + timedelta(days=1)
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    db = SessionLocal()
+    try:
+        start_date, end_date = args.start_date, args.end_date
+        if start_date is None or end_date is None:
+            source_range = get_rollup_source_date_range(db)
+            if source_range is None:
+                print(json.dumps({"mode": args.mode, "message": "无源数据"}, ensure_ascii=False))
+                return
+            start_date = start_date or source_range[0]
+            end_date = end_date or source_range[1]
+
+        mismatch_count = 0
+        for chunk_start, chunk_end in _iter_chunks(
+            start_date, end_date, max(1, args.chunk_days)
+        ):
+            if args.mode == "rebuild":
+                row_count = rebuild_production_daily_rollup(
+                    db,
+                    start_date=chunk_start,
+                    end_date=chunk_end,
+                )
+                db.commit()
+                print(
+                    json.dumps(
+                        {
+                            "mode": "rebuild",
+                            "start_date": chunk_start.isoformat(),
+                            "end_date": chunk_end.isoformat(),
+                            "rollup_rows": row_count,
+                        },
+                        ensure_ascii=False,
+                    )
+                )
+                continue
+
+            mismatches = check_production_daily_rollup(
+                db,
+                start_date=chunk_start,
+                end_date=chunk_end,
+            )
+            db.rollback()
+            for mismatch in mismatches:
+                if mismatch_count < args.max_mismatches:
+                    print(
+                        json.dumps(
+                            {
+                                "key": mismatch.key,
+                                "expected": mismatch.expected,
+                                "actual": mismatch.actual,
+                            },
+                            ensure_ascii=False,
+                            default=str,
+                        )
+                    )
+                mismatch_count += 1
+
+        if args.mode == "check":
+            print(
+                json.dumps(
+                    {
+                        "mode": "check",
+                        "start_date": start_date.isoformat(),
+                        "end_date": end_date.isoformat(),
+                        "mismatch_count": mismatch_count,
+                    },
+                    ensure_ascii=False,
+                )
+            )
+            if mismatch_count:
+                raise SystemExit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+
+@dataclass
+class FingerprintStats:
+    fingerprint: str
+    normalized_sql: str = ""
+    elapsed_ms: list[float] = field(default_factory=list)
+    callers: Counter = field(default_factory=Counter)
+    param_shapes: Counter = field(default_factory=Counter)
+    explain: object | None = None
+
+    @property
+    def count(self) -> int:
+        return len(self.elapsed_ms)
+
+    @property
+    def total_ms(self) -> float:
+        return sum(self.elapsed_ms)
+
+    def percentile(self, q: float) -> float:
+        ordered = sorted(self.elapsed_ms)
+        if not ordered:
+            return 0.0
+        index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+        return ordered[index]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="汇总 SLOW_QUERY_LOG_PATH 写出的慢 SQL JSONL，按指纹输出 Top-N。"
+    )
+    parser.add_argument("log_files", nargs="+", help="慢 SQL 日志文件（可传多个 worker 的文件）。")
+    parser.add_argument("--top", type=int, default=20, help="输出条数。")
+    parser.add_argument(
+        "--sort-by",
+        choices=["total", "count", "p95", "max"],
+        default="total",
+        help="排序口径：total=累计耗时，count=次数，p95/max=单次耗时。",
+    )
+    parser.add_argument(
+        "--min-count",
+        type=int,
+        default=1,
+        help="过滤出现次数少于该值的指纹。",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["text", "json"],
+        default="text",
+        help="text=便于阅读的表格；json=供压测报告归档。",
+    )
+    parser.add_argument(
+        "--with-explain",
+        action="store_true",
+        help="输出每个指纹最近一次采样到的 EXPLAIN 计划。",
+    )
+    return parser
+
+
+def load_fingerprint_stats(paths: list[Path]) -> dict[str, FingerprintStats]:
+    stats: dict[str, FingerprintStats] = {}
+    for path in paths:
+        with path.open("r", encoding="utf-8") as handle:
+            for raw in handle:
+                raw = raw.strip()
+                if not raw:
+                    continue
+                try:
+                    entry = json.loads(raw)
+                except ValueError:
+                    continue
+                fingerprint = entry.get("fingerprint")
+                if not fingerprint:
+                    continue
+                item = stats.setdefault(fingerprint, FingerprintStats(fingerprint=fingerprint))
+                if "explain" in entry:
+                    item.explain = entry["explain"]
+                    continue
+                item.normalized_sql = entry.get("normalized_sql") or item.normalized_sql
+                item.elapsed_ms.append(float(entry.get("elapsed_ms") or 0.0))
+                callers = entry.get("callers") or []
+                item.callers[callers[0] if callers else "<unknown>"] += 1
+                item.param_shapes[
+                    json.dumps(entry.get("param_shape"), ensure_ascii=False, sort_keys=True)
+                ] += 1
+    return stats
+
+
+def rank_fingerprints(
+    stats: dict[str, FingerprintStats],
+    *,
+    sort_by: str,
+    top: int,
+    min_count: int = 1,
+) -> list[FingerprintStats]:
+    sort_keys = {
+        "total": lambda item: item.total_ms,
+        "count": lambda item: item.count,
+        "p95": lambda item: item.percentile(0.95),
+        "max": lambda item: max(item.elapsed_ms, default=0.0),
+    }
+    candidates = [item for item in stats.values() if item.count >= max(1, min_count)]
+    candidates.sort(key=sort_keys[sort_by], reverse=True)
+    return candidates[: max(1, top)]
+
+
+def _to_report_row(item: FingerprintStats, *, with_explain: bool) -> dict[str, object]:
+    row: dict[str, object] = {
+        "fingerprint": item.fingerprint,
+        "count": item.count,
+        "total_ms": round(item.total_ms, 3),
+        "avg_ms": round(item.total_ms / item.count, 3) if item.count else 0.0,
+        "p95_ms": round(item.percentile(0.95), 3),
+        "max_ms": round(max(item.elapsed_ms, default=0.0), 3),
+        "top_callers": item.callers.most_common(3),
+        "param_shapes": [json.loads(shape) for shape, _ in item.param_shapes.most_common(2)],
+        "normalized_sql": item.normalized_sql,
+    }
+    if with_explain:
+        row["explain"] = item.explain
+    return row
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    stats = load_fingerprint_stats([Path(path) for path in args.log_files])
+    ranked = rank_fingerprints(
+        stats,
+        sort_by=args.sort_by,
+        top=args.top,
+        min_count=args.min_count,
+    )
+    rows = [_to_report_row(item, with_explain=args.with_explain) for item in ranked]
+    if args.format == "json":
+        print(json.dumps(rows, ensure_ascii=False, indent=2, default=str))
+        return
+
+    for index, row in enumerate(rows, start=1):
+        print(
+            f"#{index} {row['fingerprint']} count={row['count']} total={row['total_ms']}ms "
+            f"avg={row['avg_ms']}ms p95={row['p95_ms']}ms max={row['max_ms']}ms"
+        )
+        for caller, count in row["top_callers"]:
+            print(f"    caller: {caller} ({count})")
+        print(f"    sql: {row['normalized_sql']}")
+        if args.with_explain and row.get("explain") is not None:
+            print(f"    explain: {json.dumps(row['explain'], ensure_ascii=False)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -44,14 +44,8 @@ _ADMIN_PASSWORD = "Admin@123456"
 def _clear_all_in_process_caches() -> None:
     """Clear every module-level in-process cache used by the auth subsystem."""
     try:
-        from app.core.security import (
-            _PASSWORD_VERIFY_LOCAL_CACHE,
-            _PASSWORD_VERIFY_LOCAL_CACHE_LOCK,
-            _PASSWORD_VERIFY_USER_KEYS,
-        )
-        with _PASSWORD_VERIFY_LOCAL_CACHE_LOCK:
-            _PASSWORD_VERIFY_LOCAL_CACHE.clear()
-            _PASSWORD_VERIFY_USER_KEYS.clear()
+        from app.core.security import _PASSWORD_VERIFY_LOCAL_CACHE
+        _PASSWORD_VERIFY_LOCAL_CACHE.clear()
     except Exception:
         pass
 
@@ -1141,88 +1141,60 @@ class TestVulnerabilityJ_TC043_TC044:
                 "Mismatch require_user_id should fall through to DB and return None"
             )
 
-            # Step 4: Online status — clear_user deletes Redis key
+            # Step 4: Online status — clear_user removes the presence member immediately
             test_user_id = 12345
-            online_key = f"mes:online:{test_user_id}"
-            redis_store[online_key] = str(int(time.time()))
-            assert online_key in redis_store
-
             online_status_service.clear_user(test_user_id)
-            assert online_key not in redis_store, (
-                "FIX VULNERABILITY J: Redis online key must be deleted on clear_user"
+            online_redis.zrem.assert_called_once_with(
+                "mes:online_presence", str(test_user_id)
             )
 
-    def test_redis_online_ttl_auto_expires(self) -> None:
+    def test_redis_online_presence_window(self) -> None:
         """
-        Verify that online status uses Redis TTL (90s) as the heartbeat mechanism.
+        Verify that online status uses a Redis sorted set (score = last seen) and
+        the online_status_ttl_seconds window as the source of truth.
 
-        No in-process dictionary, no manual prune loop — Redis auto-expiry is
-        the source of truth for online/offline.
+        touch 在进程内合并后批量 ZADD；查询按窗口 ZRANGEBYSCORE / ZMSCORE，不再 KEYS 扫描。
         """
         import unittest.mock as mock
         from app.services import online_status_service
 
-        redis_store: dict[str, str] = {}
-        stored_ttls: dict[str, int] = {}
-
-        def _setex(key: str, ttl: int, value: str) -> None:
-            redis_store[key] = value
-            stored_ttls[key] = ttl
-
-        def _get(key: str) -> str | None:
-            return redis_store.get(key)
-
-        def _delete(key: str) -> int:
-            return redis_store.pop(key, None) is not None
-
-        # Mock pipeline for list_online_user_ids batch check
-        def _pipeline():
-            pipe = mock.MagicMock()
-            pending_keys: list[str] = []
+        presence: dict[str, float] = {}
 
-            def _exists(key: str) -> mock.MagicMock:
-                pending_keys.append(key)
-                return pipe  # fluent API
+        def _zadd(key: str, mapping: dict[str, float]) -> int:
+            presence.update(mapping)
+            return len(mapping)
 
-            def _execute() -> list[int]:
-                result = []
-                for k in pending_keys:
-                    result.append(1 if k in redis_store else 0)
-                pending_keys.clear()
-                return result
+        def _zrem(key: str, member: str) -> int:
+            return 1 if presence.pop(member, None) is not None else 0
 
-            pipe.exists = _exists
-            pipe.execute = _execute
-            return pipe
+        def _zmscore(key: str, members: list[str]) -> list[float | None]:
+            return [presence.get(member) for member in members]
 
         mock_client = mock.MagicMock()
-        mock_client.setex.side_effect = _setex
-        mock_client.get.side_effect = _get
-        mock_client.delete.side_effect = _delete
-        mock_client.pipeline.side_effect = _pipeline
+        mock_client.zadd.side_effect = _zadd
+        mock_client.zrem.side_effect = _zrem
+        mock_client.zmscore.side_effect = _zmscore
 
         with mock.patch.object(
             online_status_service,
             "_get_online_redis_client",
             return_value=mock_client,
         ):
-            # Touch user — Redis SETEX with TTL
-            online_status_service.touch_user(50001)
-            key = "mes:online:50001"
-            assert key in redis_store, "Online key should be set"
-            assert stored_ttls.get(key) == 90, (
-                f"TTL should be 90s (online_status_ttl_seconds), got {stored_ttls.get(key)}"
-            )
+            online_status_service.touch_user(50001, immediate=True)
+            assert "50001" in presence, "User should be in the presence set"
+            mock_client.keys.assert_not_called()
 
-            # list_online_user_ids — batch pipelined check
             online_ids = online_status_service.list_online_user_ids([50001])
             assert 50001 in online_ids, "User should be online"
 
-            # clear_user — DELETE key
+            # 超出在线窗口的成员视为离线
+            presence["50001"] -= 91
+            assert 50001 not in online_status_service.list_online_user_ids([50001])
+
+            online_status_service.touch_user(50001, immediate=True)
             online_status_service.clear_user(50001)
-            assert key not in redis_store, "Online key should be deleted on clear_user"
+            assert "50001" not in presence, "Presence member should be removed on clear_user"
 
-            # After deletion, user is offline
             online_ids_after = online_status_service.list_online_user_ids([50001])
             assert 50001 not in online_ids_after, "User should be offline after clear_user"
 
@@ -1236,10 +1208,10 @@ class TestVulnerabilityK_TC045:
 
     修复核心：
       1. security.py 新增 invalidate_password_cache(user_id)，按 user_id 追踪并清除
-         _PASSWORD_VERIFY_LOCAL_CACHE 中该用户所有缓存条目（通过 _PASSWORD_VERIFY_USER_KEYS 反查）。
+         _PASSWORD_VERIFY_LOCAL_CACHE 中该用户所有缓存条目（条目以 cache_scope 打标签，按标签失效）。
       2. user_service.py 在 reset_user_password / change_user_password 执行后显式调用
          invalidate_password_cache(user.id)，确保旧密码缓存立即失效。
-      3. 缓存键包含 user_id（在 cache_scope 中），追踪映射确保精准清理，无需全量扫描。
+      3. 缓存键包含 user_id（在 cache_scope 中），标签索引确保精准清理，无需全量扫描。
 
     漏洞复现路径（修复前）：
       - 用户登录 → verify_password_cached 缓存 SHA256("user:{id}|{old_hash}|{old_pwd}") = True
@@ -1342,58 +1314,34 @@ class TestVulnerabilityL_TC046:
     修复核心：
       online_status_service.py:
         - 删除 _last_seen_by_user_id 进程内字典
-        - 引入 Redis SETEX（Key = "mes:online:{user_id}"，TTL = 90s）
+        - 在线状态写入 Redis 有序集合（Key = "mes:online_presence"，score = 最近活跃时间）
         - Redis 持久化存储，服务重启不丢失在线状态
-        - list_online_user_ids 使用 Redis 扫描/pipeline，无进程内存依赖
+        - get_user_online_snapshot 使用 ZSCORE 判断是否落在在线窗口内
     """
 
     def test_online_status_persisted_in_redis_not_memory(self) -> None:
         """
         TC-046: 在线状态存储在 Redis（外部存储），不受进程重启影响。
-        验证：touch_user 写入 Redis SETEX，不写入任何进程内字典。
+        验证：touch_user(immediate=True) 以 ZADD 写入有序集合，重启后 ZSCORE 仍可读到。
         """
         import unittest.mock as mock
         from app.services import online_status_service
 
-        redis_store: dict[str, str] = {}
-        stored_ttls: dict[str, int] = {}
-
-        def _setex(key: str, ttl: int, value: str) -> None:
-            redis_store[key] = value
-            stored_ttls[key] = ttl
-
-        def _get(key: str) -> str | None:
-            return redis_store.get(key)
-
-        def _exists(key: str) -> int:
-            return 1 if key in redis_store else 0
-
-        def _delete(key: str) -> int:
-            return redis_store.pop(key, None) is not None
-
-        def _pipeline():
-            pipe = mock.MagicMock()
-            pending: list[str] = []
-
-            def _exists_pipe(key: str) -> mock.MagicMock:
-                pending.append(key)
-                return pipe
+        presence: dict[str, dict[str, float]] = {}
 
-            def _execute() -> list[int]:
-                result = [1 if k in redis_store else 0 for k in pending]
-                pending.clear()
-                return result
+        def _zadd(key: str, mapping: dict[str, float]) -> int:
+            members = presence.setdefault(key, {})
+            added = sum(1 for member in mapping if member not in members)
+            members.update(mapping)
+            return added
 
-            pipe.exists = _exists_pipe
-            pipe.execute = _execute
-            return pipe
+        def _zscore(key: str, member: str) -> float | None:
+            return presence.get(key, {}).get(member)
 
         mock_client = mock.MagicMock()
-        mock_client.setex.side_effect = _setex
-        mock_client.get.side_effect = _get
-        mock_client.exists.side_effect = _exists
-        mock_client.delete.side_effect = _delete
-        mock_client.pipeline.side_effect = _pipeline
+        mock_client.zadd.side_effect = _zadd
+        mock_client.zscore.side_effect = _zscore
+        mock_client.zremrangebyscore.return_value = 0
 
         # Verify _last_seen_by_user_id no longer exists in the module
         assert not hasattr(online_status_service, "_last_seen_by_user_id"), (
@@ -1408,21 +1356,21 @@ class TestVulnerabilityL_TC046:
             "_get_online_redis_client",
             return_value=mock_client,
         ):
-            # Touch user → writes to Redis
-            online_status_service.touch_user(test_user_id)
+            # Touch user → writes to Redis presence ZSET
+            online_status_service.touch_user(test_user_id, immediate=True)
 
-            key = f"mes:online:{test_user_id}"
-            assert key in redis_store, (
-                "FIX VULNERABILITY L: touch_user must write to Redis, not in-memory dict"
-            )
-            assert stored_ttls[key] == 90, (
-                f"TTL should be 90s, got {stored_ttls[key]}"
+            score = presence.get("mes:online_presence", {}).get(str(test_user_id))
+            assert score is not None, (
+                "FIX VULNERABILITY L: touch_user must ZADD into mes:online_presence, "
+                "not an in-memory dict"
             )
 
             # Redis key persists even if we "simulate restart" by clearing local state
-            # (In a real restart, Redis still holds the key)
+            # (In a real restart, Redis still holds the sorted set)
             online_status_service._ONLINE_REDIS_CLIENT = None
             online_status_service._ONLINE_REDIS_INIT = False
+            online_status_service._ONLINE_LAST_WRITTEN.clear()
+            online_status_service._ONLINE_PENDING_TOUCHES.clear()
 
             # Reconnect to same Redis (simulating restart)
             with mock.patch.object(
@@ -1430,11 +1378,15 @@ class TestVulnerabilityL_TC046:
                 "_get_online_redis_client",
                 return_value=mock_client,
             ):
-                is_online, _ = online_status_service.get_user_online_snapshot(test_user_id)
+                is_online, last_seen = online_status_service.get_user_online_snapshot(
+                    test_user_id
+                )
                 assert is_online is True, (
                     "FIX VULNERABILITY L: user should still be online after simulated restart "
                     "— Redis persists state across process restarts"
                 )
+                assert last_seen is not None
+                assert abs(last_seen.timestamp() - score) < 1e-3
 
 
 # ─────────────────────────────────────────────────────────────────────────────
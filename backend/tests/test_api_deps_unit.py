@@ -133,6 +133,59 @@ class ApiDepsUnitTest(unittest.TestCase):
         get_user_permission_codes.assert_called_once_with(db, user=user)
         self.assertEqual(touch_user.call_count, 2)
 
+    def test_auth_context_is_resolved_once_per_request(self) -> None:
+        db = MagicMock()
+        user = SimpleNamespace(
+            id=7,
+            is_deleted=False,
+            is_active=True,
+            roles=[SimpleNamespace(code="system_admin", is_enabled=True)],
+        )
+        session_row = SimpleNamespace(
+            status="active",
+            user_id=7,
+            login_ip="127.0.0.1",
+            terminal_info="TestClient/1.0",
+        )
+        request = SimpleNamespace(
+            method="POST",
+            url=SimpleNamespace(path="/api/v1/authz/permissions/catalog"),
+            client=SimpleNamespace(host="127.0.0.1"),
+            headers={"user-agent": "TestClient/1.0"},
+            state=SimpleNamespace(),
+        )
+        dependency = deps.require_permission_fast(PERM_AUTHZ_PERMISSION_CATALOG_VIEW)
+
+        with (
+            patch.object(
+                deps,
+                "decode_access_token",
+                return_value={"sub": "7", "sid": "sid-1", "login_type": "web"},
+            ) as decode_token,
+            patch.object(
+                deps,
+                "touch_session_by_token_id",
+                return_value=(session_row, False),
+            ) as touch_session,
+            patch.object(deps, "get_user_for_auth", return_value=user) as get_user_for_auth,
+            patch.object(
+                deps,
+                "get_user_permission_codes",
+                return_value={PERM_AUTHZ_PERMISSION_CATALOG_VIEW},
+            ),
+            patch.object(deps, "touch_user") as touch_user,
+            patch.object(deps, "normalize_terminal_info", return_value="TestClient/1.0"),
+        ):
+            current_user = deps.get_current_user(token="token", request=request, db=db)
+            dependency(token="token", request=request, db=db)
+
+        self.assertIs(current_user, user)
+        decode_token.assert_called_once_with("token")
+        touch_session.assert_called_once_with(db, "sid-1", require_user_id=7)
+        get_user_for_auth.assert_called_once_with(db, 7)
+        touch_user.assert_called_once_with(7)
+        self.assertIs(request.state.auth_context.user, user)
+
     def test_allow_auth_user_cache_allows_generic_gets_but_excludes_equipment(self) -> None:
         production_request = SimpleNamespace(
             method="GET",
@@ -160,8 +213,8 @@ class ApiDepsUnitTest(unittest.TestCase):
         self.assertFalse(deps._allow_auth_user_cache(production_request, None))
 
     def test_sync_permission_decision_caches_with_generation_clears_local_entries(self) -> None:
-        deps._PERMISSION_DECISION_CACHE["role|perm"] = (999.0, False)
-        deps._SESSION_PERMISSION_DECISION_CACHE["sid|perm"] = (999.0, False)
+        deps._PERMISSION_DECISION_CACHE.set("role|perm", False)
+        deps._SESSION_PERMISSION_DECISION_CACHE.set("sid|perm", False, tags=("sid",))
         deps._AUTHZ_CACHE_GENERATION = 1
 
         with patch.object(
@@ -171,8 +224,8 @@ class ApiDepsUnitTest(unittest.TestCase):
         ):
             deps._sync_permission_decision_caches_with_generation()
 
-        self.assertEqual(deps._PERMISSION_DECISION_CACHE, {})
-        self.assertEqual(deps._SESSION_PERMISSION_DECISION_CACHE, {})
+        self.assertEqual(len(deps._PERMISSION_DECISION_CACHE), 0)
+        self.assertEqual(len(deps._SESSION_PERMISSION_DECISION_CACHE), 0)
 
 
 if __name__ == "__main__":
@@ -31,6 +31,9 @@ class AppStartupWorkerSplitUnitTest(unittest.TestCase):
         async def run_case() -> None:
             maintenance_mock = AsyncMock()
             message_mock = AsyncMock()
+            export_job_mock = AsyncMock()
+            session_touch_mock = AsyncMock()
+            cache_metrics_mock = AsyncMock()
             with (
                 patch.object(app_main.settings, "jwt_secret_key", "unit-test-jwt-secret"),
                 patch.object(app_main.settings, "web_run_bootstrap", False),
@@ -46,12 +49,17 @@ class AppStartupWorkerSplitUnitTest(unittest.TestCase):
                     "run_message_delivery_maintenance_loop",
                     message_mock,
                 ),
+                patch.object(app_main, "run_export_job_worker_loop", export_job_mock),
+                patch.object(app_main, "run_session_touch_flush_loop", session_touch_mock),
+                patch.object(app_main, "run_cache_metrics_publish_loop", cache_metrics_mock),
             ):
                 async with app_main.lifespan(app_main.app):
                     pass
             bootstrap_mock.assert_not_called()
             maintenance_mock.assert_not_awaited()
             message_mock.assert_not_awaited()
+            export_job_mock.assert_not_awaited()
+            session_touch_mock.assert_not_awaited()
 
         asyncio.run(run_case())
 
@@ -59,6 +67,8 @@ class AppStartupWorkerSplitUnitTest(unittest.TestCase):
         async def run_case() -> None:
             maintenance_started = asyncio.Event()
             message_started = asyncio.Event()
+            export_worker_indexes: list[int] = []
+            session_touch_started = asyncio.Event()
             stop_event = asyncio.Event()
 
             async def fake_maintenance_loop() -> None:
@@ -69,6 +79,14 @@ class AppStartupWorkerSplitUnitTest(unittest.TestCase):
                 message_started.set()
                 await stop_event.wait()
 
+            async def fake_session_touch_loop() -> None:
+                session_touch_started.set()
+                await stop_event.wait()
+
+            async def fake_export_job_loop(*, worker_index: int) -> None:
+                export_worker_indexes.append(worker_index)
+                await stop_event.wait()
+
             with (
                 patch.object(
                     worker_main.settings,
@@ -87,6 +105,9 @@ class AppStartupWorkerSplitUnitTest(unittest.TestCase):
                     "message_delivery_maintenance_enabled",
                     True,
                 ),
+                patch.object(worker_main.settings, "export_job_worker_enabled", True),
+                patch.object(worker_main.settings, "export_job_worker_concurrency", 2),
+                patch.object(worker_main.settings, "session_touch_flush_enabled", True),
                 patch.object(worker_main, "run_startup_bootstrap") as bootstrap_mock,
                 patch.object(
                     worker_main,
@@ -98,13 +119,26 @@ class AppStartupWorkerSplitUnitTest(unittest.TestCase):
                     "run_message_delivery_maintenance_loop",
                     new=fake_message_loop,
                 ),
+                patch.object(
+                    worker_main,
+                    "run_export_job_worker_loop",
+                    new=fake_export_job_loop,
+                ),
+                patch.object(
+                    worker_main,
+                    "run_session_touch_flush_loop",
+                    new=fake_session_touch_loop,
+                ),
             ):
                 task = asyncio.create_task(worker_main.run_worker())
                 await asyncio.wait_for(maintenance_started.wait(), timeout=1)
                 await asyncio.wait_for(message_started.wait(), timeout=1)
+                await asyncio.wait_for(session_touch_started.wait(), timeout=1)
+                await asyncio.sleep(0)
                 stop_event.set()
                 await asyncio.wait_for(task, timeout=1)
             bootstrap_mock.assert_called_once()
+            self.assertEqual(sorted(export_worker_indexes), [0, 1])
 
         asyncio.run(run_case())
 
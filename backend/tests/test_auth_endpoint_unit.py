@@ -171,7 +171,7 @@ class AuthEndpointUnitTest(unittest.TestCase):
             user_id=7,
             expires_at=session_row.expires_at,
         )
-        touch_user.assert_called_once_with(7)
+        touch_user.assert_called_once_with(7, immediate=True)
         self.assertEqual(result.data.access_token, "token-1")
         self.assertEqual(user.last_login_at, now)
 
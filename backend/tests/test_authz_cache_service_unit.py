@@ -0,0 +1,179 @@
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.services import authz_cache_service
+
+
+class AuthzCacheBusUnitTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._saved = (
+            authz_cache_service._AUTHZ_CACHE_LOCAL_GENERATION,
+            authz_cache_service._AUTHZ_CACHE_REMOTE_GENERATION,
+            authz_cache_service._AUTHZ_CACHE_BUS_STARTED,
+        )
+        authz_cache_service._AUTHZ_CACHE_LOCAL_GENERATION = 0
+        authz_cache_service._AUTHZ_CACHE_REMOTE_GENERATION = None
+        # 单测中不启动真实监听线程
+        authz_cache_service._AUTHZ_CACHE_BUS_STARTED = True
+
+    def tearDown(self) -> None:
+        (
+            authz_cache_service._AUTHZ_CACHE_LOCAL_GENERATION,
+            authz_cache_service._AUTHZ_CACHE_REMOTE_GENERATION,
+            authz_cache_service._AUTHZ_CACHE_BUS_STARTED,
+        ) = self._saved
+
+    def test_generation_value_reads_memory_without_redis(self) -> None:
+        with patch.object(
+            authz_cache_service,
+            "_get_authz_cache_bus_redis_client",
+            return_value=None,
+        ):
+            self.assertEqual(authz_cache_service._authz_cache_generation_value(), 0)
+            bumped = authz_cache_service._bump_authz_cache_generation()
+
+        self.assertEqual(bumped, 1)
+        self.assertEqual(authz_cache_service._authz_cache_generation_value(), 1)
+
+    def test_bump_increments_redis_counter_and_publishes(self) -> None:
+        redis_client = MagicMock()
+        redis_client.incr.return_value = 42
+        with patch.object(
+            authz_cache_service,
+            "_get_authz_cache_bus_redis_client",
+            return_value=redis_client,
+        ):
+            authz_cache_service._bump_authz_cache_generation()
+
+        redis_client.incr.assert_called_once_with(
+            authz_cache_service._authz_cache_bus_generation_key()
+        )
+        channel, payload = redis_client.publish.call_args.args
+        self.assertEqual(channel, authz_cache_service._authz_cache_bus_channel())
+        self.assertEqual(payload, f"{authz_cache_service._AUTHZ_CACHE_BUS_ORIGIN}:42")
+        self.assertEqual(authz_cache_service._AUTHZ_CACHE_REMOTE_GENERATION, 42)
+        self.assertEqual(authz_cache_service._AUTHZ_CACHE_LOCAL_GENERATION, 1)
+
+    def test_remote_message_from_other_process_advances_generation(self) -> None:
+        parsed = authz_cache_service._parse_authz_cache_bus_message("other-node:7")
+        self.assertEqual(parsed, ("other-node", 7))
+
+        changed = authz_cache_service._observe_remote_authz_cache_generation(
+            7, origin="other-node"
+        )
+
+        self.assertTrue(changed)
+        self.assertEqual(authz_cache_service._AUTHZ_CACHE_LOCAL_GENERATION, 1)
+
+    def test_own_message_echo_does_not_advance_generation(self) -> None:
+        changed = authz_cache_service._observe_remote_authz_cache_generation(
+            3, origin=authz_cache_service._AUTHZ_CACHE_BUS_ORIGIN
+        )
+
+        self.assertFalse(changed)
+        self.assertEqual(authz_cache_service._AUTHZ_CACHE_LOCAL_GENERATION, 0)
+
+    def test_resync_establishes_baseline_then_detects_missed_invalidation(self) -> None:
+        redis_client = MagicMock()
+        redis_client.get.side_effect = ["5", "5", "9"]
+
+        authz_cache_service._resync_authz_cache_generation_from_redis(redis_client)
+        self.assertEqual(authz_cache_service._AUTHZ_CACHE_LOCAL_GENERATION, 0)
+        authz_cache_service._resync_authz_cache_generation_from_redis(redis_client)
+        self.assertEqual(authz_cache_service._AUTHZ_CACHE_LOCAL_GENERATION, 0)
+        authz_cache_service._resync_authz_cache_generation_from_redis(redis_client)
+        self.assertEqual(authz_cache_service._AUTHZ_CACHE_LOCAL_GENERATION, 1)
+
+    def test_listener_invalidates_once_per_outage(self) -> None:
+        attempts = 0
+
+        def _failing_client(*, socket_timeout):
+            nonlocal attempts
+            attempts += 1
+            if attempts >= 3:
+                authz_cache_service._AUTHZ_CACHE_BUS_STOP.set()
+            raise ConnectionError("redis down")
+
+        stop_event = authz_cache_service._AUTHZ_CACHE_BUS_STOP
+        self.addCleanup(stop_event.clear)
+        stop_event.clear()
+        with (
+            patch.object(
+                authz_cache_service,
+                "_build_authz_cache_bus_redis_client",
+                side_effect=_failing_client,
+            ),
+            patch.object(stop_event, "wait", return_value=False),
+        ):
+            authz_cache_service._run_authz_cache_bus_listener()
+
+        self.assertEqual(attempts, 3)
+        self.assertEqual(authz_cache_service._AUTHZ_CACHE_LOCAL_GENERATION, 1)
+
+    def test_listener_invalidates_again_after_reconnect_with_unchanged_counter(
+        self,
+    ) -> None:
+        # Redis 整体宕机时其他进程的 INCR 也失败，重连后计数器未变仍须清空本地缓存
+        authz_cache_service._AUTHZ_CACHE_REMOTE_GENERATION = 5
+        stop_event = authz_cache_service._AUTHZ_CACHE_BUS_STOP
+        self.addCleanup(stop_event.clear)
+        stop_event.clear()
+
+        redis_client = MagicMock()
+        redis_client.get.return_value = "5"
+
+        def _stop_after_poll(*, timeout):
+            stop_event.set()
+            return None
+
+        redis_client.pubsub.return_value.get_message.side_effect = _stop_after_poll
+        clients = iter([ConnectionError("redis down"), redis_client])
+
+        def _client(*, socket_timeout):
+            client = next(clients)
+            if isinstance(client, Exception):
+                raise client
+            return client
+
+        with (
+            patch.object(
+                authz_cache_service,
+                "_build_authz_cache_bus_redis_client",
+                side_effect=_client,
+            ),
+            patch.object(stop_event, "wait", return_value=False),
+        ):
+            authz_cache_service._run_authz_cache_bus_listener()
+
+        self.assertEqual(authz_cache_service._AUTHZ_CACHE_LOCAL_GENERATION, 2)
+
+    def test_publish_failure_keeps_local_invalidation(self) -> None:
+        redis_client = MagicMock()
+        redis_client.incr.side_effect = authz_cache_service.RedisError("down")
+        with (
+            patch.object(
+                authz_cache_service,
+                "_get_authz_cache_bus_redis_client",
+                return_value=redis_client,
+            ),
+            patch.object(
+                authz_cache_service,
+                "_mark_authz_cache_bus_redis_unavailable",
+            ) as mark_unavailable,
+        ):
+            bumped = authz_cache_service._bump_authz_cache_generation()
+
+        self.assertEqual(bumped, 1)
+        mark_unavailable.assert_called_once()
+        redis_client.publish.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 import sys
 import threading
 import unittest
+import time
 from pathlib import Path
 from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
@@ -38,10 +39,7 @@ class AuthzServiceUnitTest(unittest.TestCase):
         authz_service._AUTHZ_PERMISSION_REDIS_CLIENT = None
         authz_service._AUTHZ_PERMISSION_REDIS_DISABLED_UNTIL = 0.0
         authz_service._AUTHZ_CACHE_GENERATION = 0
-        authz_service._AUTHZ_PERMISSION_INFLIGHT.clear()
-        authz_service._AUTHZ_READ_INFLIGHT.clear()
         authz_snapshot_service._AUTHZ_SNAPSHOT_LOCAL_CACHE.clear()
-        authz_snapshot_service._AUTHZ_SNAPSHOT_INFLIGHT.clear()
 
     def tearDown(self) -> None:
         authz_service.invalidate_permission_cache()
@@ -50,10 +48,7 @@ class AuthzServiceUnitTest(unittest.TestCase):
         authz_service._AUTHZ_PERMISSION_REDIS_CLIENT = None
         authz_service._AUTHZ_PERMISSION_REDIS_DISABLED_UNTIL = 0.0
         authz_service._AUTHZ_CACHE_GENERATION = 0
-        authz_service._AUTHZ_PERMISSION_INFLIGHT.clear()
-        authz_service._AUTHZ_READ_INFLIGHT.clear()
         authz_snapshot_service._AUTHZ_SNAPSHOT_LOCAL_CACHE.clear()
-        authz_snapshot_service._AUTHZ_SNAPSHOT_INFLIGHT.clear()
 
     def test_get_permission_codes_for_role_codes_hits_cache_on_second_call(self) -> None:
         db = MagicMock()
@@ -108,9 +103,12 @@ class AuthzServiceUnitTest(unittest.TestCase):
                 db,
                 role_codes=["operator"],
             )
-            cache_key = next(iter(authz_service._AUTHZ_PERMISSION_LOCAL_CACHE))
-            _, cached_codes = authz_service._AUTHZ_PERMISSION_LOCAL_CACHE[cache_key]
-            authz_service._AUTHZ_PERMISSION_LOCAL_CACHE[cache_key] = (-1.0, cached_codes)
+            cache_key = authz_service._AUTHZ_PERMISSION_LOCAL_CACHE.keys()[0]
+            cached_codes = authz_service._AUTHZ_PERMISSION_LOCAL_CACHE.get(cache_key)
+            authz_service._AUTHZ_PERMISSION_LOCAL_CACHE.set(
+                cache_key, cached_codes, ttl_seconds=0.001
+            )
+            time.sleep(0.002)
             authz_service.get_permission_codes_for_role_codes(
                 db,
                 role_codes=["operator"],
@@ -223,8 +221,8 @@ class AuthzServiceUnitTest(unittest.TestCase):
 
     def test_generation_change_clears_local_permission_and_read_cache(self) -> None:
         db = MagicMock()
-        authz_service._AUTHZ_PERMISSION_LOCAL_CACHE["stale"] = (999.0, {"stale"})
-        authz_service._AUTHZ_READ_LOCAL_CACHE["stale"] = (999.0, {"stale": True})
+        authz_service._AUTHZ_PERMISSION_LOCAL_CACHE.set("stale", {"stale"})
+        authz_service._AUTHZ_READ_LOCAL_CACHE.set("stale", {"stale": True})
         authz_service._AUTHZ_CACHE_GENERATION = 1
 
         with (
@@ -0,0 +1,140 @@
+import json
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.services import cache_metrics_service
+
+
+def _cache_item(name: str, **overrides) -> dict[str, object]:
+    item = {
+        "name": name,
+        "size": 1,
+        "max_size": 10,
+        "default_ttl_seconds": 10.0,
+        "hits": 0,
+        "misses": 0,
+        "hit_ratio": 0.0,
+        "loads": 0,
+        "load_waits": 0,
+        "evictions": 0,
+        "expirations": 0,
+        "invalidations": 0,
+        "tags": 0,
+        "load_seconds_total": 0.0,
+        "load_latency_histogram": {"1": 0, "+Inf": 0},
+    }
+    item.update(overrides)
+    return item
+
+
+class CacheMetricsServiceUnitTest(unittest.TestCase):
+    def test_aggregate_sums_counters_and_recomputes_hit_ratio(self) -> None:
+        workers = [
+            {
+                "worker_id": "a",
+                "caches": [
+                    _cache_item(
+                        "deps.auth_user",
+                        hits=3,
+                        misses=1,
+                        load_seconds_total=0.5,
+                        load_latency_histogram={"1": 2, "+Inf": 0},
+                    )
+                ],
+            },
+            {
+                "worker_id": "b",
+                "caches": [
+                    _cache_item(
+                        "deps.auth_user",
+                        hits=1,
+                        misses=3,
+                        evictions=2,
+                        load_latency_histogram={"1": 1, "+Inf": 1},
+                    )
+                ],
+            },
+        ]
+
+        totals = cache_metrics_service.aggregate_cache_metrics(workers)
+
+        self.assertEqual(len(totals), 1)
+        total = totals[0]
+        self.assertEqual(total["hits"], 4)
+        self.assertEqual(total["misses"], 4)
+        self.assertEqual(total["hit_ratio"], 0.5)
+        self.assertEqual(total["evictions"], 2)
+        self.assertEqual(total["size"], 2)
+        self.assertEqual(total["load_seconds_total"], 0.5)
+        self.assertEqual(total["load_latency_histogram"]["1"], 3)
+        self.assertEqual(total["load_latency_histogram"]["+Inf"], 1)
+
+    def test_redis_backoff_state_reports_remaining_seconds(self) -> None:
+        with (
+            patch.object(
+                cache_metrics_service.session_service,
+                "_SESSION_REDIS_DISABLED_UNTIL",
+                130.0,
+            ),
+            patch.object(cache_metrics_service.session_service, "_SESSION_REDIS_CLIENT", None),
+            patch.object(cache_metrics_service.time, "monotonic", return_value=100.0),
+        ):
+            state = {
+                item["component"]: item
+                for item in cache_metrics_service.collect_redis_backoff_state()
+            }
+
+        self.assertEqual(state["session"]["backoff_remaining_seconds"], 30.0)
+        self.assertFalse(state["session"]["connected"])
+        self.assertIn("authz_permission_cache", state)
+
+    def test_overview_falls_back_to_current_worker_without_redis(self) -> None:
+        with patch.object(
+            cache_metrics_service,
+            "_get_cache_metrics_redis_client",
+            return_value=None,
+        ):
+            overview = cache_metrics_service.get_cache_metrics_overview()
+
+        self.assertFalse(overview["aggregated"])
+        self.assertEqual(len(overview["workers"]), 1)
+        self.assertEqual(
+            overview["workers"][0]["worker_id"],
+            overview["current_worker_id"],
+        )
+        cache_names = {item["name"] for item in overview["totals"]}
+        self.assertIn("deps.auth_user", cache_names)
+
+    def test_overview_aggregates_workers_published_to_redis(self) -> None:
+        other_worker = {
+            "worker_id": "other:1",
+            "collected_at": "2026-01-01T00:00:00+00:00",
+            "caches": [_cache_item("deps.auth_user", hits=5)],
+            "redis_backoff": [],
+        }
+        redis_client = MagicMock()
+        redis_client.zrange.return_value = ["other:1"]
+        redis_client.mget.return_value = [json.dumps(other_worker), None]
+
+        with patch.object(
+            cache_metrics_service,
+            "_get_cache_metrics_redis_client",
+            return_value=redis_client,
+        ):
+            overview = cache_metrics_service.get_cache_metrics_overview()
+
+        self.assertTrue(overview["aggregated"])
+        self.assertEqual([item["worker_id"] for item in overview["workers"]], ["other:1"])
+        redis_client.pipeline.return_value.setex.assert_called_once()
+        redis_client.zremrangebyscore.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import importlib
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core import config as config_module
+from app.db import session as session_module
+
+
+def _fake_settings(primary_url: str, replica_url: str, **overrides) -> SimpleNamespace:
+    values = {
+        "database_url": primary_url,
+        "replica_database_url": replica_url,
+        "db_pool_size": 2,
+        "db_max_overflow": 0,
+        "db_pool_timeout_seconds": 5,
+        "db_pool_recycle_seconds": 1800,
+        "db_async_enabled": False,
+        "db_replica_pool_size": 2,
+        "db_replica_max_overflow": 0,
+        "db_replica_max_lag_seconds": 5.0,
+        "db_replica_lag_check_interval_seconds": 60.0,
+    }
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+class DbReadReplicaUnitTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        tmp_path = Path(self._tmp_dir.name)
+        self.primary_url = f"sqlite:///{tmp_path / 'primary.db'}"
+        self.replica_url = f"sqlite:///{tmp_path / 'replica.db'}"
+
+    def tearDown(self) -> None:
+        patch.stopall()
+        importlib.reload(session_module)
+        self._tmp_dir.cleanup()
+
+    def _reload_with(self, **overrides) -> None:
+        fake_settings = _fake_settings(self.primary_url, self.replica_url, **overrides)
+        with patch.object(config_module, "settings", fake_settings):
+            importlib.reload(session_module)
+        # 运行期读取的配置也指向替身
+        patch.object(session_module, "settings", fake_settings).start()
+
+    def _build_app(self) -> TestClient:
+        app = FastAPI()
+
+        @app.get("/role")
+        def read_role(db: Session = Depends(session_module.get_read_db)) -> dict[str, str]:
+            return {
+                "role": db.info.get("db_role", "primary"),
+                "database": db.execute(text("PRAGMA database_list")).all()[0][2],
+            }
+
+        return TestClient(app)
+
+    def test_read_db_routes_to_sqlite_replica_stand_in(self) -> None:
+        self._reload_with()
+
+        payload = self._build_app().get("/role").json()
+
+        self.assertEqual(payload["role"], "replica")
+        self.assertTrue(payload["database"].endswith("replica.db"))
+
+    def test_read_db_falls_back_to_primary_when_lag_exceeds_bound(self) -> None:
+        self._reload_with(db_replica_max_lag_seconds=1.0)
+
+        with patch.object(session_module, "_measure_replica_lag_seconds", return_value=3.5):
+            payload = self._build_app().get("/role").json()
+
+        self.assertEqual(payload["role"], "primary")
+        self.assertTrue(payload["database"].endswith("primary.db"))
+
+    def test_failed_lag_probe_backs_off_before_retrying(self) -> None:
+        self._reload_with()
+        probe = MagicMock(return_value=None)
+
+        with patch.object(session_module, "_measure_replica_lag_seconds", probe):
+            self.assertIsNone(session_module.open_read_session())
+            self.assertIsNone(session_module.open_read_session())
+
+        probe.assert_called_once()
+
+    def test_per_endpoint_bound_overrides_default(self) -> None:
+        self._reload_with(db_replica_max_lag_seconds=1.0)
+
+        with patch.object(session_module, "_measure_replica_lag_seconds", return_value=3.0):
+            strict = session_module.open_read_session()
+            relaxed = session_module.open_read_session(max_lag_seconds=10.0)
+
+        self.assertIsNone(strict)
+        self.assertIsNotNone(relaxed)
+        relaxed.close()
+
+    def test_without_replica_read_db_is_request_primary_session(self) -> None:
+        self._reload_with(replica_database_url="")
+
+        self.assertIsNone(session_module.replica_engine)
+        self.assertIsNone(session_module.open_read_session())
+        self.assertEqual(self._build_app().get("/role").json()["role"], "primary")
+
+
+if __name__ == "__main__":
+    unittest.main()
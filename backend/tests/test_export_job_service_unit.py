@@ -0,0 +1,296 @@
+import sys
+import tempfile
+import unittest
+from datetime import UTC, datetime
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from pydantic import BaseModel
+from sqlalchemy.dialects import postgresql
+
+from app.models.export_job import ExportJob
+from app.services import export_job_service, production_data_query_service
+
+
+def _compiled_sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+class _FakeParams(BaseModel):
+    keyword: str | None = None
+
+
+def _fake_handler(rows, *, count=None) -> export_job_service.ExportJobHandler:
+    return export_job_service.ExportJobHandler(
+        job_type="fake_rows",
+        label="测试",
+        permission_code="fake.export",
+        params_model=_FakeParams,
+        headers=["编号", "名称"],
+        file_prefix="fake",
+        sheet_title="测试",
+        iter_rows=lambda db, params, operator: iter(rows),
+        count_rows=(lambda db, params, operator: count) if count is not None else None,
+    )
+
+
+def _job(**overrides) -> ExportJob:
+    values = {
+        "id": 7,
+        "job_code": "abc",
+        "job_type": "fake_rows",
+        "created_by_user_id": 1,
+        "status": export_job_service.EXPORT_JOB_STATUS_PROCESSING,
+        "format": "csv",
+        "params": {"keyword": None},
+        "record_count": 0,
+        "cancel_requested": False,
+    }
+    values.update(overrides)
+    return ExportJob(**values)
+
+
+class ExportJobServiceUnitTest(unittest.TestCase):
+    def test_create_export_job_validates_params_and_normalizes_format(self) -> None:
+        db = MagicMock()
+
+        job = export_job_service.create_export_job(
+            db,
+            created_by_user_id=3,
+            job_type="production_orders",
+            format="excel",
+            params={"keyword": "PO", "start_date_from": "2026-10-01"},
+        )
+
+        self.assertEqual(job.format, "xlsx")
+        self.assertEqual(job.status, export_job_service.EXPORT_JOB_STATUS_PENDING)
+        self.assertEqual(job.params["keyword"], "PO")
+        self.assertEqual(job.params["start_date_from"], "2026-10-01")
+        db.add.assert_called_once_with(job)
+        db.commit.assert_called_once()
+
+        with self.assertRaises(ValueError):
+            export_job_service.create_export_job(
+                db,
+                created_by_user_id=3,
+                job_type="unknown",
+                format="csv",
+                params={},
+            )
+        with self.assertRaises(ValueError):
+            export_job_service.create_export_job(
+                db,
+                created_by_user_id=3,
+                job_type="production_orders",
+                format="csv",
+                params={"start_date_from": "not-a-date"},
+            )
+
+    def test_every_handler_covers_a_business_module(self) -> None:
+        job_types = {handler.job_type for handler in export_job_service.list_export_job_handlers()}
+
+        self.assertTrue(
+            {
+                "production_orders",
+                "production_manual",
+                "production_scrap_statistics",
+                "production_repair_orders",
+                "quality_first_articles",
+                "equipment_ledger",
+                "craft_processes",
+            }.issubset(job_types)
+        )
+
+    def test_cancel_export_job_by_status(self) -> None:
+        db = MagicMock()
+
+        pending = _job(status=export_job_service.EXPORT_JOB_STATUS_PENDING)
+        export_job_service.cancel_export_job(db, job=pending)
+        self.assertEqual(pending.status, export_job_service.EXPORT_JOB_STATUS_CANCELLED)
+        self.assertIsNotNone(pending.finished_at)
+
+        processing = _job()
+        export_job_service.cancel_export_job(db, job=processing)
+        self.assertEqual(processing.status, export_job_service.EXPORT_JOB_STATUS_PROCESSING)
+        self.assertTrue(processing.cancel_requested)
+
+        with self.assertRaises(ValueError):
+            export_job_service.cancel_export_job(
+                db, job=_job(status=export_job_service.EXPORT_JOB_STATUS_SUCCEEDED)
+            )
+
+    def test_claim_next_export_job_skips_locked_rows(self) -> None:
+        db = MagicMock()
+        db.execute.return_value.scalar_one_or_none.return_value = 11
+
+        self.assertEqual(export_job_service.claim_next_export_job(db), 11)
+
+        sql = _compiled_sql(db.execute.call_args.args[0])
+        self.assertIn("FOR UPDATE SKIP LOCKED", sql)
+        self.assertIn("RETURNING sys_export_job.id", sql)
+        db.commit.assert_called_once()
+
+    def test_run_export_job_streams_file_and_reports_progress(self) -> None:
+        db = MagicMock()
+        job = _job()
+        db.get.side_effect = lambda model, _: job if model is ExportJob else SimpleNamespace(id=1)
+        rows = [[index, f"行-{index}"] for index in range(5)]
+        updates: list[dict] = []
+
+        def fake_update(job_id, **values):
+            updates.append(values)
+            return False
+
+        with (
+            tempfile.TemporaryDirectory() as temp_dir,
+            patch.object(export_job_service, "RUNTIME_EXPORT_DIR", Path(temp_dir)),
+            patch.object(export_job_service, "SessionLocal", return_value=db),
+            patch.object(export_job_service, "_update_export_job", side_effect=fake_update),
+            patch.object(export_job_service, "EXPORT_JOB_PROGRESS_REPORT_ROWS", 2),
+            patch.object(export_job_service, "write_audit_log"),
+            patch.dict(
+                export_job_service._EXPORT_JOB_HANDLERS,
+                {"fake_rows": _fake_handler(rows, count=5)},
+            ),
+        ):
+            export_job_service.run_export_job(7)
+            files = list(Path(temp_dir).iterdir())
+            content = files[0].read_bytes().decode("utf-8-sig")
+
+        self.assertEqual(len(files), 1)
+        self.assertTrue(files[0].name.startswith("abc_fake_"))
+        self.assertIn("行-4", content)
+        self.assertEqual(updates[0]["total_count"], 5)
+        self.assertEqual(
+            [values["progress_percent"] for values in updates if "record_count" in values][:2],
+            [40, 80],
+        )
+        final = updates[-1]
+        self.assertEqual(final["status"], export_job_service.EXPORT_JOB_STATUS_SUCCEEDED)
+        self.assertEqual(final["record_count"], 5)
+        self.assertEqual(final["progress_percent"], 100)
+        self.assertEqual(final["mime_type"], "text/csv")
+
+    def test_run_export_job_stops_when_cancel_requested(self) -> None:
+        db = MagicMock()
+        job = _job()
+        db.get.side_effect = lambda model, _: job if model is ExportJob else SimpleNamespace(id=1)
+        updates: list[dict] = []
+
+        def fake_update(job_id, **values):
+            updates.append(values)
+            return "record_count" in values
+
+        with (
+            tempfile.TemporaryDirectory() as temp_dir,
+            patch.object(export_job_service, "RUNTIME_EXPORT_DIR", Path(temp_dir)),
+            patch.object(export_job_service, "SessionLocal", return_value=db),
+            patch.object(export_job_service, "_update_export_job", side_effect=fake_update),
+            patch.dict(
+                export_job_service._EXPORT_JOB_HANDLERS,
+                {"fake_rows": _fake_handler([[index, "x"] for index in range(10)])},
+            ),
+            patch.object(export_job_service, "EXPORT_JOB_PROGRESS_REPORT_ROWS", 3),
+        ):
+            export_job_service.run_export_job(7)
+            leftovers = list(Path(temp_dir).iterdir())
+
+        self.assertEqual(leftovers, [])
+        self.assertEqual(updates[-1]["status"], export_job_service.EXPORT_JOB_STATUS_CANCELLED)
+        db.rollback.assert_called_once()
+
+    def test_manual_export_job_reads_replica_and_logs_on_primary(self) -> None:
+        db = MagicMock()
+        replica = MagicMock()
+        replica.commit.side_effect = AssertionError("只读副本不应提交")
+        replica.add.side_effect = AssertionError("只读副本不应写入")
+        job = _job(
+            job_type="production_manual",
+            params={"start_date": "2026-10-01", "end_date": "2026-10-02"},
+        )
+        db.get.side_effect = lambda model, _: job if model is ExportJob else SimpleNamespace(id=1)
+        payloads = [
+            {"order_id": 3, "order_code": "MO-3", "quantity": 2},
+            {"order_id": 3, "order_code": "MO-3", "quantity": 1},
+            {"order_id": 4, "order_code": "MO-4", "quantity": 5},
+        ]
+        read_sessions: list[object] = []
+        logged: list[tuple[object, int, int]] = []
+        updates: list[dict] = []
+
+        def fake_iter_rows(session, _stmt):
+            read_sessions.append(session)
+            return iter(payloads)
+
+        def fake_add_order_event_log(session, *, order_id, payload, **_kwargs):
+            logged.append((session, order_id, payload["rows"]))
+
+        def fake_update(job_id, **values):
+            updates.append(values)
+            return False
+
+        with (
+            tempfile.TemporaryDirectory() as temp_dir,
+            patch.object(export_job_service, "RUNTIME_EXPORT_DIR", Path(temp_dir)),
+            patch.object(export_job_service, "SessionLocal", return_value=db),
+            patch.object(export_job_service, "open_read_session", return_value=replica),
+            patch.object(export_job_service, "_update_export_job", side_effect=fake_update),
+            patch.object(export_job_service, "count_manual_export_rows", return_value=3),
+            patch.object(export_job_service, "write_audit_log"),
+            patch.object(production_data_query_service, "iter_rows", side_effect=fake_iter_rows),
+            patch.object(
+                production_data_query_service,
+                "_manual_row_payload",
+                side_effect=lambda row, sub_order_mode: row,
+            ),
+            patch.object(
+                production_data_query_service,
+                "add_order_event_log",
+                side_effect=fake_add_order_event_log,
+            ),
+        ):
+            export_job_service.run_export_job(7)
+            content = next(Path(temp_dir).iterdir()).read_bytes().decode("utf-8-sig")
+
+        self.assertEqual(updates[-1]["status"], export_job_service.EXPORT_JOB_STATUS_SUCCEEDED)
+        self.assertIn("MO-4", content)
+        self.assertEqual(read_sessions, [replica])
+        self.assertEqual(sorted((order_id, rows) for _, order_id, rows in logged), [(3, 3), (4, 3)])
+        self.assertTrue(all(session is db for session, _, _ in logged))
+        replica.commit.assert_not_called()
+        replica.close.assert_called_once()
+        db.commit.assert_called()
+
+    def test_cleanup_export_jobs_filters_by_status_and_time(self) -> None:
+        db = MagicMock()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            expired_file = Path(temp_dir) / "old.csv"
+            expired_file.write_bytes(b"x")
+            interrupted_result = MagicMock(rowcount=1)
+            expired_result = MagicMock()
+            expired_result.all.return_value = [(5, str(expired_file))]
+            db.execute.side_effect = [interrupted_result, expired_result, MagicMock()]
+
+            stats = export_job_service.cleanup_export_jobs(
+                db, now=datetime(2026, 10, 17, tzinfo=UTC)
+            )
+
+            self.assertFalse(expired_file.exists())
+        self.assertEqual(stats, {"interrupted": 1, "expired": 1})
+        interrupted_sql = _compiled_sql(db.execute.call_args_list[0].args[0])
+        expired_sql = _compiled_sql(db.execute.call_args_list[1].args[0])
+        self.assertIn("sys_export_job.heartbeat_at <", interrupted_sql)
+        self.assertIn("sys_export_job.status =", expired_sql)
+        self.assertIn("sys_export_job.expires_at <=", expired_sql)
+        self.assertIn("LIMIT", expired_sql)
+        db.commit.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
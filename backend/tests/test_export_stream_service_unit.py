@@ -0,0 +1,173 @@
+import base64
+import csv
+import io
+import sys
+import unittest
+from datetime import date, datetime
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from sqlalchemy import select
+
+from app.models.production_order import ProductionOrder
+from app.services import equipment_service, export_stream_service
+
+
+def _legacy_csv_base64(headers, rows) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    for row in rows:
+        writer.writerow(row)
+    return base64.b64encode(buffer.getvalue().encode("utf-8-sig")).decode("ascii")
+
+
+class ExportStreamServiceUnitTest(unittest.TestCase):
+    def test_normalize_export_format(self) -> None:
+        self.assertEqual(export_stream_service.normalize_export_format(None), "csv")
+        self.assertEqual(export_stream_service.normalize_export_format(" XLSX "), "xlsx")
+        self.assertEqual(export_stream_service.normalize_export_format("excel"), "xlsx")
+        with self.assertRaises(ValueError):
+            export_stream_service.normalize_export_format("pdf")
+
+    def test_csv_stream_is_chunked_and_keeps_bom(self) -> None:
+        headers = ["编号", "名称"]
+        rows = ([index, f"产品-{index}"] for index in range(2000))
+
+        chunks = list(
+            export_stream_service.iter_csv_bytes(headers, rows, chunk_bytes=1024)
+        )
+
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(chunk) < 2048 for chunk in chunks))
+        content = b"".join(chunks)
+        self.assertTrue(content.startswith(b"\xef\xbb\xbf"))
+        parsed = list(csv.reader(io.StringIO(content.decode("utf-8-sig"))))
+        self.assertEqual(parsed[0], headers)
+        self.assertEqual(len(parsed), 2001)
+        self.assertEqual(parsed[-1], ["1999", "产品-1999"])
+
+    def test_encode_csv_base64_matches_legacy_output(self) -> None:
+        headers = ["订单号", "数量", "备注"]
+        rows = [["PO-1", 10, "含,逗号"], ["PO-2", 0, "换\n行"], ["PO-3", None, ""]]
+
+        self.assertEqual(
+            export_stream_service.encode_csv_base64(headers, rows),
+            _legacy_csv_base64(headers, rows),
+        )
+
+    def test_xlsx_stream_round_trips(self) -> None:
+        import openpyxl
+
+        headers = ["订单号", "数量"]
+        rows = ([f"PO-{index}", index] for index in range(300))
+
+        content = b"".join(
+            export_stream_service.iter_xlsx_bytes(
+                headers, rows, sheet_title="生产订单", chunk_bytes=4096
+            )
+        )
+
+        workbook = openpyxl.load_workbook(io.BytesIO(content), read_only=True)
+        worksheet = workbook["生产订单"]
+        values = list(worksheet.iter_rows(values_only=True))
+        workbook.close()
+        self.assertEqual(list(values[0]), headers)
+        self.assertEqual(len(values), 301)
+        self.assertEqual(list(values[-1]), ["PO-299", 299])
+
+    def test_iter_scalars_uses_yield_per(self) -> None:
+        db = MagicMock()
+        db.execute.return_value.scalars.return_value = iter(["a", "b"])
+
+        values = list(
+            export_stream_service.iter_scalars(
+                db, select(ProductionOrder), batch_size=50
+            )
+        )
+
+        self.assertEqual(values, ["a", "b"])
+        stmt = db.execute.call_args.args[0]
+        self.assertEqual(stmt.get_execution_options()["yield_per"], 50)
+
+    def test_work_order_export_rows_page_through_list(self) -> None:
+        rows = [
+            SimpleNamespace(
+                id=index,
+                source_equipment_name="设备",
+                source_item_name="项目",
+                due_date=date(2026, 10, 17),
+                status="done",
+                executor=None,
+                started_at=None,
+                completed_at=None,
+                result_summary="正常",
+                result_remark=None,
+            )
+            for index in range(1, 4)
+        ]
+        calls: list[tuple[int, int]] = []
+
+        def _list_work_orders(_db, *, page, page_size, **filters):
+            calls.append((page, page_size))
+            self.assertEqual(filters["stage_code_filter"], "S1")
+            self.assertFalse(filters["mine"])
+            start = (page - 1) * page_size
+            return len(rows), rows[start : start + page_size]
+
+        with patch.object(
+            equipment_service, "list_work_orders", side_effect=_list_work_orders
+        ), patch.object(
+            equipment_service,
+            "iter_paged",
+            lambda fetch: export_stream_service.iter_paged(fetch, page_size=2),
+        ):
+            exported = list(
+                equipment_service.iter_work_order_export_rows(
+                    MagicMock(),
+                    stage_code="S1",
+                    current_user_role_codes=[],
+                    current_user_stage_codes=[],
+                )
+            )
+
+        self.assertEqual([row[0] for row in exported], [1, 2, 3])
+        self.assertEqual(exported[0][4], "已完成")
+        self.assertEqual(calls, [(1, 2), (2, 2)])
+        self.assertEqual(len(exported[0]), len(equipment_service.WORK_ORDER_EXPORT_HEADERS))
+
+    def test_streaming_response_headers(self) -> None:
+        file_name = export_stream_service.build_export_file_name(
+            "orders", format="xlsx", now=datetime(2026, 10, 17, 8, 30, 0)
+        )
+        response = export_stream_service.build_streaming_export_response(
+            file_name=file_name,
+            headers=["a"],
+            rows=[],
+            format="xlsx",
+        )
+
+        self.assertEqual(file_name, "orders_20261017_083000.xlsx")
+        self.assertEqual(
+            response.media_type,
+            export_stream_service.EXPORT_MIME_TYPES["xlsx"],
+        )
+        self.assertEqual(
+            response.headers["content-disposition"],
+            "attachment; filename=\"orders_20261017_083000.xlsx\"; "
+            "filename*=UTF-8''orders_20261017_083000.xlsx",
+        )
+        self.assertEqual(
+            export_stream_service.build_content_disposition("报表.csv"),
+            "attachment; filename=\".csv\"; filename*=UTF-8''%E6%8A%A5%E8%A1%A8.csv",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -9,7 +9,6 @@ if str(BACKEND_DIR) not in sys.path:
 from app.services.home_dashboard_service import (
     DashboardMessageSeed,
     _HOME_DASHBOARD_LOCAL_CACHE,
-    _HOME_DASHBOARD_LOCAL_CACHE_LOCK,
     build_dashboard_todo_summary,
     invalidate_home_dashboard_cache,
     select_dashboard_todo_items,
@@ -146,19 +145,15 @@ def test_build_dashboard_todo_summary_counts_all_summary_numbers() -> None:
 
 
 def test_invalidate_home_dashboard_cache_removes_only_selected_user_entries() -> None:
-    with _HOME_DASHBOARD_LOCAL_CACHE_LOCK:
-        _HOME_DASHBOARD_LOCAL_CACHE.clear()
-        _HOME_DASHBOARD_LOCAL_CACHE.update(
-            {
-                "home_dashboard:1:home,user": (999999999.0, object()),
-                "home_dashboard:1:home,user,message": (999999999.0, object()),
-                "home_dashboard:2:home,user": (999999999.0, object()),
-            }
-        )
+    _HOME_DASHBOARD_LOCAL_CACHE.clear()
+    _HOME_DASHBOARD_LOCAL_CACHE.set("home_dashboard:1:home,user", object(), tags=(1,))
+    _HOME_DASHBOARD_LOCAL_CACHE.set(
+        "home_dashboard:1:home,user,message", object(), tags=(1,)
+    )
+    _HOME_DASHBOARD_LOCAL_CACHE.set("home_dashboard:2:home,user", object(), tags=(2,))
 
     removed = invalidate_home_dashboard_cache(user_ids={1})
 
     assert removed == 2
-    with _HOME_DASHBOARD_LOCAL_CACHE_LOCK:
-        assert sorted(_HOME_DASHBOARD_LOCAL_CACHE) == ["home_dashboard:2:home,user"]
-        _HOME_DASHBOARD_LOCAL_CACHE.clear()
+    assert sorted(_HOME_DASHBOARD_LOCAL_CACHE.keys()) == ["home_dashboard:2:home,user"]
+    _HOME_DASHBOARD_LOCAL_CACHE.clear()
@@ -0,0 +1,70 @@
+import sys
+import unittest
+from datetime import UTC, datetime
+from pathlib import Path
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.models.login_log import LoginLog
+from app.models.production_order import ProductionOrder
+from app.models.user import User
+from app.services import keyword_search_service, session_service
+
+
+class KeywordSearchUnitTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(self.engine, tables=[User.__table__, LoginLog.__table__])
+        self.db = Session(self.engine)
+
+    def tearDown(self) -> None:
+        self.db.close()
+        self.engine.dispose()
+
+    def test_blank_keyword_adds_no_filter(self) -> None:
+        self.assertIsNone(keyword_search_service.keyword_filter(None, User.username))
+        self.assertIsNone(keyword_search_service.keyword_filter("   ", User.username))
+
+    def test_pattern_escapes_like_wildcards(self) -> None:
+        self.assertEqual(
+            keyword_search_service.build_contains_pattern("50%_a\\b"),
+            "%50\\%\\_a\\\\b%",
+        )
+
+    def test_postgresql_filter_keeps_plain_column_for_trigram_index(self) -> None:
+        clause = keyword_search_service.keyword_filter(
+            " MO-01 ",
+            ProductionOrder.order_code,
+            ProductionOrder.supplier_name,
+        )
+        compiled = str(
+            select(ProductionOrder.id).where(clause).compile(dialect=postgresql.dialect())
+        )
+
+        self.assertIn("mes_order.order_code ILIKE", compiled)
+        self.assertIn("mes_order.supplier_name ILIKE", compiled)
+        self.assertNotIn("lower(", compiled)
+
+    def test_sqlite_fallback_matches_case_insensitive_and_literal_wildcards(self) -> None:
+        now = datetime(2026, 10, 1, 8, 0, tzinfo=UTC)
+        for username in ("Alice_01", "alicex01", "bob"):
+            self.db.add(LoginLog(login_time=now, username=username, success=True))
+        self.db.commit()
+
+        _, rows = session_service.list_login_logs(
+            self.db, page=1, page_size=10, username="ALICE_"
+        )
+
+        self.assertEqual([row.username for row in rows], ["Alice_01"])
+
+
+if __name__ == "__main__":
+    unittest.main()
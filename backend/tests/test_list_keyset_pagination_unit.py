@@ -0,0 +1,173 @@
+import sys
+import unittest
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.models.login_log import LoginLog
+from app.models.message import Message
+from app.models.message_recipient import MessageRecipient
+from app.models.user import User
+from app.services import list_pagination_service, message_service, session_service
+
+
+class ListKeysetPaginationUnitTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(
+            self.engine,
+            tables=[
+                User.__table__,
+                LoginLog.__table__,
+                Message.__table__,
+                MessageRecipient.__table__,
+            ],
+        )
+        self.db = Session(self.engine)
+        self.base_time = datetime(2026, 10, 1, 8, 0, tzinfo=UTC)
+
+    def tearDown(self) -> None:
+        self.db.close()
+        self.engine.dispose()
+
+    def _add_login_logs(self, count: int) -> None:
+        for index in range(count):
+            # 每两条共用一个时间戳，确保游标在排序键相同的行之间也不漏不重
+            self.db.add(
+                LoginLog(
+                    login_time=self.base_time + timedelta(minutes=index // 2),
+                    username=f"user{index}",
+                    success=True,
+                )
+            )
+        self.db.commit()
+
+    def test_login_log_cursor_walk_matches_offset_pages(self) -> None:
+        self._add_login_logs(7)
+
+        _, offset_rows = session_service.list_login_logs(self.db, page=1, page_size=50)
+        cursor_ids: list[int] = []
+        cursor = None
+        while True:
+            _, rows = session_service.list_login_logs(
+                self.db,
+                page=1,
+                page_size=3,
+                cursor=cursor,
+            )
+            cursor_ids.extend(row.id for row in rows)
+            cursor = session_service.LOGIN_LOG_KEYSET.next_cursor(rows, 3)
+            if cursor is None:
+                break
+
+        self.assertEqual(cursor_ids, [row.id for row in offset_rows])
+
+    def test_capped_and_estimated_counts_stop_at_cap(self) -> None:
+        self._add_login_logs(5)
+
+        with patch.object(list_pagination_service.settings, "list_count_cap", 3):
+            capped, _ = session_service.list_login_logs(
+                self.db, page=1, page_size=2, count_mode="capped"
+            )
+            # SQLite 没有 pg_class，estimated 退回 capped
+            estimated, _ = session_service.list_login_logs(
+                self.db, page=1, page_size=2, count_mode="estimated"
+            )
+            exact, _ = session_service.list_login_logs(self.db, page=1, page_size=2)
+
+        self.assertEqual((capped, estimated, exact), (3, 3, 5))
+        with patch.object(list_pagination_service.settings, "list_count_cap", 3):
+            self.assertTrue(
+                list_pagination_service.is_total_estimate(capped, count_mode="capped")
+            )
+            self.assertFalse(
+                list_pagination_service.is_total_estimate(2, count_mode="capped")
+            )
+            self.assertFalse(
+                list_pagination_service.is_total_estimate(exact, count_mode="exact")
+            )
+
+    def test_message_cursor_respects_priority_then_published_at(self) -> None:
+        user = User(username="reader", password_hash="x")
+        self.db.add(user)
+        self.db.flush()
+        for index, priority in enumerate(["normal", "urgent", "normal", "important", "urgent"]):
+            message = Message(
+                message_type="notice",
+                priority=priority,
+                title=f"消息{index}",
+                status="active",
+                published_at=self.base_time + timedelta(minutes=index),
+            )
+            self.db.add(message)
+            self.db.flush()
+            self.db.add(MessageRecipient(message_id=message.id, recipient_user_id=user.id))
+        self.db.commit()
+
+        first_page, total = message_service.list_messages(self.db, user_id=user.id, page_size=2)
+        cursor = message_service.MESSAGE_LIST_KEYSET.next_cursor(first_page, 2)
+        second_page, _ = message_service.list_messages(
+            self.db, user_id=user.id, page_size=2, cursor=cursor
+        )
+        offset_page, _ = message_service.list_messages(self.db, user_id=user.id, page=2, page_size=2)
+
+        self.assertEqual(total, 5)
+        self.assertEqual([item.title for item in first_page], ["消息4", "消息1"])
+        self.assertEqual(
+            [item.id for item in second_page],
+            [item.id for item in offset_page],
+        )
+        self.assertEqual([item.priority for item in second_page], ["important", "normal"])
+
+    def test_message_cursor_orders_unpublished_messages_by_created_at(self) -> None:
+        user = User(username="reader", password_hash="x")
+        self.db.add(user)
+        self.db.flush()
+        for index in range(5):
+            published = index % 2 == 0
+            message = Message(
+                message_type="notice",
+                priority="normal",
+                title=f"消息{index}",
+                status="active",
+                published_at=self.base_time + timedelta(minutes=index) if published else None,
+                created_at=self.base_time + timedelta(minutes=index),
+            )
+            self.db.add(message)
+            self.db.flush()
+            self.db.add(MessageRecipient(message_id=message.id, recipient_user_id=user.id))
+        self.db.commit()
+
+        titles: list[str] = []
+        cursor = None
+        while True:
+            page, _ = message_service.list_messages(
+                self.db, user_id=user.id, page_size=2, cursor=cursor
+            )
+            titles.extend(item.title for item in page)
+            cursor = message_service.MESSAGE_LIST_KEYSET.next_cursor(page, 2)
+            if cursor is None:
+                break
+
+        self.assertEqual(titles, ["消息4", "消息3", "消息2", "消息1", "消息0"])
+        self.assertNotIn("sort_time", page[0].model_dump())
+
+    def test_invalid_cursor_is_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            session_service.list_login_logs(self.db, page=1, page_size=2, cursor="not-a-cursor")
+        token = list_pagination_service.encode_cursor([self.base_time])
+        with self.assertRaises(ValueError):
+            list_pagination_service.decode_cursor(token, size=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+import asyncio
+import sys
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.core import local_cache
+from app.core.local_cache import LocalTTLCache
+
+
+def _build_cache(**overrides) -> LocalTTLCache:
+    options = {"max_size": 3, "ttl_seconds": 10, "register": False}
+    options.update(overrides)
+    return LocalTTLCache("test", **options)
+
+
+class LocalTTLCacheUnitTest(unittest.TestCase):
+    def test_evicts_least_recently_used_entry_when_full(self) -> None:
+        cache = _build_cache()
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("c", 3)
+        cache.get("a")
+
+        cache.set("d", 4)
+
+        self.assertEqual(sorted(cache.keys()), ["a", "c", "d"])
+        self.assertEqual(cache.snapshot().evictions, 1)
+
+    def test_expired_entries_are_missed_and_swept(self) -> None:
+        with patch.object(local_cache.time, "monotonic", return_value=100.0):
+            cache = _build_cache(sweep_interval_seconds=5)
+            cache.set("a", 1, ttl_seconds=1)
+            cache.set("b", 2, ttl_seconds=60)
+        with patch.object(local_cache.time, "monotonic", return_value=102.0):
+            self.assertIsNone(cache.get("a"))
+        with patch.object(local_cache.time, "monotonic", return_value=200.0):
+            cache.get("missing")
+
+        self.assertEqual(len(cache), 0)
+        snapshot = cache.snapshot()
+        self.assertEqual(snapshot.expirations, 2)
+        self.assertEqual(snapshot.misses, 2)
+
+    def test_invalidate_tag_removes_only_tagged_entries(self) -> None:
+        cache = _build_cache(max_size=10)
+        cache.set("sid-1|a", True, tags=("sid-1",))
+        cache.set("sid-1|b", False, tags=("sid-1",))
+        cache.set("sid-2|a", True, tags=("sid-2",))
+
+        removed = cache.invalidate_tag("sid-1")
+
+        self.assertEqual(removed, 2)
+        self.assertEqual(cache.keys(), ["sid-2|a"])
+        self.assertEqual(cache.snapshot().tags, 1)
+
+    def test_copy_values_isolates_cached_object_from_callers(self) -> None:
+        cache = _build_cache(copy_values=True)
+        original = {"codes": ["a"]}
+        cache.set("k", original)
+        original["codes"].append("b")
+        loaded = cache.get("k")
+        loaded["codes"].append("c")
+
+        self.assertEqual(cache.get("k"), {"codes": ["a"]})
+
+    def test_get_or_load_coalesces_concurrent_misses(self) -> None:
+        cache = _build_cache()
+        started = threading.Event()
+        release = threading.Event()
+        calls: list[int] = []
+        results: list[str] = []
+
+        def loader() -> str:
+            calls.append(1)
+            started.set()
+            release.wait(timeout=1)
+            return "value"
+
+        def worker() -> None:
+            results.append(cache.get_or_load("k", loader))
+
+        first = threading.Thread(target=worker)
+        first.start()
+        self.assertTrue(started.wait(timeout=1))
+        second = threading.Thread(target=worker)
+        second.start()
+        release.set()
+        first.join(timeout=1)
+        second.join(timeout=1)
+
+        self.assertEqual(results, ["value", "value"])
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.snapshot().loads, 1)
+
+    def test_get_or_load_does_not_backfill_after_invalidation(self) -> None:
+        cache = _build_cache()
+
+        def loader() -> str:
+            cache.clear()
+            return "stale"
+
+        self.assertEqual(cache.get_or_load("k", loader), "stale")
+        self.assertNotIn("k", cache)
+
+    def test_get_or_load_on_event_loop_thread_does_not_wait_for_inflight_loader(self) -> None:
+        cache = _build_cache()
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_loader() -> str:
+            started.set()
+            release.wait(timeout=1)
+            return "slow"
+
+        loader_thread = threading.Thread(target=lambda: cache.get_or_load("k", slow_loader))
+        loader_thread.start()
+        self.assertTrue(started.wait(timeout=1))
+
+        async def _load_on_loop() -> str:
+            return cache.get_or_load("k", lambda: "direct", wait_timeout_seconds=5)
+
+        try:
+            self.assertEqual(asyncio.run(_load_on_loop()), "direct")
+        finally:
+            release.set()
+            loader_thread.join(timeout=1)
+        self.assertEqual(cache.snapshot().load_waits, 0)
+
+    def test_replace_keeps_expiry_and_tags(self) -> None:
+        cache = _build_cache()
+        with patch.object(local_cache.time, "monotonic", return_value=100.0):
+            cache.set("k", 1, ttl_seconds=5, tags=("t",))
+            self.assertTrue(cache.replace("k", 2))
+            self.assertFalse(cache.replace("missing", 2))
+            self.assertEqual(cache.get("k"), 2)
+        with patch.object(local_cache.time, "monotonic", return_value=106.0):
+            self.assertIsNone(cache.get("k"))
+
+    def test_get_or_load_records_load_latency_histogram(self) -> None:
+        cache = _build_cache()
+        cache.get_or_load("k", lambda: "value")
+        cache.observe_load(0.03)
+
+        snapshot = cache.snapshot()
+
+        self.assertEqual(sum(snapshot.load_latency_histogram.values()), 2)
+        self.assertEqual(snapshot.load_latency_histogram["50"], 1)
+        self.assertGreaterEqual(snapshot.load_seconds_total, 0.03)
+
+    def test_registered_caches_are_listed_with_hit_ratio(self) -> None:
+        cache = LocalTTLCache("test.registry", max_size=2, ttl_seconds=10)
+        cache.set("k", 1)
+        cache.get("k")
+        cache.get("missing")
+
+        registered = {item.name: item for item in local_cache.list_local_caches()}
+
+        self.assertIs(registered["test.registry"], cache)
+        self.assertEqual(cache.snapshot().hit_ratio, 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
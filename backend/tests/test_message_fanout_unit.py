@@ -0,0 +1,181 @@
+import asyncio
+import json
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.services.message_connection_manager import (
+    PUSH_HANDED_OFF,
+    MessageConnectionManager,
+)
+from app.services.message_fanout_service import (
+    LocalMessageFanoutBus,
+    RedisMessageFanoutBus,
+)
+
+
+class _FakeWebSocket:
+    def __init__(self, *, fail: bool = False) -> None:
+        self.sent: list[dict] = []
+        self._fail = fail
+
+    async def send_json(self, payload: dict) -> None:
+        if self._fail:
+            raise RuntimeError("closed")
+        self.sent.append(payload)
+
+
+class MessageFanoutUnitTest(unittest.TestCase):
+    def test_push_reaches_socket_owned_by_other_worker(self) -> None:
+        async def run_case() -> None:
+            bus = LocalMessageFanoutBus()
+            reported: list[tuple] = []
+
+            async def on_forwarded_result(user_id, payload, delivered, reason):
+                reported.append((user_id, payload["message_id"], delivered, reason))
+
+            worker_a = MessageConnectionManager(owner_id="worker-a")
+            worker_b = MessageConnectionManager(owner_id="worker-b")
+            await worker_a.start_fanout(bus, on_forwarded_result=on_forwarded_result)
+            await worker_b.start_fanout(bus, on_forwarded_result=on_forwarded_result)
+            websocket = _FakeWebSocket()
+            await worker_b.connect_already_accepted(websocket, 7)
+
+            delivered, failure_reason = await worker_a.push_to_user(
+                7, {"event": "message_created", "message_id": 1}
+            )
+
+            # 发起方只知道已移交，送达由持有连接的 worker_b 回写
+            self.assertFalse(delivered)
+            self.assertEqual(failure_reason, PUSH_HANDED_OFF)
+            self.assertEqual(websocket.sent, [{"event": "message_created", "message_id": 1}])
+            self.assertEqual(reported, [(7, 1, True, None)])
+
+        asyncio.run(run_case())
+
+    def test_owner_reports_failed_send_after_handoff(self) -> None:
+        async def run_case() -> None:
+            bus = LocalMessageFanoutBus()
+            reported: list[tuple] = []
+
+            async def on_forwarded_result(user_id, payload, delivered, reason):
+                reported.append((user_id, delivered, reason))
+
+            worker_a = MessageConnectionManager(owner_id="worker-a")
+            worker_b = MessageConnectionManager(owner_id="worker-b")
+            await worker_a.start_fanout(bus)
+            await worker_b.start_fanout(bus, on_forwarded_result=on_forwarded_result)
+            await worker_b.connect_already_accepted(_FakeWebSocket(fail=True), 8)
+
+            delivered, failure_reason = await worker_a.push_to_user(
+                8, {"event": "message_created", "message_id": 2}
+            )
+
+            self.assertFalse(delivered)
+            self.assertEqual(failure_reason, PUSH_HANDED_OFF)
+            self.assertEqual(reported, [(8, False, "send_json_failed")])
+
+        asyncio.run(run_case())
+
+    def test_publish_only_process_forwards_without_subscribing(self) -> None:
+        async def run_case() -> None:
+            bus = LocalMessageFanoutBus()
+            web_worker = MessageConnectionManager()
+            background_worker = MessageConnectionManager()
+            await web_worker.start_fanout(bus)
+            await background_worker.start_fanout(bus, subscribe=False)
+            websocket = _FakeWebSocket()
+            await web_worker.connect_already_accepted(websocket, 3)
+
+            delivered, failure_reason = await background_worker.push_to_user(
+                3, {"event": "ping"}
+            )
+
+            self.assertFalse(delivered)
+            self.assertEqual(failure_reason, PUSH_HANDED_OFF)
+            self.assertEqual(len(websocket.sent), 1)
+
+        asyncio.run(run_case())
+
+    def test_disconnect_unregisters_owner_and_push_reports_offline(self) -> None:
+        async def run_case() -> None:
+            bus = LocalMessageFanoutBus()
+            worker_a = MessageConnectionManager(owner_id="worker-a")
+            worker_b = MessageConnectionManager(owner_id="worker-b")
+            await worker_a.start_fanout(bus)
+            await worker_b.start_fanout(bus)
+            websocket = _FakeWebSocket()
+            await worker_b.connect_already_accepted(websocket, 9)
+            await worker_b.disconnect(websocket, 9)
+
+            delivered, failure_reason = await worker_a.push_to_user(9, {"event": "x"})
+
+            self.assertFalse(delivered)
+            self.assertEqual(failure_reason, "no_active_connection")
+
+        asyncio.run(run_case())
+
+    def test_local_only_manager_keeps_original_behaviour(self) -> None:
+        async def run_case() -> None:
+            manager = MessageConnectionManager()
+            websocket = _FakeWebSocket(fail=True)
+            await manager.connect_already_accepted(websocket, 5)
+
+            delivered, failure_reason = await manager.push_to_user(5, {"event": "x"})
+
+            self.assertFalse(delivered)
+            self.assertEqual(failure_reason, "send_json_failed")
+            self.assertEqual(manager.online_user_ids(), [])
+
+        asyncio.run(run_case())
+
+    def test_online_user_ids_snapshot_is_safe_to_read_off_loop(self) -> None:
+        async def run_case() -> None:
+            manager = MessageConnectionManager()
+            first, second = _FakeWebSocket(), _FakeWebSocket()
+            await manager.connect_already_accepted(first, 3)
+            await manager.connect_already_accepted(second, 4)
+            snapshot = manager.online_user_ids()
+            await manager.disconnect(first, 3)
+
+            # 监听线程拿到的列表是独立副本，事件循环后续的增删不影响它
+            self.assertEqual(sorted(snapshot), [3, 4])
+            self.assertEqual(manager.online_user_ids(), [4])
+            await manager.disconnect(second, 4)
+            self.assertEqual(manager.online_user_ids(), [])
+
+        asyncio.run(run_case())
+
+    def test_redis_bus_publishes_to_live_owners_except_self(self) -> None:
+        redis_client = MagicMock()
+        redis_client.zrangebyscore.return_value = ["worker-a", "worker-b"]
+        redis_client.publish.return_value = 1
+        bus = RedisMessageFanoutBus(
+            key_prefix="mes:msg_ws",
+            presence_ttl_seconds=60,
+            redis_client=redis_client,
+        )
+
+        handed_off = asyncio.run(
+            bus.publish_to_owners(11, {"event": "x"}, exclude_owner_id="worker-a")
+        )
+
+        self.assertTrue(handed_off)
+        redis_client.publish.assert_called_once()
+        channel, raw_message = redis_client.publish.call_args.args
+        self.assertEqual(channel, "mes:msg_ws:owner:worker-b")
+        self.assertEqual(
+            json.loads(raw_message),
+            {"user_id": 11, "payload": {"event": "x"}},
+        )
+        redis_client.zremrangebyscore.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,12 +6,14 @@ from pathlib import Path
 from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.exc import IntegrityError
 
 BACKEND_DIR = Path(__file__).resolve().parents[1]
 if str(BACKEND_DIR) not in sys.path:
     sys.path.insert(0, str(BACKEND_DIR))
 
+from app.db.session import ThreadpoolAsyncSession
 from app.schemas.message import AnnouncementManagementItem, MessageCreateRequest
 from app.services import message_service
 
@@ -39,6 +41,9 @@ class _FakeScalarResult:
     def all(self):
         return self._all_rows
 
+    def __iter__(self):
+        return iter(self._all_rows)
+
 
 class _FakeSessionContext:
     def __init__(self, db):
@@ -73,8 +78,8 @@ class MessageServiceUnitTest(unittest.TestCase):
         self.assertIs(result, existing)
         db.rollback.assert_called_once()
 
-    def test_mark_recipient_delivery_result_updates_retry_fields_and_audit(self):
-        recipient = SimpleNamespace(
+    def test_record_delivery_results_bulk_updates_retry_fields_and_audit(self):
+        failed_row = SimpleNamespace(
             id=7,
             message_id=12,
             recipient_user_id=3,
@@ -82,41 +87,232 @@ class MessageServiceUnitTest(unittest.TestCase):
             delivery_attempt_count=0,
             last_failure_reason=None,
             next_retry_at=None,
-            last_push_at=None,
-            delivered_at=None,
+        )
+        delivered_row = SimpleNamespace(
+            id=8,
+            message_id=12,
+            recipient_user_id=4,
+            delivery_status="failed",
+            delivery_attempt_count=1,
+            last_failure_reason="no_active_connection",
+            next_retry_at=datetime.now(UTC),
         )
         db = MagicMock()
-        db.execute.return_value = _FakeScalarResult(one=recipient)
+        db.execute.side_effect = [
+            _FakeScalarResult(all_rows=[failed_row, delivered_row]),
+            None,
+        ]
         pushed_at = datetime.now(UTC)
 
         with (
             patch.object(
                 message_service, "SessionLocal", return_value=_FakeSessionContext(db)
             ),
-            patch.object(message_service, "write_audit_log") as write_audit_log,
+            patch.object(message_service, "write_audit_logs_bulk") as write_bulk,
         ):
-            message_service._mark_recipient_delivery_result(
-                message_id=12,
-                user_id=3,
-                delivered=False,
-                failure_reason="no_active_connection",
-                pushed_at=pushed_at,
+            next_retry_by_key = message_service._record_delivery_results(
+                [
+                    message_service._MessageDeliveryResult(
+                        message_id=12,
+                        user_id=3,
+                        delivered=False,
+                        failure_reason="no_active_connection",
+                        pushed_at=pushed_at,
+                    ),
+                    message_service._MessageDeliveryResult(
+                        message_id=12,
+                        user_id=4,
+                        delivered=True,
+                        failure_reason=None,
+                        pushed_at=pushed_at,
+                    ),
+                ]
             )
 
-        self.assertEqual(recipient.delivery_status, "failed")
-        self.assertEqual(recipient.delivery_attempt_count, 1)
-        self.assertEqual(recipient.last_failure_reason, "no_active_connection")
-        self.assertIsNotNone(recipient.next_retry_at)
-        self.assertEqual(recipient.last_push_at, pushed_at)
-        self.assertIsNone(recipient.delivered_at)
-        write_audit_log.assert_called_once()
+        self.assertEqual(db.execute.call_count, 2)
+        select_sql = str(
+            db.execute.call_args_list[0].args[0].compile(dialect=postgresql.dialect())
+        )
+        self.assertIn(
+            "(msg_message_recipient.message_id, msg_message_recipient.recipient_user_id) IN",
+            select_sql,
+        )
+        update_rows = db.execute.call_args_list[1].args[1]
+        failed_update, delivered_update = update_rows
+        self.assertEqual(failed_update["id"], 7)
+        self.assertEqual(failed_update["delivery_status"], "failed")
+        self.assertEqual(failed_update["delivery_attempt_count"], 1)
+        self.assertEqual(failed_update["last_failure_reason"], "no_active_connection")
+        self.assertIsNotNone(failed_update["next_retry_at"])
+        self.assertEqual(failed_update["last_push_at"], pushed_at)
+        self.assertIsNone(failed_update["delivered_at"])
+        self.assertEqual(delivered_update["delivery_status"], "delivered")
+        self.assertEqual(delivered_update["delivery_attempt_count"], 2)
+        self.assertIsNone(delivered_update["next_retry_at"])
+        self.assertEqual(
+            next_retry_by_key, {(12, 3): failed_update["next_retry_at"]}
+        )
+        self.assertEqual(len(write_bulk.call_args.kwargs["entries"]), 2)
         db.commit.assert_called_once()
 
+    def test_deliver_message_created_counts_unread_once_and_pushes_concurrently(self):
+        in_flight = 0
+        max_in_flight = 0
+
+        async def _fake_push(user_id, message_id, unread_count):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            return user_id % 2 == 0, "no_active_connection", datetime.now(UTC)
+
+        with (
+            patch.object(
+                message_service,
+                "_load_unread_counts",
+                return_value={user_id: user_id * 10 for user_id in range(1, 7)},
+            ) as load_counts,
+            patch.object(
+                message_service, "_record_delivery_results", return_value={}
+            ) as record_results,
+            patch.object(message_service.settings, "message_delivery_batch_size", 3),
+            patch.object(
+                message_service.settings, "message_delivery_push_concurrency", 2
+            ),
+            patch(
+                "app.services.message_push_service.push_message_created",
+                new=_fake_push,
+            ),
+        ):
+            results = asyncio.run(
+                message_service._deliver_message_created(
+                    [(40, user_id) for user_id in range(1, 7)]
+                )
+            )
+
+        self.assertEqual(load_counts.call_count, 2)
+        self.assertEqual(record_results.call_count, 2)
+        self.assertEqual(len(record_results.call_args_list[0].args[0]), 3)
+        self.assertEqual(max_in_flight, 2)
+        self.assertEqual(
+            [item.delivered for item in results],
+            [False, True, False, True, False, True],
+        )
+
+    def test_deliver_message_created_leaves_handed_off_results_to_owner(self):
+        async def _fake_push(user_id, message_id, unread_count):
+            if user_id == 1:
+                return False, message_service.PUSH_HANDED_OFF, datetime.now(UTC)
+            return True, None, datetime.now(UTC)
+
+        with (
+            patch.object(message_service, "_load_unread_counts", return_value={}),
+            patch.object(
+                message_service, "_record_delivery_results", return_value={}
+            ) as record_results,
+            patch(
+                "app.services.message_push_service.push_message_created",
+                new=_fake_push,
+            ),
+        ):
+            asyncio.run(message_service._deliver_message_created([(40, 1), (40, 2)]))
+
+        recorded = record_results.call_args.args[0]
+        self.assertEqual([(item.message_id, item.user_id) for item in recorded], [(40, 2)])
+
+    def test_record_forwarded_message_delivery_writes_owner_result(self):
+        with patch.object(
+            message_service, "_record_delivery_results", return_value={}
+        ) as record_results:
+            asyncio.run(
+                message_service.record_forwarded_message_delivery(
+                    5,
+                    {"event": "message_created", "message_id": 40},
+                    False,
+                    "send_json_failed",
+                )
+            )
+            asyncio.run(
+                message_service.record_forwarded_message_delivery(
+                    5, {"event": "unread_count_changed"}, True, None
+                )
+            )
+
+        record_results.assert_called_once()
+        (result,) = record_results.call_args.args[0]
+        self.assertEqual((result.message_id, result.user_id), (40, 5))
+        self.assertFalse(result.delivered)
+        self.assertEqual(result.failure_reason, "send_json_failed")
+
+    def test_record_delivery_results_keeps_delivered_rows(self):
+        delivered_row = SimpleNamespace(
+            id=9,
+            message_id=12,
+            recipient_user_id=5,
+            delivery_status="delivered",
+            delivery_attempt_count=1,
+            last_failure_reason=None,
+            next_retry_at=None,
+        )
+        db = MagicMock()
+        db.execute.return_value = _FakeScalarResult(all_rows=[delivered_row])
+
+        with patch.object(
+            message_service, "SessionLocal", return_value=_FakeSessionContext(db)
+        ):
+            next_retry_by_key = message_service._record_delivery_results(
+                [
+                    message_service._MessageDeliveryResult(
+                        message_id=12,
+                        user_id=5,
+                        delivered=False,
+                        failure_reason="no_active_connection",
+                        pushed_at=datetime.now(UTC),
+                    )
+                ]
+            )
+
+        self.assertEqual(next_retry_by_key, {})
+        self.assertEqual(db.execute.call_count, 1)
+        db.commit.assert_not_called()
+
+    def _run_maintenance_with_rows(
+        self,
+        *,
+        now,
+        execute_results,
+    ):
+        db = MagicMock()
+        db.execute.side_effect = [
+            *execute_results,
+            *[_FakeScalarResult() for _ in range(4)],
+        ]
+        message_service._MESSAGE_MAINTENANCE_SOURCE_WATERMARK = 0
+        with (
+            patch.object(message_service, "write_audit_logs_bulk") as write_bulk,
+            patch.object(
+                message_service, "_bulk_update_message_status"
+            ) as bulk_update,
+            patch.object(
+                message_service, "_sync_pending_registration_request_messages"
+            ),
+            patch.object(message_service, "_sync_failed_first_article_messages"),
+            patch.object(message_service, "_sync_overdue_production_order_messages"),
+        ):
+            stats = message_service.run_message_maintenance(db, now=now)
+        updates = {
+            call.args[2]: call.args[1] for call in bulk_update.call_args_list
+        }
+        entries = write_bulk.call_args.kwargs["entries"]
+        return db, stats, updates, entries
+
     def test_run_message_maintenance_marks_missing_source_and_archives_old_rows(self):
         now = datetime.now(UTC)
         stale_message = SimpleNamespace(
             id=1,
             title="旧消息",
+            message_type="notice",
             status="source_unavailable",
             source_module="message",
             source_type="announcement",
@@ -128,6 +324,7 @@ class MessageServiceUnitTest(unittest.TestCase):
         missing_source_message = SimpleNamespace(
             id=2,
             title="失效来源消息",
+            message_type="todo",
             status="active",
             source_module="user",
             source_type="registration_request",
@@ -136,28 +333,26 @@ class MessageServiceUnitTest(unittest.TestCase):
             updated_at=now,
             created_at=now,
         )
-        db = MagicMock()
-        db.execute.side_effect = [
-            _FakeScalarResult(all_rows=[stale_message, missing_source_message]),
-            _FakeScalarResult(one=None),
-        ]
 
-        with (
-            patch.object(message_service, "write_audit_log") as write_audit_log,
-            patch.object(
-                message_service, "_sync_pending_registration_request_messages"
-            ),
-            patch.object(message_service, "_sync_failed_first_article_messages"),
-            patch.object(message_service, "_sync_overdue_production_order_messages"),
-        ):
-            stats = message_service.run_message_maintenance(db, now=now)
+        db, stats, updates, entries = self._run_maintenance_with_rows(
+            now=now,
+            execute_results=[
+                _FakeScalarResult(all_rows=[missing_source_message]),
+                _FakeScalarResult(all_rows=[]),
+                _FakeScalarResult(all_rows=[stale_message]),
+                _FakeScalarResult(all_rows=[]),
+            ],
+        )
 
-        self.assertEqual(stale_message.status, "archived")
-        self.assertEqual(missing_source_message.status, "src_unavailable")
+        self.assertEqual(updates["src_unavailable"], [2])
+        self.assertEqual(updates["archived"], [1])
         self.assertEqual(stats["archived_messages"], 1)
         self.assertEqual(stats["source_unavailable_updated"], 1)
         db.flush.assert_called_once()
-        self.assertEqual(write_audit_log.call_count, 2)
+        self.assertEqual(
+            [entry["action_code"] for entry in entries],
+            ["message.source_unavailable", "message.archived"],
+        )
 
     def test_run_message_maintenance_closes_registration_todo_when_request_processed(self):
         now = datetime.now(UTC)
@@ -173,26 +368,23 @@ class MessageServiceUnitTest(unittest.TestCase):
             updated_at=now,
             created_at=now,
         )
-        db = MagicMock()
-        db.execute.side_effect = [
-            _FakeScalarResult(all_rows=[processed_registration_todo]),
-            _FakeScalarResult(one=SimpleNamespace(is_deleted=False, status="approved")),
-        ]
 
-        with (
-            patch.object(message_service, "write_audit_log") as write_audit_log,
-            patch.object(
-                message_service, "_sync_pending_registration_request_messages"
-            ),
-            patch.object(message_service, "_sync_failed_first_article_messages"),
-            patch.object(message_service, "_sync_overdue_production_order_messages"),
-        ):
-            stats = message_service.run_message_maintenance(db, now=now)
+        db, stats, updates, entries = self._run_maintenance_with_rows(
+            now=now,
+            execute_results=[
+                _FakeScalarResult(all_rows=[processed_registration_todo]),
+                _FakeScalarResult(
+                    all_rows=[SimpleNamespace(id=456, is_deleted=False, status="approved")]
+                ),
+                _FakeScalarResult(all_rows=[]),
+                _FakeScalarResult(all_rows=[]),
+            ],
+        )
 
-        self.assertEqual(processed_registration_todo.status, "src_unavailable")
+        self.assertEqual(updates["src_unavailable"], [3])
         self.assertEqual(stats["source_unavailable_updated"], 1)
         db.flush.assert_called_once()
-        write_audit_log.assert_called_once()
+        self.assertEqual(len(entries), 1)
 
     def test_run_message_maintenance_closes_first_article_todo_after_disposition(self):
         now = datetime.now(UTC)
@@ -208,33 +400,30 @@ class MessageServiceUnitTest(unittest.TestCase):
             updated_at=now,
             created_at=now,
         )
-        db = MagicMock()
-        db.execute.side_effect = [
-            _FakeScalarResult(all_rows=[processed_first_article_todo]),
-            _FakeScalarResult(
-                one=SimpleNamespace(
-                    is_deleted=False,
-                    id=789,
-                    result="failed",
-                )
-            ),
-            _FakeScalarResult(all_rows=[SimpleNamespace(final_judgment="accept")]),
-        ]
 
-        with (
-            patch.object(message_service, "write_audit_log") as write_audit_log,
-            patch.object(
-                message_service, "_sync_pending_registration_request_messages"
-            ),
-            patch.object(message_service, "_sync_failed_first_article_messages"),
-            patch.object(message_service, "_sync_overdue_production_order_messages"),
-        ):
-            stats = message_service.run_message_maintenance(db, now=now)
+        db, stats, updates, entries = self._run_maintenance_with_rows(
+            now=now,
+            execute_results=[
+                _FakeScalarResult(all_rows=[processed_first_article_todo]),
+                _FakeScalarResult(
+                    all_rows=[
+                        SimpleNamespace(
+                            is_deleted=False,
+                            id=789,
+                            result="failed",
+                        )
+                    ]
+                ),
+                _FakeScalarResult(all_rows=[789]),
+                _FakeScalarResult(all_rows=[]),
+                _FakeScalarResult(all_rows=[]),
+            ],
+        )
 
-        self.assertEqual(processed_first_article_todo.status, "src_unavailable")
+        self.assertEqual(updates["src_unavailable"], [4])
         self.assertEqual(stats["source_unavailable_updated"], 1)
         db.flush.assert_called_once()
-        write_audit_log.assert_called_once()
+        self.assertEqual(len(entries), 1)
 
     def test_run_message_maintenance_closes_first_article_todo_after_cancellation(self):
         now = datetime.now(UTC)
@@ -250,33 +439,31 @@ class MessageServiceUnitTest(unittest.TestCase):
             updated_at=now,
             created_at=now,
         )
-        db = MagicMock()
-        db.execute.side_effect = [
-            _FakeScalarResult(all_rows=[cancelled_first_article_todo]),
-            _FakeScalarResult(
-                one=SimpleNamespace(
-                    is_deleted=False,
-                    id=790,
-                    result="failed",
-                    is_cancelled=True,
-                )
-            ),
-        ]
 
-        with (
-            patch.object(message_service, "write_audit_log") as write_audit_log,
-            patch.object(
-                message_service, "_sync_pending_registration_request_messages"
-            ),
-            patch.object(message_service, "_sync_failed_first_article_messages"),
-            patch.object(message_service, "_sync_overdue_production_order_messages"),
-        ):
-            stats = message_service.run_message_maintenance(db, now=now)
+        db, stats, updates, entries = self._run_maintenance_with_rows(
+            now=now,
+            execute_results=[
+                _FakeScalarResult(all_rows=[cancelled_first_article_todo]),
+                _FakeScalarResult(
+                    all_rows=[
+                        SimpleNamespace(
+                            is_deleted=False,
+                            id=790,
+                            result="failed",
+                            is_cancelled=True,
+                        )
+                    ]
+                ),
+                _FakeScalarResult(all_rows=[]),
+                _FakeScalarResult(all_rows=[]),
+                _FakeScalarResult(all_rows=[]),
+            ],
+        )
 
-        self.assertEqual(cancelled_first_article_todo.status, "src_unavailable")
+        self.assertEqual(updates["src_unavailable"], [41])
         self.assertEqual(stats["source_unavailable_updated"], 1)
         db.flush.assert_called_once()
-        write_audit_log.assert_called_once()
+        self.assertEqual(len(entries), 1)
 
     def test_run_message_maintenance_closes_maintenance_todo_when_work_order_done(self):
         now = datetime.now(UTC)
@@ -292,26 +479,79 @@ class MessageServiceUnitTest(unittest.TestCase):
             updated_at=now,
             created_at=now,
         )
+
+        db, stats, updates, entries = self._run_maintenance_with_rows(
+            now=now,
+            execute_results=[
+                _FakeScalarResult(all_rows=[completed_work_order_todo]),
+                _FakeScalarResult(
+                    all_rows=[SimpleNamespace(id=321, is_deleted=False, status="done")]
+                ),
+                _FakeScalarResult(all_rows=[]),
+                _FakeScalarResult(all_rows=[]),
+            ],
+        )
+
+        self.assertEqual(updates["src_unavailable"], [5])
+        self.assertEqual(stats["source_unavailable_updated"], 1)
+        db.flush.assert_called_once()
+        self.assertEqual(len(entries), 1)
+
+    def test_run_message_maintenance_batches_source_lookups_per_type(self):
+        now = datetime.now(UTC)
+        todos = [
+            SimpleNamespace(
+                id=index,
+                title=f"注册审批待处理：user{index}",
+                status="active",
+                source_module="user",
+                source_type="registration_request",
+                source_id=str(100 + index),
+                message_type="todo",
+                expires_at=None,
+                updated_at=now,
+                created_at=now,
+            )
+            for index in range(1, 51)
+        ]
+        pending_rows = [
+            SimpleNamespace(id=100 + index, is_deleted=False, status="pending")
+            for index in range(1, 51)
+        ]
+
+        db, stats, updates, entries = self._run_maintenance_with_rows(
+            now=now,
+            execute_results=[
+                _FakeScalarResult(all_rows=todos),
+                _FakeScalarResult(all_rows=pending_rows),
+                _FakeScalarResult(all_rows=[]),
+                _FakeScalarResult(all_rows=[]),
+            ],
+        )
+
+        # 扫描 + 单条来源 IN 查询 + 保留期归档 + 过期归档
+        self.assertEqual(db.execute.call_count, 4)
+        self.assertEqual(stats["source_unavailable_updated"], 0)
+        self.assertEqual(updates.get("src_unavailable", []), [])
+        self.assertEqual(entries, [])
+
+    def test_active_message_scan_rotates_watermark_between_batches(self):
+        rows = [SimpleNamespace(id=index) for index in range(1, 4)]
         db = MagicMock()
         db.execute.side_effect = [
-            _FakeScalarResult(all_rows=[completed_work_order_todo]),
-            _FakeScalarResult(one=SimpleNamespace(is_deleted=False, status="done")),
+            _FakeScalarResult(all_rows=rows[:2]),
+            _FakeScalarResult(all_rows=rows[2:]),
+            _FakeScalarResult(all_rows=rows[:1]),
         ]
+        message_service._MESSAGE_MAINTENANCE_SOURCE_WATERMARK = 0
 
-        with (
-            patch.object(message_service, "write_audit_log") as write_audit_log,
-            patch.object(
-                message_service, "_sync_pending_registration_request_messages"
-            ),
-            patch.object(message_service, "_sync_failed_first_article_messages"),
-            patch.object(message_service, "_sync_overdue_production_order_messages"),
-        ):
-            stats = message_service.run_message_maintenance(db, now=now)
+        first = message_service._load_active_source_bound_messages(db, batch_size=2)
+        self.assertEqual([row.id for row in first], [1, 2])
+        self.assertEqual(message_service._MESSAGE_MAINTENANCE_SOURCE_WATERMARK, 2)
 
-        self.assertEqual(completed_work_order_todo.status, "src_unavailable")
-        self.assertEqual(stats["source_unavailable_updated"], 1)
-        db.flush.assert_called_once()
-        write_audit_log.assert_called_once()
+        second = message_service._load_active_source_bound_messages(db, batch_size=2)
+        self.assertEqual([row.id for row in second], [3, 1])
+        self.assertEqual(message_service._MESSAGE_MAINTENANCE_SOURCE_WATERMARK, 1)
 
     def test_sync_failed_first_article_messages_skips_disposed_records(self):
         db = MagicMock()
@@ -501,52 +741,121 @@ class MessageServiceUnitTest(unittest.TestCase):
         recipient = SimpleNamespace(id=5, message_id=21, recipient_user_id=9)
         db = MagicMock()
         db.execute.return_value = _FakeScalarResult(all_rows=[recipient])
-        retry_db = MagicMock()
+        push = AsyncMock(return_value=(True, None, datetime.now(UTC)))
 
         with (
             patch.object(
-                message_service,
-                "SessionLocal",
-                return_value=_FakeSessionContext(retry_db),
-            ),
-            patch.object(message_service, "get_unread_count", return_value=4),
+                message_service, "SessionLocal", return_value=_FakeSessionContext(db)
+            ) as session_local,
+            patch.object(message_service, "_load_unread_counts", return_value={9: 4}),
             patch.object(
-                message_service, "_mark_recipient_delivery_result"
-            ) as mark_result,
+                message_service, "_record_delivery_results", return_value={}
+            ) as record_results,
             patch(
                 "app.services.message_push_service.push_message_created",
-                new=AsyncMock(return_value=(True, None, datetime.now(UTC))),
+                new=push,
             ),
         ):
             retried_ids = asyncio.run(
                 message_service.retry_failed_message_deliveries(
-                    db,
                     now=datetime.now(UTC),
                 )
             )
 
         self.assertEqual(retried_ids, [5])
-        mark_result.assert_called_once()
+        push.assert_awaited_once_with(9, 21, 4)
+        record_results.assert_called_once()
+        # 线程池内自建会话
+        session_local.assert_called_once_with()
 
     def test_compensate_pending_message_deliveries_replays_stale_pending_records(self):
         recipient = SimpleNamespace(id=8, message_id=31, recipient_user_id=12)
         db = MagicMock()
         db.execute.return_value = _FakeScalarResult(all_rows=[recipient])
 
-        with patch.object(
-            message_service,
-            "_push_message_created_for_recipient",
-            new=AsyncMock(),
-        ) as push_once:
+        with (
+            patch.object(
+                message_service, "SessionLocal", return_value=_FakeSessionContext(db)
+            ),
+            patch.object(
+                message_service,
+                "_deliver_message_created",
+                new=AsyncMock(return_value=[]),
+            ) as deliver,
+        ):
             compensated_ids = asyncio.run(
                 message_service.compensate_pending_message_deliveries(
-                    db,
                     now=datetime.now(UTC),
                 )
             )
 
         self.assertEqual(compensated_ids, [8])
-        push_once.assert_awaited_once_with(31, 12)
+        deliver.assert_awaited_once_with([(31, 12)])
+        sql = str(db.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        self.assertIn("FOR UPDATE SKIP LOCKED", sql)
+        # 外层 UPDATE 重新校验租约，子查询与外层各一次
+        self.assertEqual(sql.count("msg_message_recipient.last_push_at <="), 2)
+
+    def test_fan_out_message_deliveries_claims_chunks_until_drained(self):
+        claims = [[(60, 1), (60, 2)], [(60, 3)], []]
+
+        with (
+            patch.object(
+                message_service,
+                "_claim_pending_message_recipients",
+                side_effect=claims,
+            ) as claim,
+            patch.object(
+                message_service,
+                "_deliver_message_created",
+                new=AsyncMock(return_value=[]),
+            ) as deliver,
+            patch.object(message_service.settings, "message_delivery_batch_size", 2),
+        ):
+            pushed = asyncio.run(message_service.fan_out_message_deliveries(60))
+
+        self.assertEqual(pushed, 3)
+        self.assertEqual(claim.call_count, 3)
+        self.assertEqual(claim.call_args.kwargs["batch_size"], 2)
+        self.assertEqual(
+            [call.args[0] for call in deliver.await_args_list],
+            [[(60, 1), (60, 2)], [(60, 3)]],
+        )
+
+    def test_get_message_delivery_progress_groups_by_status(self):
+        db = MagicMock()
+        db.execute.return_value = _FakeScalarResult(
+            all_rows=[("delivered", 7), ("failed", 2), ("pending", 1)]
+        )
+
+        progress = message_service.get_message_delivery_progress(db, message_id=60)
+
+        self.assertEqual(progress.recipient_count, 10)
+        self.assertEqual(progress.delivered_count, 7)
+        self.assertEqual(progress.failed_count, 2)
+        self.assertEqual(progress.pending_count, 1)
+        self.assertFalse(progress.completed)
+
+    def test_publish_announcement_rejects_without_recipients_before_insert(self):
+        db = MagicMock()
+        db.execute.return_value.scalar.return_value = False
+        req = message_service.AnnouncementPublishRequest(
+            title="全员公告",
+            content="内容",
+            range_type="all",
+        )
+
+        with self.assertRaisesRegex(ValueError, "未匹配到可投递的有效用户"):
+            message_service.publish_announcement(
+                db,
+                req=req,
+                operator=SimpleNamespace(id=1),
+            )
+
+        db.execute.assert_called_once()
+        db.add.assert_not_called()
+        db.rollback.assert_not_called()
+        db.commit.assert_not_called()
 
     def test_push_message_created_async_skips_sync_compensation_without_event_loop(self):
         db = MagicMock()
@@ -784,6 +1093,59 @@ class MessageServiceUnitTest(unittest.TestCase):
         self.assertEqual(unread, 4)
         maintenance.assert_called_once()
 
+    def test_async_summary_and_unread_count_share_sync_statements(self):
+        db = MagicMock()
+        db.execute.side_effect = [
+            _FakeScalarResult(one=(5, 2, 1, 0)),
+            _FakeScalarResult(one=2),
+        ]
+        async_db = ThreadpoolAsyncSession(db)
+
+        async def _run():
+            summary = await message_service.get_message_summary_async(async_db, user_id=1)
+            unread = await message_service.get_unread_count_async(async_db, user_id=1)
+            return summary, unread
+
+        summary, unread = asyncio.run(_run())
+
+        self.assertEqual(summary["unread_count"], 2)
+        self.assertEqual(summary["todo_unread_count"], 1)
+        self.assertEqual(unread, 2)
+        self.assertEqual(db.execute.call_count, 2)
+
+    def test_list_messages_async_resolves_permissions_through_run_sync(self):
+        db = MagicMock()
+        db.execute.side_effect = [
+            _FakeScalarResult(one=0),
+            _FakeScalarResult(all_rows=[]),
+        ]
+        current_user = SimpleNamespace(id=1)
+
+        with patch.object(
+            message_service,
+            "get_user_permission_codes",
+            return_value={"message.messages.list"},
+        ) as permission_mock:
+            items, total = asyncio.run(
+                message_service.list_messages_async(
+                    ThreadpoolAsyncSession(db),
+                    user_id=1,
+                    current_user=current_user,
+                )
+            )
+
+        self.assertEqual((items, total), ([], 0))
+        permission_mock.assert_called_once_with(db, user=current_user)
+
+    def test_get_unread_counts_by_user_groups_in_single_query(self):
+        db = MagicMock()
+        db.execute.return_value = _FakeScalarResult(all_rows=[(3, 2)])
+
+        counts = message_service.get_unread_counts_by_user(db, user_ids=[7, 3, 3])
+
+        self.assertEqual(counts, {3: 2, 7: 0})
+        db.execute.assert_called_once()
+
     def test_source_record_exists_supports_non_numeric_registered_source(self):
         msg = SimpleNamespace(
             source_module="user",
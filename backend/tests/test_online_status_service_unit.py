@@ -0,0 +1,118 @@
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.services import online_status_service
+
+
+class _FakePresenceRedis:
+    def __init__(self) -> None:
+        self.members: dict[str, float] = {}
+        self.zadd_calls: list[dict[str, float]] = []
+        self.keys = MagicMock()
+        self.trim_calls: list[tuple[object, object]] = []
+
+    def zadd(self, key: str, mapping: dict[str, float]) -> int:
+        self.zadd_calls.append(dict(mapping))
+        self.members.update(mapping)
+        return len(mapping)
+
+    def zrem(self, key: str, member: str) -> int:
+        return 1 if self.members.pop(member, None) is not None else 0
+
+    def delete(self, key: str) -> int:
+        return 0
+
+    def zscore(self, key: str, member: str) -> float | None:
+        return self.members.get(member)
+
+    def zmscore(self, key: str, members: list[str]) -> list[float | None]:
+        return [self.members.get(member) for member in members]
+
+    def zrangebyscore(self, key: str, min_score: float, max_score: str) -> list[str]:
+        return [member for member, score in self.members.items() if score >= min_score]
+
+    def zcount(self, key: str, min_score: float, max_score: str) -> int:
+        return sum(1 for score in self.members.values() if score >= min_score)
+
+    def zremrangebyscore(self, key: str, min_score: object, max_score: object) -> int:
+        self.trim_calls.append((min_score, max_score))
+        return 0
+
+
+class OnlineStatusServiceUnitTest(unittest.TestCase):
+    def setUp(self) -> None:
+        online_status_service._ONLINE_PENDING_TOUCHES.clear()
+        online_status_service._ONLINE_LAST_WRITTEN.clear()
+        online_status_service._ONLINE_FLUSH_TIMER = None
+        online_status_service._ONLINE_LAST_TRIM_AT = 0.0
+        self.redis = _FakePresenceRedis()
+        patcher = patch.object(
+            online_status_service,
+            "_get_online_redis_client",
+            return_value=self.redis,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        schedule_patcher = patch.object(online_status_service, "_schedule_flush_locked")
+        self.schedule_mock = schedule_patcher.start()
+        self.addCleanup(schedule_patcher.stop)
+
+    def test_touches_are_coalesced_and_flushed_in_one_zadd(self) -> None:
+        with patch.object(online_status_service.time, "time", return_value=1000.0):
+            online_status_service.touch_user(1)
+            online_status_service.touch_user(1)
+            online_status_service.touch_user(2)
+            self.assertEqual(self.redis.zadd_calls, [])
+
+            flushed = online_status_service.flush_pending_touches()
+
+        self.assertEqual(flushed, 2)
+        self.assertEqual(self.redis.zadd_calls, [{"1": 1000.0, "2": 1000.0}])
+        self.assertEqual(len(self.redis.trim_calls), 1)
+
+        with patch.object(online_status_service.time, "time", return_value=1005.0):
+            online_status_service.touch_user(1)
+            self.assertEqual(online_status_service.flush_pending_touches(), 0)
+        with patch.object(online_status_service.time, "time", return_value=1016.0):
+            online_status_service.touch_user(1)
+            self.assertEqual(online_status_service.flush_pending_touches(), 1)
+
+    def test_immediate_touch_writes_through(self) -> None:
+        online_status_service.touch_user(7, immediate=True)
+
+        self.assertIn("7", self.redis.members)
+        self.schedule_mock.assert_not_called()
+
+    def test_window_queries_use_sorted_set(self) -> None:
+        self.redis.members = {"1": 1000.0, "2": 950.0, "3": 900.0}
+
+        with patch.object(online_status_service.time, "time", return_value=1000.0):
+            self.assertEqual(online_status_service.list_online_user_ids(), {1, 2})
+            self.assertEqual(
+                online_status_service.list_online_user_ids([1, 3, 4, 1]),
+                {1},
+            )
+            self.assertEqual(online_status_service.count_online_users(), 2)
+            is_online, last_seen = online_status_service.get_user_online_snapshot(3)
+
+        self.assertFalse(is_online)
+        self.assertIsNotNone(last_seen)
+        self.redis.keys.assert_not_called()
+
+    def test_clear_user_drops_pending_touch(self) -> None:
+        online_status_service.touch_user(5)
+        online_status_service.clear_user(5)
+
+        self.assertEqual(online_status_service.flush_pending_touches(), 0)
+        self.assertNotIn("5", self.redis.members)
+
+
+if __name__ == "__main__":
+    unittest.main()
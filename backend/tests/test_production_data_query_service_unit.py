@@ -0,0 +1,349 @@
+import sys
+import unittest
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.models.process import Process
+from app.models.product import Product
+from app.models.production_order import ProductionOrder
+from app.models.production_order_process import ProductionOrderProcess
+from app.models.production_record import ProductionRecord
+from app.models.user import User
+from app.services import production_data_query_service
+
+
+def _compiled_sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+class _FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+    def one(self):
+        return self._rows[0]
+
+
+class ProductionDataQueryServiceUnitTest(unittest.TestCase):
+    def test_today_realtime_aggregates_in_sql_without_row_limit(self) -> None:
+        latest = datetime(2026, 10, 17, 8, 30, tzinfo=UTC)
+        db = MagicMock()
+        db.execute.side_effect = [
+            _FakeResult(
+                [
+                    SimpleNamespace(
+                        product_id=2,
+                        product_name="产品B",
+                        quantity=1500,
+                        latest_time=latest,
+                    ),
+                    SimpleNamespace(
+                        product_id=1,
+                        product_name="产品A",
+                        quantity=300,
+                        latest_time=latest,
+                    ),
+                ]
+            ),
+            _FakeResult([("in_progress", 3), ("completed", 2)]),
+        ]
+        filters = production_data_query_service.build_today_filters(
+            stat_mode="main_order",
+            product_ids=None,
+            stage_ids=None,
+            process_ids=None,
+            operator_user_ids=None,
+            order_status=None,
+        )
+
+        payload = production_data_query_service.get_today_realtime_data(
+            db,
+            filters=filters,
+        )
+
+        self.assertEqual(payload["summary"]["total_quantity"], 1800)
+        self.assertEqual(payload["overview"]["finished_quantity"], 1800)
+        self.assertEqual(payload["overview"]["in_progress_count"], 3)
+        self.assertEqual(payload["overview"]["completed_count"], 2)
+        self.assertEqual(
+            [item["label"] for item in payload["chart_data"]], ["产品B", "产品A"]
+        )
+        product_sql = _compiled_sql(db.execute.call_args_list[0].args[0])
+        self.assertIn("GROUP BY", product_sql)
+        self.assertIn("max(mes_order_process_1.process_order)", product_sql)
+        self.assertNotIn("LIMIT", product_sql)
+
+    def test_manual_totals_use_single_filtered_aggregate(self) -> None:
+        db = MagicMock()
+        db.execute.side_effect = [
+            _FakeResult([]),
+            _FakeResult([]),
+            _FakeResult([(40, 160)]),
+        ]
+        filters = production_data_query_service.build_manual_filters(
+            stat_mode="sub_order",
+            start_date=date(2026, 10, 1),
+            end_date=date(2026, 10, 3),
+            product_ids=[1],
+            stage_ids=None,
+            process_ids=None,
+            operator_user_ids=[5],
+            order_status=None,
+        )
+
+        payload = production_data_query_service.get_manual_production_data(
+            db,
+            filters=filters,
+        )
+
+        self.assertEqual(payload["summary"]["filtered_total"], 40)
+        self.assertEqual(payload["summary"]["time_range_total"], 160)
+        self.assertEqual(payload["summary"]["ratio_percent"], 25.0)
+        self.assertEqual(
+            payload["chart_data"]["pie_output"][1],
+            {"name": "其余产量", "quantity": 120},
+        )
+        self.assertEqual(len(payload["chart_data"]["trend_output"]), 3)
+        totals_sql = _compiled_sql(db.execute.call_args_list[2].args[0])
+        self.assertIn("FILTER (WHERE", totals_sql)
+        self.assertNotIn("GROUP BY", totals_sql)
+
+    def test_manual_trend_merges_hour_buckets_into_local_days(self) -> None:
+        first_hour = datetime(2026, 10, 2, 1, 0).astimezone()
+        second_hour = datetime(2026, 10, 2, 9, 0).astimezone()
+
+        chart_data = production_data_query_service._build_manual_chart_data(
+            [{"product_name": "产品A", "quantity": 12}],
+            trend_buckets=[(first_hour, 5), (second_hour, 7)],
+            start_date=date(2026, 10, 1),
+            end_date=date(2026, 10, 3),
+        )
+
+        self.assertEqual(
+            chart_data["trend_output"],
+            [
+                {"bucket": "2026-10-01", "quantity": 0},
+                {"bucket": "2026-10-02", "quantity": 12},
+                {"bucket": "2026-10-03", "quantity": 0},
+            ],
+        )
+
+
+def _reference_manual_data(db: Session, filters) -> dict:
+    """改写前的 Python 口径：逐条读记录后在内存中过滤、分组、按本地小时/日分桶"""
+    start_at = datetime.combine(filters.start_date, datetime.min.time())
+    end_at = datetime.combine(filters.end_date, datetime.max.time())
+    records = [
+        record
+        for record in db.query(ProductionRecord).order_by(ProductionRecord.id).all()
+        if record.record_type == "production" and start_at <= record.created_at <= end_at
+    ]
+    last_process_order: dict[int, int] = {}
+    for process in db.query(ProductionOrderProcess).all():
+        last_process_order[process.order_id] = max(
+            last_process_order.get(process.order_id, 0), process.process_order
+        )
+
+    def _matches(record, *, narrow: bool) -> bool:
+        order, process = record.order, record.order_process
+        if filters.order_status and order.status != filters.order_status:
+            return False
+        if narrow:
+            if filters.product_ids and order.product_id not in filters.product_ids:
+                return False
+            if filters.process_ids and process.process_id not in filters.process_ids:
+                return False
+            if (
+                filters.operator_user_ids
+                and record.operator_user_id not in filters.operator_user_ids
+            ):
+                return False
+        if filters.stat_mode == "main_order":
+            return process.process_order == last_process_order.get(order.id)
+        return True
+
+    def _group(narrow: bool) -> dict:
+        grouped: dict = {}
+        for record in records:
+            if not _matches(record, narrow=narrow):
+                continue
+            if filters.stat_mode == "main_order":
+                key = (record.order.order_code, record.order_process.process_code, "")
+            else:
+                key = (
+                    record.order.order_code,
+                    record.order_process.process_code,
+                    record.operator.username,
+                )
+            grouped[key] = grouped.get(key, 0) + record.production_quantity
+        return grouped
+
+    filtered = [record for record in records if _matches(record, narrow=True)]
+    if filters.start_date == filters.end_date:
+        trend = {f"{hour:02d}:00": 0 for hour in range(24)}
+        for record in filtered:
+            trend[f"{record.created_at.hour:02d}:00"] += record.production_quantity
+    else:
+        trend = {}
+        cursor = filters.start_date
+        while cursor <= filters.end_date:
+            trend[cursor.strftime("%Y-%m-%d")] = 0
+            cursor += timedelta(days=1)
+        for record in filtered:
+            trend[record.created_at.strftime("%Y-%m-%d")] += record.production_quantity
+    rows = _group(narrow=True)
+    return {
+        "rows": rows,
+        "filtered_total": sum(rows.values()),
+        "time_range_total": sum(_group(narrow=False).values()),
+        "trend": trend,
+    }
+
+
+class ManualProductionDataSqliteUnitTest(unittest.TestCase):
+    """在真实（SQLite）数据上对比 SQL 聚合与改写前的 Python 聚合结果"""
+
+    def setUp(self) -> None:
+        self.engine = create_engine("sqlite://")
+        # mes_process_stage 与 mes_process 的索引在 SQLite 下同名，本用例用不到工段表
+        Base.metadata.create_all(
+            self.engine,
+            tables=[
+                table
+                for table in Base.metadata.sorted_tables
+                if table.name != "mes_process_stage"
+            ],
+        )
+        self.db = Session(self.engine)
+        self.day = date(2026, 10, 14)
+        self._seed()
+
+    def tearDown(self) -> None:
+        self.db.close()
+        self.engine.dispose()
+
+    def _seed(self) -> None:
+        products = [Product(name="产品A"), Product(name="产品B")]
+        processes = [Process(code="GX-01", name="下料"), Process(code="GX-02", name="装配")]
+        users = [User(username="worker_a", password_hash="x"), User(username="worker_b", password_hash="x")]
+        self.db.add_all([*products, *processes, *users])
+        self.db.flush()
+        self.user_ids = [user.id for user in users]
+        self.product_ids = [product.id for product in products]
+        orders = [
+            ProductionOrder(order_code="MO-1", product_id=products[0].id, quantity=50, status="in_progress"),
+            ProductionOrder(order_code="MO-2", product_id=products[1].id, quantity=30, status="completed"),
+        ]
+        self.db.add_all(orders)
+        self.db.flush()
+        order_processes = []
+        for order, count in ((orders[0], 2), (orders[1], 1)):
+            for index in range(count):
+                order_processes.append(
+                    ProductionOrderProcess(
+                        order_id=order.id,
+                        process_id=processes[index].id,
+                        process_code=processes[index].code,
+                        process_name=processes[index].name,
+                        process_order=index + 1,
+                    )
+                )
+        self.db.add_all(order_processes)
+        self.db.flush()
+        samples = [
+            # (订单工序下标, 操作员下标, 日偏移, 小时, 数量, 记录类型)
+            (0, 0, 0, 8, 5, "production"),
+            (1, 0, 0, 9, 4, "production"),
+            (1, 1, 0, 9, 3, "production"),
+            (1, 1, 1, 14, 6, "production"),
+            (2, 1, 1, 23, 7, "production"),
+            (2, 0, 2, 0, 2, "production"),
+            (1, 0, 1, 10, 9, "repair"),
+            (1, 0, 5, 10, 11, "production"),
+        ]
+        for process_index, user_index, offset, hour, quantity, record_type in samples:
+            process = order_processes[process_index]
+            self.db.add(
+                ProductionRecord(
+                    order_id=process.order_id,
+                    order_process_id=process.id,
+                    operator_user_id=self.user_ids[user_index],
+                    production_quantity=quantity,
+                    record_type=record_type,
+                    created_at=datetime.combine(
+                        self.day + timedelta(days=offset), datetime.min.time()
+                    ).replace(hour=hour, minute=15),
+                )
+            )
+        self.db.commit()
+
+    def _assert_matches_reference(self, **overrides) -> None:
+        params = {
+            "stat_mode": "sub_order",
+            "start_date": self.day,
+            "end_date": self.day + timedelta(days=2),
+            "product_ids": None,
+            "stage_ids": None,
+            "process_ids": None,
+            "operator_user_ids": None,
+            "order_status": None,
+        }
+        params.update(overrides)
+        filters = production_data_query_service.build_manual_filters(**params)
+
+        payload = production_data_query_service.get_manual_production_data(
+            self.db, filters=filters
+        )
+        expected = _reference_manual_data(self.db, filters)
+
+        main_mode = filters.stat_mode == "main_order"
+        actual_rows = {
+            (
+                row["order_code"],
+                row["process_code"],
+                "" if main_mode else row["operator_username"],
+            ): row["quantity"]
+            for row in payload["table_rows"]
+        }
+        self.assertEqual(actual_rows, expected["rows"])
+        self.assertEqual(payload["summary"]["filtered_total"], expected["filtered_total"])
+        self.assertEqual(payload["summary"]["time_range_total"], expected["time_range_total"])
+        self.assertEqual(
+            {item["bucket"]: item["quantity"] for item in payload["chart_data"]["trend_output"]},
+            expected["trend"],
+        )
+
+    def test_sub_order_mode_matches_python_aggregation(self) -> None:
+        self._assert_matches_reference()
+        self._assert_matches_reference(operator_user_ids=[self.user_ids[1]])
+        self._assert_matches_reference(product_ids=[self.product_ids[0]], order_status="in_progress")
+
+    def test_main_order_mode_matches_python_aggregation(self) -> None:
+        self._assert_matches_reference(stat_mode="main_order")
+        self._assert_matches_reference(stat_mode="main_order", order_status="completed")
+
+    def test_single_day_hour_buckets_match_python_aggregation(self) -> None:
+        self._assert_matches_reference(end_date=self.day)
+        self._assert_matches_reference(
+            start_date=self.day + timedelta(days=1),
+            end_date=self.day + timedelta(days=1),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,202 @@
+import sys
+import unittest
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from app.core.production_constants import (
+    PROCESS_STATUS_IN_PROGRESS,
+    REPAIR_STATUS_IN_REPAIR,
+    SUB_ORDER_STATUS_IN_PROGRESS,
+    SUB_ORDER_STATUS_PENDING,
+)
+from app.db.base import Base
+from app.models.first_article_record import FirstArticleRecord
+from app.models.order_sub_order_pipeline_instance import ProcessPipelineInstance
+from app.models.process import Process
+from app.models.product import Product
+from app.models.production_order import ProductionOrder
+from app.models.production_order_process import ProductionOrderProcess
+from app.models.production_sub_order import ProductionSubOrder
+from app.models.repair_order import RepairOrder
+from app.models.role import Role
+from app.models.user import User
+from app.services import production_order_service
+
+
+class ProductionMyOrdersQueryCountUnitTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine("sqlite://")
+        # mes_process_stage 与 mes_process 的索引在 SQLite 下同名，本用例用不到工段表
+        Base.metadata.create_all(
+            self.engine,
+            tables=[
+                table
+                for table in Base.metadata.sorted_tables
+                if table.name != "mes_process_stage"
+            ],
+        )
+        self.statement_count = 0
+        event.listen(self.engine, "before_cursor_execute", self._count_statement)
+        self.db = Session(self.engine)
+        self.process = Process(
+            code="P01",
+            name="装配",
+            allow_multi_device_production=True,
+        )
+        self.user = User(username="operator01", password_hash="x")
+        self.user.roles.append(Role(code="operator", name="操作员"))
+        self.user.processes.append(self.process)
+        self.helper = User(username="operator02", password_hash="x")
+        self.product = Product(name="产品A")
+        self.db.add_all([self.process, self.user, self.helper, self.product])
+        self.db.flush()
+        self._order_seq = 0
+
+    def tearDown(self) -> None:
+        self.db.close()
+        self.engine.dispose()
+
+    def _count_statement(self, *args) -> None:
+        self.statement_count += 1
+
+    def _add_orders(self, count: int) -> None:
+        now = datetime.now(UTC)
+        for _ in range(count):
+            self._order_seq += 1
+            seq = self._order_seq
+            order = ProductionOrder(
+                order_code=f"MO-{seq:04d}",
+                product_id=self.product.id,
+                quantity=10,
+                status="in_progress",
+                due_date=date(2026, 12, 31),
+                pipeline_enabled=seq % 2 == 0,
+                pipeline_process_codes="P01" if seq % 2 == 0 else "",
+            )
+            self.db.add(order)
+            self.db.flush()
+            process_row = ProductionOrderProcess(
+                order_id=order.id,
+                process_id=self.process.id,
+                process_code="P01",
+                process_name="装配",
+                process_order=1,
+                status=PROCESS_STATUS_IN_PROGRESS,
+                visible_quantity=10,
+                completed_quantity=seq % 3,
+            )
+            self.db.add(process_row)
+            self.db.flush()
+            in_progress = seq % 2 == 1
+            sub_order = ProductionSubOrder(
+                order_process_id=process_row.id,
+                operator_user_id=self.user.id,
+                status=SUB_ORDER_STATUS_IN_PROGRESS if in_progress else SUB_ORDER_STATUS_PENDING,
+            )
+            self.db.add_all(
+                [
+                    sub_order,
+                    ProductionSubOrder(
+                        order_process_id=process_row.id,
+                        operator_user_id=self.helper.id,
+                        status=SUB_ORDER_STATUS_IN_PROGRESS,
+                    ),
+                ]
+            )
+            self.db.flush()
+            if in_progress:
+                self.db.add(
+                    FirstArticleRecord(
+                        order_id=order.id,
+                        order_process_id=process_row.id,
+                        operator_user_id=self.user.id,
+                        sub_order_id=sub_order.id,
+                        verification_date=now.date(),
+                        verification_code="000000",
+                        result="passed",
+                        created_at=now - timedelta(hours=1),
+                    )
+                )
+            else:
+                self.db.add(
+                    ProcessPipelineInstance(
+                        sub_order_id=sub_order.id,
+                        order_id=order.id,
+                        order_process_id=process_row.id,
+                        process_code="P01",
+                        pipeline_seq=1,
+                        pipeline_instance_no=f"P{order.id}-1-1",
+                        is_active=True,
+                    )
+                )
+            self.db.add(
+                RepairOrder(
+                    repair_order_code=f"RO-{seq:04d}",
+                    source_order_id=order.id,
+                    source_order_process_id=process_row.id,
+                    source_process_code="P01",
+                    source_process_name="装配",
+                    sender_user_id=self.user.id,
+                    repair_quantity=1,
+                    repair_time=now,
+                    status=REPAIR_STATUS_IN_REPAIR,
+                )
+            )
+        self.db.commit()
+
+    def _list_page(self) -> tuple[int, list[dict[str, object]], int]:
+        self.db.expire_all()
+        self.statement_count = 0
+        with patch.object(production_order_service, "has_permission", return_value=False):
+            total, items = production_order_service.list_my_orders(
+                self.db,
+                current_user=self.user,
+                keyword=None,
+                page=1,
+                page_size=50,
+            )
+        return total, items, self.statement_count
+
+    def test_query_count_does_not_grow_with_rows(self) -> None:
+        self._add_orders(2)
+        small_total, _, small_count = self._list_page()
+        self._add_orders(8)
+        large_total, large_items, large_count = self._list_page()
+
+        self.assertEqual(small_total, 2)
+        self.assertEqual(large_total, 10)
+        self.assertEqual(large_count, small_count)
+        self.assertLessEqual(large_count, 16)
+        self.assertTrue(all(item["pipeline_instance_id"] for item in large_items if item["pipeline_mode_enabled"]))
+
+    def test_batched_items_match_single_row_builder(self) -> None:
+        self._add_orders(4)
+        _, items, _ = self._list_page()
+
+        with patch.object(production_order_service, "has_permission", return_value=False):
+            for item in items:
+                process_row = self.db.get(ProductionOrderProcess, item["current_process_id"])
+                sub_order = self.db.get(ProductionSubOrder, item["user_sub_order_id"])
+                expected = production_order_service._build_my_order_item(
+                    self.db,
+                    order=process_row.order,
+                    process_row=process_row,
+                    sub_order=sub_order,
+                    is_operator_context=True,
+                    runtime_operator_user_id=self.user.id,
+                    runtime_operator_username=self.user.username,
+                )
+                self.assertEqual(item, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
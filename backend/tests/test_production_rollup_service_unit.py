@@ -0,0 +1,201 @@
+import sys
+import unittest
+from datetime import UTC, date, datetime
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from sqlalchemy.dialects import postgresql
+
+from app.services import production_data_query_service, production_rollup_service
+
+
+def _compiled_sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+class _FakeRow:
+    def __init__(self, **values):
+        self._mapping = values
+
+
+class _FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+    def one(self):
+        return self._rows[0]
+
+
+def _rollup_row(**overrides):
+    values = {
+        "stat_date": date(2026, 10, 16),
+        "stat_mode": "sub_order",
+        "product_id": 1,
+        "stage_id": 0,
+        "process_id": 3,
+        "operator_user_id": 7,
+        "production_quantity": 0,
+        "production_record_count": 0,
+        "last_production_at": None,
+    }
+    values.update(overrides)
+    return _FakeRow(**values)
+
+
+class ProductionRollupServiceUnitTest(unittest.TestCase):
+    def test_production_records_upsert_both_stat_modes(self) -> None:
+        db = MagicMock()
+
+        production_rollup_service.add_production_records_to_rollup(
+            db,
+            record_ids=[11, 11, 12],
+        )
+
+        self.assertEqual(db.execute.call_count, 2)
+        main_sql, sub_sql = (
+            _compiled_sql(call.args[0]) for call in db.execute.call_args_list
+        )
+        for sql in (main_sql, sub_sql):
+            self.assertIn("INSERT INTO mes_production_daily_rollup", sql)
+            self.assertIn(
+                "ON CONFLICT ON CONSTRAINT uq_mes_production_daily_rollup_key", sql
+            )
+            self.assertIn("CAST(mes_production_record.created_at AS DATE)", sql)
+        self.assertIn("max(mes_order_process_1.process_order)", main_sql)
+        self.assertNotIn("max(mes_order_process_1.process_order)", sub_sql)
+
+    def test_empty_record_ids_skip_upsert(self) -> None:
+        db = MagicMock()
+
+        production_rollup_service.add_production_records_to_rollup(db, record_ids=[])
+
+        db.execute.assert_not_called()
+
+    def test_check_reports_keys_whose_rollup_drifted(self) -> None:
+        produced_at = datetime(2026, 10, 16, 2, 0, tzinfo=UTC)
+        source_row = _rollup_row(
+            production_quantity=30,
+            production_record_count=3,
+            last_production_at=produced_at,
+        )
+        rollup_row = _rollup_row(
+            production_quantity=28,
+            production_record_count=3,
+            last_production_at=produced_at,
+        )
+        db = MagicMock()
+        db.execute.side_effect = [
+            _FakeResult([]),
+            _FakeResult([source_row]),
+            _FakeResult([rollup_row]),
+        ]
+
+        mismatches = production_rollup_service.check_production_daily_rollup(
+            db,
+            start_date=date(2026, 10, 16),
+            end_date=date(2026, 10, 16),
+        )
+
+        self.assertEqual(len(mismatches), 1)
+        self.assertEqual(mismatches[0].key["process_id"], 3)
+        self.assertEqual(mismatches[0].expected["production_quantity"], 30)
+        self.assertEqual(mismatches[0].actual["production_quantity"], 28)
+
+    def test_rebuild_rejects_inverted_range(self) -> None:
+        with self.assertRaises(ValueError):
+            production_rollup_service.rebuild_production_daily_rollup(
+                MagicMock(),
+                start_date=date(2026, 10, 2),
+                end_date=date(2026, 10, 1),
+            )
+
+    def test_manual_totals_and_trend_read_rollup_when_enabled(self) -> None:
+        db = MagicMock()
+        db.execute.side_effect = [
+            _FakeResult([(date(2026, 10, 2), 12)]),
+            _FakeResult([(40, 160)]),
+        ]
+        filters = production_data_query_service.build_manual_filters(
+            stat_mode="main_order",
+            start_date=date(2026, 10, 1),
+            end_date=date(2026, 10, 3),
+            product_ids=[1],
+            stage_ids=None,
+            process_ids=None,
+            operator_user_ids=None,
+            order_status=None,
+        )
+
+        with patch.object(
+            production_data_query_service.settings,
+            "production_rollup_read_enabled",
+            True,
+        ):
+            trend = production_data_query_service._load_manual_trend_buckets(
+                db, filters=filters
+            )
+            totals = production_data_query_service._load_manual_totals(
+                db, filters=filters
+            )
+
+        self.assertEqual(totals, (40, 160))
+        self.assertEqual(trend[0][0].date(), date(2026, 10, 2))
+        for call in db.execute.call_args_list:
+            sql = _compiled_sql(call.args[0])
+            self.assertIn("FROM mes_production_daily_rollup", sql)
+            self.assertNotIn("mes_production_record", sql)
+
+    def test_today_product_rows_read_rollup_when_enabled(self) -> None:
+        db = MagicMock()
+        db.execute.return_value = _FakeResult([])
+        filters = production_data_query_service.build_today_filters(
+            stat_mode="sub_order",
+            product_ids=None,
+            stage_ids=None,
+            process_ids=[3],
+            operator_user_ids=None,
+            order_status=None,
+        )
+
+        with patch.object(
+            production_data_query_service.settings,
+            "production_rollup_read_enabled",
+            True,
+        ):
+            production_data_query_service._load_today_product_rows(db, filters=filters)
+
+        sql = _compiled_sql(db.execute.call_args.args[0])
+        self.assertIn("FROM mes_production_daily_rollup", sql)
+        self.assertIn("max(mes_production_daily_rollup.last_production_at)", sql)
+        self.assertNotIn("mes_production_record", sql)
+
+    def test_order_status_filter_keeps_reading_records(self) -> None:
+        filters = production_data_query_service.build_manual_filters(
+            stat_mode="sub_order",
+            start_date=date(2026, 10, 1),
+            end_date=date(2026, 10, 3),
+            product_ids=None,
+            stage_ids=None,
+            process_ids=None,
+            operator_user_ids=None,
+            order_status="completed",
+        )
+
+        with patch.object(
+            production_data_query_service.settings,
+            "production_rollup_read_enabled",
+            True,
+        ):
+            self.assertFalse(production_data_query_service._rollup_readable(filters))
+
+
+if __name__ == "__main__":
+    unittest.main()
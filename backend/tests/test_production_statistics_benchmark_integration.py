@@ -0,0 +1,95 @@
+"""生产统计聚合的规模化耗时基准。
+
+默认跳过；设置 ``MES_PERF_BENCHMARK=1`` 后在 PostgreSQL 上按规模灌入样本并断言耗时预算：
+- ``MES_PERF_STATS_RECORDS``：生产记录条数，默认 1000000；
+- ``MES_PERF_STATS_BUDGET_MS``：单次统计查询的耗时上限（毫秒），默认 2000；
+- ``MES_PERF_STATS_ROUNDS``：每个接口的测量轮数，取中位数，默认 5。
+"""
+
+import os
+import statistics
+import sys
+import time
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.db.session import SessionLocal  # noqa: E402
+from app.services import production_statistics_service  # noqa: E402
+from app.services.bootstrap_seed_service import seed_initial_data  # noqa: E402
+from app.services.perf_sample_seed_service import (  # noqa: E402
+    reset_production_statistics_samples,
+    seed_production_statistics_samples,
+)
+
+
+BENCHMARK_ENABLED = os.getenv("MES_PERF_BENCHMARK") == "1"
+RECORD_COUNT = int(os.getenv("MES_PERF_STATS_RECORDS", "1000000"))
+BUDGET_MS = float(os.getenv("MES_PERF_STATS_BUDGET_MS", "2000"))
+ROUNDS = max(1, int(os.getenv("MES_PERF_STATS_ROUNDS", "5")))
+RUN_ID = "bench"
+
+
+@unittest.skipUnless(BENCHMARK_ENABLED, "设置 MES_PERF_BENCHMARK=1 后运行生产统计基准")
+class ProductionStatisticsBenchmarkIntegrationTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.db = SessionLocal()
+        seed_initial_data(
+            self.db,
+            admin_username="admin",
+            admin_password="Admin@123456",
+        )
+        self.seed_result = seed_production_statistics_samples(
+            self.db,
+            run_id=RUN_ID,
+            record_count=RECORD_COUNT,
+        )
+
+    def tearDown(self) -> None:
+        try:
+            reset_production_statistics_samples(self.db, run_id=RUN_ID)
+        finally:
+            self.db.close()
+
+    def _median_elapsed_ms(self, func, **kwargs) -> float:
+        func(self.db, **kwargs)  # 预热，排除首次计划缓存与连接开销
+        samples = []
+        for _ in range(ROUNDS):
+            started = time.perf_counter()
+            func(self.db, **kwargs)
+            samples.append((time.perf_counter() - started) * 1000)
+        return statistics.median(samples)
+
+    def test_statistics_stay_within_latency_budget(self) -> None:
+        self.assertGreaterEqual(self.seed_result.record_count, RECORD_COUNT)
+        today = date.today()
+        windows = {
+            "all": {},
+            "last_30_days": {
+                "start_date": today - timedelta(days=29),
+                "end_date": today,
+            },
+        }
+        for name, func in (
+            ("overview", production_statistics_service.get_overview_stats),
+            ("processes", production_statistics_service.get_process_stats),
+            ("operators", production_statistics_service.get_operator_stats),
+        ):
+            for window_name, kwargs in windows.items():
+                with self.subTest(stat=name, window=window_name):
+                    elapsed_ms = self._median_elapsed_ms(func, **kwargs)
+                    self.assertLessEqual(
+                        elapsed_ms,
+                        BUDGET_MS,
+                        f"{name}/{window_name} 中位耗时 {elapsed_ms:.1f}ms 超出预算 "
+                        f"{BUDGET_MS:.0f}ms（records={self.seed_result.record_count}）",
+                    )
+
+
+if __name__ == "__main__":
+    unittest.main()
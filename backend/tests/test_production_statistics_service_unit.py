@@ -0,0 +1,112 @@
+import sys
+import unittest
+from datetime import UTC, date, datetime
+from pathlib import Path
+from unittest.mock import MagicMock
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from sqlalchemy.dialects import postgresql
+
+from app.services import production_statistics_service
+
+
+def _compiled_sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+class _FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+    def one(self):
+        return self._rows[0]
+
+
+class ProductionStatisticsServiceUnitTest(unittest.TestCase):
+    def test_overview_stats_use_single_filtered_aggregate(self) -> None:
+        db = MagicMock()
+        db.execute.return_value = _FakeResult([(10, 3, 4, 3, 1000, 620)])
+
+        payload = production_statistics_service.get_overview_stats(
+            db,
+            start_date=date(2026, 10, 1),
+            end_date=date(2026, 10, 17),
+        )
+
+        self.assertEqual(
+            payload,
+            {
+                "total_orders": 10,
+                "pending_orders": 3,
+                "in_progress_orders": 4,
+                "completed_orders": 3,
+                "total_quantity": 1000,
+                "finished_quantity": 620,
+            },
+        )
+        self.assertEqual(db.execute.call_count, 1)
+        statement = db.execute.call_args.args[0]
+        sql = _compiled_sql(statement)
+        self.assertEqual(sql.count("FILTER (WHERE"), 3)
+        self.assertIn("mes_order.created_at >=", sql)
+        self.assertIn("mes_order.created_at <", sql)
+        params = statement.compile(dialect=postgresql.dialect()).params
+        self.assertIn(date(2026, 10, 18), params.values())
+
+    def test_process_stats_group_by_process_code_in_one_query(self) -> None:
+        db = MagicMock()
+        db.execute.return_value = _FakeResult(
+            [("P01", "切割", 5, 1, 1, 2, 1, 500, 260)]
+        )
+
+        rows = production_statistics_service.get_process_stats(db)
+
+        self.assertEqual(rows[0]["process_code"], "P01")
+        self.assertEqual(rows[0]["partial_orders"], 2)
+        self.assertEqual(rows[0]["total_completed_quantity"], 260)
+        sql = _compiled_sql(db.execute.call_args.args[0])
+        self.assertEqual(sql.count("FILTER (WHERE"), 4)
+        self.assertIn("GROUP BY mes_order_process.process_code", sql)
+        self.assertNotIn("WHERE mes_order_process.created_at", sql)
+
+    def test_operator_stats_aggregate_in_sql_with_date_window(self) -> None:
+        latest = datetime(2026, 10, 17, 9, 0, tzinfo=UTC)
+        db = MagicMock()
+        db.execute.return_value = _FakeResult(
+            [(7, "op7", "P01", "切割", 12, 48, latest)]
+        )
+
+        rows = production_statistics_service.get_operator_stats(
+            db,
+            start_date=date(2026, 10, 17),
+        )
+
+        self.assertEqual(
+            rows,
+            [
+                {
+                    "operator_user_id": 7,
+                    "operator_username": "op7",
+                    "process_code": "P01",
+                    "process_name": "切割",
+                    "production_records": 12,
+                    "production_quantity": 48,
+                    "last_production_at": latest,
+                }
+            ],
+        )
+        sql = _compiled_sql(db.execute.call_args.args[0])
+        self.assertIn("GROUP BY mes_production_record.operator_user_id", sql)
+        self.assertIn("mes_production_record.created_at >=", sql)
+        self.assertNotIn("mes_production_record.created_at <", sql)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,254 @@
+import sys
+import unittest
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.models.first_article_record import FirstArticleRecord
+from app.models.process import Process
+from app.models.product import Product
+from app.models.production_order import ProductionOrder
+from app.models.production_order_process import ProductionOrderProcess
+from app.models.repair_cause import RepairCause
+from app.models.repair_defect_phenomenon import RepairDefectPhenomenon
+from app.models.repair_order import RepairOrder
+from app.models.user import User
+from app.services import quality_service
+
+
+class QualityGroupedStatsUnitTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine("sqlite://")
+        # mes_process_stage 与 mes_process 的索引在 SQLite 下同名，本用例用不到工段表
+        Base.metadata.create_all(
+            self.engine,
+            tables=[
+                table
+                for table in Base.metadata.sorted_tables
+                if table.name != "mes_process_stage"
+            ],
+        )
+        self.statements: list[str] = []
+        event.listen(self.engine, "before_cursor_execute", self._record_statement)
+        self.db = Session(self.engine)
+        quality_service._invalidate_quality_stats_cache()
+        self.day = date(2026, 3, 2)
+        self._seed()
+
+    def tearDown(self) -> None:
+        quality_service._invalidate_quality_stats_cache()
+        self.db.close()
+        self.engine.dispose()
+
+    def _record_statement(self, _conn, _cursor, statement, *_args) -> None:
+        self.statements.append(statement)
+
+    def _seed(self) -> None:
+        product = Product(name="产品A")
+        process = Process(code="GX-01", name="检验")
+        self.worker = User(username="quality_worker", password_hash="x")
+        self.helper = User(username="helper", password_hash="x")
+        self.db.add_all([product, process, self.worker, self.helper])
+        self.db.flush()
+        order = ProductionOrder(order_code="MO-1", product_id=product.id, quantity=10)
+        self.db.add(order)
+        self.db.flush()
+        process_rows = []
+        for index, (code, name) in enumerate([("GX-01", "检验"), ("GX-02", "包装")], start=1):
+            process_rows.append(
+                ProductionOrderProcess(
+                    order_id=order.id,
+                    process_id=process.id,
+                    process_code=code,
+                    process_name=name,
+                    process_order=index,
+                )
+            )
+        self.db.add_all(process_rows)
+        self.db.flush()
+
+        # 第 1 天 3 条（2 通过 1 不通过），第 3 天 1 条，另有 1 条已撤销（首件汇总不计入）
+        samples = [
+            (0, process_rows[0], self.worker, "passed", False),
+            (0, process_rows[0], self.helper, "failed", False),
+            (0, process_rows[1], self.worker, "passed", False),
+            (2, process_rows[1], self.helper, "passed", False),
+            (2, process_rows[1], self.helper, "passed", True),
+        ]
+        for offset, process_row, operator, result, cancelled in samples:
+            created_at = datetime.combine(
+                self.day + timedelta(days=offset), datetime.min.time()
+            ) + timedelta(hours=9)
+            self.db.add(
+                FirstArticleRecord(
+                    order_id=order.id,
+                    order_process_id=process_row.id,
+                    operator_user_id=operator.id,
+                    verification_date=created_at.date(),
+                    verification_code="000000",
+                    result=result,
+                    is_cancelled=cancelled,
+                    created_at=created_at,
+                )
+            )
+
+        repair = RepairOrder(
+            repair_order_code="RO-1",
+            source_order_id=order.id,
+            source_process_code="GX-01",
+            source_process_name="检验",
+            repair_quantity=3,
+            repair_time=datetime.combine(self.day, datetime.min.time()),
+        )
+        self.db.add(repair)
+        self.db.flush()
+        for offset, phenomenon, quantity, operator in [
+            (0, "划伤", 2, self.worker),
+            (0, "变形", 1, self.helper),
+            (1, "划伤", 3, self.helper),
+        ]:
+            self.db.add(
+                RepairDefectPhenomenon(
+                    repair_order_id=repair.id,
+                    product_id=product.id,
+                    product_name=product.name,
+                    process_code="GX-01",
+                    process_name="检验",
+                    phenomenon=phenomenon,
+                    quantity=quantity,
+                    operator_user_id=operator.id,
+                    operator_username=operator.username,
+                    production_time=datetime.combine(
+                        self.day + timedelta(days=offset), datetime.min.time()
+                    )
+                    + timedelta(hours=10),
+                )
+            )
+        self.db.add_all(
+            [
+                RepairCause(repair_order_id=repair.id, reason="来料不良", quantity=4),
+                RepairCause(repair_order_id=repair.id, reason=" 来料不良 ", quantity=1),
+                RepairCause(repair_order_id=repair.id, reason="操作失误", quantity=2),
+            ]
+        )
+        self.db.commit()
+
+    def test_first_article_aggregates_feed_overview_and_breakdowns(self) -> None:
+        kwargs = {"start_date": self.day, "end_date": self.day + timedelta(days=2)}
+        overview = quality_service.get_quality_overview(self.db, **kwargs)
+        process_items = quality_service.get_quality_process_stats(self.db, **kwargs)
+        operator_items = quality_service.get_quality_operator_stats(self.db, **kwargs)
+
+        self.assertEqual(
+            (overview["first_article_total"], overview["passed_total"], overview["failed_total"]),
+            (4, 3, 1),
+        )
+        self.assertEqual(overview["latest_first_article_at"], datetime(2026, 3, 4, 9, 0))
+        by_code = {item["process_code"]: item for item in process_items}
+        self.assertEqual(by_code["GX-01"]["first_article_total"], 2)
+        self.assertEqual(by_code["GX-02"]["passed_total"], 2)
+        self.assertEqual(by_code["GX-02"]["process_name"], "包装")
+        by_operator = {item["operator_username"]: item for item in operator_items}
+        self.assertEqual(by_operator["quality_worker"]["first_article_total"], 2)
+        self.assertEqual(by_operator["helper"]["failed_total"], 1)
+
+    def test_trend_groups_by_day_and_fills_gaps(self) -> None:
+        items = quality_service.get_quality_trend(
+            self.db,
+            start_date=self.day,
+            end_date=self.day + timedelta(days=2),
+        )
+
+        self.assertEqual(
+            [item["stat_date"] for item in items],
+            [self.day + timedelta(days=n) for n in range(3)],
+        )
+        # 趋势沿用原口径，不排除已撤销的首件
+        self.assertEqual([item["first_article_total"] for item in items], [3, 0, 2])
+        self.assertEqual([item["failed_total"] for item in items], [1, 0, 0])
+        self.assertEqual([item["defect_total"] for item in items], [3, 3, 0])
+        self.assertEqual(items[0]["pass_rate_percent"], 66.67)
+        first_article_selects = [
+            statement
+            for statement in self.statements
+            if "FROM mes_first_article_record" in statement
+        ]
+        self.assertTrue(all("GROUP BY" in statement for statement in first_article_selects))
+
+    def test_defect_analysis_returns_grouped_breakdowns(self) -> None:
+        result = quality_service.get_defect_analysis(
+            self.db,
+            start_date=self.day,
+            end_date=self.day + timedelta(days=2),
+        )
+
+        self.assertEqual(result.total_defect_quantity, 6)
+        self.assertEqual(
+            [(item.phenomenon, item.quantity) for item in result.top_defects],
+            [("划伤", 5), ("变形", 1)],
+        )
+        self.assertEqual(
+            [(item.reason, item.quantity) for item in result.top_reasons],
+            [("来料不良", 5), ("操作失误", 2)],
+        )
+        self.assertEqual(
+            [(item.operator_username, item.quantity) for item in result.by_operator],
+            [("helper", 4), ("quality_worker", 2)],
+        )
+        self.assertEqual(
+            [(item.stat_date, item.quantity) for item in result.by_date],
+            [(self.day, 3), (self.day + timedelta(days=1), 3)],
+        )
+        self.assertEqual([item.quantity for item in result.by_process], [6])
+
+    def test_postgresql_uses_single_grouping_sets_statement(self) -> None:
+        captured: list[str] = []
+
+        class _FakeDialect:
+            name = "postgresql"
+
+        class _FakeBind:
+            dialect = _FakeDialect()
+
+        class _FakeResult:
+            def all(self) -> list:
+                return []
+
+        class _FakeSession:
+            def get_bind(self):
+                return _FakeBind()
+
+            def execute(self, stmt):
+                captured.append(str(stmt.compile(dialect=postgresql.dialect())))
+                return _FakeResult()
+
+        grouped = quality_service._execute_grouping_sets(
+            _FakeSession(),
+            lambda *columns: select(*columns).select_from(RepairDefectPhenomenon),
+            grouping_sets={
+                "total": (),
+                "phenomenon": (RepairDefectPhenomenon.phenomenon.label("phenomenon"),),
+            },
+            measures=(),
+        )
+
+        self.assertEqual(grouped, {"total": [], "phenomenon": []})
+        self.assertEqual(len(captured), 1)
+        self.assertIn(
+            "GROUP BY GROUPING SETS((), (mes_repair_defect_phenomenon.phenomenon))",
+            captured[0],
+        )
+        self.assertIn("grouping(mes_repair_defect_phenomenon.phenomenon)", captured[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,6 @@
 import unittest
 from datetime import date, datetime
 from pathlib import Path
-from types import SimpleNamespace
 from unittest.mock import patch
 
 import sys
@@ -62,7 +61,10 @@ class QualityServiceStatsUnitTest(unittest.TestCase):
 
     def test_overview_uses_related_quality_scope_without_first_article(self) -> None:
         with (
-            patch("app.services.quality_service._load_first_article_rows", return_value=[]),
+            patch(
+                "app.services.quality_service._load_first_article_aggregates",
+                return_value=quality_service._EMPTY_FIRST_ARTICLE_AGGREGATES,
+            ),
             patch(
                 "app.services.quality_service._aggregate_quality_related_totals",
                 return_value=_build_related_totals(),
@@ -84,7 +86,10 @@ class QualityServiceStatsUnitTest(unittest.TestCase):
 
     def test_process_stats_keep_related_only_process_rows(self) -> None:
         with (
-            patch("app.services.quality_service._load_first_article_rows", return_value=[]),
+            patch(
+                "app.services.quality_service._load_first_article_aggregates",
+                return_value=quality_service._EMPTY_FIRST_ARTICLE_AGGREGATES,
+            ),
             patch(
                 "app.services.quality_service._aggregate_quality_related_totals",
                 return_value=_build_related_totals(),
@@ -105,16 +110,24 @@ class QualityServiceStatsUnitTest(unittest.TestCase):
         self.assertEqual(items[0]["repair_total"], 1)
 
     def test_operator_stats_merge_first_article_and_related_operator_meta(self) -> None:
-        rows = [
-            SimpleNamespace(
-                operator_user_id=9,
-                operator=SimpleNamespace(username="quality_worker"),
-                result="passed",
-                created_at=datetime(2026, 3, 2, 8, 0, 0),
-            )
-        ]
+        counts = quality_service._FirstArticleCounts(
+            total=1,
+            passed=1,
+            failed=0,
+            latest_at=datetime(2026, 3, 2, 8, 0, 0),
+        )
+        aggregates = quality_service._FirstArticleAggregates(
+            overall=counts,
+            order_ids=frozenset({101}),
+            by_process=(("GX-01", "检验", counts),),
+            by_operator=((9, "quality_worker", counts),),
+            by_product=(),
+        )
         with (
-            patch("app.services.quality_service._load_first_article_rows", return_value=rows),
+            patch(
+                "app.services.quality_service._load_first_article_aggregates",
+                return_value=aggregates,
+            ),
             patch(
                 "app.services.quality_service._aggregate_quality_related_totals",
                 return_value=_build_related_totals(),
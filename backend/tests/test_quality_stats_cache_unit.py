@@ -0,0 +1,177 @@
+import sys
+import unittest
+from datetime import date, datetime
+from pathlib import Path
+from types import MappingProxyType, SimpleNamespace
+from unittest.mock import patch
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.services import quality_service, quality_stats_cache_service
+
+
+class _FakePipeline:
+    def __init__(self, redis: "_FakeRedis") -> None:
+        self._redis = redis
+        self._keys: list[str] = []
+
+    def get(self, key: str) -> None:
+        self._keys.append(key)
+
+    def execute(self) -> list:
+        return [self._redis.store.get(key) for key in self._keys]
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.store: dict[str, str] = {}
+
+    def pipeline(self, transaction: bool = True) -> _FakePipeline:
+        return _FakePipeline(self)
+
+    def setex(self, key: str, _ttl: int, value: str) -> None:
+        self.store[key] = value
+
+    def set(self, key: str, value: str, px: int | None = None) -> None:
+        self.store[key] = value
+
+    def incr(self, key: str) -> int:
+        value = int(self.store.get(key, 0)) + 1
+        self.store[key] = str(value)
+        return value
+
+
+class QualityStatsCacheUnitTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.redis = _FakeRedis()
+        patcher = patch.object(
+            quality_stats_cache_service,
+            "_get_quality_stats_redis_client",
+            return_value=self.redis,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        quality_stats_cache_service.clear_local_quality_stats()
+        self.addCleanup(quality_stats_cache_service.clear_local_quality_stats)
+        self.loads = 0
+
+    def _loader(self):
+        self.loads += 1
+        return quality_stats_cache_service.freeze_value(
+            {
+                "scrap_by_product": {7: 3},
+                "covered_order_ids": {"all": {1, 2}},
+                "latest": datetime(2026, 3, 2, 9, 30),
+            }
+        )
+
+    def _get(self, db=None):
+        return quality_stats_cache_service.get_or_load_quality_stats(
+            "related_totals",
+            (date(2026, 3, 1), None, "kw"),
+            self._loader,
+            db=db,
+        )
+
+    def test_local_hit_shares_frozen_snapshot(self) -> None:
+        first = self._get()
+        second = self._get()
+
+        self.assertIs(first, second)
+        self.assertEqual(self.loads, 1)
+        self.assertIsInstance(first, MappingProxyType)
+        self.assertIsInstance(first["covered_order_ids"]["all"], frozenset)
+        with self.assertRaises(TypeError):
+            first["scrap_by_product"][7] = 0  # type: ignore[index]
+
+    def test_redis_payload_round_trips_for_other_workers(self) -> None:
+        first = self._get()
+        # 模拟另一个 worker：进程内为空，从 Redis 还原
+        quality_stats_cache_service.clear_local_quality_stats()
+        restored = self._get()
+
+        self.assertEqual(self.loads, 1)
+        self.assertIsNot(restored, first)
+        self.assertEqual(restored, first)
+        self.assertEqual(restored["scrap_by_product"][7], 3)
+        self.assertEqual(restored["latest"], datetime(2026, 3, 2, 9, 30))
+
+    def test_version_bump_invalidates_both_tiers(self) -> None:
+        self._get()
+        quality_stats_cache_service.bump_quality_stats_version()
+        self._get()
+
+        self.assertEqual(self.loads, 2)
+        self.assertEqual(self.redis.store["mes:quality_stats:version"], "1")
+
+    def test_replica_load_skips_redis_fill_within_lag_window(self) -> None:
+        replica_db = SimpleNamespace(info={"db_role": "replica"})
+        quality_stats_cache_service.bump_quality_stats_version()
+        self.assertIn("mes:quality_stats:bumped_at", self.redis.store)
+
+        self._get(db=replica_db)
+        payload_keys = [key for key in self.redis.store if key.startswith("mes:quality_stats:related")]
+        self.assertEqual(payload_keys, [])
+
+        # 复制延迟窗口过去（标记过期）后副本结果可以回填
+        del self.redis.store["mes:quality_stats:bumped_at"]
+        quality_stats_cache_service.clear_local_quality_stats()
+        self._get(db=replica_db)
+        payload_keys = [key for key in self.redis.store if key.startswith("mes:quality_stats:related")]
+        self.assertEqual(len(payload_keys), 1)
+        self.assertEqual(self.loads, 2)
+
+    def test_primary_load_fills_redis_right_after_bump(self) -> None:
+        quality_stats_cache_service.bump_quality_stats_version()
+        self._get(db=SimpleNamespace(info={}))
+        quality_stats_cache_service.clear_local_quality_stats()
+        self._get()
+
+        self.assertEqual(self.loads, 1)
+
+    def test_first_article_aggregates_payload_round_trip(self) -> None:
+        counts = quality_service._FirstArticleCounts(
+            total=3, passed=2, failed=1, latest_at=datetime(2026, 3, 2, 9, 0)
+        )
+        aggregates = quality_service._FirstArticleAggregates(
+            overall=counts,
+            order_ids=frozenset({5}),
+            by_process=(("gx-01", "检验", counts),),
+            by_operator=((9, "worker", counts),),
+            by_product=((None, "", counts),),
+        )
+        payload = quality_stats_cache_service._serialize_payload(
+            0, quality_service._first_article_aggregates_to_payload(aggregates)
+        )
+        hit, value = quality_stats_cache_service._deserialize_payload(payload, version=0)
+
+        self.assertTrue(hit)
+        self.assertEqual(
+            quality_service._first_article_aggregates_from_payload(value), aggregates
+        )
+        self.assertFalse(
+            quality_stats_cache_service._deserialize_payload(payload, version=1)[0]
+        )
+
+    def test_mark_changed_bumps_again_after_commit(self) -> None:
+        engine = create_engine("sqlite://")
+        self.addCleanup(engine.dispose)
+        db = Session(engine)
+        self.addCleanup(db.close)
+
+        quality_stats_cache_service.mark_quality_stats_changed(db)
+        quality_stats_cache_service.mark_quality_stats_changed(db)
+        self.assertEqual(self.redis.store["mes:quality_stats:version"], "2")
+        db.commit()
+
+        self.assertEqual(self.redis.store["mes:quality_stats:version"], "3")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.core import request_metrics
+
+
+def _build_app() -> FastAPI:
+    request_metrics.install_sql_query_counter()
+    engine = create_engine("sqlite://")
+    app = FastAPI()
+    app.add_middleware(request_metrics.RequestMetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int) -> dict[str, int]:
+        with engine.connect() as conn:
+            for _ in range(3):
+                conn.execute(text("SELECT 1")).scalar_one()
+        return {"item_id": item_id}
+
+    @app.get("/broken")
+    def broken() -> dict[str, int]:
+        with engine.connect() as conn:
+            for _ in range(2):
+                try:
+                    conn.execute(text("SELECT * FROM missing_table"))
+                except OperationalError:
+                    pass
+            conn.execute(text("SELECT 1")).scalar_one()
+            return {"pending": len(conn.info.get("request_metrics_started", []))}
+
+    return app
+
+
+class RequestMetricsUnitTest(unittest.TestCase):
+    def setUp(self) -> None:
+        request_metrics.reset_route_metrics()
+
+    def tearDown(self) -> None:
+        request_metrics.reset_route_metrics()
+
+    def test_middleware_records_route_template_sql_count_and_server_timing(self) -> None:
+        client = TestClient(_build_app())
+
+        first = client.get("/items/1")
+        client.get("/items/2")
+
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('desc="3 queries"', first.headers["server-timing"])
+        rows = request_metrics.summarize_route_metrics()
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["route"], "/items/{item_id}")
+        self.assertEqual(rows[0]["count"], 2)
+        self.assertEqual(rows[0]["avg_sql_statements"], 3.0)
+
+    def test_failed_statements_pop_timing_stack(self) -> None:
+        client = TestClient(_build_app())
+
+        response = client.get("/broken")
+
+        self.assertEqual(response.json(), {"pending": 0})
+        self.assertIn('desc="3 queries"', response.headers["server-timing"])
+
+    def test_unsampled_requests_are_passed_through(self) -> None:
+        client = TestClient(_build_app())
+
+        with patch.object(request_metrics.settings, "request_metrics_sample_rate", 0.0):
+            response = client.get("/items/1")
+
+        self.assertNotIn("server-timing", response.headers)
+        self.assertEqual(request_metrics.summarize_route_metrics(), [])
+
+    def test_quantiles_and_prometheus_exposition(self) -> None:
+        stats = request_metrics.RequestSqlStats(statements=2, seconds=0.001)
+        for seconds in (0.002, 0.003, 0.004, 0.2):
+            request_metrics.record_request(
+                method="GET",
+                route="/demo",
+                seconds=seconds,
+                sql_stats=stats,
+                status_code=200,
+            )
+
+        row = request_metrics.summarize_route_metrics()[0]
+        text_output = request_metrics.render_prometheus_text()
+
+        self.assertLessEqual(row["p50_ms"], 5.0)
+        self.assertGreater(row["p99_ms"], 100.0)
+        self.assertIn(
+            'mes_http_request_duration_seconds_bucket{method="GET",route="/demo",le="0.005"} 3',
+            text_output,
+        )
+        self.assertIn(
+            'mes_http_request_sql_statements_total{method="GET",route="/demo"} 8',
+            text_output,
+        )
+
+
+    def test_metrics_endpoint_requires_configured_token(self) -> None:
+        from starlette.requests import Request
+
+        from app.main import metrics
+
+        def _request(authorization: str | None) -> Request:
+            headers = [] if authorization is None else [(b"authorization", authorization.encode())]
+            return Request({"type": "http", "method": "GET", "path": "/metrics", "headers": headers})
+
+        with patch.object(request_metrics.settings, "request_metrics_token", ""):
+            self.assertEqual(metrics(_request(None)).status_code, 404)
+            self.assertEqual(metrics(_request("Bearer ")).status_code, 404)
+        with patch.object(request_metrics.settings, "request_metrics_token", "s3cret"):
+            self.assertEqual(metrics(_request(None)).status_code, 401)
+            self.assertEqual(metrics(_request("Bearer wrong")).status_code, 401)
+            self.assertEqual(metrics(_request("Bearer s3cret")).status_code, 200)
+
+if __name__ == "__main__":
+    unittest.main()
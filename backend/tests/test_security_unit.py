@@ -17,7 +17,6 @@ class SecurityUnitTest(unittest.TestCase):
 
     def test_verify_password_cached_hits_local_cache_after_first_success(self) -> None:
         with (
-            patch.object(security.time, "monotonic", side_effect=[10.0, 20.0]),
             patch.object(security, "verify_password", return_value=True) as verify_password,
         ):
             first = security.verify_password_cached(
@@ -37,7 +36,6 @@ class SecurityUnitTest(unittest.TestCase):
 
     def test_verify_password_cached_does_not_cache_failed_verification(self) -> None:
         with (
-            patch.object(security.time, "monotonic", side_effect=[10.0, 20.0]),
             patch.object(security, "verify_password", return_value=False) as verify_password,
         ):
             first = security.verify_password_cached(
@@ -55,6 +53,18 @@ class SecurityUnitTest(unittest.TestCase):
         self.assertFalse(second)
         self.assertEqual(verify_password.call_count, 2)
 
+    def test_invalidate_password_cache_drops_only_that_users_entries(self) -> None:
+        with patch.object(security, "verify_password", return_value=True) as verify_password:
+            security.verify_password_cached("Pwd@123", "hash-1", cache_scope="user:7")
+            security.verify_password_cached("Pwd@123", "hash-2", cache_scope="user:8")
+
+            removed = security.invalidate_password_cache(7)
+            security.verify_password_cached("Pwd@123", "hash-1", cache_scope="user:7")
+            security.verify_password_cached("Pwd@123", "hash-2", cache_scope="user:8")
+
+        self.assertEqual(removed, 1)
+        self.assertEqual(verify_password.call_count, 3)
+
     def test_create_access_token_rejects_insecure_placeholder_secret(self) -> None:
         with patch.object(
             security.settings,
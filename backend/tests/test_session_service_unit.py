@@ -18,6 +18,21 @@ class SessionServiceUnitTest(unittest.TestCase):
         session_service._LOGIN_LOG_CLEANUP_NEXT_AT = 0.0
         session_service._SESSION_CLEANUP_NEXT_AT = 0.0
         session_service._SUCCESS_LOGIN_LOG_LOCAL_CACHE.clear()
+        session_service._SESSION_TOUCH_PENDING.clear()
+        schedule_patcher = patch.object(
+            session_service,
+            "_schedule_session_touch_flush_locked",
+        )
+        self.schedule_flush = schedule_patcher.start()
+        self.addCleanup(schedule_patcher.stop)
+        self.addCleanup(session_service._SESSION_TOUCH_PENDING.clear)
+        state_cache_patcher = patch.object(
+            session_service.settings,
+            "session_state_cache_enabled",
+            False,
+        )
+        state_cache_patcher.start()
+        self.addCleanup(state_cache_patcher.stop)
 
     def test_touch_session_throttles_when_interval_not_elapsed(self) -> None:
         now = datetime(2026, 4, 8, 12, 0, tzinfo=UTC)
@@ -51,7 +66,7 @@ class SessionServiceUnitTest(unittest.TestCase):
         self.assertEqual(row.last_active_at, now - timedelta(seconds=10))
         db.flush.assert_not_called()
 
-    def test_touch_session_updates_when_interval_elapsed(self) -> None:
+    def test_touch_session_buffers_write_behind_when_interval_elapsed(self) -> None:
         now = datetime(2026, 4, 8, 12, 0, tzinfo=UTC)
         row = SimpleNamespace(
             status="active",
@@ -79,9 +94,14 @@ class SessionServiceUnitTest(unittest.TestCase):
             result_row, touched = session_service.touch_session_by_token_id(db, "sid-2")
 
         self.assertIs(result_row, row)
-        self.assertTrue(touched)
-        self.assertEqual(row.last_active_at, now)
-        db.flush.assert_called_once()
+        self.assertFalse(touched)
+        self.assertEqual(row.last_active_at, now - timedelta(seconds=45))
+        db.flush.assert_not_called()
+        self.assertEqual(
+            session_service._SESSION_TOUCH_PENDING,
+            {"sid-2": now.timestamp()},
+        )
+        self.schedule_flush.assert_called_once()
 
     def test_touch_session_marks_expired_when_session_has_timed_out(self) -> None:
         now = datetime(2026, 4, 8, 12, 0, tzinfo=UTC)
@@ -166,7 +186,7 @@ class SessionServiceUnitTest(unittest.TestCase):
             result_row, touched = session_service.touch_session_by_token_id(db, "sid-redis")
 
         self.assertIs(result_row, row)
-        self.assertTrue(touched)
+        self.assertFalse(touched)
         # Redis was called with correct positional args
         touch_redis.assert_called_once()
         call_args = touch_redis.call_args
@@ -196,6 +216,195 @@ class SessionServiceUnitTest(unittest.TestCase):
         self.assertFalse(touched)
         delete_redis.assert_called_once_with("sid-missing")
 
+    def test_flush_local_session_touches_moves_buffer_into_redis_hash(self) -> None:
+        session_service._SESSION_TOUCH_PENDING.update({"sid-a": 100.0, "sid-b": 200.5})
+        redis_client = MagicMock()
+
+        with (
+            patch.object(
+                session_service,
+                "_get_session_redis_client",
+                return_value=redis_client,
+            ),
+            patch.object(session_service, "_write_session_touches_to_db") as write_db,
+        ):
+            flushed = session_service.flush_local_session_touches()
+
+        self.assertEqual(flushed, 2)
+        redis_client.hset.assert_called_once_with(
+            session_service._SESSION_TOUCH_PENDING_KEY,
+            mapping={"sid-a": "100.000", "sid-b": "200.500"},
+        )
+        write_db.assert_not_called()
+        self.assertEqual(session_service._SESSION_TOUCH_PENDING, {})
+
+    def test_flush_local_session_touches_writes_db_when_redis_unavailable(self) -> None:
+        session_service._SESSION_TOUCH_PENDING.update({"sid-a": 100.0})
+
+        with (
+            patch.object(session_service, "_get_session_redis_client", return_value=None),
+            patch.object(
+                session_service,
+                "_write_session_touches_to_db",
+                return_value=1,
+            ) as write_db,
+        ):
+            flushed = session_service.flush_local_session_touches()
+
+        self.assertEqual(flushed, 1)
+        write_db.assert_called_once_with({"sid-a": 100.0})
+
+    def test_flush_session_touches_merges_redis_and_local_keeping_latest(self) -> None:
+        session_service._SESSION_TOUCH_PENDING.update({"sid-a": 300.0, "sid-c": 50.0})
+        redis_client = MagicMock()
+        pipe = redis_client.pipeline.return_value
+        pipe.execute.return_value = [{"sid-a": "100.0", "sid-b": "200.0", "bad": "x"}, 1]
+
+        with (
+            patch.object(
+                session_service,
+                "_get_session_redis_client",
+                return_value=redis_client,
+            ),
+            patch.object(
+                session_service,
+                "_write_session_touches_to_db",
+                return_value=3,
+            ) as write_db,
+        ):
+            updated = session_service.flush_session_touches()
+
+        self.assertEqual(updated, 3)
+        pipe.hgetall.assert_called_once_with(session_service._SESSION_TOUCH_PENDING_KEY)
+        pipe.delete.assert_called_once_with(session_service._SESSION_TOUCH_PENDING_KEY)
+        write_db.assert_called_once_with({"sid-a": 300.0, "sid-b": 200.0, "sid-c": 50.0})
+        self.assertEqual(session_service._SESSION_TOUCH_PENDING, {})
+
+    def test_apply_session_touches_issues_single_update_from_values(self) -> None:
+        from sqlalchemy.dialects import postgresql
+
+        db = MagicMock()
+        db.execute.return_value.rowcount = 2
+
+        updated = session_service.apply_session_touches(
+            db,
+            {"sid-a": 100.0, "sid-b": 200.0},
+        )
+
+        self.assertEqual(updated, 2)
+        db.execute.assert_called_once()
+        sql = str(db.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        self.assertIn("UPDATE sys_user_session SET last_active_at=session_touch.last_active_at", sql)
+        self.assertIn("FROM (VALUES", sql)
+        self.assertIn("sys_user_session.last_active_at < session_touch.last_active_at", sql)
+
+    def test_touch_session_uses_cached_state_without_querying_db(self) -> None:
+        now = datetime(2026, 4, 8, 12, 0, tzinfo=UTC)
+        state = session_service.CachedSessionState(
+            session_token_id="sid-cached",
+            status="active",
+            user_id=7,
+            login_ip="127.0.0.1",
+            terminal_info="pytest",
+            expires_at=now + timedelta(minutes=10),
+            last_active_at=now - timedelta(seconds=5),
+        )
+        db = MagicMock()
+
+        with (
+            patch.object(session_service, "get_cached_session_state", return_value=state),
+            patch.object(session_service, "get_session_by_token_id") as get_by_sid,
+            patch.object(session_service, "_now_utc", return_value=now),
+            patch.object(session_service, "_touch_session_active_in_redis"),
+        ):
+            result_row, touched = session_service.touch_session_by_token_id(
+                db,
+                "sid-cached",
+                require_user_id=7,
+            )
+
+        self.assertIs(result_row, state)
+        self.assertFalse(touched)
+        get_by_sid.assert_not_called()
+        db.execute.assert_not_called()
+
+    def test_touch_session_caches_state_after_db_fallback(self) -> None:
+        now = datetime(2026, 4, 8, 12, 0, tzinfo=UTC)
+        row = SimpleNamespace(
+            status="active",
+            expires_at=now + timedelta(minutes=10),
+            last_active_at=now - timedelta(seconds=5),
+            logout_time=None,
+            user_id=7,
+            login_ip="127.0.0.1",
+            terminal_info="pytest",
+        )
+        db = MagicMock()
+
+        with (
+            patch.object(session_service, "get_cached_session_state", return_value=None),
+            patch.object(session_service, "get_session_by_token_id", return_value=row),
+            patch.object(session_service, "cache_session_state") as cache_state,
+            patch.object(session_service, "_now_utc", return_value=now),
+            patch.object(session_service, "_touch_session_active_in_redis"),
+        ):
+            session_service.touch_session_by_token_id(db, "sid-fill", require_user_id=7)
+
+        cache_state.assert_called_once()
+        cached = cache_state.call_args.args[0]
+        self.assertEqual(cached.session_token_id, "sid-fill")
+        self.assertEqual(cached.login_ip, "127.0.0.1")
+        self.assertEqual(cached.user_id, 7)
+
+    def test_force_offline_sessions_invalidates_session_state_cache(self) -> None:
+        now = datetime(2026, 4, 8, 12, 0, tzinfo=UTC)
+        rows = [
+            SimpleNamespace(session_token_id="sid-a", status="active"),
+            SimpleNamespace(session_token_id="sid-b", status="active"),
+        ]
+        db = MagicMock()
+        db.execute.return_value.scalars.return_value.all.return_value = rows
+
+        with (
+            patch.object(session_service, "_now_utc", return_value=now),
+            patch.object(session_service, "_delete_session_active_in_redis"),
+            patch.object(session_service, "invalidate_session_states") as invalidate,
+        ):
+            affected = session_service.force_offline_sessions(
+                db,
+                session_token_ids=["sid-a", "sid-b"],
+            )
+
+        self.assertEqual(affected, 2)
+        invalidate.assert_called_once_with(["sid-a", "sid-b"])
+
+    def test_mark_session_logout_and_renew_invalidate_session_state_cache(self) -> None:
+        now = datetime(2026, 4, 8, 12, 0, tzinfo=UTC)
+        row = SimpleNamespace(
+            session_token_id="sid-1",
+            status="active",
+            expires_at=now + timedelta(minutes=10),
+            last_active_at=now,
+            logout_time=None,
+            is_forced_offline=False,
+            user_id=7,
+        )
+        db = MagicMock()
+
+        with (
+            patch.object(session_service, "get_session_by_token_id", return_value=row),
+            patch.object(session_service, "_now_utc", return_value=now),
+            patch.object(session_service, "_touch_session_active_in_redis"),
+            patch.object(session_service, "_delete_session_active_in_redis"),
+            patch.object(session_service, "invalidate_session_states") as invalidate,
+        ):
+            session_service.renew_session(db, session_token_id="sid-1")
+            session_service.mark_session_logout(db, session_token_id="sid-1")
+
+        self.assertEqual(invalidate.call_count, 2)
+        for call in invalidate.call_args_list:
+            self.assertEqual(call.args[0], ["sid-1"])
+
     def test_create_user_session_does_not_flush_immediately(self) -> None:
         now = datetime(2026, 4, 8, 12, 0, tzinfo=UTC)
         db = MagicMock()
@@ -392,7 +601,7 @@ class SessionServiceUnitTest(unittest.TestCase):
             )
 
         self.assertIs(result_row, row)
-        self.assertTrue(touched)
+        self.assertFalse(touched)
         self.assertEqual(touch_redis.call_count, 1)
         ttl_seconds = touch_redis.call_args.kwargs["ttl_seconds"]
         self.assertLessEqual(ttl_seconds, 4)
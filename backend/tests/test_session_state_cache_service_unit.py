@@ -0,0 +1,147 @@
+import sys
+import unittest
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.services import session_state_cache_service as cache_service
+
+
+def _build_state(token: str = "sid-1", **overrides) -> cache_service.CachedSessionState:
+    values = {
+        "session_token_id": token,
+        "status": "active",
+        "user_id": 7,
+        "login_ip": "127.0.0.1",
+        "terminal_info": "pytest",
+        "expires_at": datetime.now(UTC) + timedelta(minutes=30),
+        "last_active_at": None,
+    }
+    values.update(overrides)
+    return cache_service.CachedSessionState(**values)
+
+
+class SessionStateCacheServiceUnitTest(unittest.TestCase):
+    def setUp(self) -> None:
+        cache_service.clear_local_session_states()
+        self.redis_client = MagicMock()
+        self.redis_client.get.return_value = None
+        patchers = [
+            patch.object(cache_service, "_ensure_session_state_bus_started"),
+            patch.object(
+                cache_service,
+                "_get_session_state_redis_client",
+                return_value=self.redis_client,
+            ),
+            patch.object(cache_service.settings, "session_state_cache_enabled", True),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(cache_service.clear_local_session_states)
+
+    def test_cached_state_is_served_locally_after_first_write(self) -> None:
+        state = _build_state()
+
+        cache_service.cache_session_state(state)
+        cached = cache_service.get_cached_session_state("sid-1")
+
+        self.assertEqual(cached, state)
+        self.redis_client.setex.assert_called_once()
+        key, ttl, _payload = self.redis_client.setex.call_args.args
+        self.assertEqual(key, "mes:session:state:sid-1")
+        self.assertGreater(ttl, 0)
+        self.redis_client.get.assert_not_called()
+
+    def test_redis_tier_fills_local_cache_on_local_miss(self) -> None:
+        state = _build_state(last_active_at=datetime(2026, 4, 8, 12, 0, tzinfo=UTC))
+        self.redis_client.get.return_value = cache_service._serialize_session_state(state)
+
+        first = cache_service.get_cached_session_state("sid-1")
+        second = cache_service.get_cached_session_state("sid-1")
+
+        self.assertEqual(first, state)
+        self.assertEqual(second, state)
+        self.redis_client.get.assert_called_once_with("mes:session:state:sid-1")
+
+    def test_inactive_or_expired_states_are_not_cached(self) -> None:
+        cache_service.cache_session_state(_build_state("sid-off", status="forced_offline"))
+        cache_service.cache_session_state(
+            _build_state("sid-old", expires_at=datetime.now(UTC) - timedelta(seconds=1))
+        )
+
+        self.assertIsNone(cache_service.get_cached_session_state("sid-off"))
+        self.assertIsNone(cache_service.get_cached_session_state("sid-old"))
+        self.redis_client.setex.assert_not_called()
+
+    def test_invalidate_drops_local_entry_and_broadcasts(self) -> None:
+        cache_service.cache_session_state(_build_state("sid-1"))
+        cache_service.cache_session_state(_build_state("sid-2"))
+        pipe = self.redis_client.pipeline.return_value
+
+        cache_service.invalidate_session_states(["sid-2", "sid-1", " "])
+
+        self.assertIsNone(cache_service.get_cached_session_state("sid-1"))
+        self.assertIsNone(cache_service.get_cached_session_state("sid-2"))
+        pipe.delete.assert_called_once_with(
+            "mes:session:state:sid-1",
+            "mes:session:state:sid-2",
+        )
+        pipe.publish.assert_called_once_with(
+            cache_service.settings.session_state_invalidation_channel,
+            "sid-1,sid-2",
+        )
+
+    def test_bus_message_forgets_local_entries(self) -> None:
+        cache_service.cache_session_state(_build_state("sid-1"))
+        cache_service.cache_session_state(_build_state("sid-2"))
+
+        cache_service._forget_local_session_states(["sid-1"])
+
+        self.assertIsNone(cache_service._get_local_session_state("sid-1"))
+        self.assertIsNotNone(cache_service._get_local_session_state("sid-2"))
+
+
+    def test_bus_listener_clears_once_per_outage_and_on_reconnect(self) -> None:
+        attempts = 0
+        pubsub = MagicMock()
+
+        def _client(*, socket_timeout):
+            nonlocal attempts
+            attempts += 1
+            if attempts <= 3:
+                raise ConnectionError("redis down")
+            client = MagicMock()
+            client.pubsub.return_value = pubsub
+            return client
+
+        def _get_message(timeout):
+            cache_service._SESSION_STATE_BUS_STOP.set()
+            return None
+
+        pubsub.get_message.side_effect = _get_message
+        stop_event = cache_service._SESSION_STATE_BUS_STOP
+        self.addCleanup(stop_event.clear)
+        stop_event.clear()
+        with (
+            patch.object(
+                cache_service,
+                "_build_session_state_redis_client",
+                side_effect=_client,
+            ),
+            patch.object(stop_event, "wait", return_value=False),
+            patch.object(cache_service, "clear_local_session_states") as clear_local,
+        ):
+            cache_service._run_session_state_bus_listener()
+
+        self.assertEqual(attempts, 4)
+        # 断线时一次 + 重连成功后一次
+        self.assertEqual(clear_local.call_count, 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.core import slow_query_log
+from scripts import slow_query_report
+
+
+class SlowQueryLogUnitTest(unittest.TestCase):
+    def test_normalize_sql_collapses_literals_params_and_in_lists(self) -> None:
+        first = slow_query_log.sql_fingerprint(
+            "SELECT a::text FROM t1 WHERE id IN (%(id_1_1)s, %(id_1_2)s) AND name = 'x'"
+        )
+        second = slow_query_log.sql_fingerprint(
+            "SELECT a::text FROM t1  WHERE id IN (%(id_1_1)s) AND name = 'yy'"
+        )
+
+        self.assertEqual(first, second)
+        self.assertEqual(
+            first[1],
+            "SELECT a::text FROM t1 WHERE id IN (?...) AND name = ?",
+        )
+
+    def test_parameter_shape_omits_values(self) -> None:
+        shape = slow_query_log.describe_parameter_shape(
+            {"password": "secret", "ids": [1, 2, 3], "limit": 20},
+            False,
+        )
+
+        self.assertEqual(shape, {"password": "str[6]", "ids": "list[3]", "limit": "int"})
+
+    def test_slow_statement_is_written_with_caller_and_reported(self) -> None:
+        slow_query_log.install_slow_query_log()
+        engine = create_engine("sqlite://")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            log_path = Path(tmp_dir) / "slow.jsonl"
+            with (
+                patch.object(slow_query_log.settings, "slow_query_log_enabled", True),
+                patch.object(slow_query_log.settings, "slow_query_threshold_ms", 0.0),
+                patch.object(slow_query_log.settings, "slow_query_log_path", str(log_path)),
+                patch.object(slow_query_log, "capture_caller_frames", return_value=["services/demo.py:1 f"]),
+                engine.connect() as conn,
+            ):
+                for value in (1, 2):
+                    conn.execute(text("SELECT :value"), {"value": value}).scalar_one()
+
+            entries = [json.loads(line) for line in log_path.read_text(encoding="utf-8").splitlines()]
+            stats = slow_query_report.load_fingerprint_stats([log_path])
+
+        self.assertEqual(len(entries), 2)
+        self.assertEqual(entries[0]["callers"], ["services/demo.py:1 f"])
+        self.assertEqual(entries[0]["param_shape"], ["int"])
+        ranked = slow_query_report.rank_fingerprints(stats, sort_by="count", top=5)
+        self.assertEqual(len(ranked), 1)
+        self.assertEqual(ranked[0].count, 2)
+        self.assertEqual(ranked[0].normalized_sql, "SELECT ?")
+
+    def test_failed_statement_pops_timing_stack(self) -> None:
+        slow_query_log.install_slow_query_log()
+        engine = create_engine("sqlite://")
+        with (
+            patch.object(slow_query_log.settings, "slow_query_log_enabled", True),
+            patch.object(slow_query_log.settings, "slow_query_threshold_ms", 10_000.0),
+            engine.connect() as conn,
+        ):
+            with self.assertRaises(OperationalError):
+                conn.execute(text("SELECT * FROM missing_table"))
+
+            self.assertEqual(conn.info.get("slow_query_started"), [])
+
+    def test_disabled_log_skips_timing(self) -> None:
+        slow_query_log.install_slow_query_log()
+        engine = create_engine("sqlite://")
+        with (
+            patch.object(slow_query_log.settings, "slow_query_log_enabled", False),
+            patch.object(slow_query_log, "write_slow_query_entry") as write_mock,
+            engine.connect() as conn,
+        ):
+            conn.execute(text("SELECT 1")).scalar_one()
+
+        write_mock.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()